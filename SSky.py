@@ -6,17 +6,27 @@ SSky - Blueskyクライアント
 メインエントリーポイント
 """
 
+from core.startup_timer import StartupTimer  # 起動時間の計測はこのインポートの時点から（最初にインポートする）
 import os
 import wx
 import logging
+import multiprocessing
 from config.logging_config import setup_logging
 from gui.app import SSkyApp
 
-# ロギングの設定
-logger = setup_logging()
-
-logger.debug("アプリケーションを起動します")
-
 if __name__ == "__main__":
+    # 画像処理用ワーカープロセス（spawn）で本体の初期化が走らないようにする
+    multiprocessing.freeze_support()
+    
+    # モジュールの読み込みが終わった時点
+    startup_timer = StartupTimer()
+    startup_timer.mark('imports')
+    
+    # ロギングの設定
+    with startup_timer.phase('setup_logging'):
+        logger = setup_logging()
+    
+    logger.debug("アプリケーションを起動します")
+    
     app = SSkyApp()
     app.MainLoop()
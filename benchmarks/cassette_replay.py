@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+実際のサーバーとの通信をカセットに記録し、ネットワークに接続せずに再生して計測する
+
+使い方:
+    python benchmarks/cassette_replay.py record --handle you.bsky.social --output session.json
+                                            # ログインしてタイムライン・プロフィール・スレッドを取得し、記録する
+    python benchmarks/cassette_replay.py replay session.json --repeat 10
+                                            # 待ち時間なしで再生し、応答の解析と正規化の時間を計測する
+    python benchmarks/cassette_replay.py replay session.json --realtime
+                                            # 記録した応答時間で再生する
+    python benchmarks/cassette_replay.py replay session.json --output result.json
+    python benchmarks/cassette_replay.py replay session.json --baseline base.json --max-ratio 1.2
+
+記録と再生は同じ手順（ログイン -> タイムライン -> 正規化 -> プロフィール -> スレッド）で行うため、
+再生時のリクエストは記録と同じ順に照合される。カセットに認証情報は残らない（core.cassetteを参照）。
+再生の段階ごとの時間には、atprotoのモデルへの変換（pydantic）が含まれる。
+atprotoのインストールが必要（wxは不要）。
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import getpass
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.xrpc_load import DiscardingAuthManager
+from core.cassette import Cassette
+from core.post_model import normalize_post
+from core.data_store import DataStore
+from core.auth.session_persistence import SessionPersistence
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 段階（表示順）
+STAGES = ('login', 'timeline', 'normalize', 'profile', 'threads')
+
+# 再生時のパスワード（カセットではパスワードを照合しない）
+REPLAY_PASSWORD = 'replay'
+
+def run_session(client, handle, password, limit, threads):
+    """記録・再生する手順を実行する
+
+    Args:
+        client (BlueskyClient): クライアント
+        handle (str): ログインするハンドル
+        password (str): パスワード
+        limit (int): タイムラインの取得件数
+        threads (int): スレッドを取得する投稿の数（タイムラインの先頭から）
+
+    Returns:
+        tuple: (段階名 -> 所要時間（ミリ秒）, 正規化した投稿のリスト)
+    """
+    timings = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = (time.perf_counter() - start) * 1000
+        return result
+
+    timed('login', client.login, handle, password)
+    timeline = timed('timeline', client.get_timeline, limit)
+    posts = timed('normalize', lambda: [normalize_post(item.post, handle) for item in timeline.feed])
+    timed('profile', client.get_profile, handle)
+    timed('threads', lambda: [client.get_post_thread(post['uri']) for post in posts[:threads]])
+    return timings, posts
+
+def _create_client(transport, data_store, base_url=None):
+    from core.client import BlueskyClient
+    return BlueskyClient(base_url=base_url, data_store=data_store, transport=transport)
+
+def record(args):
+    """実際のサーバーとの通信を記録する"""
+    from core.cassette_transport import RecordingTransport
+
+    password = os.environ.get('SSKY_PASSWORD') or getpass.getpass(f"{args.handle}のアプリパスワード: ")
+    cassette = Cassette(args.output, metadata={
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'handle': args.handle, 'limit': args.limit, 'threads': args.threads,
+    })
+    work_dir = tempfile.mkdtemp(prefix='ssky_cassette_')
+    data_store = DataStore(os.path.join(work_dir, 'record.db'))
+    try:
+        transport = RecordingTransport(cassette, autosave=False)
+        timings, posts = run_session(
+            _create_client(transport, data_store, args.url), args.handle, password, args.limit, args.threads
+        )
+    finally:
+        data_store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not cassette.save():
+        return 1
+    print(f"{len(cassette)}件の通信を記録しました（投稿{len(posts)}件）: {args.output}")
+    for stage in STAGES:
+        print(f"  {stage:10} {timings[stage]:10.1f}ms")
+    return 0
+
+def replay(args):
+    """記録した通信を再生して計測する"""
+    from core.cassette_transport import ReplayTransport
+
+    cassette = Cassette.load(args.cassette)
+    handle = cassette.metadata.get('handle')
+    limit = cassette.metadata.get('limit', 50)
+    threads = cassette.metadata.get('threads', 0)
+    if not handle:
+        print("カセットにハンドルが記録されていません（recordで記録したカセットを指定してください）", file=sys.stderr)
+        return 2
+
+    runs = []
+    post_count = 0
+    work_dir = tempfile.mkdtemp(prefix='ssky_cassette_')
+    try:
+        for index in range(args.repeat):
+            cassette.rewind()
+            data_store = DataStore(os.path.join(work_dir, f"replay_{index}.db"))
+            try:
+                transport = ReplayTransport(cassette, realtime=args.realtime, speed=args.speed)
+                gc.collect()
+                timings, posts = run_session(
+                    _create_client(transport, data_store), handle, REPLAY_PASSWORD, limit, threads
+                )
+            finally:
+                data_store.close()
+            runs.append(timings)
+            post_count = len(posts)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {}
+    print(f"{len(cassette)}件の通信を{args.repeat}回再生しました（投稿{post_count}件）")
+    for stage in STAGES:
+        values = [run[stage] for run in runs]
+        median = statistics.median(values)
+        results[stage] = {
+            'median_ms': round(median, 3),
+            'min_ms': round(min(values), 3),
+            'runs_ms': [round(value, 3) for value in values],
+        }
+        print(f"  {stage:10} 中央値 {median:10.1f}ms  最小 {min(values):10.1f}ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cassette': os.path.basename(args.cassette),
+                'realtime': args.realtime,
+                'repeat': args.repeat,
+                'results': results,
+            }, f, ensure_ascii=False, indent=4)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failed = compare(results, baseline.get('results', {}), args.max_ratio)
+    return 1 if failed else 0
+
+def compare(results, baseline, max_ratio):
+    """基準の結果と比較する
+
+    Args:
+        results (dict): 段階名 -> 計測結果
+        baseline (dict): 基準の結果（--outputで保存したJSONの'results'）
+        max_ratio (float): 許容する比率
+
+    Returns:
+        bool: 許容する比率を超えた段階があった場合はTrue
+    """
+    failed = False
+    for stage, values in results.items():
+        base = baseline.get(stage)
+        if not base or not base.get('median_ms'):
+            continue
+        ratio = values['median_ms'] / base['median_ms']
+        status = "OK" if ratio <= max_ratio else "NG"
+        print(f"{stage}: {base['median_ms']:.1f}ms -> {values['median_ms']:.1f}ms（{ratio:.2f}倍, 上限{max_ratio}倍）{status}")
+        failed = failed or ratio > max_ratio
+    return failed
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="通信をカセットに記録し、再生して計測します")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="実際のサーバーとの通信を記録する")
+    record_parser.add_argument('--handle', required=True, help="ログインするハンドル")
+    record_parser.add_argument('--output', required=True, help="カセットの保存先")
+    record_parser.add_argument('--url', help="接続先のサーバー（省略した場合はatprotoの既定）")
+    record_parser.add_argument('--limit', type=int, default=100, help="タイムラインの取得件数")
+    record_parser.add_argument('--threads', type=int, default=5, help="スレッドを取得する投稿の数")
+
+    replay_parser = subparsers.add_parser('replay', help="記録した通信を再生して計測する")
+    replay_parser.add_argument('cassette', help="再生するカセット")
+    replay_parser.add_argument('--repeat', type=int, default=5, help="再生する回数（中央値を使用）")
+    replay_parser.add_argument('--realtime', action='store_true', help="記録した応答時間だけ待つ")
+    replay_parser.add_argument('--speed', type=float, default=1.0, help="--realtimeのときの再生速度")
+    replay_parser.add_argument('--output', help="結果を保存するJSONファイル")
+    replay_parser.add_argument('--baseline', help="比較する基準の結果のJSONファイル")
+    replay_parser.add_argument('--max-ratio', type=float, default=1.2, help="基準に対して許容する比率")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    # セッション情報はこのプロセスでは保存しない
+    SessionPersistence(auth_manager=DiscardingAuthManager())
+    if args.command == 'record':
+        return record(args)
+    return replay(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
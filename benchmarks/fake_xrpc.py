@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ローカルの検証用XRPCサーバー（BlueskyClientが使うPDS/AppViewのエンドポイントの代わり）
+
+HTTPの経路を含めたクライアントの動作（並行処理・キャッシュ・再試行など）を、1台のマシンで
+ネットワークに接続せずに確認・計測するためのサーバー。応答の遅延、エラーの割合、
+レート制限のヘッダー、データの件数（benchmarks.synthetic_feedの合成の投稿）を指定できる。
+
+テストから使う場合:
+    with FakeXrpcServer(latency_ms=20) as server:
+        client = BlueskyClient(base_url=server.url)
+        client.login(server.handle, server.password)
+
+コマンドラインから使う場合:
+    python benchmarks/fake_xrpc.py --port 2583 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+    SSKY_XRPC_URL=http://127.0.0.1:2583 python SSky.py   # アプリケーションをこのサーバーに接続
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic_feed import generate_feed
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 既定のアカウント（合成の投稿の投稿者の1人）
+DEFAULT_HANDLE = 'user1.bsky.social'
+DEFAULT_PASSWORD = 'password'
+
+# トークンの有効期間（秒）。実際のPDSと同じく、アクセストークンは短く、リフレッシュトークンは長い
+ACCESS_TOKEN_TTL = 2 * 60 * 60
+REFRESH_TOKEN_TTL = 60 * 24 * 60 * 60
+
+# アップロードできるブロブの最大サイズ（バイト）
+MAX_BLOB_SIZE = 1000000
+
+# 一覧を返すエンドポイントの件数の既定値と上限
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 100
+
+# TID（レコードのキー）に使う文字
+_TID_CHARS = '234567abcdefghijklmnopqrstuvwxyz'
+
+class XrpcError(Exception):
+    """XRPCのエラー応答（{'error', 'message'}）を表す例外クラス"""
+
+    def __init__(self, status, error, message=None):
+        """初期化
+
+        Args:
+            status (int): HTTPのステータスコード
+            error (str): エラーの種類（InvalidRequest、RecordNotFoundなど）
+            message (str, optional): エラーメッセージ
+        """
+        super(XrpcError, self).__init__(message or error)
+        self.status = status
+        self.error = error
+        self.message = message or error
+
+class FakeXrpcServer:
+    """ローカルの検証用XRPCサーバー
+
+    ThreadingHTTPServerを別スレッドで動かし、/xrpc/<NSID>へのリクエストに応答する。
+    状態（投稿・フォロー・ミュートなど）はメモリ上に保持し、書き込み系のエンドポイントで更新される。
+    request_countsにエンドポイントごとの受信数を数える（キャッシュや再試行の確認に使う）。
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, handle=DEFAULT_HANDLE, password=DEFAULT_PASSWORD,
+                 timeline_size=1000, author_count=None, follow_count=50, seed=0,
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=500,
+                 rate_limit=None, rate_limit_window=300, endpoint_overrides=None,
+                 access_token_ttl=ACCESS_TOKEN_TTL, refresh_token_ttl=REFRESH_TOKEN_TTL):
+        """初期化
+
+        Args:
+            host (str, optional): 待ち受けるアドレス
+            port (int, optional): 待ち受けるポート（0の場合は空いているポート）
+            handle (str, optional): ログインできるアカウントのハンドル
+            password (str, optional): ログインできるアカウントのパスワード
+            timeline_size (int, optional): タイムラインの投稿数
+            author_count (int, optional): 投稿者の数。省略した場合は投稿数に応じて決める
+            follow_count (int, optional): アカウントがフォローしているユーザーの数
+            seed (int, optional): 合成のデータ・遅延・エラーの乱数のシード
+            latency_ms (float, optional): 応答の遅延（ミリ秒）
+            jitter_ms (float, optional): 遅延に加えるばらつきの最大値（ミリ秒）
+            error_rate (float, optional): エラーを返す割合（0〜1）
+            error_status (int, optional): エラーを返すときのステータスコード
+            rate_limit (int, optional): レート制限の期間あたりのリクエスト数。Noneの場合は制限しない
+            rate_limit_window (int, optional): レート制限の期間（秒）
+            endpoint_overrides (dict, optional): NSID -> {'latency_ms', 'jitter_ms', 'error_rate'}の上書き
+            access_token_ttl (int, optional): アクセストークンの有効期間（秒）
+            refresh_token_ttl (int, optional): リフレッシュトークンの有効期間（秒）
+        """
+        self.host = host
+        self.port = port
+        self.handle = handle
+        self.password = password
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.endpoint_overrides = dict(endpoint_overrides or {})
+        self.access_token_ttl = access_token_ttl
+        self.refresh_token_ttl = refresh_token_ttl
+
+        self.request_counts = Counter()  # NSID -> 受信数
+        self.status_counts = Counter()  # ステータスコード -> 応答数
+
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._tid_clock = 0
+        self._tokens = {}  # トークン -> (種類, DID, 有効期限)
+        self._rate_window_start = time.time()
+        self._rate_count = 0
+        self._httpd = None
+        self._thread = None
+
+        self._build_dataset(timeline_size, author_count, follow_count, seed)
+
+    # ---- サーバーの開始・停止 ----
+
+    @property
+    def url(self):
+        """サーバーのURL（BlueskyClientのbase_urlに渡す）"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """別スレッドでリクエストの受け付けを開始する
+
+        Returns:
+            FakeXrpcServer: 自分自身
+        """
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _XrpcRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FakeXrpcServer")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"検証用XRPCサーバーを開始しました: {self.url}")
+        return self
+
+    def stop(self):
+        """リクエストの受け付けを停止する"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=5)
+        self._httpd = None
+        self._thread = None
+        logger.info("検証用XRPCサーバーを停止しました")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset_counts(self):
+        """受信数と応答数の集計を消去する"""
+        with self._lock:
+            self.request_counts.clear()
+            self.status_counts.clear()
+
+    # ---- リクエストの処理 ----
+
+    def dispatch(self, method, nsid, params, body, headers):
+        """XRPCのリクエストを処理する（HTTPを介さずにテストから呼び出すこともできる）
+
+        Args:
+            method (str): 'GET'または'POST'
+            nsid (str): エンドポイントのNSID
+            params (dict): クエリパラメータ
+            body (bytes): リクエストの本文
+            headers (dict): リクエストのヘッダー（Authorization、Content-Type）
+
+        Returns:
+            tuple: (ステータスコード, 応答のJSON（辞書）, 追加のヘッダーの辞書)
+        """
+        with self._lock:
+            self.request_counts[nsid] += 1
+            rate_headers, limited = self._check_rate_limit()
+
+        if limited:
+            return self._respond(429, _error_body('RateLimitExceeded', "Rate Limit Exceeded"), rate_headers)
+
+        # 応答の遅延とエラーの注入（エンドポイントごとの上書きがあれば使う）
+        override = self.endpoint_overrides.get(nsid, {})
+        latency = override.get('latency_ms', self.latency_ms)
+        jitter = override.get('jitter_ms', self.jitter_ms)
+        error_rate = override.get('error_rate', self.error_rate)
+        with self._lock:
+            delay = latency + (self._rng.uniform(0, jitter) if jitter else 0)
+            inject_error = error_rate and self._rng.random() < error_rate
+        if delay:
+            time.sleep(delay / 1000)
+        if inject_error:
+            return self._respond(
+                self.error_status, _error_body('InternalServerError', "Injected error"), rate_headers
+            )
+
+        route = _ROUTES.get(nsid)
+        if route is None:
+            return self._respond(501, _error_body('MethodNotImplemented', f"Method Not Implemented: {nsid}"), rate_headers)
+        route_method, auth, handler_name = route
+        if method != route_method:
+            return self._respond(400, _error_body('InvalidRequest', f"Incorrect HTTP method ({method}) expected {route_method}"), rate_headers)
+
+        try:
+            with self._lock:
+                did = self._authenticate(headers, auth) if auth else None
+                if route_method == 'POST' and nsid != 'com.atproto.repo.uploadBlob':
+                    body = _parse_json_body(body)
+                payload = getattr(self, handler_name)(params, body, did, headers)
+        except XrpcError as e:
+            return self._respond(e.status, _error_body(e.error, e.message), rate_headers)
+        except Exception as e:
+            logger.error(f"検証用XRPCサーバーでエラーが発生しました: {nsid}: {str(e)}", exc_info=True)
+            return self._respond(500, _error_body('InternalServerError', str(e)), rate_headers)
+        return self._respond(200, payload if payload is not None else {}, rate_headers)
+
+    def _respond(self, status, payload, headers):
+        """応答を集計して返す"""
+        with self._lock:
+            self.status_counts[status] += 1
+        return status, payload, headers
+
+    def _check_rate_limit(self):
+        """レート制限を確認する（_lockを取得した状態で呼び出す）
+
+        Returns:
+            tuple: (応答に付けるRateLimit-*ヘッダーの辞書, 制限を超えた場合はTrue)
+        """
+        if not self.rate_limit:
+            return {}, False
+
+        now = time.time()
+        if now - self._rate_window_start >= self.rate_limit_window:
+            self._rate_window_start = now
+            self._rate_count = 0
+        self._rate_count += 1
+        limited = self._rate_count > self.rate_limit
+        headers = {
+            'RateLimit-Limit': str(self.rate_limit),
+            'RateLimit-Remaining': str(max(self.rate_limit - self._rate_count, 0)),
+            'RateLimit-Reset': str(int(self._rate_window_start + self.rate_limit_window)),
+            'RateLimit-Policy': f"{self.rate_limit};w={self.rate_limit_window}",
+        }
+        return headers, limited
+
+    def _authenticate(self, headers, kind):
+        """Authorizationヘッダーのトークンを確認する
+
+        Args:
+            headers (dict): リクエストのヘッダー
+            kind (str): 'access'または'refresh'
+
+        Returns:
+            str: トークンのDID
+        """
+        authorization = headers.get('Authorization') or ''
+        if not authorization.startswith('Bearer '):
+            raise XrpcError(401, 'AuthMissing', "Authentication Required")
+        token = authorization[len('Bearer '):]
+        entry = self._tokens.get(token)
+        if entry is None or entry[0] != kind:
+            raise XrpcError(401, 'InvalidToken', "Token could not be verified")
+        if entry[2] <= time.time():
+            raise XrpcError(400, 'ExpiredToken', "Token has expired")
+        return entry[1]
+
+    # ---- 合成のデータ ----
+
+    def _build_dataset(self, timeline_size, author_count, follow_count, seed):
+        """合成の投稿から投稿者・タイムライン・フォローを作成する"""
+        self.feed = generate_feed(timeline_size, seed=seed, author_count=author_count)
+        self.posts = {}  # URI -> PostView
+        self.replies = {}  # 返信先のURI -> 返信のURIのリスト
+        self.profiles = {}  # DID -> 投稿者（ProfileViewBasic）
+        for item in self.feed:
+            post = item['post']
+            self.posts[post['uri']] = post
+            self.profiles.setdefault(post['author']['did'], post['author'])
+            if 'reason' in item:
+                self.profiles.setdefault(item['reason']['by']['did'], item['reason']['by'])
+            parent = post['record'].get('reply', {}).get('parent')
+            if parent:
+                self.replies.setdefault(parent['uri'], []).append(post['uri'])
+
+        self.handles = {profile['handle']: did for did, profile in self.profiles.items()}
+        self.did = self.handles.get(self.handle)
+        if self.did is None:
+            self.did = 'did:plc:fakeself'
+            self.profiles[self.did] = {'did': self.did, 'handle': self.handle, 'displayName': "", 'avatar': None}
+            self.handles[self.handle] = self.did
+
+        # リポジトリのレコード（コレクション -> rkey -> (CID, レコード)）と、フォロー・ブロックの索引
+        self.records = {}
+        self.following = {}  # 相手のDID -> フォローのレコードのURI
+        self.blocking = {}  # 相手のDID -> ブロックのレコードのURI
+        self.mutes = set()
+        others = [did for did in self.profiles if did != self.did]
+        for did in others[:follow_count]:
+            self._put_record('app.bsky.graph.follow', {
+                '$type': 'app.bsky.graph.follow', 'subject': did, 'createdAt': _now_iso(),
+            })
+        self.followers = others[::3][:max(follow_count * 2, 1)]
+
+    def _profile_view(self, did, viewer_did=None, detailed=False):
+        """プロフィール（ProfileViewBasic/ProfileViewDetailed）を作成する"""
+        profile = dict(self.profiles[did])
+        if viewer_did == self.did:
+            profile['viewer'] = {'muted': did in self.mutes}
+            if did in self.following:
+                profile['viewer']['following'] = self.following[did]
+            if did in self.blocking:
+                profile['viewer']['blocking'] = self.blocking[did]
+        if detailed:
+            digest = int(hashlib.sha256(did.encode('utf-8')).hexdigest()[:8], 16)
+            profile.update({
+                'description': f"{profile['handle']}のプロフィール（検証用）",
+                'followersCount': len(self.followers) if did == self.did else digest % 5000,
+                'followsCount': len(self.following) if did == self.did else digest % 700,
+                'postsCount': digest % 20000,
+                'indexedAt': _now_iso(),
+            })
+        return profile
+
+    def _resolve_actor(self, actor):
+        """ハンドルまたはDIDを投稿者のDIDにする"""
+        did = actor if actor in self.profiles else self.handles.get((actor or '').lstrip('@'))
+        if did is None:
+            raise XrpcError(400, 'InvalidRequest', "Profile not found")
+        return did
+
+    def _next_rkey(self):
+        """新しいレコードのキー（TID）を作成する（_lockを取得した状態で呼び出す）"""
+        self._tid_clock = max(self._tid_clock + 1, int(time.time() * 1000000))
+        value = self._tid_clock << 10
+        chars = []
+        for _ in range(13):
+            chars.append(_TID_CHARS[value & 31])
+            value >>= 5
+        return ''.join(reversed(chars))
+
+    def _put_record(self, collection, record, rkey=None):
+        """リポジトリにレコードを追加し、フォロー・ブロック・投稿の状態に反映する
+
+        Returns:
+            tuple: (URI, CID)
+        """
+        rkey = rkey or self._next_rkey()
+        uri = f"at://{self.did}/{collection}/{rkey}"
+        cid = _make_cid(json.dumps(record, sort_keys=True).encode('utf-8'), codec=0x71)
+        self.records.setdefault(collection, {})[rkey] = (cid, record)
+
+        if collection == 'app.bsky.graph.follow':
+            self.following[record.get('subject')] = uri
+        elif collection == 'app.bsky.graph.block':
+            self.blocking[record.get('subject')] = uri
+        elif collection in ('app.bsky.feed.like', 'app.bsky.feed.repost'):
+            target = self.posts.get((record.get('subject') or {}).get('uri'))
+            if target is not None:
+                key = 'likeCount' if collection == 'app.bsky.feed.like' else 'repostCount'
+                target[key] = target.get(key, 0) + 1
+        elif collection == 'app.bsky.feed.post':
+            post = {
+                'uri': uri,
+                'cid': cid,
+                'author': self.profiles[self.did],
+                'record': record,
+                'replyCount': 0,
+                'repostCount': 0,
+                'likeCount': 0,
+                'quoteCount': 0,
+                'indexedAt': _now_iso(),
+                'labels': [],
+            }
+            self.posts[uri] = post
+            self.feed.insert(0, {'post': post})
+            parent = (record.get('reply') or {}).get('parent')
+            if parent and parent.get('uri') in self.posts:
+                self.replies.setdefault(parent['uri'], []).append(uri)
+                self.posts[parent['uri']]['replyCount'] += 1
+        return uri, cid
+
+    def _remove_record(self, collection, rkey):
+        """リポジトリからレコードを削除し、フォロー・ブロック・投稿の状態に反映する"""
+        removed = self.records.get(collection, {}).pop(rkey, None)
+        if removed is None:
+            return
+        uri = f"at://{self.did}/{collection}/{rkey}"
+        record = removed[1]
+        if collection == 'app.bsky.graph.follow' and self.following.get(record.get('subject')) == uri:
+            del self.following[record['subject']]
+        elif collection == 'app.bsky.graph.block' and self.blocking.get(record.get('subject')) == uri:
+            del self.blocking[record['subject']]
+        elif collection == 'app.bsky.feed.post' and uri in self.posts:
+            del self.posts[uri]
+            self.feed = [item for item in self.feed if item['post']['uri'] != uri]
+
+    def _issue_session(self, did):
+        """アクセストークンとリフレッシュトークンを発行する"""
+        now = int(time.time())
+        access_jwt = _make_jwt({
+            'scope': 'com.atproto.access', 'sub': did, 'aud': 'did:web:localhost',
+            'iat': now, 'exp': now + self.access_token_ttl,
+        })
+        refresh_jwt = _make_jwt({
+            'scope': 'com.atproto.refresh', 'sub': did, 'aud': 'did:web:localhost',
+            'jti': base64.urlsafe_b64encode(os.urandom(12)).decode('ascii'),
+            'iat': now, 'exp': now + self.refresh_token_ttl,
+        })
+        self._tokens[access_jwt] = ('access', did, now + self.access_token_ttl)
+        self._tokens[refresh_jwt] = ('refresh', did, now + self.refresh_token_ttl)
+        return {
+            'accessJwt': access_jwt,
+            'refreshJwt': refresh_jwt,
+            'handle': self.profiles[did]['handle'],
+            'did': did,
+            'active': True,
+        }
+
+    def _check_repo(self, repo):
+        """書き込み先のリポジトリが自分のものか確認する"""
+        if repo not in (self.did, self.handle):
+            raise XrpcError(400, 'InvalidRequest', f"Could not find repo: {repo}")
+
+    # ---- エンドポイント ----
+
+    def _describe_server(self, params, body, did, headers):
+        return {'did': 'did:web:localhost', 'availableUserDomains': ['.test']}
+
+    def _create_session(self, params, body, did, headers):
+        identifier = (body.get('identifier') or '').lstrip('@')
+        if identifier not in (self.handle, self.did) or body.get('password') != self.password:
+            raise XrpcError(401, 'AuthenticationRequired', "Invalid identifier or password")
+        return self._issue_session(self.did)
+
+    def _refresh_session(self, params, body, did, headers):
+        # 使用したリフレッシュトークンは無効にする（実際のPDSと同じく1回限り）
+        self._tokens.pop(headers.get('Authorization', '')[len('Bearer '):], None)
+        return self._issue_session(did)
+
+    def _get_session(self, params, body, did, headers):
+        return {'handle': self.profiles[did]['handle'], 'did': did, 'active': True}
+
+    def _delete_session(self, params, body, did, headers):
+        self._tokens.pop(headers.get('Authorization', '')[len('Bearer '):], None)
+        return {}
+
+    def _resolve_handle(self, params, body, did, headers):
+        handle = params.get('handle')
+        if handle not in self.handles:
+            raise XrpcError(400, 'InvalidRequest', "Unable to resolve handle")
+        return {'did': self.handles[handle]}
+
+    def _get_timeline(self, params, body, did, headers):
+        items, cursor = _page(self.feed, params)
+        return _with_cursor({'feed': items}, cursor)
+
+    def _get_post_thread(self, params, body, did, headers):
+        uri = params.get('uri')
+        if uri not in self.posts:
+            raise XrpcError(400, 'NotFound', f"Post not found: {uri}")
+        depth = int(params.get('depth', 6))
+        parent_height = int(params.get('parentHeight', 80))
+        return {'thread': self._thread_view(uri, depth, parent_height)}
+
+    def _thread_view(self, uri, depth, parent_height):
+        """スレッド（app.bsky.feed.defs#threadViewPost）を作成する"""
+        post = self.posts[uri]
+        view = {'$type': 'app.bsky.feed.defs#threadViewPost', 'post': post}
+        if depth > 0:
+            view['replies'] = [
+                self._thread_view(reply_uri, depth - 1, 0)
+                for reply_uri in self.replies.get(uri, []) if reply_uri in self.posts
+            ]
+        parent = (post['record'].get('reply') or {}).get('parent')
+        if parent_height > 0 and parent:
+            if parent['uri'] in self.posts:
+                view['parent'] = self._thread_view(parent['uri'], 0, parent_height - 1)
+            else:
+                view['parent'] = {'$type': 'app.bsky.feed.defs#notFoundPost', 'uri': parent['uri'], 'notFound': True}
+        return view
+
+    def _get_profile(self, params, body, did, headers):
+        return self._profile_view(self._resolve_actor(params.get('actor')), did, detailed=True)
+
+    def _get_follows(self, params, body, did, headers):
+        subject = self._resolve_actor(params.get('actor'))
+        follows = list(self.following) if subject == self.did else self._sample_actors(subject, 'follows')
+        items, cursor = _page(follows, params)
+        return _with_cursor({
+            'subject': self._profile_view(subject, did),
+            'follows': [self._profile_view(actor, did) for actor in items if actor in self.profiles],
+        }, cursor)
+
+    def _get_followers(self, params, body, did, headers):
+        subject = self._resolve_actor(params.get('actor'))
+        followers = self.followers if subject == self.did else self._sample_actors(subject, 'followers')
+        items, cursor = _page(followers, params)
+        return _with_cursor({
+            'subject': self._profile_view(subject, did),
+            'followers': [self._profile_view(actor, did) for actor in items],
+        }, cursor)
+
+    def _sample_actors(self, subject, salt):
+        """自分以外のユーザーのフォロー・フォロワーを決まった方法で選ぶ"""
+        rng = random.Random(f"{subject}:{salt}")
+        others = [did for did in self.profiles if did != subject]
+        return rng.sample(others, min(len(others), rng.randint(0, 80)))
+
+    def _get_blocks(self, params, body, did, headers):
+        items, cursor = _page(list(self.blocking), params)
+        return _with_cursor({'blocks': [self._profile_view(actor, did) for actor in items if actor in self.profiles]}, cursor)
+
+    def _get_mutes(self, params, body, did, headers):
+        items, cursor = _page(sorted(self.mutes), params)
+        return _with_cursor({'mutes': [self._profile_view(actor, did) for actor in items]}, cursor)
+
+    def _mute_actor(self, params, body, did, headers):
+        self.mutes.add(self._resolve_actor(body.get('actor')))
+        return {}
+
+    def _unmute_actor(self, params, body, did, headers):
+        self.mutes.discard(self._resolve_actor(body.get('actor')))
+        return {}
+
+    def _create_record(self, params, body, did, headers):
+        self._check_repo(body.get('repo'))
+        collection = body.get('collection')
+        record = body.get('record')
+        if not collection or not isinstance(record, dict):
+            raise XrpcError(400, 'InvalidRequest', "collection and record are required")
+        rkey = body.get('rkey')
+        if rkey and rkey in self.records.get(collection, {}):
+            raise XrpcError(400, 'InvalidRequest', f"Record already exists: {collection}/{rkey}")
+        uri, cid = self._put_record(collection, record, rkey)
+        return {'uri': uri, 'cid': cid}
+
+    def _delete_record(self, params, body, did, headers):
+        self._check_repo(body.get('repo'))
+        self._remove_record(body.get('collection'), body.get('rkey'))
+        return {}
+
+    def _get_record(self, params, body, did, headers):
+        self._check_repo(params.get('repo'))
+        collection, rkey = params.get('collection'), params.get('rkey')
+        entry = self.records.get(collection, {}).get(rkey)
+        uri = f"at://{self.did}/{collection}/{rkey}"
+        if entry is None:
+            raise XrpcError(400, 'RecordNotFound', f"Could not locate record: {uri}")
+        return {'uri': uri, 'cid': entry[0], 'value': entry[1]}
+
+    def _list_records(self, params, body, did, headers):
+        self._check_repo(params.get('repo'))
+        collection = params.get('collection')
+        # 既定は新しい順（rkeyの降順）
+        reverse = str(params.get('reverse', 'false')).lower() == 'true'
+        rkeys = sorted(self.records.get(collection, {}), reverse=not reverse)
+        items, cursor = _page(rkeys, params)
+        records = [
+            {'uri': f"at://{self.did}/{collection}/{rkey}", 'cid': self.records[collection][rkey][0],
+             'value': self.records[collection][rkey][1]}
+            for rkey in items
+        ]
+        return _with_cursor({'records': records}, cursor)
+
+    def _upload_blob(self, params, body, did, headers):
+        if len(body) > MAX_BLOB_SIZE:
+            raise XrpcError(400, 'BlobTooLarge', f"This file is too large. It is {len(body)} bytes but the maximum size is {MAX_BLOB_SIZE} bytes.")
+        return {'blob': {
+            '$type': 'blob',
+            'ref': {'$link': _make_cid(body, codec=0x55)},
+            'mimeType': headers.get('Content-Type') or 'application/octet-stream',
+            'size': len(body),
+        }}
+
+# NSID -> (HTTPメソッド, 認証（None、'access'、'refresh'）, 処理するメソッド名)
+_ROUTES = {
+    'com.atproto.server.describeServer': ('GET', None, '_describe_server'),
+    'com.atproto.server.createSession': ('POST', None, '_create_session'),
+    'com.atproto.server.refreshSession': ('POST', 'refresh', '_refresh_session'),
+    'com.atproto.server.getSession': ('GET', 'access', '_get_session'),
+    'com.atproto.server.deleteSession': ('POST', 'refresh', '_delete_session'),
+    'com.atproto.identity.resolveHandle': ('GET', None, '_resolve_handle'),
+    'app.bsky.feed.getTimeline': ('GET', 'access', '_get_timeline'),
+    'app.bsky.feed.getPostThread': ('GET', 'access', '_get_post_thread'),
+    'app.bsky.actor.getProfile': ('GET', 'access', '_get_profile'),
+    'app.bsky.graph.getFollows': ('GET', 'access', '_get_follows'),
+    'app.bsky.graph.getFollowers': ('GET', 'access', '_get_followers'),
+    'app.bsky.graph.getBlocks': ('GET', 'access', '_get_blocks'),
+    'app.bsky.graph.getMutes': ('GET', 'access', '_get_mutes'),
+    'app.bsky.graph.muteActor': ('POST', 'access', '_mute_actor'),
+    'app.bsky.graph.unmuteActor': ('POST', 'access', '_unmute_actor'),
+    'com.atproto.repo.createRecord': ('POST', 'access', '_create_record'),
+    'com.atproto.repo.deleteRecord': ('POST', 'access', '_delete_record'),
+    'com.atproto.repo.getRecord': ('GET', None, '_get_record'),
+    'com.atproto.repo.listRecords': ('GET', None, '_list_records'),
+    'com.atproto.repo.uploadBlob': ('POST', 'access', '_upload_blob'),
+}
+
+class _XrpcRequestHandler(BaseHTTPRequestHandler):
+    """HTTPのリクエストをFakeXrpcServer.dispatchに渡すハンドラ"""
+
+    # httpxの接続の再利用（keep-alive）に対応する
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        parsed = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if not parsed.path.startswith('/xrpc/'):
+            self._send(404, _error_body('NotFound', "Not Found"), {})
+            return
+
+        params = {
+            key: values[0] if len(values) == 1 else values
+            for key, values in parse_qs(parsed.query).items()
+        }
+        headers = {
+            'Authorization': self.headers.get('Authorization'),
+            'Content-Type': self.headers.get('Content-Type'),
+        }
+        status, payload, extra_headers = self.server.fake.dispatch(
+            method, parsed.path[len('/xrpc/'):], params, body, headers
+        )
+        self._send(status, payload, extra_headers)
+
+    def _send(self, status, payload, extra_headers):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in extra_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+def _error_body(error, message):
+    """XRPCのエラー応答の本文を作成する"""
+    return {'error': error, 'message': message}
+
+def _parse_json_body(body):
+    """POSTの本文をJSONとして解析する"""
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise XrpcError(400, 'InvalidRequest', "Request body is not valid JSON")
+    if not isinstance(data, dict):
+        raise XrpcError(400, 'InvalidRequest', "Request body must be an object")
+    return data
+
+def _page(items, params):
+    """一覧の1ページ分を取り出す（カーソルは先頭からの位置）
+
+    Returns:
+        tuple: (ページの要素のリスト, 次のページのカーソル。最後のページの場合はNone)
+    """
+    try:
+        limit = min(max(int(params.get('limit', DEFAULT_PAGE_LIMIT)), 1), MAX_PAGE_LIMIT)
+        offset = int(params.get('cursor') or 0)
+    except ValueError:
+        raise XrpcError(400, 'InvalidRequest', "Invalid limit or cursor")
+    page = items[offset:offset + limit]
+    return page, str(offset + limit) if offset + limit < len(items) else None
+
+def _with_cursor(payload, cursor):
+    """次のページがある場合はカーソルを追加する"""
+    if cursor is not None:
+        payload['cursor'] = cursor
+    return payload
+
+def _b64url(data):
+    """パディングなしのbase64urlにする"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _make_jwt(payload):
+    """署名を検証しない（検証用の）JWTを作成する"""
+    header = {'alg': 'HS256', 'typ': 'at+jwt'}
+    return '.'.join((
+        _b64url(json.dumps(header).encode('utf-8')),
+        _b64url(json.dumps(payload).encode('utf-8')),
+        _b64url(os.urandom(32)),
+    ))
+
+def _make_cid(data, codec):
+    """データのCID（CIDv1、SHA-256、base32）を作成する
+
+    Args:
+        data (bytes): データ
+        codec (int): 0x55（raw、ブロブ）または0x71（dag-cbor、レコード）
+    """
+    digest = hashlib.sha256(data).digest()
+    cid_bytes = bytes([0x01, codec, 0x12, 0x20]) + digest
+    return 'b' + base64.b32encode(cid_bytes).decode('ascii').lower().rstrip('=')
+
+def _now_iso():
+    """現在時刻をAPIと同じ形式の文字列にする"""
+    now = time.time()
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now)) + f".{int(now * 1000) % 1000:03d}Z"
+
+def main(argv=None):
+    """エントリーポイント（検証用サーバーを起動し、Ctrl+Cで停止する）"""
+    parser = argparse.ArgumentParser(description="SSkyの検証用XRPCサーバーを起動します")
+    parser.add_argument('--host', default='127.0.0.1', help="待ち受けるアドレス")
+    parser.add_argument('--port', type=int, default=2583, help="待ち受けるポート")
+    parser.add_argument('--handle', default=DEFAULT_HANDLE, help="ログインできるアカウントのハンドル")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help="ログインできるアカウントのパスワード")
+    parser.add_argument('--timeline-size', type=int, default=1000, help="タイムラインの投稿数")
+    parser.add_argument('--seed', type=int, default=0, help="乱数のシード")
+    parser.add_argument('--latency-ms', type=float, default=0, help="応答の遅延（ミリ秒）")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="遅延のばらつきの最大値（ミリ秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="エラーを返す割合（0〜1）")
+    parser.add_argument('--error-status', type=int, default=500, help="エラーのステータスコード")
+    parser.add_argument('--rate-limit', type=int, help="レート制限（期間あたりのリクエスト数）")
+    parser.add_argument('--rate-limit-window', type=int, default=300, help="レート制限の期間（秒）")
+    parser.add_argument('--access-token-ttl', type=int, default=ACCESS_TOKEN_TTL, help="アクセストークンの有効期間（秒）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeXrpcServer(
+        host=args.host, port=args.port, handle=args.handle, password=args.password,
+        timeline_size=args.timeline_size, seed=args.seed,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status,
+        rate_limit=args.rate_limit, rate_limit_window=args.rate_limit_window,
+        access_token_ttl=args.access_token_ttl,
+    ).start()
+    print(f"URL: {server.url}  ハンドル: {server.handle}  パスワード: {server.password}")
+    print(f"アプリケーションを接続する場合: SSKY_XRPC_URL={server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"受信数: {dict(server.request_counts)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
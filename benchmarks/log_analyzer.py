@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+JSON形式のログ（advanced.log_format = "json"）を集計し、遅いリクエストとエラーの集中を表示する
+
+使い方:
+    python benchmarks/log_analyzer.py                      # アプリケーションのlogディレクトリを集計する
+    python benchmarks/log_analyzer.py path/to/log --slow-ms 500 --top 20
+    python benchmarks/log_analyzer.py path/to/log --burst-window 30 --burst-min 3
+    python benchmarks/log_analyzer.py path/to/log --json   # 集計結果をJSONで出力する
+
+ディレクトリ内のログファイル（ssky_*.logとローテーションした*.log.1など、圧縮した*.gzを含む）を古い順に読み込む。
+JSON以外の行（従来の形式のログなど）は読み飛ばす。
+"""
+
+import os
+import sys
+import math
+import glob
+import gzip
+import json
+import argparse
+from datetime import datetime
+from collections import Counter
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core.log_retention import LOG_FILE_PATTERN
+
+# 既定のログディレクトリ
+DEFAULT_LOG_DIR = os.path.join(ROOT_DIR, 'log')
+
+# エラーとみなす結果とログレベル
+ERROR_OUTCOMES = ('error', 'failed')
+ERROR_LEVELS = ('ERROR', 'CRITICAL')
+
+def list_log_files(log_dir):
+    """ディレクトリ内のログファイルを古い順に列挙する
+
+    Args:
+        log_dir (str): ログディレクトリ
+
+    Returns:
+        list: ファイルのパスのリスト（更新日時の古い順。ローテーションしたファイルは番号の大きい順）
+    """
+    paths = [path for path in glob.glob(os.path.join(log_dir, '*')) if LOG_FILE_PATTERN.match(os.path.basename(path))]
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+def load_entries(paths):
+    """ログファイルからJSONの行を読み込む
+
+    Args:
+        paths (list): ログファイルのパスのリスト
+
+    Returns:
+        tuple: (時刻の順に並べたエントリ（辞書）のリスト, 読み飛ばした行の数)。
+            エントリには読み込んだファイル名（'file'）と時刻（'time'、datetime）を加える
+    """
+    entries = []
+    skipped = 0
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entry['time'] = datetime.fromisoformat(entry['ts'])
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                entry['file'] = os.path.basename(path)
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry['time'])
+    return entries, skipped
+
+def is_error(entry):
+    """エラーのエントリかどうか
+
+    Args:
+        entry (dict): エントリ
+
+    Returns:
+        bool: 結果が失敗・例外のイベント、またはERROR以上のログの場合はTrue
+    """
+    return entry.get('outcome') in ERROR_OUTCOMES or entry.get('level') in ERROR_LEVELS
+
+def _percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize_requests(entries, slow_ms=1000, top=10):
+    """所要時間のあるイベントを集計する
+
+    Args:
+        entries (list): エントリのリスト
+        slow_ms (float, optional): 遅いとみなす所要時間（ミリ秒）
+        top (int, optional): 遅いリクエストを表示する数
+
+    Returns:
+        dict: {'endpoints': エンドポイントごとの集計（呼び出し回数の多い順）,
+            'slow': 遅いリクエストのリスト（所要時間の長い順）, 'slow_total': 遅いリクエストの数}
+    """
+    durations = {}
+    errors = Counter()
+    slow = []
+    for entry in entries:
+        duration = entry.get('duration_ms')
+        if not isinstance(duration, (int, float)):
+            continue
+        key = (entry.get('event'), entry.get('endpoint'))
+        durations.setdefault(key, []).append(duration)
+        if is_error(entry):
+            errors[key] += 1
+        if duration >= slow_ms:
+            slow.append(entry)
+
+    endpoints = []
+    for (event, endpoint), values in durations.items():
+        values.sort()
+        endpoints.append({
+            'event': event,
+            'endpoint': endpoint,
+            'count': len(values),
+            'errors': errors[(event, endpoint)],
+            'p50_ms': _percentile(values, 50),
+            'p95_ms': _percentile(values, 95),
+            'max_ms': values[-1],
+        })
+    endpoints.sort(key=lambda row: (-row['count'], str(row['endpoint'])))
+    slow.sort(key=lambda entry: -entry['duration_ms'])
+    return {'endpoints': endpoints, 'slow': slow[:top], 'slow_total': len(slow)}
+
+def find_error_bursts(entries, window_s=60, min_errors=5):
+    """短い間に集中したエラーを探す
+
+    エラーの間隔がwindow_s秒以内で続く範囲をまとめ、min_errors件以上のものを集中とみなす。
+
+    Args:
+        entries (list): エントリのリスト（時刻の順）
+        window_s (float, optional): 続いているとみなすエラーの間隔（秒）
+        min_errors (int, optional): 集中とみなすエラーの数
+
+    Returns:
+        list: {'start', 'end'（datetime）, 'count', 'endpoints'（エンドポイント -> 件数）,
+            'messages'（多い順のメッセージ）, 'request_ids'}の辞書のリスト（時刻の順）
+    """
+    bursts = []
+    current = []
+
+    def flush():
+        if len(current) >= min_errors:
+            endpoints = Counter(entry.get('endpoint') or entry.get('logger') for entry in current)
+            messages = Counter(entry.get('error') or entry.get('message', '') for entry in current)
+            bursts.append({
+                'start': current[0]['time'],
+                'end': current[-1]['time'],
+                'count': len(current),
+                'endpoints': dict(endpoints.most_common()),
+                'messages': [message for message, _ in messages.most_common(3)],
+                'request_ids': sorted({entry['request_id'] for entry in current if entry.get('request_id')}),
+            })
+
+    for entry in entries:
+        if not is_error(entry):
+            continue
+        if current and (entry['time'] - current[-1]['time']).total_seconds() > window_s:
+            flush()
+            current = []
+        current.append(entry)
+    flush()
+    return bursts
+
+def format_report(files, entries, skipped, requests, bursts, slow_ms):
+    """集計結果を文字列にする
+
+    Args:
+        files (list): 読み込んだログファイルのパスのリスト
+        entries (list): エントリのリスト
+        skipped (int): 読み飛ばした行の数
+        requests (dict): summarize_requestsの結果
+        bursts (list): find_error_burstsの結果
+        slow_ms (float): 遅いとみなす所要時間（ミリ秒）
+
+    Returns:
+        str: 報告
+    """
+    lines = [f"ログファイル{len(files)}件, JSONの行{len(entries)}件（読み飛ばした行{skipped}件）"]
+    if entries:
+        lines.append(f"期間: {entries[0]['time']:%Y-%m-%d %H:%M:%S} 〜 {entries[-1]['time']:%Y-%m-%d %H:%M:%S}")
+
+    lines.append("")
+    lines.append("エンドポイントごとの所要時間:")
+    for row in requests['endpoints']:
+        lines.append(
+            f"  {row['event'] or '-':16} {row['endpoint'] or '-':40} {row['count']:6}回 エラー{row['errors']:4}回 "
+            f"p50 {row['p50_ms']:8.1f}ms  p95 {row['p95_ms']:8.1f}ms  最大 {row['max_ms']:8.1f}ms"
+        )
+
+    lines.append("")
+    lines.append(f"遅いリクエスト（{slow_ms}ms以上）: {requests['slow_total']}件")
+    for entry in requests['slow']:
+        lines.append(
+            f"  {entry['time']:%Y-%m-%d %H:%M:%S} {entry['duration_ms']:10.1f}ms {entry.get('endpoint') or '-':40} "
+            f"request_id={entry.get('request_id', '-')} outcome={entry.get('outcome', '-')}"
+        )
+
+    lines.append("")
+    lines.append(f"エラーの集中: {len(bursts)}件")
+    for burst in bursts:
+        duration = (burst['end'] - burst['start']).total_seconds()
+        lines.append(f"  {burst['start']:%Y-%m-%d %H:%M:%S} から{duration:.0f}秒間に{burst['count']}件")
+        lines.append("    " + ", ".join(f"{endpoint}={count}" for endpoint, count in burst['endpoints'].items()))
+        for message in burst['messages']:
+            lines.append(f"    {message}")
+    return "\n".join(lines)
+
+def _to_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(type(value))
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="JSON形式のログから遅いリクエストとエラーの集中を集計します")
+    parser.add_argument('log_dir', nargs='?', default=DEFAULT_LOG_DIR, help="ログディレクトリ（またはログファイル）")
+    parser.add_argument('--slow-ms', type=float, default=1000, help="遅いとみなす所要時間（ミリ秒）")
+    parser.add_argument('--top', type=int, default=10, help="表示する遅いリクエストの数")
+    parser.add_argument('--burst-window', type=float, default=60, help="続いているとみなすエラーの間隔（秒）")
+    parser.add_argument('--burst-min', type=int, default=5, help="集中とみなすエラーの数")
+    parser.add_argument('--json', action='store_true', help="集計結果をJSONで出力する")
+    args = parser.parse_args(argv)
+
+    files = [args.log_dir] if os.path.isfile(args.log_dir) else list_log_files(args.log_dir)
+    if not files:
+        print(f"ログファイルが見つかりません: {args.log_dir}", file=sys.stderr)
+        return 2
+
+    entries, skipped = load_entries(files)
+    requests = summarize_requests(entries, args.slow_ms, args.top)
+    bursts = find_error_bursts(entries, args.burst_window, args.burst_min)
+    if args.json:
+        print(json.dumps({
+            'files': [os.path.basename(path) for path in files],
+            'entries': len(entries),
+            'skipped': skipped,
+            'endpoints': requests['endpoints'],
+            'slow': [{key: value for key, value in entry.items() if key != 'time'} for entry in requests['slow']],
+            'slow_total': requests['slow_total'],
+            'bursts': bursts,
+        }, ensure_ascii=False, indent=2, default=_to_json))
+    else:
+        print(format_report(files, entries, skipped, requests, bursts, args.slow_ms))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+長時間の実行を模したメモリのソークテスト（更新・いいね・スレッドの表示を繰り返す）
+
+使い方:
+    python benchmarks/memory_soak.py                              # 合成の投稿で3000サイクル
+    python benchmarks/memory_soak.py --cycles 10000 --batch 500
+    python benchmarks/memory_soak.py --xrpc                       # BlueskyClientで検証用XRPCサーバーに接続
+    python benchmarks/memory_soak.py --ui                         # PostHandlersとThreadDialogを通して操作する
+    python benchmarks/memory_soak.py --tolerance-kb 512 --output soak.json
+
+1サイクルで次の操作のいずれかを行う（--mixで割合を指定。既定は更新:いいね:スレッド = 2:1:1）:
+    refresh  タイムラインの画面と同じ取得処理（core.timeline_model.fetch_timeline_posts）で取得し、
+             マージ（1000件まで）・相対時間の更新を行う
+    like     送信待ちキュー（Outbox）を通していいねし、送信結果の通知でいいね数を更新した投稿をマージする
+    thread   スレッドを取得してThreadCacheにマージする
+
+--uiの場合はwxのアプリケーションを起動し（ウィンドウは表示しない）、いいねはPostHandlers.on_like、
+スレッドはThreadDialogの作成と破棄を通して行う（wxとpypubsubが必要）。
+
+バッチごとにキャッシュの書き込みとガベージコレクションを済ませてから、core.memory_monitorでメモリ使用量と、
+クライアントを参照しているオブジェクト・イベントの購読者の数を記録する。ウォームアップ後の使用量が増え続けている
+（直線を当てはめた増加量が許容量を超えた）場合、またはイベントの購読者が増えた場合は終了コード1で終了する。
+--xrpcの場合はatprotoのインストールが必要。
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from types import SimpleNamespace
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic_feed import generate_feed, to_model
+from core import events
+from core.memory_monitor import MemoryMonitor, count_instances, detect_growth
+from core.timeline_model import fetch_timeline_posts, merge_timeline_posts, refresh_relative_times
+from core.thread_cache import ThreadCache, Thread, THREAD_VIEW_POST
+from core.outbox import Outbox
+from core.data_store import DataStore
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 既定の操作の割合
+DEFAULT_MIX = 'refresh=2,like=1,thread=1'
+
+# 1回の更新で取得する投稿数
+PAGE_SIZE = 50
+
+# 合成の投稿の数（更新のたびにずらしながら取得する）
+POOL_SIZE = 5000
+
+# 合成のスレッドに含める返信の数
+THREAD_REPLIES = 3
+
+# ログインユーザー
+MY_DID = 'did:plc:synthetic000001'
+MY_HANDLE = 'user1.bsky.social'
+
+# --uiの場合に、バックグラウンドの処理の結果が届くのを待つ最大時間（秒）
+UI_WAIT_TIMEOUT = 10
+
+# 使用量の計算から除く確保元（プロセス内で起動した検証用サーバーのデータ）
+IGNORED_FILENAMES = ('*/benchmarks/fake_xrpc.py', '*/http/server.py', '*/socketserver.py')
+
+class SyntheticClient:
+    """ネットワークを使わずに合成の投稿を返すクライアント（BlueskyClientの代わり）"""
+
+    def __init__(self, data_store, pool_size=POOL_SIZE, seed=0):
+        """初期化
+
+        Args:
+            data_store (DataStore): キャッシュに使うデータストア
+            pool_size (int, optional): 合成の投稿の数
+            seed (int, optional): 乱数のシード
+        """
+        self.data_store = data_store
+        self.user_did = MY_DID
+        self.profile = SimpleNamespace(handle=MY_HANDLE)
+        self.is_logged_in = True
+        self._feed = generate_feed(pool_size, seed=seed)
+        self._index = {item['post']['uri']: i for i, item in enumerate(self._feed)}
+        self._offset = 0
+
+    def get_timeline(self, limit=50):
+        """合成の投稿をずらしながら返す（APIの応答と同じく毎回新しいオブジェクトを作る）"""
+        items = [self._feed[(self._offset + i) % len(self._feed)] for i in range(limit)]
+        self._offset = (self._offset + limit // 2) % len(self._feed)
+        feed = []
+        for item in items:
+            model = to_model(item)
+            # DataStoreに元のレコードとして渡せるように、atprotoのモデルと同じメソッドを持たせる
+            model.model_dump_json = lambda item=item, **kwargs: json.dumps(item, ensure_ascii=False)
+            feed.append(model)
+        return SimpleNamespace(feed=feed, cursor=None)
+
+    def get_post_thread(self, uri, depth=6, parent_height=0):
+        """投稿と、それより新しい数件の投稿を返信としたスレッドを返す"""
+        index = self._index[uri]
+        replies = [
+            {'$type': THREAD_VIEW_POST, 'post': self._feed[index - i]['post'], 'replies': []}
+            for i in range(1, THREAD_REPLIES + 1) if index - i >= 0
+        ]
+        return to_model({'$type': THREAD_VIEW_POST, 'post': self._feed[index]['post'], 'replies': replies})
+
+    def create_like(self, uri, cid, rkey, created_at):
+        """いいねの作成結果を返す（送信待ちキューから呼び出される）"""
+        return SimpleNamespace(uri=f"at://{MY_DID}/app.bsky.feed.like/{rkey}", cid=cid)
+
+    def get_own_record(self, collection, rkey):
+        """送信済みのレコードはないものとして扱う"""
+        return None
+
+def count_pubsub_listeners():
+    """アプリケーションのイベント（core.events）の購読者の数を数える
+
+    Returns:
+        int: 購読者の数。pypubsubがない場合はNone
+    """
+    try:
+        from pubsub import pub
+    except ImportError:
+        return None
+
+    topic_manager = pub.getDefaultTopicMgr()
+    count = 0
+    for name, value in vars(events).items():
+        if not name.isupper() or not isinstance(value, str):
+            continue
+        topic = topic_manager.getTopic(value, okIfNone=True)
+        if topic is not None:
+            count += topic.getNumListeners()
+    return count
+
+class SoakSession:
+    """タイムラインの表示と同じ処理を、wxを使わずに繰り返すセッション"""
+
+    def __init__(self, client, seed=0):
+        """初期化
+
+        Args:
+            client: BlueskyClient（ログイン済み）またはSyntheticClient
+            seed (int, optional): 乱数のシード
+        """
+        self.client = client
+        self.rng = random.Random(seed)
+        self.posts = []  # 表示中の投稿（古い順）
+        self.selected = None  # 操作の対象の投稿
+        self.outbox = Outbox(client, listener=self._on_outbox_result)
+
+    def tracked_classes(self):
+        """生きているインスタンスの数を記録するクラス
+
+        Returns:
+            dict: 名前 -> クラス
+        """
+        return {'threads': Thread, 'namespaces': SimpleNamespace}
+
+    def close(self):
+        """セッションを終了する"""
+
+    def refresh(self):
+        """タイムラインを更新する（TimelineViewと同じ取得処理の結果をマージする）"""
+        new_posts = fetch_timeline_posts(self.client, PAGE_SIZE)
+        self.posts, _, _ = merge_timeline_posts(self.posts, new_posts)
+        refresh_relative_times(self.posts)
+
+    def like(self):
+        """投稿にいいねする（送信待ちキューに追加して送信する）"""
+        if not self._select():
+            return self.refresh()
+        self.outbox.enqueue_like(self.selected['uri'], self.selected['cid'])
+        self.outbox.drain_once()
+
+    def thread(self):
+        """スレッドを表示する（ThreadCacheに取得してマージする）"""
+        if not self._select():
+            return self.refresh()
+        ThreadCache().load(self.client, self.selected['uri'], force=True)
+
+    def _select(self):
+        """表示中の投稿から操作の対象を選ぶ
+
+        Returns:
+            dict: 選んだ投稿。表示中の投稿がない場合はNone
+        """
+        self.selected = self.rng.choice(self.posts) if self.posts else None
+        return self.selected
+
+    def _on_outbox_result(self, item, result=None, error=None, retrying=False):
+        """送信待ちキューの送信結果の通知"""
+        if item['kind'] == 'like' and result is not None:
+            self._like_succeeded(item['payload']['uri'])
+
+    def _like_succeeded(self, uri):
+        """いいねした投稿のいいね数を更新する
+
+        Args:
+            uri (str): 投稿のURI
+        """
+        for post in self.posts:
+            if post['uri'] == uri:
+                updated = dict(post, likes=post['likes'] + 1)
+                self.posts, _, _ = merge_timeline_posts(self.posts, {uri: updated})
+                break
+
+class UiSoakSession(SoakSession):
+    """wxのアプリケーションを起動し、画面と同じハンドラ・ダイアログを通して操作するセッション
+
+    いいねはPostHandlers.on_like（AsyncPostHandlerの送信待ちキューとpubsubの通知）、スレッドは
+    ThreadDialogの作成と破棄を通して行う。メッセージボックスは表示しない。
+    PostHandlersの親ウィンドウとタイムラインの代わりを兼ねる。
+    """
+
+    def __init__(self, client, seed=0):
+        """初期化
+
+        Args:
+            client: BlueskyClient（ログイン済み）またはSyntheticClient
+            seed (int, optional): 乱数のシード
+        """
+        import wx
+        from unittest.mock import patch
+        from pubsub import pub
+        from gui.handlers.post_handlers import PostHandlers
+
+        super().__init__(client, seed)
+        self.app = wx.App(False)
+        self.frame = wx.Frame(None)
+        self.timeline = self
+        self._like_results = 0
+        self._message_box = patch('wx.MessageBox', return_value=wx.OK)
+        self._message_box.start()
+        self.handlers = PostHandlers(self, client)
+        pub.subscribe(self._on_like_success, events.LIKE_SUCCESS)
+        pub.subscribe(self._on_like_failure, events.LIKE_FAILURE)
+
+    def tracked_classes(self):
+        """生きているインスタンスの数を記録するクラス（破棄したダイアログが残っていないかを含む）"""
+        from gui.dialogs.thread_dialog import ThreadDialog
+        return dict(super().tracked_classes(), thread_dialogs=ThreadDialog)
+
+    def close(self):
+        """セッションを終了する（送信待ちキューを停止し、ウィンドウを破棄する）"""
+        from gui.handlers.async_post_handler import AsyncPostHandler
+        AsyncPostHandler.stop_outbox()
+        self._message_box.stop()
+        self.frame.Destroy()
+        self._pump()
+
+    def get_selected_post(self):
+        """選択中の投稿データを取得（PostHandlersから呼び出される）"""
+        return self.selected
+
+    def fetch_timeline(self, client=None, selected_uri=None):
+        """タイムラインを更新する（いいねの成功後にPostHandlersから呼び出される）"""
+        self.refresh()
+
+    def like(self):
+        """投稿にいいねする（PostHandlers.on_likeを呼び出し、結果の通知が届くまで待つ）"""
+        if not self._select():
+            return self.refresh()
+        expected = self._like_results + 1
+        if self.handlers.on_like(None):
+            self._wait(lambda: self._like_results >= expected)
+
+    def thread(self):
+        """スレッドを表示する（ThreadDialogを作成し、取得が終わったら破棄する）"""
+        from gui.dialogs.thread_dialog import ThreadDialog
+        if not self._select():
+            return self.refresh()
+        dlg = ThreadDialog(self.frame, self.client, self.selected)
+        try:
+            self._wait(dlg.refresh_btn.IsEnabled)
+        finally:
+            dlg.Destroy()
+            self._pump()
+
+    def _on_like_success(self, result, uri):
+        """いいね成功イベントハンドラ"""
+        self._like_results += 1
+        self._like_succeeded(uri)
+
+    def _on_like_failure(self, error, uri):
+        """いいね失敗イベントハンドラ"""
+        self._like_results += 1
+
+    def _pump(self):
+        """保留中のイベント（wx.CallAfterで送られた通知など）を処理する"""
+        import wx
+        self.app.ProcessPendingEvents()
+        wx.Yield()
+
+    def _wait(self, condition, timeout=UI_WAIT_TIMEOUT):
+        """イベントを処理しながら条件を満たすまで待つ
+
+        Args:
+            condition (callable): 満たした場合にTrueを返す関数
+            timeout (float, optional): 最大の待ち時間（秒）
+
+        Returns:
+            bool: 条件を満たした場合はTrue
+        """
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                logger.warning("バックグラウンドの処理の結果が届きませんでした")
+                return False
+            self._pump()
+            time.sleep(0.005)
+        return True
+
+def parse_mix(text):
+    """操作の割合の指定を解析する
+
+    Args:
+        text (str): 'refresh=2,like=1'の形式
+
+    Returns:
+        list: (操作名, 重み)のリスト
+    """
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('refresh', 'like', 'thread'):
+            raise ValueError(f"不明な操作です: {name}（refresh, like, threadのいずれか）")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+def run_soak(session, cycles, batch, mix, warmup=2, tolerance=1024 * 1024, seed=0, progress=None):
+    """操作を繰り返し、バッチごとのメモリ使用量を記録する
+
+    Args:
+        session (SoakSession): 操作するセッション
+        cycles (int): 操作の回数
+        batch (int): メモリ使用量を記録する間隔（操作の回数）
+        mix (list): (操作名, 重み)のリスト
+        warmup (int, optional): 判定から除く最初のバッチの数
+        tolerance (int, optional): ウォームアップ後に許容する増加量（バイト）
+        seed (int, optional): 乱数のシード
+        progress (callable, optional): バッチごとにサンプルを受け取る関数
+
+    Returns:
+        dict: {'cycles', 'elapsed_s', 'operations', 'samples', 'growing', 'growth_bytes',
+            'listener_growth'（イベントの購読者の増加数。pypubsubがない場合はNone）, 'report'}
+    """
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    operations = dict.fromkeys(names, 0)
+    data_store = session.client.data_store
+
+    monitor = MemoryMonitor(ignored=IGNORED_FILENAMES)
+    monitor.add_counter('timeline_posts', lambda: len(session.posts))
+    monitor.add_counter('live_objects', lambda: count_instances(session.tracked_classes()))
+    # 破棄したダイアログや購読を解除していないハンドラがクライアントを参照し続けていないか
+    monitor.add_counter('client_referrers', lambda: len(gc.get_referrers(session.client)))
+    listeners_before = count_pubsub_listeners()
+    if listeners_before is not None:
+        monitor.add_counter('pubsub_listeners', count_pubsub_listeners)
+
+    # 最初の更新で表示中の投稿を用意してから計測を開始する
+    session.refresh()
+    data_store.flush()
+    gc.collect()
+    monitor.start(thread=False)
+    start = time.monotonic()
+    try:
+        for cycle in range(1, cycles + 1):
+            name = rng.choices(names, weights)[0]
+            getattr(session, name)()
+            operations[name] += 1
+            if cycle % batch == 0 or cycle == cycles:
+                # 書き込み待ちのキューや循環参照を除いてから記録する
+                data_store.flush()
+                gc.collect()
+                record = monitor.sample()
+                if progress:
+                    progress(cycle, record)
+        elapsed = time.monotonic() - start
+        samples = monitor.samples
+        report = monitor.report()
+    finally:
+        monitor.stop()
+
+    growing, growth = detect_growth([sample['traced_bytes'] for sample in samples], warmup, tolerance)
+    listener_growth = None
+    if listeners_before is not None:
+        listener_growth = count_pubsub_listeners() - listeners_before
+        growing = growing or listener_growth > 0
+    return {
+        'cycles': cycles,
+        'elapsed_s': round(elapsed, 2),
+        'operations': operations,
+        'samples': [
+            {key: value for key, value in sample.items() if key != 'top_growth'} for sample in samples
+        ],
+        'top_growth': samples[-1]['top_growth'] if samples else [],
+        'growing': growing,
+        'growth_bytes': round(growth),
+        'listener_growth': listener_growth,
+        'report': report,
+    }
+
+def _create_xrpc_session(data_store, seed, session_class=SoakSession):
+    """検証用XRPCサーバーを起動し、BlueskyClientでログインしたセッションを作成する"""
+    from unittest.mock import patch
+    from benchmarks.fake_xrpc import FakeXrpcServer
+    from core.client import BlueskyClient
+
+    server = FakeXrpcServer(timeline_size=POOL_SIZE // 5, seed=seed).start()
+    client = BlueskyClient(base_url=server.url, data_store=data_store)
+    # セッション情報はこのプロセスでは保存しない
+    with patch('core.client.SessionPersistence'):
+        client.login(server.handle, server.password)
+    return server, session_class(client, seed)
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="更新・いいね・スレッドの表示を繰り返し、メモリが増え続けないかを確認します")
+    parser.add_argument('--cycles', type=int, default=3000, help="操作の回数")
+    parser.add_argument('--batch', type=int, default=250, help="メモリ使用量を記録する間隔（操作の回数）")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="操作の割合（例: refresh=2,like=1,thread=1）")
+    parser.add_argument('--warmup', type=int, default=2, help="判定から除く最初のバッチの数")
+    parser.add_argument('--tolerance-kb', type=int, default=1024, help="ウォームアップ後に許容する増加量（KB）")
+    parser.add_argument('--seed', type=int, default=0, help="乱数のシード")
+    parser.add_argument('--xrpc', action='store_true', help="BlueskyClientで検証用XRPCサーバーに接続する")
+    parser.add_argument('--ui', action='store_true', help="PostHandlersとThreadDialogを通して操作する（wxが必要）")
+    parser.add_argument('--output', help="結果を保存するJSONファイル")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    def progress(cycle, record):
+        print(f"{cycle:8}サイクル  {record['traced_bytes'] / 1024 / 1024:8.2f}MB  "
+              f"{json.dumps(record['counters'], ensure_ascii=False)}")
+
+    work_dir = tempfile.mkdtemp(prefix='ssky_soak_')
+    data_store = DataStore(os.path.join(work_dir, 'soak.db'))
+    server = None
+    session = None
+    session_class = UiSoakSession if args.ui else SoakSession
+    try:
+        if args.xrpc:
+            server, session = _create_xrpc_session(data_store, args.seed, session_class)
+        else:
+            session = session_class(SyntheticClient(data_store, seed=args.seed), args.seed)
+        result = run_soak(
+            session, args.cycles, args.batch, mix, args.warmup, args.tolerance_kb * 1024, args.seed, progress
+        )
+    finally:
+        if session is not None:
+            session.close()
+        if server is not None:
+            server.stop()
+        data_store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    print(result['report'])
+    status = "NG（増え続けています）" if result['growing'] else "OK"
+    print(f"\nウォームアップ後の増加: {result['growth_bytes'] / 1024:+.0f}KB（許容{args.tolerance_kb}KB）{status}")
+    if result['listener_growth'] is not None:
+        print(f"イベントの購読者の増加: {result['listener_growth']:+d}")
+
+    if args.output:
+        result.update({'python': platform.python_version(), 'xrpc': args.xrpc, 'ui': args.ui, 'mix': args.mix})
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    return 1 if result['growing'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+起動時間のベンチマーク（-X importtimeの集計とメインフレーム表示までの時間）
+
+使い方:
+    python benchmarks/startup_importtime.py                       # レポートを表示
+    python benchmarks/startup_importtime.py --save base.json      # 結果を保存
+    python benchmarks/startup_importtime.py --baseline base.json --max-ratio 0.5
+                                                                  # 保存した結果の半分以下かを確認
+
+起動時に読み込まれてはいけないモジュール（FORBIDDEN_MODULES）が読み込まれた場合や、
+基準の結果に対する比率が--max-ratioを超えた場合は終了コード1で終了する。
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# プロジェクトのルートディレクトリ
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 計測する起動経路（SSky.py -> gui.app -> MainFrame）
+DEFAULT_MODULE = 'gui.app'
+
+# 起動時には読み込まず、最初に使うときに読み込むモジュール
+FORBIDDEN_MODULES = (
+    'atproto',
+    'atproto_client',
+    'win32crypt',
+    'PIL',
+    'gui.dialogs.login_dialog',
+    'gui.dialogs.post_dialog',
+    'gui.dialogs.post_detail_dialog',
+    'gui.dialogs.settings_dialog',
+    'gui.dialogs.diagnostics_dialog',
+    'core.cassette_transport',
+)
+
+# メインフレームを表示するまでの時間を計測するスクリプト
+FRAME_SCRIPT = '''
+import time
+start = time.perf_counter()
+from gui.app import SSkyApp
+app = SSkyApp()
+print(f"FRAME_SHOWN_MS={(time.perf_counter() - start) * 1000:.1f}", flush=True)
+app.frame.Destroy()
+'''
+
+_LINE_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+def parse_importtime(text):
+    """-X importtimeの出力を解析する
+
+    Args:
+        text (str): 標準エラー出力
+
+    Returns:
+        list: {'module', 'self_us', 'cumulative_us', 'depth'}の辞書のリスト（出力順）
+    """
+    entries = []
+    for line in text.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': max(len(indent) - 1, 0) // 2,
+        })
+    return entries
+
+def summarize(entries, top=15):
+    """解析結果を集計する
+
+    Args:
+        entries (list): parse_importtimeの結果
+        top (int, optional): 上位何件を含めるか
+
+    Returns:
+        dict: 合計時間、上位のモジュール、パッケージごとの時間、読み込まれたモジュール名
+    """
+    packages = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + entry['self_us']
+
+    return {
+        'total_ms': sum(entry['cumulative_us'] for entry in entries if entry['depth'] == 0) / 1000,
+        'module_count': len(entries),
+        'top_cumulative': [
+            (entry['module'], entry['cumulative_us'] / 1000)
+            for entry in sorted(entries, key=lambda e: e['cumulative_us'], reverse=True)[:top]
+        ],
+        'top_packages': [
+            (package, us / 1000)
+            for package, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        'modules': [entry['module'] for entry in entries],
+    }
+
+def find_forbidden(modules, forbidden=FORBIDDEN_MODULES):
+    """起動時に読み込まれてはいけないモジュールを探す
+
+    Args:
+        modules (list): 読み込まれたモジュール名のリスト
+        forbidden (tuple, optional): 読み込まれてはいけないモジュール名（パッケージの場合は配下も含む）
+
+    Returns:
+        list: 読み込まれていた禁止モジュール名
+    """
+    found = set()
+    for module in modules:
+        for name in forbidden:
+            if module == name or module.startswith(name + '.'):
+                found.add(name)
+    return sorted(found)
+
+def measure_imports(module, runs):
+    """モジュールのインポート時間を別プロセスで計測する
+
+    Args:
+        module (str): モジュール名
+        runs (int): 計測回数
+
+    Returns:
+        dict: 合計時間が中央値だった回の集計結果（'runs_ms'に全回の合計時間）
+    """
+    summaries = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{module}をインポートできませんでした:\n{result.stderr[-2000:]}")
+        summaries.append(summarize(parse_importtime(result.stderr)))
+
+    summaries.sort(key=lambda summary: summary['total_ms'])
+    median = summaries[len(summaries) // 2]
+    median['runs_ms'] = [summary['total_ms'] for summary in summaries]
+    return median
+
+def measure_frame(runs):
+    """メインフレームを表示するまでの時間を別プロセスで計測する（表示できる環境が必要）
+
+    Args:
+        runs (int): 計測回数
+
+    Returns:
+        float: 中央値（ミリ秒）。計測できなかった場合はNone
+    """
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', FRAME_SCRIPT], cwd=ROOT_DIR, capture_output=True, text=True, timeout=120
+        )
+        match = re.search(r'FRAME_SHOWN_MS=([\d.]+)', result.stdout)
+        if not match:
+            print(f"メインフレームの表示時間を計測できませんでした:\n{result.stderr[-1000:]}", file=sys.stderr)
+            return None
+        times.append(float(match.group(1)))
+    return statistics.median(times)
+
+def print_report(summary, frame_ms, forbidden):
+    """レポートを表示する"""
+    print(f"インポート時間: {summary['total_ms']:.1f}ms（{summary['module_count']}モジュール, "
+          f"各回: {', '.join(f'{ms:.0f}' for ms in summary['runs_ms'])}ms）")
+    if frame_ms is not None:
+        print(f"メインフレームの表示まで: {frame_ms:.1f}ms")
+
+    print("\n累積時間の長いモジュール:")
+    for module, ms in summary['top_cumulative']:
+        print(f"  {ms:9.1f}ms  {module}")
+
+    print("\nパッケージごとの時間:")
+    for package, ms in summary['top_packages']:
+        print(f"  {ms:9.1f}ms  {package}")
+
+    if forbidden:
+        print(f"\n起動時に読み込まれたモジュール（遅延させるべきもの）: {', '.join(forbidden)}")
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="SSkyの起動時間を計測します")
+    parser.add_argument('--module', default=DEFAULT_MODULE, help="計測するモジュール")
+    parser.add_argument('--runs', type=int, default=5, help="計測回数（中央値を使用）")
+    parser.add_argument('--frame', action='store_true', help="メインフレームの表示までの時間も計測する")
+    parser.add_argument('--save', help="結果を保存するJSONファイル")
+    parser.add_argument('--baseline', help="比較する基準の結果のJSONファイル")
+    parser.add_argument('--max-ratio', type=float, default=1.2,
+                        help="基準に対して許容する比率（0.5で基準の半分以下を要求）")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = measure_imports(args.module, args.runs)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    frame_ms = measure_frame(args.runs) if args.frame else None
+    forbidden = find_forbidden(summary['modules'])
+    print_report(summary, frame_ms, forbidden)
+
+    result = {'module': args.module, 'import_ms': summary['total_ms'], 'frame_ms': frame_ms}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+
+    failed = bool(forbidden)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key in ('import_ms', 'frame_ms'):
+            if result.get(key) is None or not baseline.get(key):
+                continue
+            ratio = result[key] / baseline[key]
+            status = "OK" if ratio <= args.max_ratio else "NG"
+            print(f"{key}: {baseline[key]:.1f}ms -> {result[key]:.1f}ms（{ratio:.2f}倍, 上限{args.max_ratio}倍）{status}")
+            failed = failed or ratio > args.max_ratio
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
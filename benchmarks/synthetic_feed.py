@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ベンチマーク・テスト用の合成タイムライン（FeedViewPost）の生成
+
+generate_feedはAPIの応答と同じ形式（JSONの辞書）で投稿を作成する。
+to_modelはそれをatprotoのモデルと同じ属性名（スネークケース、$typeはpy_type）で参照できる
+オブジェクトに変換する（atprotoやネットワークがない環境でもnormalize_postに渡せる）。
+"""
+
+import re
+import random
+import functools
+from types import SimpleNamespace
+from datetime import datetime, timezone, timedelta
+
+# 投稿の種類の割合（合計が1を超えないようにする。残りは通常の投稿）
+REPOST_RATIO = 0.15
+REPLY_RATIO = 0.25
+QUOTE_RATIO = 0.08
+QUOTE_WITH_MEDIA_RATIO = 0.03
+QUOTE_NOT_FOUND_RATIO = 0.01
+IMAGES_RATIO = 0.12
+
+# 本文にリンク・メンション・ハッシュタグを含む割合
+FACET_RATIO = 0.3
+
+# 投稿の時刻を分布させる期間（秒）
+DEFAULT_SPAN_SECONDS = 3 * 24 * 60 * 60
+
+# 本文の材料
+_WORDS_JA = (
+    "今日", "は", "いい天気", "ですね", "新しい", "アプリ", "を", "試して", "みました", "ブルスカ",
+    "タイムライン", "が", "速い", "コーヒー", "飲みながら", "作業", "中", "週末", "どこか", "行きたい",
+    "写真", "撮った", "おはよう", "ございます", "お疲れさま", "でした", "読んだ", "本", "面白かった", "ラーメン",
+)
+_WORDS_EN = (
+    "just", "shipped", "a", "new", "release", "of", "the", "client", "check", "out", "this", "thread",
+    "about", "performance", "and", "caching", "coffee", "weekend", "photo", "great", "day",
+)
+_TAGS = ("bluesky", "python", "wxpython", "写真", "日記", "ssky")
+
+_CAMEL_PATTERN = re.compile(r'(?<!^)(?=[A-Z])')
+
+def generate_feed(count, seed=0, now=None, span_seconds=DEFAULT_SPAN_SECONDS, author_count=None):
+    """合成のタイムライン（FeedViewPostのJSONのリスト、新しい順）を作成する
+
+    Args:
+        count (int): 投稿数
+        seed (int, optional): 乱数のシード（同じ値なら同じ内容になる）
+        now (datetime, optional): 最も新しい投稿の時刻。省略した場合は現在
+        span_seconds (int, optional): 投稿の時刻を分布させる期間（秒）
+        author_count (int, optional): 投稿者の数。省略した場合は投稿数に応じて決める
+
+    Returns:
+        list: FeedViewPostの辞書のリスト
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    author_count = author_count or min(count // 10 + 10, 5000)
+    authors = [_make_author(i) for i in range(author_count)]
+
+    # 返信先・引用元が必ず古い投稿になるよう、古い順に作成して最後に並べ替える
+    offsets = sorted((rng.uniform(0, span_seconds) for _ in range(count)), reverse=True)
+
+    feed = []
+    posts = []  # 返信先・引用元として参照する既存の投稿
+    for i, offset in enumerate(offsets):
+        indexed_at = now - timedelta(seconds=offset)
+        author = authors[int(rng.paretovariate(1.2)) % author_count]  # 一部の投稿者に偏らせる
+        post = _make_post(rng, i, author, indexed_at, posts, authors)
+        item = {'post': post}
+
+        roll = rng.random()
+        if roll < REPOST_RATIO:
+            item['reason'] = {
+                '$type': 'app.bsky.feed.defs#reasonRepost',
+                'by': rng.choice(authors),
+                'indexedAt': _isoformat(indexed_at + timedelta(seconds=rng.uniform(0, 600))),
+            }
+        feed.append(item)
+        posts.append(post)
+    # APIの応答と同じく新しい順にする
+    feed.reverse()
+    return feed
+
+def to_model(data):
+    """JSONの辞書をatprotoのモデルと同じ属性名で参照できるオブジェクトに変換する
+
+    Args:
+        data: generate_feedの結果（またはその一部）
+
+    Returns:
+        object: キーをスネークケースの属性にしたオブジェクト（$typeはpy_type）
+    """
+    if isinstance(data, list):
+        return [to_model(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    attributes = {'py_type': data.get('$type')}
+    for key, value in data.items():
+        if key != '$type':
+            attributes[_attribute_name(key)] = to_model(value)
+    return SimpleNamespace(**attributes)
+
+@functools.lru_cache(maxsize=None)
+def _attribute_name(key):
+    """JSONのキーをスネークケースの属性名にする（キーの種類は少ないため結果を保持する）"""
+    return _CAMEL_PATTERN.sub('_', key).lower()
+
+def _make_author(index):
+    """投稿者（ProfileViewBasic）を作成する"""
+    return {
+        'did': f"did:plc:synthetic{index:06d}",
+        'handle': f"user{index}.bsky.social",
+        'displayName': f"ユーザー{index}" if index % 4 else "",
+        'avatar': f"https://cdn.bsky.app/img/avatar/plain/did:plc:synthetic{index:06d}/avatar@jpeg",
+    }
+
+def _make_post(rng, index, author, indexed_at, posts, authors):
+    """投稿（PostView）を作成する"""
+    uri = f"at://{author['did']}/app.bsky.feed.post/3synthetic{index:08d}"
+    text, lang, facets = _make_text(rng, authors)
+    record = {
+        '$type': 'app.bsky.feed.post',
+        'text': text,
+        'createdAt': _isoformat(indexed_at - timedelta(seconds=rng.uniform(0, 5))),
+        'langs': [lang],
+    }
+    if facets:
+        record['facets'] = facets
+
+    roll = rng.random()
+    if posts and roll < REPLY_RATIO:
+        parent = rng.choice(posts)
+        root = parent['record'].get('reply', {}).get('root') or _strong_ref(parent)
+        record['reply'] = {'parent': _strong_ref(parent), 'root': root}
+
+    post = {
+        'uri': uri,
+        'cid': f"bafyreisynthetic{index:08d}",
+        'author': author,
+        'record': record,
+        'replyCount': int(rng.expovariate(0.5)),
+        'repostCount': int(rng.expovariate(0.3)),
+        'likeCount': int(rng.expovariate(0.1)),
+        'quoteCount': 0,
+        'indexedAt': _isoformat(indexed_at),
+        'labels': [],
+    }
+
+    roll = rng.random()
+    if posts and roll < QUOTE_RATIO:
+        post['embed'] = {'$type': 'app.bsky.embed.record#view', 'record': _view_record(rng.choice(posts))}
+    elif posts and roll < QUOTE_RATIO + QUOTE_WITH_MEDIA_RATIO:
+        post['embed'] = {
+            '$type': 'app.bsky.embed.recordWithMedia#view',
+            'record': {'$type': 'app.bsky.embed.record#view', 'record': _view_record(rng.choice(posts))},
+            'media': _images_view(rng, author, index),
+        }
+    elif roll < QUOTE_RATIO + QUOTE_WITH_MEDIA_RATIO + QUOTE_NOT_FOUND_RATIO:
+        post['embed'] = {
+            '$type': 'app.bsky.embed.record#view',
+            'record': {
+                '$type': 'app.bsky.embed.record#viewNotFound',
+                'uri': f"at://did:plc:deleted/app.bsky.feed.post/3deleted{index:08d}",
+                'notFound': True,
+            },
+        }
+    elif roll < QUOTE_RATIO + QUOTE_WITH_MEDIA_RATIO + QUOTE_NOT_FOUND_RATIO + IMAGES_RATIO:
+        post['embed'] = _images_view(rng, author, index)
+    return post
+
+def _make_text(rng, authors):
+    """本文・言語・facetsを作成する（facetsのbyteStart/byteEndはUTF-8のバイト位置）"""
+    lang = 'ja' if rng.random() < 0.8 else 'en'
+    words, separator = (_WORDS_JA, '') if lang == 'ja' else (_WORDS_EN, ' ')
+    text = separator.join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+    if rng.random() >= FACET_RATIO:
+        return text, lang, None
+
+    facets = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.random()
+        if kind < 0.4:
+            segment = f"https://example.com/articles/{rng.randint(1, 99999)}"
+            feature = {'$type': 'app.bsky.richtext.facet#link', 'uri': segment}
+        elif kind < 0.7:
+            mentioned = rng.choice(authors)
+            segment = f"@{mentioned['handle']}"
+            feature = {'$type': 'app.bsky.richtext.facet#mention', 'did': mentioned['did']}
+        else:
+            tag = rng.choice(_TAGS)
+            segment = f"#{tag}"
+            feature = {'$type': 'app.bsky.richtext.facet#tag', 'tag': tag}
+        text += ' '
+        start = len(text.encode('utf-8'))
+        text += segment
+        facets.append({
+            'index': {'byteStart': start, 'byteEnd': start + len(segment.encode('utf-8'))},
+            'features': [feature],
+        })
+    return text, lang, facets
+
+def _view_record(post):
+    """引用元（app.bsky.embed.record#viewRecord）を作成する"""
+    return {
+        '$type': 'app.bsky.embed.record#viewRecord',
+        'uri': post['uri'],
+        'cid': post['cid'],
+        'author': post['author'],
+        'value': post['record'],
+        'likeCount': post['likeCount'],
+        'repostCount': post['repostCount'],
+        'indexedAt': post['indexedAt'],
+    }
+
+def _images_view(rng, author, index):
+    """画像の埋め込み（app.bsky.embed.images#view）を作成する"""
+    return {
+        '$type': 'app.bsky.embed.images#view',
+        'images': [
+            {
+                'thumb': f"https://cdn.bsky.app/img/feed_thumbnail/plain/{author['did']}/{index}-{n}@jpeg",
+                'fullsize': f"https://cdn.bsky.app/img/feed_fullsize/plain/{author['did']}/{index}-{n}@jpeg",
+                'alt': "",
+            }
+            for n in range(rng.randint(1, 4))
+        ],
+    }
+
+def _strong_ref(post):
+    """投稿の参照（com.atproto.repo.strongRef）を作成する"""
+    return {'uri': post['uri'], 'cid': post['cid']}
+
+def _isoformat(dt):
+    """APIと同じ形式（ミリ秒とZ）の時刻の文字列にする"""
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+タイムライン処理のベンチマーク（wxとネットワークを使わずに合成の投稿で計測する）
+
+使い方:
+    python benchmarks/timeline_pipeline.py                            # 1k/10k/100k件で計測
+    python benchmarks/timeline_pipeline.py --sizes 1000 --repeat 5    # 件数と回数を指定
+    python benchmarks/timeline_pipeline.py --output result.json       # 結果を保存
+    python benchmarks/timeline_pipeline.py --baseline base.json --max-ratio 1.2
+                                                                      # 保存した結果と比較
+
+計測する段階:
+    normalize    PostView -> 投稿データの変換（core.post_model.normalize_post）
+    merge_sort   表示中の投稿とのマージと並べ替え（core.timeline_model.merge_timeline_posts）
+    trim         保持する件数への制限（core.timeline_model.trim_timeline_posts）
+    relative_time  全投稿の相対時間の再計算（core.timeline_model.refresh_relative_times）
+    cache_posts  投稿のキャッシュへの書き込み（DataStore.save_posts、全文検索の索引を含む）
+    cache_raw    元のレコードの圧縮と書き込み（DataStore.queue_raw_records + flush）
+
+APIの応答からatprotoのモデルへの変換（pydantic）は含まない。
+基準の結果に対する比率が--max-ratioを超えた段階があった場合は終了コード1で終了する。
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic_feed import generate_feed, to_model
+from core.post_model import normalize_post
+from core.timeline_model import merge_timeline_posts, trim_timeline_posts, refresh_relative_times, MAX_TIMELINE_POSTS
+from core.data_store import DataStore
+
+# 既定の投稿数
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# 段階（表示順）
+STAGES = ('normalize', 'merge_sort', 'trim', 'relative_time', 'cache_posts', 'cache_raw')
+
+# ログインユーザー（自分の投稿の判定に使う）
+MY_DID = 'did:plc:synthetic000001'
+MY_HANDLE = 'user1.bsky.social'
+
+def run_pipeline(feed_json, feed_models, work_dir):
+    """タイムライン処理の各段階を1回ずつ計測する
+
+    Args:
+        feed_json (list): generate_feedの結果（元のレコードの保存に使う）
+        feed_models (list): feed_jsonをto_modelで変換したもの
+        work_dir (str): データベースを作成するディレクトリ
+
+    Returns:
+        dict: 段階名 -> 所要時間（ミリ秒）
+    """
+    timings = {}
+
+    def timed(stage, func, *args):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = (time.perf_counter() - start) * 1000
+        return result
+
+    # 正規化（APIの応答は新しい順）
+    posts = timed('normalize', lambda: [normalize_post(item.post, MY_HANDLE) for item in feed_models])
+
+    # 古い方の半分を表示中として、新しい方の6割（1割は表示中と重複）をマージする
+    half = len(posts) // 2
+    displayed = sorted(posts[half:], key=lambda post: post['raw_timestamp'])
+    fetched = {post['uri']: post for post in posts[:len(posts) * 6 // 10]}
+    merged, _, _ = timed('merge_sort', merge_timeline_posts, displayed, fetched, None)
+    timed('trim', trim_timeline_posts, merged, MAX_TIMELINE_POSTS)
+
+    # 表示を消しておき、すべての投稿の表示を再計算させる（最も遅い場合）
+    for post in merged:
+        post['time'] = ''
+    timed('relative_time', refresh_relative_times, merged)
+
+    # キャッシュへの書き込み（毎回新しいデータベースに書き込む）
+    db_path = os.path.join(work_dir, f"bench_{time.monotonic_ns()}.db")
+    data_store = DataStore(db_path)
+    try:
+        timed('cache_posts', data_store.save_posts, posts, MY_DID, 'home')
+
+        def write_raw():
+            data_store.queue_raw_records([(item['post']['uri'], item) for item in feed_json])
+            if not data_store.flush(timeout=600):
+                raise RuntimeError("元のレコードの書き込みが完了しませんでした")
+        timed('cache_raw', write_raw)
+    finally:
+        data_store.close()
+    return timings
+
+def benchmark(sizes, repeat, seed):
+    """投稿数ごとに計測する
+
+    Args:
+        sizes (list): 投稿数のリスト
+        repeat (int): 計測回数（中央値を使用）
+        seed (int): 合成の投稿の乱数のシード
+
+    Returns:
+        dict: 投稿数（文字列） -> 段階名 -> {'median_ms', 'min_ms', 'per_post_us', 'runs_ms'}
+    """
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='ssky_bench_')
+    try:
+        for size in sizes:
+            feed_json = generate_feed(size, seed=seed)
+            feed_models = [to_model(item) for item in feed_json]
+            runs = [run_pipeline(feed_json, feed_models, work_dir) for _ in range(repeat)]
+
+            results[str(size)] = {}
+            for stage in STAGES:
+                values = [run[stage] for run in runs]
+                median = statistics.median(values)
+                results[str(size)][stage] = {
+                    'median_ms': round(median, 3),
+                    'min_ms': round(min(values), 3),
+                    'per_post_us': round(median * 1000 / size, 3),
+                    'runs_ms': [round(value, 3) for value in values],
+                }
+            del feed_json, feed_models, runs
+            gc.collect()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def print_report(results):
+    """結果を表形式で表示する"""
+    print(f"{'件数':>8}  " + "  ".join(f"{stage:>13}" for stage in STAGES))
+    for size, stages in results.items():
+        cells = [f"{stages[stage]['median_ms']:11.1f}ms" for stage in STAGES]
+        print(f"{int(size):>8}  " + "  ".join(cells))
+
+def compare(results, baseline, max_ratio):
+    """基準の結果と比較する
+
+    Args:
+        results (dict): benchmarkの結果
+        baseline (dict): 基準の結果（--outputで保存したJSONの'results'）
+        max_ratio (float): 許容する比率
+
+    Returns:
+        bool: 許容する比率を超えた段階があった場合はTrue
+    """
+    failed = False
+    for size, stages in results.items():
+        for stage, values in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if not base or not base.get('median_ms'):
+                continue
+            ratio = values['median_ms'] / base['median_ms']
+            status = "OK" if ratio <= max_ratio else "NG"
+            print(f"{size}件 {stage}: {base['median_ms']:.1f}ms -> {values['median_ms']:.1f}ms"
+                  f"（{ratio:.2f}倍, 上限{max_ratio}倍）{status}")
+            failed = failed or ratio > max_ratio
+    return failed
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="SSkyのタイムライン処理の時間を計測します")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="投稿数")
+    parser.add_argument('--repeat', type=int, default=3, help="計測回数（中央値を使用）")
+    parser.add_argument('--seed', type=int, default=0, help="合成の投稿の乱数のシード")
+    parser.add_argument('--output', help="結果を保存するJSONファイル")
+    parser.add_argument('--baseline', help="比較する基準の結果のJSONファイル")
+    parser.add_argument('--max-ratio', type=float, default=1.2, help="基準に対して許容する比率")
+    args = parser.parse_args(argv)
+
+    # 書き込みなどのログで結果が埋もれないようにする
+    logging.basicConfig(level=logging.ERROR)
+
+    results = benchmark(args.sizes, args.repeat, args.seed)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'results': results,
+            }, f, ensure_ascii=False, indent=4)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failed = compare(results, baseline.get('results', {}), args.max_ratio)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+XRPCの負荷生成（複数のBlueskyClientから検証用サーバーにリクエストを送り、応答時間を集計する）
+
+使い方:
+    python benchmarks/xrpc_load.py --clients 8 --duration 30 --latency-ms 80 --jitter-ms 40
+    python benchmarks/xrpc_load.py --mix timeline=6,profile=2,thread=1,post=1 --error-rate 0.05
+    python benchmarks/xrpc_load.py --url http://127.0.0.1:2583 --output load.json
+                                                                  # 起動済みのサーバーに接続
+
+--urlを省略した場合は、このプロセス内でbenchmarks.fake_xrpc.FakeXrpcServerを起動する。
+応答時間はクライアント側（HTTPの往復とatprotoのモデルへの変換を含む）でcore.metricsが計測した値。
+atprotoのインストールが必要（wxは不要）。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from collections import Counter
+
+# プロジェクトのルートディレクトリをパスに追加
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fake_xrpc import FakeXrpcServer, DEFAULT_HANDLE, DEFAULT_PASSWORD
+from core.metrics import ClientMetrics
+from core.data_store import DataStore
+from core.auth.session_persistence import SessionPersistence
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 既定の操作の割合
+DEFAULT_MIX = 'timeline=6,profile=2,thread=1,post=1,like=1,upload=1'
+
+# アップロードする画像の種類（同じ画像を繰り返しアップロードし、ブロブキャッシュの効果を見る）
+UPLOAD_POOL_SIZE = 4
+UPLOAD_SIZE = 64 * 1024
+
+class DiscardingAuthManager:
+    """セッション情報を保存しない認証マネージャー（負荷生成中にDPAPIやデータベースへ書き込まないため）"""
+
+    def save_session(self, user_did, session_string):
+        return True
+
+def parse_mix(text):
+    """操作の割合の指定を解析する
+
+    Args:
+        text (str): 'timeline=6,profile=2'の形式
+
+    Returns:
+        list: (操作名, 重み)のリスト
+    """
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"不明な操作です: {name}（{', '.join(OPERATIONS)}のいずれか）")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+class LoadWorker:
+    """1つのBlueskyClientで操作を繰り返すワーカー"""
+
+    def __init__(self, index, url, handle, password, data_store, mix, seed):
+        """初期化
+
+        Args:
+            index (int): ワーカーの番号
+            url (str): サーバーのURL
+            handle (str): ログインするハンドル
+            password (str): パスワード
+            data_store (DataStore): キャッシュに使うデータストア（全ワーカーで共有）
+            mix (list): (操作名, 重み)のリスト
+            seed (int): 乱数のシード
+        """
+        from core.client import BlueskyClient
+
+        self.index = index
+        self.client = BlueskyClient(base_url=url, data_store=data_store)
+        self.handle = handle
+        self.password = password
+        self.rng = random.Random(seed + index)
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.operations = Counter()
+        self.errors = Counter()
+        self.posts = []  # (URI, CID)のリスト（スレッド・いいねの対象）
+        self.handles = []
+
+    def run(self, deadline, max_operations=None):
+        """期限まで（または指定の回数まで）操作を繰り返す
+
+        Args:
+            deadline (float): 終了する時刻（time.monotonic）
+            max_operations (int, optional): 最大の操作回数
+        """
+        try:
+            self.client.login(self.handle, self.password)
+            self._refresh_targets()
+        except Exception as e:
+            self.errors['login'] += 1
+            logger.error(f"ワーカー{self.index}: ログインに失敗しました: {str(e)}")
+            return
+        count = 0
+        while time.monotonic() < deadline and (max_operations is None or count < max_operations):
+            name = self.rng.choices(self.names, self.weights)[0]
+            try:
+                OPERATIONS[name](self)
+            except Exception as e:
+                self.errors[name] += 1
+                logger.debug(f"ワーカー{self.index}: {name}に失敗しました: {str(e)}")
+            self.operations[name] += 1
+            count += 1
+
+    def _refresh_targets(self):
+        """タイムラインを取得し、操作の対象にする投稿とハンドルを更新する"""
+        timeline = self.client.get_timeline(limit=50)
+        self.posts = [(item.post.uri, item.post.cid) for item in timeline.feed]
+        self.handles = sorted({item.post.author.handle for item in timeline.feed})
+
+    def op_timeline(self):
+        self._refresh_targets()
+
+    def op_profile(self):
+        self.client.get_profile(self.rng.choice(self.handles))
+
+    def op_thread(self):
+        self.client.get_post_thread(self.rng.choice(self.posts)[0])
+
+    def op_post(self):
+        self.client.send_post(f"負荷試験の投稿 {self.index}-{time.monotonic_ns()}")
+
+    def op_like(self):
+        uri, cid = self.rng.choice(self.posts)
+        self.client.like(uri, cid)
+
+    def op_upload(self):
+        data = _upload_data(self.rng.randrange(UPLOAD_POOL_SIZE))
+        self.client.upload_images([(data, 'image/png', hashlib.sha256(data).hexdigest())])
+
+# 操作名 -> 処理
+OPERATIONS = {
+    'timeline': LoadWorker.op_timeline,
+    'profile': LoadWorker.op_profile,
+    'thread': LoadWorker.op_thread,
+    'post': LoadWorker.op_post,
+    'like': LoadWorker.op_like,
+    'upload': LoadWorker.op_upload,
+}
+
+def _upload_data(index):
+    """アップロードする画像の代わりのデータを作成する"""
+    return hashlib.sha256(str(index).encode('ascii')).digest() * (UPLOAD_SIZE // 32)
+
+def run_load(url, clients, duration, mix, seed=0, handle=DEFAULT_HANDLE, password=DEFAULT_PASSWORD,
+             max_operations=None):
+    """負荷を生成して結果を集計する
+
+    Args:
+        url (str): サーバーのURL
+        clients (int): 同時に動かすクライアントの数
+        duration (float): 実行する秒数
+        mix (list): (操作名, 重み)のリスト
+        seed (int, optional): 乱数のシード
+        handle (str, optional): ログインするハンドル
+        password (str, optional): パスワード
+        max_operations (int, optional): クライアントごとの最大の操作回数
+
+    Returns:
+        dict: {'elapsed_s', 'operations', 'errors', 'throughput_per_s', 'endpoints'}
+    """
+    # セッション情報はこのプロセスでは保存しない（最初に作成した設定がシングルトンに残る）
+    SessionPersistence(auth_manager=DiscardingAuthManager())
+    metrics = ClientMetrics()
+    metrics.reset()
+
+    work_dir = tempfile.mkdtemp(prefix='ssky_load_')
+    data_store = DataStore(os.path.join(work_dir, 'load.db'))
+    try:
+        workers = [LoadWorker(i, url, handle, password, data_store, mix, seed) for i in range(clients)]
+        start = time.monotonic()
+        deadline = start + duration
+        threads = [
+            threading.Thread(target=worker.run, args=(deadline, max_operations), name=f"LoadWorker-{worker.index}")
+            for worker in workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+    finally:
+        data_store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    operations = sum((worker.operations for worker in workers), Counter())
+    errors = sum((worker.errors for worker in workers), Counter())
+    endpoints = [
+        {key: value for key, value in row.items() if key != 'buckets'}
+        for row in metrics.snapshot() if row['count']
+    ]
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'operations': dict(operations),
+        'errors': dict(errors),
+        'throughput_per_s': round(sum(operations.values()) / elapsed, 2) if elapsed else None,
+        'endpoints': endpoints,
+    }
+
+def _format_ms(value):
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+def print_report(result, server=None):
+    """結果を表示する"""
+    print(f"経過時間: {result['elapsed_s']:.1f}秒  操作: {sum(result['operations'].values())}回  "
+          f"スループット: {result['throughput_per_s']}回/秒")
+    for name, count in sorted(result['operations'].items()):
+        print(f"  {name:10} {count:6}回  失敗 {result['errors'].get(name, 0)}回")
+
+    print(f"\n{'エンドポイント':34} {'呼び出し':>8} {'エラー':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'最大':>8}（ミリ秒）")
+    for row in result['endpoints']:
+        print(f"{row['endpoint']:40} {row['count']:8} {row['errors']:6} {_format_ms(row['p50'])} "
+              f"{_format_ms(row['p95'])} {_format_ms(row['p99'])} {_format_ms(row['max_ms'])}")
+
+    if server is not None:
+        print("\nサーバーの受信数:")
+        for nsid, count in server.request_counts.most_common():
+            print(f"  {count:8}  {nsid}")
+        print(f"ステータスコード: {dict(server.status_counts)}")
+
+def main(argv=None):
+    """エントリーポイント"""
+    parser = argparse.ArgumentParser(description="検証用XRPCサーバーに負荷をかけ、クライアント側の応答時間を計測します")
+    parser.add_argument('--url', help="起動済みのサーバーのURL（省略した場合はこのプロセスで起動）")
+    parser.add_argument('--clients', type=int, default=4, help="同時に動かすクライアントの数")
+    parser.add_argument('--duration', type=float, default=10, help="実行する秒数")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="操作の割合（例: timeline=6,profile=2）")
+    parser.add_argument('--seed', type=int, default=0, help="乱数のシード")
+    parser.add_argument('--handle', default=DEFAULT_HANDLE, help="ログインするハンドル")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help="パスワード")
+    parser.add_argument('--timeline-size', type=int, default=1000, help="サーバーのタイムラインの投稿数")
+    parser.add_argument('--latency-ms', type=float, default=0, help="サーバーの応答の遅延（ミリ秒）")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="遅延のばらつきの最大値（ミリ秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="サーバーがエラーを返す割合（0〜1）")
+    parser.add_argument('--rate-limit', type=int, help="サーバーのレート制限（期間あたりのリクエスト数）")
+    parser.add_argument('--output', help="結果を保存するJSONファイル")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    server = None
+    url = args.url
+    if url is None:
+        server = FakeXrpcServer(
+            handle=args.handle, password=args.password, timeline_size=args.timeline_size, seed=args.seed,
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+        ).start()
+        url = server.url
+
+    try:
+        result = run_load(url, args.clients, args.duration, mix, args.seed, args.handle, args.password)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print_report(result, server)
+    if args.output:
+        result.update({
+            'python': platform.python_version(),
+            'clients': args.clients,
+            'mix': args.mix,
+            'server': None if server is None else {
+                'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms,
+                'error_rate': args.error_rate, 'rate_limit': args.rate_limit,
+                'request_counts': dict(server.request_counts),
+            },
+        })
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
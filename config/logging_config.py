@@ -4,43 +4,105 @@
 """
 SSky - Blueskyクライアント
 ロギング設定モジュール
+
+ログの出力（コンソールとファイルへの書き込み）はバックグラウンドのスレッドで行う。
+ルートロガーにはキューに追加するだけのハンドラ（QueueHandler）を設定し、
+書き込み用のスレッド（QueueListener）がキューから取り出してコンソールとファイルに出力するため、
+UIスレッドなどのログを出力したスレッドはファイルの書き込みを待たない。
 """
 
 import os
+import copy
+import queue
+import atexit
 import logging
+import threading
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from utils.file_utils import ensure_directory_exists
+from core.log_events import JsonFormatter, LOG_FORMAT_TEXT, LOG_FORMAT_JSON, LOG_FORMATS, set_enabled
+
+# ログの書式
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 書き込み用のスレッド（setup_loggingで開始し、stop_loggingで停止する）
+_listener = None
+_queue_handler = None
+_log_filename = None
+_lock = threading.Lock()
+_atexit_registered = False
+
+class DeferredQueueHandler(QueueHandler):
+    """ログレコードをキューに追加するハンドラ
+
+    メッセージの組み立てと例外の文字列化だけを行い（引数や例外は別のスレッドでは参照しない）、
+    書式の適用は書き込み用のスレッドの各ハンドラに任せる（ファイルとコンソールで書式が異なる場合があるため）。
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        """キューに追加するレコードを作成する
+
+        Args:
+            record (logging.LogRecord): ログレコード
+
+        Returns:
+            logging.LogRecord: メッセージを組み立てたレコードのコピー
+        """
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-def setup_logging(app_name="ssky"):
+def setup_logging(app_name="ssky", log_dir=None):
     """アプリケーションのロギング設定を行う
     
     Args:
         app_name (str): アプリケーション名（ログファイル名のプレフィックス）
+        log_dir (str, optional): ログの保存先。省略した場合はアプリケーションのlogディレクトリ
         
     Returns:
         logging.Logger: 設定済みのロガーオブジェクト
     """
-    # 設定マネージャーからデバッグログの有効/無効を取得
+    global _listener, _queue_handler, _log_filename, _atexit_registered
+    
+    # 設定マネージャーからデバッグログの有効/無効とログの形式を取得
     try:
         from config.settings_manager import SettingsManager
         settings_manager = SettingsManager()
         enable_debug_log = settings_manager.get('advanced.enable_debug_log', False)
+        log_format = settings_manager.get('advanced.log_format', LOG_FORMAT_TEXT)
     except Exception:
         # 設定マネージャーの取得に失敗した場合はデフォルト値を使用
         enable_debug_log = False
+        log_format = LOG_FORMAT_TEXT
+    if log_format not in LOG_FORMATS:
+        log_format = LOG_FORMAT_TEXT
     
     # ログディレクトリの確認と作成
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'log')
+    if log_dir is None:
+        log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'log')
     ensure_directory_exists(log_dir)
 
     # ログファイル名（日時を含める）
     log_filename = os.path.join(log_dir, f'{app_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
 
+    # 以前の設定で開始した書き込み用のスレッドを停止（キューに残っているログは書き込まれる）
+    stop_logging()
+
     # ロガーの設定
     # コンソールとファイルの両方にログを出力
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)  # ロガー自体のレベルはDEBUGに設定
+    # デバッグログが無効な場合は、ロガーの時点で破棄する（メッセージの組み立てやキューへの追加を行わない）。
+    # 後から読み込まれたモジュールのロガーもルートロガーのレベルを引き継ぐ
+    logger.setLevel(logging.DEBUG if enable_debug_log else logging.INFO)
 
     # 既存のハンドラをクリア
     for handler in logger.handlers[:]:
@@ -50,8 +112,7 @@ def setup_logging(app_name="ssky"):
     console_handler = logging.StreamHandler()
     # デバッグログが有効な場合はDEBUG、無効な場合はINFO
     console_handler.setLevel(logging.DEBUG if enable_debug_log else logging.INFO)
-    console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
     # ファイルハンドラ（ローテーション機能付き）
     file_handler = RotatingFileHandler(
@@ -60,24 +121,68 @@ def setup_logging(app_name="ssky"):
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(logging.DEBUG)  # ファイルには常にDEBUGレベルで出力
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
+    file_handler.setLevel(logging.DEBUG)  # ファイルにはロガーを通過したすべてのログを出力
+    # JSON形式の場合はファイルに1行に1つのJSONオブジェクトを出力し、イベントを記録する（コンソールは従来の形式）
+    file_handler.setFormatter(JsonFormatter() if log_format == LOG_FORMAT_JSON else logging.Formatter(LOG_FORMAT))
+    set_enabled(log_format == LOG_FORMAT_JSON)
 
-    # ハンドラをロガーに追加
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # ルートロガーにはキューに追加するハンドラだけを設定し、書き込みは書き込み用のスレッドで行う
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    with _lock:
+        _listener = listener
+        _queue_handler = queue_handler
+        _log_filename = log_filename
+        # 終了時にキューに残っているログを書き込む
+        if not _atexit_registered:
+            atexit.register(stop_logging)
+            _atexit_registered = True
     
     # サードパーティライブラリのログレベルを調整
     logging.getLogger('httpx').setLevel(logging.WARNING)
     logging.getLogger('httpcore').setLevel(logging.WARNING)  # HTTPリクエストのログを抑制
     
-    # デバッグログが無効な場合は、ルートロガー以外のすべてのロガーのレベルをINFOに設定
+    # デバッグログが無効な場合は、レベルを指定済みのロガー（ルートロガーとサードパーティライブラリ以外）をINFOに設定
     if not enable_debug_log:
-        for logger_name in logging.root.manager.loggerDict:
-            if logger_name != '':  # ルートロガー以外
-                logging.getLogger(logger_name).setLevel(logging.INFO)
+        for named_logger in logging.root.manager.loggerDict.values():
+            if (isinstance(named_logger, logging.Logger) and named_logger.level < logging.INFO
+                    and named_logger.level != logging.NOTSET):
+                named_logger.setLevel(logging.INFO)
     
-    logger.debug(f"{app_name}のロギング設定を完了しました（デバッグログ: {'有効' if enable_debug_log else '無効'}）")
+    logger.info("%sのロギング設定を完了しました（デバッグログ: %s, 形式: %s）",
+                app_name, '有効' if enable_debug_log else '無効', log_format)
     
     return logger
+
+def current_log_file():
+    """現在書き込み中のログファイルのパスを取得する
+
+    Returns:
+        str: ログファイルのパス。setup_loggingを呼び出していない場合はNone
+    """
+    return _log_filename
+
+def stop_logging():
+    """書き込み用のスレッドを停止する（キューに残っているログをすべて書き込んでから停止する）
+    
+    停止後のログは書き込まれない（WARNING以上はPythonの既定の出力先に出力される）。
+    """
+    global _listener, _queue_handler
+    with _lock:
+        listener, queue_handler = _listener, _queue_handler
+        _listener = None
+        _queue_handler = None
+    if listener is None:
+        return
+    
+    logging.getLogger().removeHandler(queue_handler)
+    set_enabled(False)
+    listener.stop()
+    for handler in listener.handlers:
+        try:
+            handler.close()
+        except Exception:
+            pass
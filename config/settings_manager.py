@@ -7,6 +7,7 @@ SSky - Blueskyクライアント
 """
 
 import os
+import copy
 import json
 import logging
 from utils.file_utils import ensure_directory_exists
@@ -14,6 +15,16 @@ from utils.file_utils import ensure_directory_exists
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+# ローカルキャッシュのテーブルごとの上限（max_rows: 最大行数、max_mb: インデックスを含む最大サイズ）
+DEFAULT_CACHE_BUDGETS = {
+    "posts": {"max_rows": 50000, "max_mb": 64},
+    "authors": {"max_rows": 20000, "max_mb": 8},
+    "timeline_posts": {"max_rows": 20000, "max_mb": 4}
+}
+
+# ログファイルの保持の上限（max_age_days: 保持日数、max_total_mb: 合計サイズ、max_files: ファイル数）
+DEFAULT_LOG_RETENTION = {"max_age_days": 30, "max_total_mb": 200, "max_files": 100}
+
 class SettingsManager:
     """設定管理クラス（シングルトン）"""
     
@@ -52,7 +63,10 @@ class SettingsManager:
                 "show_completion_dialog": True  # 投稿・返信・引用時に完了ダイアログを表示
             },
             "advanced": {
-                "enable_debug_log": False  # デバッグログを有効にする
+                "enable_debug_log": False,  # デバッグログを有効にする
+                "log_format": "text",  # ログファイルの形式（text: 従来の形式、json: 1行に1つのJSONオブジェクト）
+                "cache_budgets": copy.deepcopy(DEFAULT_CACHE_BUDGETS),  # キャッシュの上限
+                "log_retention": copy.deepcopy(DEFAULT_LOG_RETENTION)  # ログファイルの保持の上限
             }
         }
         
@@ -239,6 +253,14 @@ class SettingsManager:
         if fetch_count < 1 or fetch_count > 100:
             return False, "投稿の取得件数は1以上100以下に設定してください。"
         
+        # キャッシュの上限のバリデーション
+        if not self._is_valid_cache_budgets(self.get('advanced.cache_budgets', {})):
+            return False, "キャッシュの上限は正の数で設定してください。"
+        
+        # ログファイルの保持の上限のバリデーション
+        if not self._is_valid_log_retention(self.get('advanced.log_retention', {})):
+            return False, "ログファイルの保持の上限は正の数で設定してください。"
+        
         # 他のバリデーションルールがあれば追加
         
         return True, None
@@ -286,6 +308,59 @@ class SettingsManager:
         elif fetch_count > 100:
             self.set('timeline.fetch_count', 100)
             logger.info("投稿の取得件数が100を超えていたため、100に設定しました。")
+        
+        # キャッシュの上限が無効な場合は初期値に戻す
+        if not self._is_valid_cache_budgets(self.get('advanced.cache_budgets', {})):
+            self.set('advanced.cache_budgets', copy.deepcopy(DEFAULT_CACHE_BUDGETS))
+            logger.info("キャッシュの上限が無効だったため、初期値に戻しました。")
+        
+        # ログファイルの保持の上限が無効な場合は初期値に戻す
+        if not self._is_valid_log_retention(self.get('advanced.log_retention', {})):
+            self.set('advanced.log_retention', copy.deepcopy(DEFAULT_LOG_RETENTION))
+            logger.info("ログファイルの保持の上限が無効だったため、初期値に戻しました。")
+    
+    @staticmethod
+    def _is_valid_cache_budgets(budgets):
+        """キャッシュの上限の設定が有効かを判定する
+        
+        Args:
+            budgets: advanced.cache_budgetsの値
+            
+        Returns:
+            bool: 有効な場合はTrue
+        """
+        if not isinstance(budgets, dict):
+            return False
+        for budget in budgets.values():
+            if not isinstance(budget, dict):
+                return False
+            for key in ('max_rows', 'max_mb'):
+                value = budget.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                    return False
+        return True
+    
+    @staticmethod
+    def _is_valid_log_retention(retention):
+        """ログファイルの保持の上限の設定が有効かを判定する
+        
+        Args:
+            retention: advanced.log_retentionの値（Noneの項目はその上限を使わない）
+            
+        Returns:
+            bool: 有効な場合はTrue
+        """
+        if not isinstance(retention, dict):
+            return False
+        for key in ('max_age_days', 'max_total_mb', 'max_files'):
+            value = retention.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                return False
+        return True
     
     def _update_nested_dict(self, d, u):
         """ネストされた辞書を更新する
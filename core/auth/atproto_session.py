@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+atprotoのクライアントのセッション管理の非公開の機能を使う部分をまとめたモジュール
+
+atprotoには、通信せずに保存されたセッションを読み込む方法と、クライアントの更新用ロックを取得して
+アクセストークンを更新する方法が公開されていないため、非公開の属性を使う。これらは動作を確認した
+バージョン（requirements.txtで固定）に合わせており、属性が見つからない場合は公開の方法に切り替える。
+"""
+
+import logging
+from importlib import metadata
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 非公開の属性の動作を確認したatprotoのバージョン（requirements.txtの指定と一致させる）
+SUPPORTED_ATPROTO_VERSION = '0.0.61'
+
+# 使用するatprotoのクライアントの非公開の属性
+PRIVATE_ATTRIBUTES = ('_session', '_refresh_lock', '_import_session_string', '_refresh_and_set_session')
+
+_version_checked = False
+
+def installed_atproto_version():
+    """インストールされているatprotoのバージョンを取得する
+
+    Returns:
+        str: バージョン。パッケージの情報がない場合（実行ファイルにまとめた場合など）はNone
+    """
+    try:
+        return metadata.version('atproto')
+    except metadata.PackageNotFoundError:
+        return None
+
+def supports_private_api(client):
+    """クライアントが非公開の属性を持っているかどうか
+
+    動作を確認したバージョンと異なる場合は、最初の1回だけ警告を出力する。
+
+    Args:
+        client (atproto_client.Client): atprotoのクライアント
+
+    Returns:
+        bool: 非公開の属性をすべて持っている場合はTrue
+    """
+    global _version_checked
+    if not _version_checked:
+        _version_checked = True
+        version = installed_atproto_version()
+        if version is not None and version != SUPPORTED_ATPROTO_VERSION:
+            logger.warning(
+                "atprotoのバージョン(%s)が動作を確認したバージョン(%s)と異なります",
+                version, SUPPORTED_ATPROTO_VERSION
+            )
+
+    missing = [name for name in PRIVATE_ATTRIBUTES if not hasattr(client, name)]
+    if missing:
+        logger.warning("atprotoのクライアントに必要な属性がないため、公開の方法を使います: %s", ", ".join(missing))
+        return False
+    return True
+
+def current_session(client):
+    """クライアントが使用中のセッションを取得する
+
+    Args:
+        client (atproto_client.Client): atprotoのクライアント
+
+    Returns:
+        atproto_client.client.session.Session: セッション。ログインしていない場合はNone
+    """
+    return getattr(client, '_session', None)
+
+def import_session(client, session_string, did, handle):
+    """保存されたセッションを通信せずに読み込む
+
+    atprotoのlogin(session_string=...)はプロフィールの取得で必ず通信するため、セッションだけを読み込み、
+    プロフィールはセッションから分かるDIDとハンドルだけのモデルにしておく。
+
+    Args:
+        client (atproto_client.Client): atprotoのクライアント
+        session_string (str): セッション文字列
+        did (str): ユーザーのDID
+        handle (str): ハンドル
+
+    Returns:
+        models.AppBskyActorDefs.ProfileViewDetailed: DIDとハンドルだけのプロフィール。
+            非公開の属性がない場合はNone（呼び出し側でlogin(session_string=...)を使う）
+    """
+    if not supports_private_api(client):
+        return None
+
+    from atproto_client import models
+    client._import_session_string(session_string)
+    client.me = models.AppBskyActorDefs.ProfileViewDetailed(did=did, handle=handle)
+    return client.me
+
+def refresh_session(client, should_refresh):
+    """クライアントの更新用ロックを取得し、必要な場合はアクセストークンを更新する
+
+    ロックの取得中に送られたリクエストは、重複して更新せずにこの更新が終わるのを待つ。
+
+    Args:
+        client (atproto_client.Client): atprotoのクライアント
+        should_refresh (callable): ロックの取得後に呼び出し、更新が必要な場合にTrueを返す関数
+
+    Returns:
+        bool: 更新した場合はTrue。非公開の属性がない場合は更新せずにFalse
+            （atprotoのクライアントがAPI呼び出しの中で更新する）
+
+    Raises:
+        AtProtocolError: 更新に失敗した場合
+    """
+    if not supports_private_api(client):
+        return False
+
+    with client._refresh_lock:
+        if not should_refresh():
+            return False
+        client._refresh_and_set_session()
+        return True
@@ -7,8 +7,9 @@ SSky - Blueskyクライアント
 """
 
 import logging
-from utils.crypto import encrypt_data, decrypt_data
 from core.data_store import DataStore
+from core.auth.session_persistence import DpapiBackend
+from core.startup_timer import StartupTimer
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -31,8 +32,25 @@ class AuthManager:
             return
         self._initialized = True # 初期化フラグを立てる
         self.data_store = DataStore() # 常に新しいDataStoreを作成（シングルトンなので一度だけ）
+        self.crypto_backend = DpapiBackend() # 暗号化方式
         logger.debug("AuthManager initialized with DataStore.") # デバッグログ追加
 
+    def set_crypto_backend(self, backend):
+        """セッション情報の暗号化方式を設定
+
+        Args:
+            backend (CryptoBackend): 暗号化方式（core.auth.session_persistence.CryptoBackend）
+        """
+        self.crypto_backend = backend
+
+    def _encrypt(self, data):
+        """設定された暗号化方式でデータを暗号化"""
+        return self.crypto_backend.encrypt(data)
+
+    def _decrypt(self, encrypted_data):
+        """設定された暗号化方式でデータを復号化"""
+        return self.crypto_backend.decrypt(encrypted_data)
+
     def save_session(self, user_did, session_data):
         """セッション情報を保存
 
@@ -50,7 +68,7 @@ class AuthManager:
             # logger.debug(f"セッションデータの内容: {session_data}") # 機密情報を含む可能性があるためコメントアウト推奨
 
             # セッションデータを暗号化
-            encrypted_session = encrypt_data(session_data)
+            encrypted_session = self._encrypt(session_data)
             if not encrypted_session:
                 logger.error("セッションデータの暗号化に失敗しました")
                 return False
@@ -85,7 +103,8 @@ class AuthManager:
                 # logger.debug(f"暗号化されたセッションデータの内容: {encrypted_session}") # 暗号化されていてもログ出力は慎重に
 
                 # 暗号化されたセッションデータを復号化
-                session_data = decrypt_data(encrypted_session)
+                with StartupTimer().phase('session_decrypt'):
+                    session_data = self._decrypt(encrypted_session)
                 if session_data:
                     logger.info(f"最新のセッション情報を復号化しました: {user_did}")
                     logger.debug(f"復号化されたセッションデータ: 型={type(session_data)}, 長さ={len(session_data) if hasattr(session_data, '__len__') else 'N/A'}")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+セッション情報の保存サービス（暗号化と書き込みをバックグラウンドでまとめて行う）
+"""
+
+import abc
+import time
+import logging
+import threading
+from utils.crypto import encrypt_data, decrypt_data
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 最後の保存要求からこの秒数の間に次の要求がなければ保存する（連続した更新は最後の1回だけ保存する）
+DEBOUNCE_SECONDS = 1.0
+
+class CryptoBackend(abc.ABC):
+    """セッション情報の暗号化方式の基底クラス
+
+    AuthManager.set_crypto_backendで差し替えられる（既定はDpapiBackend。テストやWindows以外の環境で使う）。
+    """
+
+    @abc.abstractmethod
+    def encrypt(self, data):
+        """データを暗号化する
+
+        Args:
+            data (str or bytes): 暗号化するデータ
+
+        Returns:
+            bytes: 暗号化したデータ。失敗した場合はNone
+        """
+
+    @abc.abstractmethod
+    def decrypt(self, encrypted_data):
+        """暗号化されたデータを復号化する
+
+        Args:
+            encrypted_data (bytes): 暗号化されたデータ
+
+        Returns:
+            str: 復号化したデータ。失敗した場合はNone
+        """
+
+class DpapiBackend(CryptoBackend):
+    """DPAPI（utils.crypto）による暗号化方式（既定）"""
+
+    def encrypt(self, data):
+        return encrypt_data(data)
+
+    def decrypt(self, encrypted_data):
+        return decrypt_data(encrypted_data)
+
+class SessionPersistence:
+    """セッション情報を保存する唯一の経路（シングルトン）
+
+    セッションの変更（ログイン・トークンの更新）はどのスレッドからでもsubmitで渡す。
+    保存済み・保存待ちと同じセッション文字列は無視し、短時間に続いた要求は最後の1つだけを
+    書き込み用スレッドで暗号化してデータベースに保存する。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """シングルトンパターンの実装"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(SessionPersistence, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self, auth_manager=None, debounce=DEBOUNCE_SECONDS):
+        """初期化（一度だけ実行）
+
+        Args:
+            auth_manager (AuthManager, optional): 暗号化と保存を行う認証マネージャー。省略した場合はAuthManager()
+            debounce (float, optional): 保存までの待ち時間（秒）
+        """
+        if self._initialized:
+            return
+
+        if auth_manager is None:
+            from core.auth.auth_manager import AuthManager
+            auth_manager = AuthManager()
+        self.auth_manager = auth_manager
+        self.debounce = debounce
+        self._condition = threading.Condition()
+        self._pending = {}  # DID -> (セッション文字列, 要求された時刻)
+        self._saved = {}  # DID -> 最後に保存したセッション文字列
+        self._writing = False
+        self._listeners = []
+        self._thread = None
+        self._initialized = True
+
+    def add_listener(self, callback):
+        """保存が完了したときに呼び出す関数を登録する（書き込み用スレッドから呼び出される）
+
+        Args:
+            callback (callable): ユーザーのDIDを引数に取る関数
+        """
+        self._listeners.append(callback)
+
+    def submit(self, user_did, session_string):
+        """セッション情報の保存を要求する（どのスレッドからでも呼び出せる）
+
+        Args:
+            user_did (str): ユーザーのDID
+            session_string (str): セッション文字列
+
+        Returns:
+            bool: 保存を予約した場合はTrue（同じセッションが保存済み・保存待ちの場合はFalse）
+        """
+        if not user_did or not session_string:
+            logger.warning("DIDまたはセッション情報がないため、セッション情報を保存しません")
+            return False
+
+        with self._condition:
+            pending = self._pending.get(user_did)
+            if session_string == (pending[0] if pending else self._saved.get(user_did)):
+                logger.debug(f"同じセッション情報が保存済みのため、保存を省略します: {user_did}")
+                return False
+            self._pending[user_did] = (session_string, time.monotonic())
+            self._ensure_worker()
+            self._condition.notify_all()
+        return True
+
+    def discard(self, user_did):
+        """保存待ちのセッション情報を破棄する（ログアウトやセッションの削除の前に呼び出す）
+
+        書き込み中の場合は完了を待つため、この後に削除すれば削除したセッションが書き戻されることはない。
+
+        Args:
+            user_did (str): ユーザーのDID
+        """
+        with self._condition:
+            self._pending.pop(user_did, None)
+            while self._writing and threading.current_thread() is not self._thread:
+                self._condition.wait()
+            self._saved.pop(user_did, None)
+
+    def flush(self, timeout=10):
+        """保存待ちのセッション情報をすぐに書き込み、完了を待つ（アプリケーションの終了時など）
+
+        Args:
+            timeout (float, optional): 最大の待ち時間（秒）
+
+        Returns:
+            bool: すべて書き込んだ場合はTrue
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            # 待ち時間を経過したものとして扱う
+            for user_did, (session_string, _) in self._pending.items():
+                self._pending[user_did] = (session_string, 0)
+            self._condition.notify_all()
+            while self._pending or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _ensure_worker(self):
+        """書き込み用スレッドを開始する（_conditionを取得した状態で呼び出す）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker_loop, name="SessionPersistence")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _worker_loop(self):
+        """書き込み用スレッドのメインループ"""
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    ready = [
+                        user_did for user_did, (_, requested_at) in self._pending.items()
+                        if now - requested_at >= self.debounce
+                    ]
+                    if ready:
+                        break
+                    if self._pending:
+                        wait = min(requested_at for _, requested_at in self._pending.values()) + self.debounce - now
+                        self._condition.wait(max(wait, 0.01))
+                    else:
+                        self._condition.wait()
+                batch = [(user_did, self._pending.pop(user_did)[0]) for user_did in ready]
+                self._writing = True
+
+            try:
+                for user_did, session_string in batch:
+                    self._write(user_did, session_string)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, user_did, session_string):
+        """セッション情報を暗号化して保存する
+
+        Args:
+            user_did (str): ユーザーのDID
+            session_string (str): セッション文字列
+        """
+        if not self.auth_manager.save_session(user_did, session_string):
+            logger.error(f"セッション情報を保存できませんでした: {user_did}")
+            return
+
+        with self._condition:
+            self._saved[user_did] = session_string
+        for callback in self._listeners:
+            try:
+                callback(user_did)
+            except Exception as e:
+                logger.error(f"セッション保存後の処理でエラーが発生しました: {str(e)}", exc_info=True)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+セッショントークンの検証モジュール（ネットワークに接続せずにJWTの有効期限を確認する）
+"""
+
+import json
+import time
+import base64
+import logging
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# セッション文字列の区切り（atprotoのSession.encodeと同じ形式）
+SESSION_STRING_SEPARATOR = ':::'
+
+# アクセストークンの有効期限までの余裕（秒）。atprotoのクライアントは期限の15分前に更新するため、
+# それより期限が近いトークンは再利用しても最初のAPI呼び出しで更新される
+ACCESS_TOKEN_MARGIN = 15 * 60
+
+# リフレッシュトークンの有効期限までの余裕（秒）
+REFRESH_TOKEN_MARGIN = 60
+
+# セッションの状態
+SESSION_VALID = 'valid'  # アクセストークンが有効（通信せずに再利用できる）
+SESSION_NEEDS_REFRESH = 'needs_refresh'  # アクセストークンは期限切れだが、リフレッシュトークンで更新できる
+SESSION_EXPIRED = 'expired'  # リフレッシュトークンも期限切れ（再ログインが必要）
+
+def decode_jwt_payload(token):
+    """JWTのペイロードを署名を検証せずに取り出す
+
+    Args:
+        token (str): JWT
+
+    Returns:
+        dict: ペイロード。JWTの形式でない場合はNone
+    """
+    try:
+        segment = token.split('.')[1]
+        # base64urlのパディングを補う
+        segment += '=' * (-len(segment) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(segment))
+        return payload if isinstance(payload, dict) else None
+    except Exception:
+        return None
+
+def token_expires_at(token):
+    """JWTの有効期限を取得する
+
+    Args:
+        token (str): JWT
+
+    Returns:
+        float: 有効期限（UNIX時刻）。取得できない場合はNone
+    """
+    payload = decode_jwt_payload(token)
+    if not payload or not isinstance(payload.get('exp'), (int, float)):
+        return None
+    return float(payload['exp'])
+
+def parse_session_string(session_string):
+    """保存されたセッション文字列を解析する
+
+    Args:
+        session_string (str or bytes): セッション文字列（atprotoのexport_session_stringの結果）
+
+    Returns:
+        dict: {'handle', 'did', 'access_jwt', 'refresh_jwt', 'pds_endpoint'}。形式が異なる場合はNone
+    """
+    if isinstance(session_string, bytes):
+        try:
+            session_string = session_string.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+    if not isinstance(session_string, str):
+        return None
+
+    fields = session_string.split(SESSION_STRING_SEPARATOR)
+    if len(fields) not in (4, 5) or not all(fields[:4]):
+        return None
+    return {
+        'handle': fields[0],
+        'did': fields[1],
+        'access_jwt': fields[2],
+        'refresh_jwt': fields[3],
+        'pds_endpoint': fields[4] if len(fields) == 5 else None,
+    }
+
+def encode_session(session):
+    """解析したセッションをセッション文字列に戻す
+
+    Args:
+        session (dict): parse_session_stringの結果
+
+    Returns:
+        str: セッション文字列（PDSのエンドポイントがない場合は古い形式）
+    """
+    fields = [session['handle'], session['did'], session['access_jwt'], session['refresh_jwt']]
+    if session.get('pds_endpoint'):
+        fields.append(session['pds_endpoint'])
+    return SESSION_STRING_SEPARATOR.join(fields)
+
+def check_session(session, now=None):
+    """セッションのトークンの有効期限をローカルで確認する
+
+    Args:
+        session (dict): parse_session_stringの結果
+        now (float, optional): 現在時刻（UNIX時刻）。省略した場合は現在
+
+    Returns:
+        str: SESSION_VALID、SESSION_NEEDS_REFRESH、SESSION_EXPIREDのいずれか。
+            有効期限が読み取れない場合はNone（サーバーに問い合わせて確認する）
+    """
+    now = time.time() if now is None else now
+    access_exp = token_expires_at(session['access_jwt'])
+    refresh_exp = token_expires_at(session['refresh_jwt'])
+    if access_exp is None or refresh_exp is None:
+        return None
+
+    if access_exp - ACCESS_TOKEN_MARGIN > now:
+        return SESSION_VALID
+    if refresh_exp - REFRESH_TOKEN_MARGIN > now:
+        return SESSION_NEEDS_REFRESH
+    return SESSION_EXPIRED
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+アクセストークンの事前更新モジュール
+"""
+
+import time
+import logging
+import threading
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# アクセストークンの有効期限のこの秒数前に更新する。atprotoのクライアントは期限の15分前から
+# API呼び出しの中で更新するため、それより前に更新しておき、呼び出し側が更新を待たないようにする
+REFRESH_AHEAD = 20 * 60
+
+# 次に確認するまでの最長の待ち時間（秒）。スリープからの復帰後も期限を過ぎたままにならないようにする
+MAX_WAIT = 10 * 60
+
+# 最短の待ち時間（秒）
+MIN_WAIT = 5
+
+# 更新に失敗した場合に再試行するまでの待ち時間（秒）
+RETRY_DELAY = 60
+
+# リフレッシュトークンが無効・期限切れの場合にサーバーが返すエラー名
+AUTH_ERROR_NAMES = ('ExpiredToken', 'InvalidToken', 'AuthenticationRequired')
+
+def is_auth_error(error):
+    """再ログインが必要な認証エラーかどうかを判定する
+
+    Args:
+        error (Exception): 発生したエラー
+
+    Returns:
+        bool: 再ログインが必要な場合はTrue
+    """
+    try:
+        from atproto_client.exceptions import UnauthorizedError, LoginRequiredError
+    except ImportError:
+        return False
+
+    if isinstance(error, (UnauthorizedError, LoginRequiredError)):
+        return True
+    content = getattr(getattr(error, 'response', None), 'content', None)
+    return getattr(content, 'error', None) in AUTH_ERROR_NAMES
+
+class TokenRefresher:
+    """アクセストークンの有効期限を監視し、期限が近づいたらバックグラウンドで更新するクラス
+
+    更新はatprotoのクライアントの更新用ロックを取得して行うため、更新中に送られたリクエストは
+    同時に更新を始めずに完了を待つ。更新したセッションは、セッション変更イベント（REFRESH）から
+    1回だけ保存される。リフレッシュトークンが無効で更新できない場合は、on_auth_failureで通知して監視を終える。
+    """
+
+    def __init__(self, client, on_auth_failure=None):
+        """初期化
+
+        Args:
+            client (BlueskyClient): Blueskyクライアント
+            on_auth_failure (callable, optional): 再ログインが必要な場合に(エラー, ユーザーのDID)で呼び出す関数
+                （監視用スレッドから呼び出される）
+        """
+        self.client = client
+        self.on_auth_failure = on_auth_failure
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """監視用のスレッドを開始する"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        # 停止直後に再開した場合に古いスレッドが動き続けないよう、スレッドごとに停止フラグを作る
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="TokenRefresher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """監視用のスレッドを停止する"""
+        self._stop_event.set()
+        self._thread = None
+
+    def next_wait(self):
+        """次に確認するまでの待ち時間を計算する
+
+        Returns:
+            float: 待ち時間（秒）
+        """
+        expires_at = self.client.access_token_expires_at()
+        if expires_at is None:
+            return MAX_WAIT
+        return min(max(expires_at - REFRESH_AHEAD - time.time(), MIN_WAIT), MAX_WAIT)
+
+    def run_once(self):
+        """期限が近い場合はアクセストークンを更新する
+
+        Returns:
+            bool: 更新した場合はTrue
+        """
+        refreshed = self.client.refresh_session(REFRESH_AHEAD)
+        if refreshed:
+            logger.info("アクセストークンを有効期限の前に更新しました")
+        return refreshed
+
+    def _run(self, stop_event):
+        """監視用スレッドのメインループ
+
+        Args:
+            stop_event (threading.Event): このスレッドの停止フラグ
+        """
+        wait = self.next_wait()
+        while not stop_event.wait(wait):
+            try:
+                self.run_once()
+                wait = self.next_wait()
+            except Exception as e:
+                did = self.client.user_did
+                needs_relogin = self.client.handle_api_error(e, "アクセストークンの更新")
+                if needs_relogin or is_auth_error(e):
+                    # リフレッシュトークンが無効な場合は、他の認証エラーと同じく再ログインを求める
+                    self._notify_auth_failure(e, did)
+                    return
+                wait = RETRY_DELAY
+
+    def _notify_auth_failure(self, error, did):
+        """再ログインが必要になったことを通知する"""
+        if not self.on_auth_failure:
+            return
+        try:
+            self.on_auth_failure(error, did)
+        except Exception as e:
+            logger.error(f"認証エラーの通知中にエラーが発生しました: {str(e)}", exc_info=True)
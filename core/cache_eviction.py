@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ローカルキャッシュの容量管理モジュール
+"""
+
+import logging
+import threading
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 起動してから最初に整理するまでの待ち時間（秒）。起動直後の処理と重ならないようにする
+INITIAL_DELAY = 120
+
+# 整理を行う間隔（秒）
+EVICTION_INTERVAL = 900
+
+# 最後のキャッシュの書き込みからこの秒数が経過するまでは整理を延期する
+IDLE_SECONDS = 30
+
+# 延期した場合に再確認するまでの待ち時間（秒）
+RETRY_DELAY = 60
+
+class CacheEvictor:
+    """アイドル時にキャッシュを容量の上限まで削除するクラス
+
+    上限（テーブルごとの行数・サイズ）は実行のたびに取得するため、設定の変更は次回の整理から反映される。
+    """
+
+    def __init__(self, data_store, budgets_provider):
+        """初期化
+
+        Args:
+            data_store (DataStore): データストア
+            budgets_provider (callable): テーブルごとの上限の辞書を返す関数
+        """
+        self.data_store = data_store
+        self.budgets_provider = budgets_provider
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """整理用のスレッドを開始する"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        # 停止直後に再開した場合に古いスレッドが動き続けないよう、スレッドごとに停止フラグを作る
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="CacheEvictor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """整理用のスレッドを停止する"""
+        self._stop_event.set()
+        self._thread = None
+
+    def run_once(self):
+        """アイドル状態であればキャッシュを整理する
+
+        以前のバージョンで作成したデータベースは、最初の整理の前に空き領域を段階的に解放できる形に再構成する。
+
+        Returns:
+            dict: テーブル名 -> 削除した行数。アイドル状態でないため延期した場合はNone
+        """
+        if not self.data_store.is_idle(IDLE_SECONDS):
+            logger.debug("キャッシュへの書き込み中のため、整理を延期します")
+            return None
+
+        self.data_store.enable_incremental_vacuum()
+        budgets = self.budgets_provider() or {}
+        return self.data_store.evict_cache(budgets)
+
+    def _run(self, stop_event):
+        """整理用スレッドのメインループ
+
+        Args:
+            stop_event (threading.Event): このスレッドの停止フラグ
+        """
+        wait = INITIAL_DELAY
+        while not stop_event.wait(wait):
+            try:
+                result = self.run_once()
+                wait = RETRY_DELAY if result is None else EVICTION_INTERVAL
+            except Exception as e:
+                logger.error(f"キャッシュの整理中にエラーが発生しました: {str(e)}", exc_info=True)
+                wait = EVICTION_INTERVAL
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+HTTPの記録（カセット）モジュール
+
+実際のサーバーとのリクエストと応答の組を記録し、ファイルに保存する。保存したカセットから
+同じ応答を返すことで、ネットワークに接続せずに同じ結果と（必要なら）同じ応答時間を再現できる。
+通信への組み込みはcore.cassette_transport（httpxのトランスポート）で行う。
+
+カセットには認証情報を残さない:
+    - Authorization・Cookieなどのヘッダーは<redacted>に置き換える
+    - パスワードとメールアドレスは<redacted>に置き換える
+    - accessJwt・refreshJwtは署名のない代わりのJWTに置き換える（再生時にクライアントが有効期限を
+      読み取れるように、有効期限は遠い将来にする）
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit, parse_qsl
+
+from core.auth.session_token import decode_jwt_payload
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# カセットの形式のバージョン
+CASSETTE_VERSION = 1
+
+# 記録する環境変数（カセットのパス）
+CASSETTE_RECORD_ENV = 'SSKY_CASSETTE_RECORD'
+
+# 再生する環境変数（カセットのパス）
+CASSETTE_REPLAY_ENV = 'SSKY_CASSETTE_REPLAY'
+
+# 置き換えた値
+REDACTED = '<redacted>'
+
+# 値を置き換えるヘッダー（小文字）
+REDACTED_HEADERS = ('authorization', 'cookie', 'set-cookie', 'dpop')
+
+# 値を置き換えるJSONのフィールド
+REDACTED_FIELDS = ('password', 'authFactorToken', 'email')
+
+# 代わりのJWTに置き換えるJSONのフィールド
+TOKEN_FIELDS = ('accessJwt', 'refreshJwt')
+
+# 代わりのJWTに残すクレーム
+TOKEN_CLAIMS = ('scope', 'sub', 'aud', 'iat')
+
+# 代わりのJWTの有効期限（2100-01-01。再生中に更新が発生しないようにする）
+REPLAY_TOKEN_EXP = 4102444800
+
+# 記録しない応答のヘッダー（記録する本文は展開済みのため、圧縮や長さの情報は再生時に合わなくなる）
+DROPPED_RESPONSE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+class CassetteMissError(Exception):
+    """カセットに記録のないリクエストを再生しようとしたことを表す例外クラス"""
+    pass
+
+def replacement_token(token):
+    """JWTを署名のない代わりのJWTに置き換える
+
+    Args:
+        token (str): 元のJWT
+
+    Returns:
+        str: 代わりのJWT（同じ内容のJWTからは同じ文字列になる）
+    """
+    payload = decode_jwt_payload(token) or {}
+    claims = {key: payload[key] for key in TOKEN_CLAIMS if key in payload}
+    claims['exp'] = REPLAY_TOKEN_EXP
+    return '.'.join((
+        _b64url(json.dumps({'alg': 'none', 'typ': 'at+jwt'}).encode('utf-8')),
+        _b64url(json.dumps(claims, sort_keys=True).encode('utf-8')),
+        _b64url(REDACTED.encode('ascii')),
+    ))
+
+def redact_json(value):
+    """JSONの値から認証情報を取り除く（元の値は変更しない）
+
+    Args:
+        value: JSONから読み込んだ値
+
+    Returns:
+        認証情報を置き換えた値
+    """
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            if key in TOKEN_FIELDS and isinstance(item, str):
+                redacted[key] = replacement_token(item)
+            elif key in REDACTED_FIELDS and item is not None:
+                redacted[key] = REDACTED
+            else:
+                redacted[key] = redact_json(item)
+        return redacted
+    if isinstance(value, list):
+        return [redact_json(item) for item in value]
+    return value
+
+def redact_headers(headers, drop=()):
+    """ヘッダーから認証情報を取り除く
+
+    Args:
+        headers (dict): ヘッダー
+        drop (tuple, optional): 記録しないヘッダー（小文字）
+
+    Returns:
+        dict: 名前を小文字にしたヘッダー
+    """
+    redacted = {}
+    for name, value in headers.items():
+        name = name.lower()
+        if name in drop:
+            continue
+        redacted[name] = REDACTED if name in REDACTED_HEADERS else value
+    return redacted
+
+def match_key(method, url, body_digest=None):
+    """リクエストを照合するキーを作成する
+
+    ホスト名は含めない（ログイン後にPDSのURLへ切り替わっても、別のサーバーの記録でも再生できるように）。
+
+    Args:
+        method (str): HTTPメソッド
+        url (str): URL
+        body_digest (str, optional): 本文のハッシュ（本文も照合する場合に指定する）
+
+    Returns:
+        tuple: 照合するキー
+    """
+    parts = urlsplit(url)
+    query = tuple(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return (method.upper(), parts.path, query, body_digest)
+
+class Cassette:
+    """記録したリクエストと応答の組を保持するクラス
+
+    再生時は同じキーのリクエストに記録した順に応答する。記録した回数より多く呼び出された場合は、
+    repeat=Trueなら最後の応答を繰り返し、Falseなら例外を発生させる。
+    """
+
+    def __init__(self, path=None, interactions=None, match_body=False, repeat=True, metadata=None):
+        """初期化
+
+        Args:
+            path (str, optional): 保存先のパス
+            interactions (list, optional): 記録済みのリクエストと応答の組
+            match_body (bool, optional): 本文（認証情報を取り除いたもの）も照合する場合はTrue。
+                投稿の作成日時など、毎回変わる値を含むリクエストがあるため既定では照合しない
+            repeat (bool, optional): 記録した回数を超えた場合に最後の応答を繰り返す場合はTrue
+            metadata (dict, optional): 記録の情報（記録した日時など）
+        """
+        self.path = path
+        self.interactions = list(interactions or [])
+        self.match_body = match_body
+        self.repeat = repeat
+        self.metadata = dict(metadata or {})
+        self._lock = threading.Lock()
+        self._index = None  # キー -> 記録のリスト（再生時に作成）
+        self._positions = defaultdict(int)  # キー -> 次に返す記録の位置
+
+    def __len__(self):
+        return len(self.interactions)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """ファイルからカセットを読み込む
+
+        Args:
+            path (str): カセットのパス
+            **kwargs: Cassetteの初期化の引数
+
+        Returns:
+            Cassette: 読み込んだカセット
+
+        Raises:
+            ValueError: 形式が異なる場合
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"カセットの形式が異なります: {path}")
+        logger.info(f"カセットを読み込みました: {path}（{len(data.get('interactions', []))}件）")
+        return cls(path, data.get('interactions'), metadata=data.get('metadata'), **kwargs)
+
+    def save(self, path=None):
+        """カセットをファイルに保存する（一時ファイルに書き込んでから置き換える）
+
+        Args:
+            path (str, optional): 保存先のパス。省略した場合は初期化時のパス
+
+        Returns:
+            bool: 保存に成功した場合はTrue
+        """
+        path = path or self.path
+        if not path:
+            logger.error("カセットの保存先が指定されていません")
+            return False
+        try:
+            with self._lock:
+                data = {
+                    'version': CASSETTE_VERSION,
+                    'metadata': dict(self.metadata, saved_at=time.strftime('%Y-%m-%dT%H:%M:%S%z')),
+                    'interactions': list(self.interactions),
+                }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, path)
+            logger.info(f"カセットを保存しました: {path}（{len(data['interactions'])}件）")
+            return True
+        except Exception as e:
+            logger.error(f"カセットの保存中にエラーが発生しました: {str(e)}")
+            return False
+
+    def record(self, method, url, request_headers, request_body, status, response_headers, response_body,
+               elapsed_ms):
+        """リクエストと応答の組を記録する（認証情報は取り除く）
+
+        Args:
+            method (str): HTTPメソッド
+            url (str): URL
+            request_headers (dict): リクエストのヘッダー
+            request_body (bytes): リクエストの本文
+            status (int): ステータスコード
+            response_headers (dict): 応答のヘッダー
+            response_body (bytes): 応答の本文（展開済み）
+            elapsed_ms (float): 応答までの時間（ミリ秒）
+
+        Returns:
+            dict: 記録した内容
+        """
+        request_headers = redact_headers(request_headers)
+        response_headers = redact_headers(response_headers, DROPPED_RESPONSE_HEADERS)
+        interaction = {
+            'request': {
+                'method': method.upper(),
+                'url': url,
+                'headers': request_headers,
+                # JSON以外（画像など）は大きいため、照合に使うハッシュと長さだけを残す
+                'body': _encode_body(request_body, request_headers.get('content-type'), keep_binary=False),
+            },
+            'response': {
+                'status': status,
+                'headers': response_headers,
+                'body': _encode_body(response_body, response_headers.get('content-type')),
+            },
+            'elapsed_ms': round(elapsed_ms, 3),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self._index = None
+        return interaction
+
+    def find(self, method, url, body=None):
+        """リクエストに対応する記録を探す
+
+        Args:
+            method (str): HTTPメソッド
+            url (str): URL
+            body (bytes, optional): リクエストの本文（match_body=Trueの場合に照合する）
+
+        Returns:
+            dict: 記録（'request', 'response', 'elapsed_ms'）
+
+        Raises:
+            CassetteMissError: 対応する記録がない場合
+        """
+        key = match_key(method, url, _body_digest(_redact_body(body)) if self.match_body else None)
+        with self._lock:
+            if self._index is None:
+                self._build_index()
+            candidates = self._index.get(key)
+            if not candidates:
+                raise CassetteMissError(f"カセットに記録がありません: {method} {url}")
+            position = self._positions[key]
+            if position >= len(candidates):
+                if not self.repeat:
+                    raise CassetteMissError(f"カセットの記録を使い切りました: {method} {url}（{len(candidates)}回）")
+                position = len(candidates) - 1
+            self._positions[key] = position + 1
+            return candidates[position]
+
+    def rewind(self):
+        """再生の位置を最初に戻す"""
+        with self._lock:
+            self._positions.clear()
+
+    def _build_index(self):
+        """照合用の索引を作成する（ロックを取得して呼び出す）"""
+        self._index = defaultdict(list)
+        for interaction in self.interactions:
+            request = interaction['request']
+            digest = _stored_digest(request.get('body')) if self.match_body else None
+            self._index[match_key(request['method'], request['url'], digest)].append(interaction)
+
+def decode_response_body(interaction):
+    """記録した応答の本文をバイト列に戻す
+
+    Args:
+        interaction (dict): 記録
+
+    Returns:
+        bytes: 応答の本文
+    """
+    return _decode_body(interaction['response'].get('body'))
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _load_json(data, content_type):
+    """本文がJSONの場合は読み込む
+
+    Returns:
+        tuple: (読み込んだ値, JSONだった場合はTrue)
+    """
+    if content_type and 'json' not in content_type.lower():
+        return None, False
+    try:
+        return json.loads(data), True
+    except ValueError:
+        return None, False
+
+def _encode_body(data, content_type, keep_binary=True):
+    """本文をカセットに保存できる形式にする
+
+    Args:
+        data (bytes): 本文
+        content_type (str): Content-Type
+        keep_binary (bool, optional): JSON以外の本文も保存する場合はTrue（Falseの場合はハッシュと長さだけ）
+
+    Returns:
+        dict: {'json'}・{'text'}・{'base64'}・{'sha256', 'size'}のいずれか。本文がない場合はNone
+    """
+    if not data:
+        return None
+    value, is_json = _load_json(data, content_type)
+    if is_json:
+        return {'json': redact_json(value)}
+    if not keep_binary:
+        return {'sha256': hashlib.sha256(data).hexdigest(), 'size': len(data)}
+    if content_type and content_type.lower().startswith('text/'):
+        try:
+            return {'text': data.decode('utf-8')}
+        except UnicodeDecodeError:
+            pass
+    return {'base64': base64.b64encode(data).decode('ascii')}
+
+def _decode_body(body):
+    """カセットに保存した本文をバイト列に戻す（ハッシュだけの場合はNone）"""
+    if not body:
+        return b''
+    if 'json' in body:
+        return json.dumps(body['json'], ensure_ascii=False).encode('utf-8')
+    if 'text' in body:
+        return body['text'].encode('utf-8')
+    if 'base64' in body:
+        return base64.b64decode(body['base64'])
+    return None
+
+def _redact_body(body):
+    """照合する前に、記録と同じように本文から認証情報を取り除く"""
+    if not body:
+        return b''
+    value, is_json = _load_json(body, None)
+    if is_json:
+        return json.dumps(redact_json(value), ensure_ascii=False).encode('utf-8')
+    return body
+
+def _stored_digest(body):
+    """カセットに保存した本文のハッシュ（ハッシュだけを保存した本文はその値）"""
+    if body and 'sha256' in body:
+        return body['sha256']
+    return _body_digest(_decode_body(body))
+
+def _body_digest(body):
+    """本文のハッシュ（JSONはキーの順序によらない）"""
+    if not body:
+        return None
+    value, is_json = _load_json(body, None)
+    if is_json:
+        body = json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+カセットの記録・再生を行うHTTPのトランスポート
+
+atprotoのクライアントが使うhttpxのトランスポートを差し替えて、通信をcore.cassette.Cassetteに記録する、
+またはカセットから応答する。BlueskyClient(transport=...)か、環境変数で指定する:
+    SSKY_CASSETTE_RECORD=session.json    通信を記録し、終了時に保存する
+    SSKY_CASSETTE_REPLAY=session.json    記録から応答する（ネットワークに接続しない）
+    SSKY_CASSETTE_REALTIME=1             再生時に記録した応答時間だけ待つ
+"""
+
+import os
+import time
+import atexit
+import logging
+
+import httpx
+
+from core.cassette import Cassette, CASSETTE_RECORD_ENV, CASSETTE_REPLAY_ENV, decode_response_body
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 再生時に記録した応答時間だけ待つ環境変数
+CASSETTE_REALTIME_ENV = 'SSKY_CASSETTE_REALTIME'
+
+class RecordingTransport(httpx.BaseTransport):
+    """通信をそのまま行い、リクエストと応答をカセットに記録するトランスポート"""
+
+    def __init__(self, cassette, transport=None, autosave=True):
+        """初期化
+
+        Args:
+            cassette (Cassette): 記録先のカセット
+            transport (httpx.BaseTransport, optional): 実際に通信するトランスポート
+            autosave (bool, optional): 閉じるときにカセットを保存する場合はTrue
+        """
+        self.cassette = cassette
+        self._transport = transport or httpx.HTTPTransport()
+        self.autosave = autosave
+
+    def handle_request(self, request):
+        """リクエストを送信し、応答を記録する"""
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        # 本文を読み込むまでを応答時間とする（読み込んだ本文はhttpxの応答に保持される）
+        response.read()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.cassette.record(
+            request.method, str(request.url), dict(request.headers), request.content,
+            response.status_code, dict(response.headers), response.content, elapsed_ms
+        )
+        return response
+
+    def close(self):
+        """通信を終了し、カセットを保存する"""
+        self._transport.close()
+        if self.autosave:
+            self.cassette.save()
+
+class ReplayTransport(httpx.BaseTransport):
+    """カセットに記録した応答を返すトランスポート（ネットワークに接続しない）"""
+
+    def __init__(self, cassette, realtime=False, speed=1.0):
+        """初期化
+
+        Args:
+            cassette (Cassette): 再生するカセット
+            realtime (bool, optional): 記録した応答時間だけ待つ場合はTrue（Falseの場合は待たない）
+            speed (float, optional): realtime=Trueのときの再生速度（2.0なら半分の時間で応答する）
+        """
+        self.cassette = cassette
+        self.realtime = realtime
+        self.speed = speed
+
+    def handle_request(self, request):
+        """記録から応答を作成する
+
+        Raises:
+            core.cassette.CassetteMissError: 対応する記録がない場合
+        """
+        interaction = self.cassette.find(request.method, str(request.url), request.read())
+        if self.realtime and interaction.get('elapsed_ms'):
+            time.sleep(interaction['elapsed_ms'] / 1000 / self.speed)
+        recorded = interaction['response']
+        return httpx.Response(
+            recorded['status'],
+            headers=recorded.get('headers') or {},
+            content=decode_response_body(interaction),
+            request=request,
+        )
+
+def transport_from_env():
+    """環境変数で指定されたカセットのトランスポートを作成する
+
+    Returns:
+        httpx.BaseTransport: トランスポート。環境変数が指定されていない場合はNone
+    """
+    record_path = os.environ.get(CASSETTE_RECORD_ENV)
+    replay_path = os.environ.get(CASSETTE_REPLAY_ENV)
+    if replay_path:
+        if record_path:
+            logger.warning(f"{CASSETTE_RECORD_ENV}と{CASSETTE_REPLAY_ENV}の両方が指定されたため、再生します")
+        realtime = os.environ.get(CASSETTE_REALTIME_ENV, '') not in ('', '0', 'false')
+        logger.info(f"カセットから再生します: {replay_path}（応答時間の再現: {realtime}）")
+        return ReplayTransport(Cassette.load(replay_path), realtime=realtime)
+    if record_path:
+        logger.info(f"通信をカセットに記録します: {record_path}")
+        cassette = Cassette(record_path, metadata={'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')})
+        # atprotoのクライアントは通信を明示的に閉じないため、終了時に保存する
+        atexit.register(cassette.save)
+        return RecordingTransport(cassette, autosave=False)
+    return None
@@ -6,11 +6,26 @@ SSky - Blueskyクライアント
 Blueskyクライアントラッパーモジュール
 """
 
+import os
+import time
 import logging
+import threading
 import mimetypes
-from atproto import Client as AtprotoClient, SessionEvent, Session
-from atproto.exceptions import AtProtocolError
-from atproto import models
+from atproto_core.exceptions import AtProtocolError
+from utils.lazy_import import lazy_import
+from core.startup_timer import StartupTimer
+from core.metrics import instrument_methods
+from core.cassette import CASSETTE_RECORD_ENV, CASSETTE_REPLAY_ENV
+from core.auth import atproto_session
+from core.auth.session_persistence import SessionPersistence
+from core.auth.session_token import (
+    SESSION_VALID, SESSION_EXPIRED, parse_session_string, encode_session, check_session, token_expires_at
+)
+
+# atprotoのクライアントとモデルは読み込みに時間がかかるため、最初に使うときに読み込む
+# （atprotoパッケージ全体ではなく、必要なatproto_clientだけを読み込む）
+AtprotoClient = lazy_import('atproto_client', 'Client')
+models = lazy_import('atproto_client', 'models')
 
 # 認証エラー用の例外クラス
 class AuthenticationError(Exception):
@@ -20,43 +35,103 @@ class AuthenticationError(Exception):
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+# 投稿から参照されていないブロブはサーバー側で数分後に削除されるため、短い期間だけ再利用する
+BLOB_CACHE_UNREFERENCED_TTL = 5 * 60
+
+# 投稿から参照されたブロブは投稿が残る限り保持されるため、長めに再利用する
+BLOB_CACHE_REFERENCED_TTL = 7 * 24 * 60 * 60
+
+# 接続先のサーバーを変更する環境変数（ローカルの検証用サーバーなど）
+XRPC_URL_ENV = 'SSKY_XRPC_URL'
+
+# 計測しないメソッド（通信を伴わないもの）
+UNINSTRUMENTED_METHODS = (
+    'handle_api_error', 'access_token_expires_at', 'export_session_string', 'mark_blobs_referenced', 'forget_blobs'
+)
+
+@instrument_methods(exclude=UNINSTRUMENTED_METHODS)
 class BlueskyClient:
     """Blueskyクライアントラッパークラス"""
     
-    def __init__(self):
-        """初期化"""
-        self.client = AtprotoClient()
+    def __init__(self, base_url=None, data_store=None, transport=None):
+        """初期化
+        
+        Args:
+            base_url (str, optional): 接続先のサーバー（PDS）のURL。省略した場合は環境変数SSKY_XRPC_URL、
+                それもない場合はatprotoの既定（https://bsky.social）。ローカルの検証用サーバーに接続する場合などに指定する
+            data_store (DataStore, optional): キャッシュに使うデータストア。省略した場合は既定のデータベース
+            transport (httpx.BaseTransport, optional): 通信に使うトランスポート（core.cassette_transportの
+                記録・再生など）。省略した場合は環境変数SSKY_CASSETTE_RECORD・SSKY_CASSETTE_REPLAYの指定に従う
+        """
+        self._client = None  # atprotoのクライアント（clientプロパティで最初に使うときに作成）
+        self.base_url = base_url or os.environ.get(XRPC_URL_ENV) or None
+        self.transport = transport
         self.profile = None
         self.is_logged_in = False
         self.user_did = None  # ログインユーザーのDIDを保持
         
         # データストアの初期化
-        from core.data_store import DataStore
-        self.data_store = DataStore()
+        if data_store is None:
+            from core.data_store import DataStore
+            data_store = DataStore()
+        self.data_store = data_store
+        
+    @property
+    def client(self):
+        """atprotoのクライアント（最初に使うときに作成する）"""
+        if self._client is None:
+            with StartupTimer().phase('atproto_client'):
+                self._client = self._create_client()
+        return self._client
+        
+    @client.setter
+    def client(self, value):
+        """atprotoのクライアントを設定する（テストなど）"""
+        self._client = value
+        
+    def _create_client(self):
+        """atprotoのクライアントを作成し、セッション変更イベントのコールバックを登録
+        
+        Returns:
+            Client: atprotoのクライアント
+        """
+        from atproto_client.client.session import SessionEvent
+        
+        # カセットの記録・再生が指定された場合は、通信のトランスポートを差し替える
+        if self.transport is None and (os.environ.get(CASSETTE_RECORD_ENV) or os.environ.get(CASSETTE_REPLAY_ENV)):
+            from core.cassette_transport import transport_from_env
+            self.transport = transport_from_env()
+        
+        if self.transport is not None:
+            from atproto_client.request import Request
+            client = AtprotoClient(self.base_url, request=Request(transport=self.transport))
+            logger.info(f"通信のトランスポートを変更しました: {type(self.transport).__name__}")
+        else:
+            client = AtprotoClient(self.base_url)
+        if self.base_url:
+            logger.info(f"接続先のサーバーを変更しました: {self.base_url}")
         
         # セッション変更イベントのコールバックを登録（デコレータ構文）
         logger.info("セッション変更イベントのコールバックを登録します（デコレータ構文）")
-        logger.debug(f"クライアントオブジェクト: {type(self.client)}")
+        logger.debug("クライアントオブジェクト: %s", type(client))
         
-        @self.client.on_session_change
-        def handle_session_change(event: SessionEvent, session: Session):
+        @client.on_session_change
+        def handle_session_change(event, session):
             try:
                 # イベントの種類をログに記録
-                logger.info(f"セッション変更イベントが発生しました: {event}")
-                logger.debug(f"セッションオブジェクト: 型={type(session)}")
-                logger.debug(f"セッションオブジェクトの内容: {session}")  # デバッグ目的で内容も出力
+                # （セッションの内容はトークンを含むため出力しない）
+                logger.info("セッション変更イベントが発生しました: %s", event)
+                logger.debug("セッションオブジェクト: 型=%s", type(session))
                 
                 # REFRESH イベントの場合のみ、セッション情報を保存
                 if event == SessionEvent.REFRESH:
                     # セッション情報をエクスポート
-                    session_string = self.client.export_session_string()
+                    session_string = client.export_session_string()
                     
                     if session_string:
-                        # セッション情報を保存
-                        from core.auth.auth_manager import AuthManager
-                        auth_manager = AuthManager()
-                        auth_manager.save_session(self.user_did, session_string)
-                        logger.info(f"セッション変更イベント({event})によりセッション情報を保存しました: {self.user_did}")
+                        # セッション情報の保存を要求（同じセッションの重複は除き、暗号化と書き込みはバックグラウンドで行う）
+                        if SessionPersistence().submit(self.user_did, session_string):
+                            logger.info("セッション変更イベント(%s)によりセッション情報の保存を要求しました: %s", event, self.user_did)
                     else:
                         if not session_string:
                             logger.error("セッション情報のエクスポートに失敗しました")
@@ -69,6 +144,43 @@ class BlueskyClient:
         self._session_change_handler = handle_session_change
         
         logger.info("セッション変更イベントのコールバックを登録しました（デコレータ構文）")
+        return client
+        
+    def access_token_expires_at(self):
+        """現在のアクセストークンの有効期限を取得する
+        
+        Returns:
+            float: 有効期限（UNIX時刻）。ログインしていない場合や読み取れない場合はNone
+        """
+        session = atproto_session.current_session(self._client) if self.is_logged_in else None
+        if session is None or not session.access_jwt:
+            return None
+        return token_expires_at(session.access_jwt)
+        
+    def refresh_session(self, ahead=0):
+        """アクセストークンの有効期限が近い場合はリフレッシュトークンで更新する
+        
+        atprotoのクライアントの更新用ロックを取得して行うため、同時に送られたリクエストは
+        重複して更新せずに、この更新が終わるのを待つ。
+        
+        Args:
+            ahead (int, optional): 有効期限のこの秒数前から更新する
+            
+        Returns:
+            bool: 更新した場合はTrue（ロックの取得中に他のスレッドが更新した場合はFalse）
+            
+        Raises:
+            AtProtocolError: 更新に失敗した場合
+        """
+        client = self._client
+        if not self.is_logged_in or client is None:
+            return False
+            
+        def should_refresh():
+            expires_at = self.access_token_expires_at()
+            return expires_at is None or expires_at - ahead <= time.time()
+            
+        return atproto_session.refresh_session(client, should_refresh)
         
     def handle_api_error(self, error, operation_name="API操作"):
         """API呼び出し時のエラーを処理
@@ -110,8 +222,8 @@ class BlueskyClient:
             # セッション情報をエクスポート
             session_string = self.client.export_session_string()
             logger.info("セッション情報をエクスポートしました")
-            logger.debug(f"エクスポートしたセッション情報: 型={type(session_string)}, 長さ={len(session_string) if session_string else 'None'}")
-            logger.debug(f"セッション文字列の内容: {session_string}")  # デバッグ目的で内容も出力
+            logger.debug("エクスポートしたセッション情報: 型=%s, 長さ=%s",
+                         type(session_string), len(session_string) if session_string else 'None')
             return session_string
         except Exception as e:
             logger.error(f"セッション情報のエクスポートに失敗しました: {str(e)}", exc_info=True)
@@ -120,46 +232,64 @@ class BlueskyClient:
     def login_with_session(self, session_string):
         """セッション情報を使用してログイン
         
+        保存されたアクセストークンの有効期限をローカルで確認し、有効な場合は通信せずにセッションを再利用する
+        （プロフィールはバックグラウンドで取得する）。期限切れの場合のみリフレッシュトークンで更新し、
+        リフレッシュトークンも期限切れの場合は通信せずに失敗とする。
+        
         Args:
             session_string (str): セッション情報の文字列
             
         Returns:
-            object: プロフィール情報。ログイン失敗時は例外が発生
+            object: プロフィール情報（通信せずに再利用した場合は、プロフィールを取得するまでDIDとハンドルだけのもの）。
+                ログイン失敗時は例外が発生
             
         Raises:
             AuthenticationError: セッションが無効な場合
             Exception: その他のエラー
         """
         try:
-            logger.debug(f"セッション情報を使用してログイン試行: 型={type(session_string)}")
+            logger.debug("セッション情報を使用してログイン試行: 型=%s", type(session_string))
+            session = parse_session_string(session_string)
+            status = check_session(session) if session else None
             
-            # セッション情報をそのまま使用（バイト列への変換なし）
-            # atprotoライブラリが文字列を直接処理できるか試す
-            try:
-                # まず文字列のままで試す
-                logger.debug("文字列のままでログイン試行")
-                self.profile = self.client.login(session_string=session_string)
-            except Exception as e:
-                logger.debug(f"文字列でのログインに失敗: {str(e)}")
+            if status == SESSION_EXPIRED:
+                raise AuthenticationError("保存されたセッションの有効期限が切れています")
                 
-                # 文字列での試行が失敗した場合、バイト列に変換して再試行
-                if isinstance(session_string, str):
-                    logger.debug("セッション情報を文字列からバイト列に変換して再試行")
-                    session_bytes = session_string.encode('utf-8')
-                    self.profile = self.client.login(session_string=session_bytes)
-                else:
-                    # 既にバイト列の場合はそのまま使用
-                    logger.debug("セッション情報はバイト列なのでそのまま使用")
-                    self.profile = self.client.login(session_string=session_string)
+            client = self.client
+            
+            with StartupTimer().phase('session_login'):
+                if status == SESSION_VALID:
+                    # アクセストークンが有効なため、通信せずにセッションを読み込む
+                    logger.debug("アクセストークンが有効なため、保存されたセッションを再利用")
+                    self.profile = atproto_session.import_session(
+                        client, encode_session(session), session['did'], session['handle']
+                    )
+                    if self.profile is None:
+                        # atprotoのクライアントが対応していない場合は、通信して読み込む
+                        status = None
+                        
+                if status != SESSION_VALID:
+                    # アクセストークンの更新が必要（または有効期限が読み取れない）場合は、
+                    # プロフィールの取得時にatprotoのクライアントがリフレッシュトークンで更新する
+                    if session:
+                        # 更新されたセッションを保存するときに使うため、先にDIDを設定する
+                        self.user_did = session['did']
+                        # バイト列で保存されていた場合も、通信して再試行せずに文字列に戻す
+                        session_string = encode_session(session)
+                    logger.debug("サーバーに問い合わせてセッションを確認: 状態=%s", status)
+                    self.profile = client.login(session_string=session_string)
             
             # ユーザーDIDを保存
             self.user_did = self.client.me.did
-            logger.debug(f"ユーザーDID: {self.user_did}")
+            logger.debug("ユーザーDID: %s", self.user_did)
             
             # ログイン状態を更新
             self.is_logged_in = True
             
-            logger.info(f"セッションを使用したログインに成功しました: {self.profile.handle}")
+            if status == SESSION_VALID:
+                self._load_profile_async()
+            
+            logger.info("セッションを使用したログインに成功しました: %s", self.profile.handle)
             return self.profile
                 
         except Exception as e:
@@ -167,6 +297,30 @@ class BlueskyClient:
             self.is_logged_in = False
             self.profile = None
             raise AuthenticationError("セッションが無効になりました。再ログインが必要です。") from e
+            
+    def _load_profile_async(self):
+        """ログインユーザーのプロフィールをバックグラウンドで取得する（セッションを通信せずに再利用した場合）
+        
+        Returns:
+            threading.Thread: 起動したスレッド
+        """
+        user_did = self.user_did
+        
+        def _worker():
+            try:
+                profile = self.client.get_profile(actor=user_did)
+                # 取得中にログアウト・別のアカウントでログインした場合は反映しない
+                if self.is_logged_in and self.user_did == user_did:
+                    self.profile = profile
+                    self.client.me = profile
+                    logger.debug("プロフィールを取得しました: %s", profile.handle)
+            except Exception as e:
+                self.handle_api_error(e, "プロフィールの取得")
+                
+        thread = threading.Thread(target=_worker, name="ProfileLoader")
+        thread.daemon = True
+        thread.start()
+        return thread
     
     def login(self, username, password):
         """Blueskyにログイン
@@ -183,16 +337,16 @@ class BlueskyClient:
             Exception: その他のエラー
         """
         try:
-            logger.debug(f"ログイン試行: ユーザー名={username}")
+            logger.debug("ログイン試行: ユーザー名=%s", username)
             
             # ログイン試行
             self.profile = self.client.login(username, password)
             
-            logger.debug(f"ログイン成功: プロフィール={self.profile.display_name}, セッション={type(self.client._session)}")
+            logger.debug("ログイン成功: プロフィール=%s, セッション=%s", self.profile.display_name, type(self.client._session))
             
             # ユーザーDIDを保存
             self.user_did = self.client.me.did
-            logger.debug(f"ユーザーDID: {self.user_did}")
+            logger.debug("ユーザーDID: %s", self.user_did)
             
             # ログイン状態を更新
             self.is_logged_in = True
@@ -200,10 +354,8 @@ class BlueskyClient:
             # ログイン成功後にセッション情報を保存
             session_string = self.export_session_string()
             if session_string and self.user_did:
-                from core.auth.auth_manager import AuthManager
-                auth_manager = AuthManager()
-                auth_manager.save_session(self.user_did, session_string)
-                logger.info(f"ログイン成功時にセッション情報を保存しました: {self.user_did}")
+                SessionPersistence().submit(self.user_did, session_string)
+                logger.info("ログイン成功時にセッション情報の保存を要求しました: %s", self.user_did)
             
             return self.profile
             
@@ -224,8 +376,8 @@ class BlueskyClient:
             bool: 成功した場合はTrue
         """
         try:
-            # クライアントをリセット
-            self.client = AtprotoClient()
+            # クライアントをリセット（次に使うときに作り直す）
+            self.client = None
             self.profile = None
             self.is_logged_in = False
             
@@ -258,7 +410,7 @@ class BlueskyClient:
             logger.info("タイムラインを取得しています...")
             timeline_data = self.client.get_timeline(limit=limit)
             
-            logger.info(f"タイムラインを取得しました: {len(timeline_data.feed)}件")
+            logger.info("タイムラインを取得しました: %d件", len(timeline_data.feed))
             return timeline_data
             
         except AtProtocolError as e:
@@ -273,12 +425,47 @@ class BlueskyClient:
             logger.error(f"タイムライン取得中に例外が発生しました: {str(e)}", exc_info=True)
             raise
             
+    def get_post_thread(self, uri, depth=6, parent_height=0):
+        """投稿のスレッドを取得
+        
+        Args:
+            uri (str): 起点となる投稿のURI
+            depth (int, optional): 取得する返信の深さ
+            parent_height (int, optional): 取得する親投稿の高さ
+            
+        Returns:
+            object: スレッド（ThreadViewPost、NotFoundPost、BlockedPostのいずれか）。取得失敗時は例外が発生
+            
+        Raises:
+            AuthenticationError: 認証エラーの場合
+            AtProtocolError: API呼び出し失敗時
+            Exception: その他のエラー
+        """
+        if not self.is_logged_in:
+            logger.error("スレッドの取得に失敗しました: ログインしていません")
+            raise Exception("スレッドの取得にはログインが必要です")
+            
+        try:
+            logger.info("スレッドを取得しています: %s (depth=%d)", uri, depth)
+            response = self.client.get_post_thread(uri, depth=depth, parent_height=parent_height)
+            return response.thread
+            
+        except AtProtocolError as e:
+            # 認証エラーかどうかを確認
+            if self.handle_api_error(e, "スレッド取得"):
+                raise AuthenticationError("セッションが無効になりました。再ログインが必要です。") from e
+            raise
+            
+        except Exception as e:
+            logger.error(f"スレッド取得中に例外が発生しました: {str(e)}", exc_info=True)
+            raise
+            
     def send_post(self, text, images=None):
         """投稿を送信
         
         Args:
             text (str): 投稿内容
-            images (list, optional): 画像ブロブのリスト
+            images (list, optional): upload_blobの結果（またはBlobRef）のリスト
             
         Returns:
             object: 投稿結果。投稿失敗時は例外が発生
@@ -296,7 +483,13 @@ class BlueskyClient:
             
             # 画像付き投稿
             if images:
-                result = self.client.send_post(text=text, images=images)
+                embed = models.AppBskyEmbedImages.Main(
+                    images=[
+                        models.AppBskyEmbedImages.Image(alt='', image=getattr(blob, 'blob', blob))
+                        for blob in images
+                    ]
+                )
+                result = self.client.send_post(text=text, embed=embed)
             else:
                 # テキストのみ投稿
                 result = self.client.send_post(text=text)
@@ -333,8 +526,8 @@ class BlueskyClient:
         try:
             logger.info(f"ファイルをアップロードしています: {mime_type}")
             
-            # ファイルをアップロード
-            blob = self.client.upload_blob(file_data, mime_type)
+            # ファイルをアップロード（MIMEタイプはサーバー側で判定される）
+            blob = self.client.upload_blob(file_data)
             
             logger.info("ファイルのアップロードが完了しました")
             return blob
@@ -347,6 +540,61 @@ class BlueskyClient:
             logger.error(f"ファイルアップロード中に例外が発生しました: {str(e)}", exc_info=True)
             raise
             
+    def upload_images(self, prepared_images, use_cache=True):
+        """画像をアップロードし、アップロード済みのものはブロブを再利用する
+        
+        Args:
+            prepared_images (list): (画像データ, MIMEタイプ, 画像データのSHA-256)のタプルのリスト
+            use_cache (bool, optional): ブロブキャッシュを使用するかどうか
+            
+        Returns:
+            tuple: (ブロブのリスト, キャッシュから再利用したかどうか)
+            
+        Raises:
+            AtProtocolError: API呼び出し失敗時
+            Exception: その他のエラー
+        """
+        from atproto_client.models.blob_ref import BlobRef, IpldLink
+        
+        blobs = []
+        reused = False
+        for file_data, mime_type, sha256 in prepared_images:
+            cached = self.data_store.load_blob_cache(self.user_did, sha256) if use_cache else None
+            if cached:
+                logger.info(f"アップロード済みのブロブを再利用します: {cached['cid']}")
+                blobs.append(BlobRef(mime_type=cached['mime_type'], size=cached['size'],
+                                     ref=IpldLink(link=cached['cid'])))
+                reused = True
+                continue
+            
+            blob = self.upload_blob(file_data, mime_type).blob
+            blob_json = blob.to_json_representation()
+            self.data_store.save_blob_cache(
+                self.user_did, sha256, blob_json.ref.link, blob.mime_type, blob.size,
+                BLOB_CACHE_UNREFERENCED_TTL
+            )
+            blobs.append(blob)
+        
+        return blobs, reused
+        
+    def mark_blobs_referenced(self, sha256_list):
+        """投稿で参照されたブロブのキャッシュ期限を延長
+        
+        Args:
+            sha256_list (list): アップロードした画像データのSHA-256のリスト
+        """
+        if sha256_list:
+            self.data_store.extend_blob_cache(self.user_did, sha256_list, BLOB_CACHE_REFERENCED_TTL)
+            
+    def forget_blobs(self, sha256_list):
+        """ブロブのキャッシュを破棄（サーバー側で削除されていた場合など）
+        
+        Args:
+            sha256_list (list): アップロードした画像データのSHA-256のリスト
+        """
+        if sha256_list:
+            self.data_store.delete_blob_cache(self.user_did, sha256_list)
+            
     def like(self, uri, cid):
         """投稿にいいねする
         
@@ -439,36 +687,7 @@ class BlueskyClient:
             
             # 返信を送信
             # Bluesky APIでは、reply.parentとreply.rootが必要
-            reply_params = {
-                'parent': {
-                    'uri': reply_to['uri'],
-                    'cid': reply_to['cid']
-                }
-            }
-            
-            # ルート投稿の情報を設定
-            # 返信先の投稿がすでに返信である場合（スレッド内の返信）
-            if 'reply_root' in reply_to and reply_to['reply_root']:
-                # 元の投稿のルートを使用
-                reply_params['root'] = {
-                    'uri': reply_to['reply_root']['uri'],
-                    'cid': reply_to['reply_root']['cid']
-                }
-                logger.debug(f"スレッド内の返信: root={reply_params['root']['uri']}")
-            elif 'reply_parent' in reply_to and reply_to['reply_parent']:
-                # 返信先が返信で、ルートが設定されていない場合は親の親をルートとして使用
-                reply_params['root'] = {
-                    'uri': reply_to['reply_parent']['uri'],
-                    'cid': reply_to['reply_parent']['cid']
-                }
-                logger.debug(f"親の親をルートとして使用: root={reply_params['root']['uri']}")
-            else:
-                # 返信先自体がルート（スレッドの最初の投稿への返信）
-                reply_params['root'] = {
-                    'uri': reply_to['uri'],
-                    'cid': reply_to['cid']
-                }
-                logger.debug(f"スレッドの最初の投稿への返信: root={reply_params['root']['uri']}")
+            reply_params = self._build_reply_params(reply_to)
             
             result = self.client.send_post(
                 text=text,
@@ -486,6 +705,176 @@ class BlueskyClient:
             logger.error(f"返信中に例外が発生しました: {str(e)}", exc_info=True)
             raise
             
+    def _build_reply_params(self, reply_to):
+        """返信先情報からreply.parentとreply.rootを組み立てる
+        
+        Args:
+            reply_to (dict): 返信先情報 {'uri': uri, 'cid': cid, 'reply_parent': {...}, 'reply_root': {...}}
+            
+        Returns:
+            dict: {'parent': {'uri', 'cid'}, 'root': {'uri', 'cid'}}
+        """
+        reply_params = {
+            'parent': {
+                'uri': reply_to['uri'],
+                'cid': reply_to['cid']
+            }
+        }
+        
+        # ルート投稿の情報を設定
+        # 返信先の投稿がすでに返信である場合（スレッド内の返信）
+        if 'reply_root' in reply_to and reply_to['reply_root']:
+            # 元の投稿のルートを使用
+            reply_params['root'] = {
+                'uri': reply_to['reply_root']['uri'],
+                'cid': reply_to['reply_root']['cid']
+            }
+            logger.debug(f"スレッド内の返信: root={reply_params['root']['uri']}")
+        elif 'reply_parent' in reply_to and reply_to['reply_parent']:
+            # 返信先が返信で、ルートが設定されていない場合は親の親をルートとして使用
+            reply_params['root'] = {
+                'uri': reply_to['reply_parent']['uri'],
+                'cid': reply_to['reply_parent']['cid']
+            }
+            logger.debug(f"親の親をルートとして使用: root={reply_params['root']['uri']}")
+        else:
+            # 返信先自体がルート（スレッドの最初の投稿への返信）
+            reply_params['root'] = {
+                'uri': reply_to['uri'],
+                'cid': reply_to['cid']
+            }
+            logger.debug(f"スレッドの最初の投稿への返信: root={reply_params['root']['uri']}")
+        
+        return reply_params
+        
+    def create_post(self, text, rkey, created_at, images=None, reply_to=None):
+        """レコードキーを指定して投稿を作成
+        
+        同じrkeyで再送しても投稿が重複しないため、送信待ちキューからの送信に使用する。
+        
+        Args:
+            text (str): 投稿内容
+            rkey (str): 作成するレコードのキー（TID）
+            created_at (str): 投稿の作成日時（ISO形式）
+            images (list, optional): 画像のBlobRefのリスト
+            reply_to (dict, optional): 返信先情報（reply_to_postと同じ形式）
+            
+        Returns:
+            object: 作成結果（uri、cidを持つ）。失敗時は例外が発生
+            
+        Raises:
+            AtProtocolError: API呼び出し失敗時
+            Exception: その他のエラー
+        """
+        if not self.is_logged_in:
+            logger.error("投稿に失敗しました: ログインしていません")
+            raise Exception("投稿にはログインが必要です")
+            
+        try:
+            logger.info(f"投稿を送信しています: rkey={rkey}")
+            from atproto_client.models.languages import DEFAULT_LANGUAGE_CODE1
+            
+            embed = None
+            if images:
+                embed = models.AppBskyEmbedImages.Main(
+                    images=[models.AppBskyEmbedImages.Image(alt='', image=blob) for blob in images]
+                )
+            
+            reply_ref = None
+            if reply_to:
+                reply_params = self._build_reply_params(reply_to)
+                reply_ref = models.AppBskyFeedPost.ReplyRef(
+                    parent=models.ComAtprotoRepoStrongRef.Main(**reply_params['parent']),
+                    root=models.ComAtprotoRepoStrongRef.Main(**reply_params['root'])
+                )
+            
+            record = models.AppBskyFeedPost.Record(
+                created_at=created_at,
+                text=text,
+                reply=reply_ref,
+                embed=embed,
+                langs=[DEFAULT_LANGUAGE_CODE1]
+            )
+            result = self.client.app.bsky.feed.post.create(self.user_did, record, rkey=rkey)
+            
+            logger.info("投稿が完了しました")
+            return result
+            
+        except AtProtocolError as e:
+            logger.error(f"投稿時にBluesky APIエラー: {str(e)}")
+            raise
+            
+        except Exception as e:
+            logger.error(f"投稿中に例外が発生しました: {str(e)}", exc_info=True)
+            raise
+            
+    def create_like(self, uri, cid, rkey, created_at):
+        """レコードキーを指定していいねを作成
+        
+        Args:
+            uri (str): 投稿のURI
+            cid (str): 投稿のCID
+            rkey (str): 作成するレコードのキー（TID）
+            created_at (str): 作成日時（ISO形式）
+            
+        Returns:
+            object: 作成結果（uri、cidを持つ）。失敗時は例外が発生
+            
+        Raises:
+            AtProtocolError: API呼び出し失敗時
+            Exception: その他のエラー
+        """
+        if not self.is_logged_in:
+            logger.error("いいねに失敗しました: ログインしていません")
+            raise Exception("いいねにはログインが必要です")
+            
+        try:
+            logger.info(f"投稿にいいねしています: {uri}")
+            
+            record = models.AppBskyFeedLike.Record(
+                created_at=created_at,
+                subject=models.ComAtprotoRepoStrongRef.Main(uri=uri, cid=cid)
+            )
+            result = self.client.app.bsky.feed.like.create(self.user_did, record, rkey=rkey)
+            
+            logger.info("いいねが完了しました")
+            return result
+            
+        except AtProtocolError as e:
+            logger.error(f"いいね時にBluesky APIエラー: {str(e)}")
+            raise
+            
+        except Exception as e:
+            logger.error(f"いいね中に例外が発生しました: {str(e)}", exc_info=True)
+            raise
+            
+    def get_own_record(self, collection, rkey):
+        """自分のリポジトリからレコードを取得
+        
+        送信待ちキューの再送時に、前回の送信が実際には成功していたかを確認するために使用する。
+        
+        Args:
+            collection (str): コレクション名（例: app.bsky.feed.post）
+            rkey (str): レコードのキー
+            
+        Returns:
+            object: レコード（uri、cidを持つ）。存在しない場合はNone
+            
+        Raises:
+            AtProtocolError: API呼び出し失敗時（レコードが存在しない場合を除く）
+        """
+        from atproto_client.exceptions import BadRequestError
+        
+        try:
+            return self.client.com.atproto.repo.get_record(
+                {'repo': self.user_did, 'collection': collection, 'rkey': rkey}
+            )
+        except BadRequestError as e:
+            content = getattr(e.response, 'content', None)
+            if getattr(content, 'error', None) == 'RecordNotFound':
+                return None
+            raise
+            
     def quote_post(self, text, quote_of):
         """投稿を引用
         
@@ -7,15 +7,96 @@ SSky - Blueskyクライアント
 """
 
 import os
+import json
+import time
 import sqlite3
 import logging
-from datetime import datetime
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils.compression import compress, decompress, train_dictionary
+from core.startup_timer import StartupTimer
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+# 接続ごとに設定するPRAGMA
+# WALモードでは書き込み中も読み込みがブロックされない。synchronous=NORMALは
+# WALモードでは電源断時に直近のコミットを失う可能性があるだけで、破損はしない
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-8000",  # 約8MB
+    "PRAGMA mmap_size=67108864",  # 64MB
+    "PRAGMA temp_store=MEMORY",
+)
+
+# 全文検索（trigram）で検索できる語の最小文字数
+FTS_MIN_TERM_LENGTH = 3
+
+# キャッシュの遅延書き込み（write-behind）
+# 溜まった件数がWRITE_BEHIND_MAX_RECORDSに達するか、最初の追加からWRITE_BEHIND_INTERVAL秒
+# 経過したら、書き込み用スレッドがまとめて1つのトランザクションで書き込む
+WRITE_BEHIND_MAX_RECORDS = 500
+WRITE_BEHIND_INTERVAL = 2.0
+
+# 元のレコード（JSON）の圧縮用の辞書を作成するのに使うレコード数
+# 辞書ができるまでは辞書なしで圧縮し、辞書の作成時にそれらも圧縮し直す
+RAW_DICT_TRAINING_SAMPLES = 200
+
+# 辞書の作成に使うレコードの上限（新しい順）と、作成できなかった場合に再試行するまでの待ち時間（秒）
+RAW_DICT_MAX_SAMPLES = 2000
+RAW_DICT_RETRY_INTERVAL = 3600
+
+# 辞書の作成時に1回のトランザクションで圧縮し直すレコード数
+RAW_DICT_RECOMPRESS_CHUNK = 500
+
+# 保存する起動時間の履歴の件数
+STARTUP_HISTORY_LIMIT = 50
+
+# 起動時に表示する保存済みのタイムラインの件数
+CACHED_TIMELINE_LIMIT = 50
+
+# キャッシュから投稿を読み込むときの列と、参照しているIDからURI・投稿者を復元する結合
+POST_COLUMNS = (
+    "r.uri, r.cid, a.did AS author_did, p.text, "
+    "parent.uri AS reply_parent_uri, parent.cid AS reply_parent_cid, "
+    "root.uri AS reply_root_uri, root.cid AS reply_root_cid, quote.uri AS quote_uri, "
+    "p.like_count, p.reply_count, p.repost_count, p.indexed_at, a.handle, a.display_name"
+)
+POST_JOINS = (
+    "JOIN post_refs r ON r.id = p.id "
+    "LEFT JOIN authors a ON a.id = p.author_id "
+    "LEFT JOIN post_refs parent ON parent.id = p.reply_parent_id "
+    "LEFT JOIN post_refs root ON root.id = p.reply_root_id "
+    "LEFT JOIN post_refs quote ON quote.id = p.quote_id"
+)
+
+# ユーザーごとの関係を保存するテーブル
+RELATION_TABLES = ('follows', 'blocks', 'mutes')
+
+# 容量の上限を設定できるキャッシュのテーブル
+EVICTABLE_TABLES = ('posts', 'authors', 'timeline_posts')
+
+# 上限を超えた場合は上限のこの割合まで削除する（削除が頻繁に起きないようにする）
+EVICTION_TARGET_RATIO = 0.9
+
+# 1回のトランザクションで削除する行数・解放するページ数（他の処理を長く待たせない）
+EVICTION_CHUNK_ROWS = 1000
+VACUUM_CHUNK_PAGES = 500
+
 class DataStore:
-    """データ永続化クラス"""
+    """データ永続化クラス
+    
+    接続はスレッドごとに1つ作成して使い回す。書き込みは明示的なトランザクション
+    （BEGIN IMMEDIATE）で行い、読み込みはWALにより書き込み中でも待たされない。
+    """
+    
+    # スキーマを確認済みのデータベースファイルのパス
+    _verified_paths = set()
+    _verified_lock = threading.Lock()
     
     def __init__(self, db_path=None):
         """初期化
@@ -31,45 +112,180 @@ class DataStore:
         else:
             self.db_path = db_path
             
+        # スレッドごとの接続
+        self._local = threading.local()
+        self._connections = []  # (スレッドへの弱参照, 接続)のリスト
+        self._connections_lock = threading.Lock()
+        self._fts_available = None
+        
+        # 遅延書き込みのキュー
+        self._write_cond = threading.Condition()
+        self._pending_writes = []  # (種類, 引数)のリスト
+        self._pending_records = 0
+        self._first_pending_at = None
+        self._queued_seq = 0  # キューに追加したバッチの通し番号
+        self._written_seq = 0  # 書き込みが完了したバッチの通し番号
+        self._flush_requested = False
+        self._writer = None
+        self._writer_stop = False
+        self._last_cache_write = 0.0  # 最後にキャッシュを書き込んだ時刻（time.monotonic）
+        self._dbstat_available = None
+        
+        # 元のレコードの圧縮用の辞書（ID -> 辞書）と、新しいレコードの圧縮に使う辞書のID
+        self._raw_dicts = {}
+        self._raw_dict_id = None
+        self._raw_dict_retry_at = 0.0  # 辞書の作成を次に試みる時刻（time.monotonic）
+        
         # データベースの初期化
-        self._init_db()
+        with StartupTimer().phase('data_store_init'):
+            self._init_db()
         
-    def _init_db(self):
-        """データベースの初期化"""
-        try:
-            # データベースが存在しない場合は作成
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+    def _connection(self):
+        """現在のスレッド用の接続を取得（なければ作成）
+        
+        Returns:
+            sqlite3.Connection: データベース接続
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
             
-            # テーブルの存在確認
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sessions'")
-            sessions_exists = cursor.fetchone() is not None
+        # 自動コミットモードで開き、トランザクションは_transactionで明示的に開始する
+        # （close()は他のスレッドから呼ばれるため、check_same_thread=Falseとする）
+        is_new = not os.path.exists(self.db_path) or os.path.getsize(self.db_path) == 0
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+        if is_new:
+            # 空き領域を段階的に解放できるようにする（ファイルが作られる前に指定した場合のみ有効。
+            # 既存のデータベースはアイドル時にenable_incremental_vacuumで切り替える）
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        self._local.conn = conn
+        
+        with self._connections_lock:
+            # 終了したスレッドの接続を閉じる（非同期処理はスレッドを都度作成するため）
+            alive = []
+            for thread_ref, other in self._connections:
+                thread = thread_ref()
+                if thread is not None and thread.is_alive():
+                    alive.append((thread_ref, other))
+                else:
+                    other.close()
+            alive.append((weakref.ref(threading.current_thread()), conn))
+            self._connections = alive
+            
+        logger.debug(f"データベース接続を作成しました（{threading.current_thread().name}）")
+        return conn
+        
+    def _cursor(self):
+        """読み込み用のカーソルを取得
+        
+        Returns:
+            sqlite3.Cursor: カーソル
+        """
+        return self._connection().cursor()
+        
+    @contextmanager
+    def _transaction(self):
+        """書き込み用のトランザクション
+        
+        ブロック内で例外が発生した場合はロールバックする。
+        既にトランザクション中の場合は、外側のトランザクションに含める。
+        
+        Yields:
+            sqlite3.Cursor: カーソル
+        """
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn.cursor()
+            return
             
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-            users_exists = cursor.fetchone() is not None
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        
+    def close(self):
+        """遅延書き込みを反映し、すべてのスレッドの接続を閉じる
+        
+        閉じた後に再びメソッドを呼び出した場合は、新しい接続が作成される。
+        """
+        self._stop_writer()
+        with self._connections_lock:
+            for _, conn in self._connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.error(f"データベース接続のクローズに失敗しました: {str(e)}")
+            self._connections = []
+            self._local = threading.local()
+        logger.debug("データベース接続をすべて閉じました")
+        
+    def _init_db(self):
+        """データベースの初期化
+        
+        未適用のマイグレーションを順に、それぞれ1つのトランザクションで適用する。
+        同じプロセス内で確認済みのデータベースは再確認しない。
+        """
+        db_key = os.path.abspath(self.db_path)
+        if db_key in DataStore._verified_paths and os.path.exists(self.db_path):
+            logger.debug("データベースのスキーマは確認済みです")
+            return
             
-            # 必要なテーブルが存在しない場合は、バージョン情報をリセット
-            if not sessions_exists or not users_exists:
-                logger.warning("必要なテーブルが存在しません。データベースを再初期化します。")
-                # バージョン管理テーブルが存在する場合は削除
-                cursor.execute("DROP TABLE IF EXISTS db_version")
-                current_version = 0
-            else:
-                # バージョン管理テーブルの作成
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS db_version (
-                    id INTEGER PRIMARY KEY,
-                    version INTEGER,
-                    updated_at TIMESTAMP
-                )
-                ''')
+        with DataStore._verified_lock:
+            if db_key in DataStore._verified_paths and os.path.exists(self.db_path):
+                return
                 
-                # 現在のバージョンを確認
-                cursor.execute("SELECT version FROM db_version ORDER BY id DESC LIMIT 1")
-                result = cursor.fetchone()
-                current_version = result[0] if result else 0
+            try:
+                # データベースが存在しない場合は作成
+                with self._transaction() as cursor:
+                    current_version = self._get_current_version(cursor)
+                    
+                # バージョンに応じてマイグレーション
+                for version, migrate in DataStore._MIGRATIONS:
+                    if version <= current_version:
+                        continue
+                    with self._transaction() as cursor:
+                        migrate(self, cursor)
+                        cursor.execute(
+                            "INSERT INTO db_version (version, updated_at) VALUES (?, ?)",
+                            (version, datetime.now().isoformat())
+                        )
+                        
+                DataStore._verified_paths.add(db_key)
+                logger.info("データベースの初期化が完了しました")
+            except Exception as e:
+                logger.error(f"データベースの初期化に失敗しました: {str(e)}")
+                raise
+                
+    def _get_current_version(self, cursor):
+        """現在のスキーマバージョンを取得
+        
+        Args:
+            cursor: データベースカーソル
             
-            # バージョン管理テーブルの作成（再作成の場合もある）
+        Returns:
+            int: 現在のバージョン。未初期化の場合は0
+        """
+        # テーブルの存在確認
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sessions'")
+        sessions_exists = cursor.fetchone() is not None
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+        users_exists = cursor.fetchone() is not None
+        
+        # 必要なテーブルが存在しない場合は、バージョン情報をリセット
+        if not sessions_exists or not users_exists:
+            logger.warning("必要なテーブルが存在しません。データベースを再初期化します。")
+            # バージョン管理テーブルが存在する場合は削除
+            cursor.execute("DROP TABLE IF EXISTS db_version")
+            current_version = 0
+        else:
+            # バージョン管理テーブルの作成
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS db_version (
                 id INTEGER PRIMARY KEY,
@@ -78,17 +294,22 @@ class DataStore:
             )
             ''')
             
-            # バージョンに応じてマイグレーション
-            if current_version < 1:
-                self._migrate_to_v1(cursor)
-                
-            conn.commit()
-            conn.close()
-            logger.info("データベースの初期化が完了しました")
-        except Exception as e:
-            logger.error(f"データベースの初期化に失敗しました: {str(e)}")
-            raise
-            
+            # 現在のバージョンを確認
+            cursor.execute("SELECT version FROM db_version ORDER BY id DESC LIMIT 1")
+            result = cursor.fetchone()
+            current_version = result[0] if result else 0
+        
+        # バージョン管理テーブルの作成（再作成の場合もある）
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS db_version (
+            id INTEGER PRIMARY KEY,
+            version INTEGER,
+            updated_at TIMESTAMP
+        )
+        ''')
+        
+        return current_version
+        
     def _migrate_to_v1(self, cursor):
         """バージョン1へのマイグレーション
         
@@ -168,60 +389,349 @@ class DataStore:
                     cursor.execute("DROP TABLE old_sessions")
                     logger.info("古いデータを新しいテーブル構造に移行しました")
             
-            # バージョン情報を更新
-            cursor.execute(
-                "INSERT INTO db_version (version, updated_at) VALUES (?, ?)",
-                (1, datetime.now().isoformat())
-            )
-            
             logger.info("データベースをバージョン1に更新しました")
         except Exception as e:
             logger.error(f"バージョン1へのマイグレーションに失敗しました: {str(e)}")
             raise
             
-    def save_session(self, user_did, encrypted_session):
-        """セッション情報を保存
+    def _migrate_to_v2(self, cursor):
+        """バージョン2へのマイグレーション（アップロード済みブロブのキャッシュ）
         
         Args:
-            user_did (str): ユーザーのDID
-            encrypted_session (bytes): 暗号化されたセッション情報
-            
-        Returns:
-            bool: 成功した場合はTrue
+            cursor: データベースカーソル
         """
         try:
-            logger.debug(f"セッション情報を保存します: {user_did}")
+            logger.info("データベースをバージョン2に更新しています...")
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # blob_cacheテーブルの作成
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blob_cache (
+                user_did TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                cid TEXT NOT NULL,
+                mime_type TEXT,
+                size INTEGER,
+                created_at TIMESTAMP,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (user_did, sha256)
+            )
+            ''')
+            
+            logger.info("データベースをバージョン2に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン2へのマイグレーションに失敗しました: {str(e)}")
+            raise
             
-            # ユーザー情報を保存または更新
+    def _migrate_to_v3(self, cursor):
+        """バージョン3へのマイグレーション（送信待ちキュー）
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン3に更新しています...")
+            
+            # outboxテーブルの作成
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_did TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                rkey TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP,
+                last_error TEXT,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP
+            )
+            ''')
             cursor.execute(
-                "INSERT OR IGNORE INTO users (did, created_at, updated_at) VALUES (?, ?, ?)",
-                (user_did, datetime.now().isoformat(), datetime.now().isoformat())
+                "CREATE INDEX IF NOT EXISTS idx_outbox_user_status ON outbox (user_did, status, id)"
+            )
+            
+            logger.info("データベースをバージョン3に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン3へのマイグレーションに失敗しました: {str(e)}")
+            raise
+            
+    def _migrate_to_v4(self, cursor):
+        """バージョン4へのマイグレーション（投稿・ユーザー・フォロー関係のキャッシュ）
+        
+        投稿者と投稿のURIを1回だけ保存し、投稿からは整数のIDで参照する。
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン4に更新しています...")
+            
+            # authorsテーブルの作成（投稿者のプロフィール。DIDごとに1行）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS authors (
+                id INTEGER PRIMARY KEY,
+                did TEXT NOT NULL UNIQUE,
+                handle TEXT,
+                display_name TEXT,
+                updated_at TIMESTAMP
+            )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_authors_handle ON authors (handle)")
+            
+            # post_refsテーブルの作成（投稿のURIごとに1行。返信先・引用元の参照にも使用）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_refs (
+                id INTEGER PRIMARY KEY,
+                uri TEXT NOT NULL UNIQUE,
+                cid TEXT
             )
+            ''')
+            
+            # postsテーブルの作成（投稿本体。idはpost_refsのidと同じ）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS posts (
+                id INTEGER PRIMARY KEY,
+                author_id INTEGER NOT NULL,
+                text TEXT,
+                reply_parent_id INTEGER,
+                reply_root_id INTEGER,
+                quote_id INTEGER,
+                like_count INTEGER DEFAULT 0,
+                reply_count INTEGER DEFAULT 0,
+                repost_count INTEGER DEFAULT 0,
+                indexed_at TEXT,
+                cached_at TIMESTAMP
+            )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_author ON posts (author_id, indexed_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_reply_root ON posts (reply_root_id)")
             
-            # ユーザーが既に存在する場合は更新
+            # timeline_postsテーブルの作成（タイムラインごとの投稿の並び）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS timeline_posts (
+                user_did TEXT NOT NULL,
+                timeline TEXT NOT NULL,
+                post_id INTEGER NOT NULL,
+                indexed_at TEXT,
+                PRIMARY KEY (user_did, timeline, post_id)
+            )
+            ''')
             cursor.execute(
-                "UPDATE users SET updated_at = ? WHERE did = ?",
-                (datetime.now().isoformat(), user_did)
+                "CREATE INDEX IF NOT EXISTS idx_timeline_posts_timeline "
+                "ON timeline_posts (user_did, timeline, indexed_at)"
             )
             
-            # ユーザーIDを取得
-            cursor.execute("SELECT id FROM users WHERE did = ?", (user_did,))
-            user_id = cursor.fetchone()[0]
+            # follows、blocks、mutesテーブルの作成（ユーザーごとの関係）
+            for table in RELATION_TABLES:
+                cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    user_did TEXT NOT NULL,
+                    subject_did TEXT NOT NULL,
+                    uri TEXT,
+                    created_at TIMESTAMP,
+                    PRIMARY KEY (user_did, subject_did)
+                )
+                ''')
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_subject ON {table} (subject_did)")
+            
+            logger.info("データベースをバージョン4に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン4へのマイグレーションに失敗しました: {str(e)}")
+            raise
+            
+    def _migrate_to_v5(self, cursor):
+        """バージョン5へのマイグレーション（キャッシュ済み投稿の全文検索）
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン5に更新しています...")
+            
+            # 全文検索用の仮想テーブル
+            self._create_posts_fts(cursor)
+            
+            logger.info("データベースをバージョン5に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン5へのマイグレーションに失敗しました: {str(e)}")
+            raise
+            
+    def _migrate_to_v6(self, cursor):
+        """バージョン6へのマイグレーション（キャッシュの最終アクセス日時）
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン6に更新しています...")
             
-            # 既存のセッション情報を削除
-            cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            # 容量の上限を超えた場合に、最もアクセスされていない行から削除するための列
+            initial_values = {'posts': 'cached_at', 'authors': 'updated_at', 'timeline_posts': 'indexed_at'}
+            for table in EVICTABLE_TABLES:
+                cursor.execute(f"PRAGMA table_info({table})")
+                if 'last_accessed' not in [column[1] for column in cursor.fetchall()]:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN last_accessed TIMESTAMP")
+                cursor.execute(f"UPDATE {table} SET last_accessed = {initial_values[table]} WHERE last_accessed IS NULL")
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_last_accessed ON {table} (last_accessed)"
+                )
+            
+            logger.info("データベースをバージョン6に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン6へのマイグレーションに失敗しました: {str(e)}")
+            raise
             
-            # 新しいセッション情報を保存
+    def _create_posts_fts(self, cursor):
+        """postsテーブルの全文検索用の仮想テーブルと、索引を更新するトリガーを作成
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        # 全文検索用の仮想テーブル（trigramは日本語のように空白で区切られない文章も検索できる）
+        try:
             cursor.execute(
-                "INSERT INTO sessions (user_id, encrypted_session, created_at) VALUES (?, ?, ?)",
-                (user_id, encrypted_session, datetime.now().isoformat())
+                "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+                "text, content='posts', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            # FTS5やtrigramに対応していないSQLiteでは、検索は部分一致で行う
+            logger.warning(f"全文検索を利用できません。部分一致で検索します: {str(e)}")
+        else:
+            # 投稿の追加・更新・削除に合わせて索引を更新するトリガー
+            # （更新時は本文が変わった場合のみ。タイムラインの再取得では同じ本文で上書きされることが多い）
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts (rowid, text) VALUES (new.id, new.text);
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF text ON posts
+            WHEN old.text IS NOT new.text BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                INSERT INTO posts_fts (rowid, text) VALUES (new.id, new.text);
+            END
+            ''')
+            
+    def _migrate_to_v7(self, cursor):
+        """バージョン7へのマイグレーション（元のレコードの保存）
+        
+        APIから取得したレコードのJSONを、投稿ごとに圧縮して保存する。
+        正規化したテーブルに保存していない項目（埋め込み・言語・ラベルなど）が必要になったときや、
+        スキーマの変更後に再取得せずに作り直すときに使う。
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン7に更新しています...")
+            
+            # 圧縮用の辞書（作り直した場合も、古い辞書で圧縮したレコードを展開できるよう残す）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS compression_dicts (
+                id INTEGER PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at TIMESTAMP
+            )
+            ''')
+            
+            # post_rawテーブルの作成（post_idはpost_refsのid。dict_idがNULLの場合は辞書なしで圧縮）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_raw (
+                post_id INTEGER PRIMARY KEY,
+                dict_id INTEGER,
+                data BLOB NOT NULL,
+                fetched_at TIMESTAMP
+            )
+            ''')
+            
+            logger.info("データベースをバージョン7に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン7へのマイグレーションに失敗しました: {str(e)}")
+            raise
+            
+    def _migrate_to_v8(self, cursor):
+        """バージョン8へのマイグレーション（起動時間の履歴）
+        
+        Args:
+            cursor: データベースカーソル
+        """
+        try:
+            logger.info("データベースをバージョン8に更新しています...")
+            
+            # startup_historyテーブルの作成（phasesは段階ごとの時間のJSON）
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS startup_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recorded_at TIMESTAMP,
+                app_version TEXT,
+                outcome TEXT,
+                total_ms REAL,
+                phases TEXT
             )
+            ''')
+            
+            logger.info("データベースをバージョン8に更新しました")
+        except Exception as e:
+            logger.error(f"バージョン8へのマイグレーションに失敗しました: {str(e)}")
+            raise
+            
+    # マイグレーションの一覧（バージョン順）。新しいバージョンは末尾に追加する
+    _MIGRATIONS = (
+        (1, _migrate_to_v1),
+        (2, _migrate_to_v2),
+        (3, _migrate_to_v3),
+        (4, _migrate_to_v4),
+        (5, _migrate_to_v5),
+        (6, _migrate_to_v6),
+        (7, _migrate_to_v7),
+        (8, _migrate_to_v8),
+    )
+            
+    def save_session(self, user_did, encrypted_session):
+        """セッション情報を保存
+        
+        Args:
+            user_did (str): ユーザーのDID
+            encrypted_session (bytes): 暗号化されたセッション情報
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            logger.debug(f"セッション情報を保存します: {user_did}")
+            
+            with self._transaction() as cursor:
+                # ユーザー情報を保存または更新
+                cursor.execute(
+                    "INSERT OR IGNORE INTO users (did, created_at, updated_at) VALUES (?, ?, ?)",
+                    (user_did, datetime.now().isoformat(), datetime.now().isoformat())
+                )
+                
+                # ユーザーが既に存在する場合は更新
+                cursor.execute(
+                    "UPDATE users SET updated_at = ? WHERE did = ?",
+                    (datetime.now().isoformat(), user_did)
+                )
+                
+                # ユーザーIDを取得
+                cursor.execute("SELECT id FROM users WHERE did = ?", (user_did,))
+                user_id = cursor.fetchone()[0]
+                
+                # 既存のセッション情報を削除
+                cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+                
+                # 新しいセッション情報を保存
+                cursor.execute(
+                    "INSERT INTO sessions (user_id, encrypted_session, created_at) VALUES (?, ?, ?)",
+                    (user_id, encrypted_session, datetime.now().isoformat())
+                )
             
-            conn.commit()
-            conn.close()
             logger.info(f"セッション情報を保存しました: {user_did}")
             return True
         except Exception as e:
@@ -238,8 +748,7 @@ class DataStore:
             bytes: 暗号化されたセッション情報。情報がない場合はNone
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._cursor()
             
             # ユーザーIDを取得
             cursor.execute("SELECT id FROM users WHERE did = ?", (user_did,))
@@ -247,7 +756,6 @@ class DataStore:
             
             if not result:
                 logger.debug(f"ユーザーが見つかりませんでした: {user_did}")
-                conn.close()
                 return None
                 
             user_id = result[0]
@@ -259,7 +767,6 @@ class DataStore:
             )
             
             result = cursor.fetchone()
-            conn.close()
             
             if result:
                 encrypted_session = result[0]
@@ -283,25 +790,20 @@ class DataStore:
             bool: 成功した場合はTrue
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # ユーザーIDを取得
-            cursor.execute("SELECT id FROM users WHERE did = ?", (user_did,))
-            result = cursor.fetchone()
-            
-            if not result:
-                logger.debug(f"ユーザーが見つかりませんでした: {user_did}")
-                conn.close()
-                return True  # ユーザーが存在しない場合は成功とみなす
+            with self._transaction() as cursor:
+                # ユーザーIDを取得
+                cursor.execute("SELECT id FROM users WHERE did = ?", (user_did,))
+                result = cursor.fetchone()
                 
-            user_id = result[0]
-            
-            # セッション情報を削除
-            cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+                if not result:
+                    logger.debug(f"ユーザーが見つかりませんでした: {user_did}")
+                    return True  # ユーザーが存在しない場合は成功とみなす
+                
+                user_id = result[0]
+                
+                # セッション情報を削除
+                cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
             
-            conn.commit()
-            conn.close()
             logger.info(f"セッション情報を削除しました: {user_did}")
             return True
         except Exception as e:
@@ -315,8 +817,7 @@ class DataStore:
             tuple: (user_did, encrypted_session)のタプル。情報がない場合は(None, None)
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._cursor()
             
             # 最新のセッション情報を取得
             cursor.execute("""
@@ -327,7 +828,6 @@ class DataStore:
             """)
             
             result = cursor.fetchone()
-            conn.close()
             
             if result:
                 user_did, encrypted_session = result
@@ -340,3 +840,1118 @@ class DataStore:
         except Exception as e:
             logger.error(f"セッション情報の読み込みに失敗しました: {str(e)}")
             return None, None
+            
+    def save_blob_cache(self, user_did, sha256, cid, mime_type, size, ttl_seconds):
+        """アップロード済みブロブの情報を保存
+        
+        Args:
+            user_did (str): アップロードしたユーザーのDID
+            sha256 (str): アップロードした画像データのSHA-256（16進数）
+            cid (str): ブロブのCID
+            mime_type (str): ブロブのMIMEタイプ
+            size (int): ブロブのサイズ（バイト）
+            ttl_seconds (int): 有効期間（秒）
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            now = datetime.now()
+            with self._transaction() as cursor:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO blob_cache "
+                    "(user_did, sha256, cid, mime_type, size, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_did, sha256, cid, mime_type, size, now.isoformat(),
+                     (now + timedelta(seconds=ttl_seconds)).isoformat())
+                )
+            
+            logger.debug(f"ブロブキャッシュを保存しました: {sha256}")
+            return True
+        except Exception as e:
+            logger.error(f"ブロブキャッシュの保存に失敗しました: {str(e)}")
+            return False
+            
+    def load_blob_cache(self, user_did, sha256):
+        """有効期限内のブロブ情報を取得
+        
+        Args:
+            user_did (str): ユーザーのDID
+            sha256 (str): アップロードした画像データのSHA-256（16進数）
+            
+        Returns:
+            dict: cid、mime_type、sizeを含む辞書。情報がない場合や期限切れの場合はNone
+        """
+        try:
+            cursor = self._cursor()
+            
+            cursor.execute(
+                "SELECT cid, mime_type, size FROM blob_cache "
+                "WHERE user_did = ? AND sha256 = ? AND expires_at > ?",
+                (user_did, sha256, datetime.now().isoformat())
+            )
+            
+            result = cursor.fetchone()
+            
+            if result:
+                cid, mime_type, size = result
+                return {'cid': cid, 'mime_type': mime_type, 'size': size}
+            return None
+        except Exception as e:
+            logger.error(f"ブロブキャッシュの読み込みに失敗しました: {str(e)}")
+            return None
+            
+    def extend_blob_cache(self, user_did, sha256_list, ttl_seconds):
+        """ブロブ情報の有効期限を延長
+        
+        Args:
+            user_did (str): ユーザーのDID
+            sha256_list (list): アップロードした画像データのSHA-256のリスト
+            ttl_seconds (int): 現在時刻からの有効期間（秒）
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            expires_at = (datetime.now() + timedelta(seconds=ttl_seconds)).isoformat()
+            with self._transaction() as cursor:
+                cursor.executemany(
+                    "UPDATE blob_cache SET expires_at = ? WHERE user_did = ? AND sha256 = ?",
+                    [(expires_at, user_did, sha256) for sha256 in sha256_list]
+                )
+            
+            return True
+        except Exception as e:
+            logger.error(f"ブロブキャッシュの更新に失敗しました: {str(e)}")
+            return False
+            
+    def delete_blob_cache(self, user_did, sha256_list=None):
+        """ブロブ情報を削除
+        
+        Args:
+            user_did (str): ユーザーのDID
+            sha256_list (list, optional): 削除するSHA-256のリスト。
+                指定しない場合はユーザーの全件と、全ユーザーの期限切れ分を削除
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            with self._transaction() as cursor:
+                if sha256_list is None:
+                    cursor.execute(
+                        "DELETE FROM blob_cache WHERE user_did = ? OR expires_at <= ?",
+                        (user_did, datetime.now().isoformat())
+                    )
+                else:
+                    cursor.executemany(
+                        "DELETE FROM blob_cache WHERE user_did = ? AND sha256 = ?",
+                        [(user_did, sha256) for sha256 in sha256_list]
+                    )
+            
+            return True
+        except Exception as e:
+            logger.error(f"ブロブキャッシュの削除に失敗しました: {str(e)}")
+            return False
+            
+    def enqueue_outbox(self, user_did, kind, payload, rkey):
+        """送信待ちキューに項目を追加
+        
+        Args:
+            user_did (str): 送信するユーザーのDID
+            kind (str): 項目の種類（'post'、'like'）
+            payload (str): 送信内容（JSON文字列）
+            rkey (str): 作成するレコードのキー（冪等性の確保に使用）
+            
+        Returns:
+            int: 追加した項目のID。失敗した場合はNone
+        """
+        try:
+            now = datetime.now().isoformat()
+            with self._transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO outbox (user_did, kind, payload, rkey, status, attempts, "
+                    "next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, 'pending', 0, ?, ?, ?)",
+                    (user_did, kind, payload, rkey, now, now, now)
+                )
+                item_id = cursor.lastrowid
+            
+            logger.debug(f"送信待ちキューに追加しました: id={item_id}, kind={kind}")
+            return item_id
+        except Exception as e:
+            logger.error(f"送信待ちキューへの追加に失敗しました: {str(e)}")
+            return None
+            
+    def get_next_outbox_item(self, user_did):
+        """送信順で先頭の未完了項目を取得
+        
+        Args:
+            user_did (str): ユーザーのDID
+            
+        Returns:
+            dict: 項目の情報。未完了の項目がない場合はNone
+        """
+        try:
+            cursor = self._cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute(
+                "SELECT id, kind, payload, rkey, status, attempts, next_attempt_at, last_error "
+                "FROM outbox WHERE user_did = ? AND status IN ('pending', 'sending') "
+                "ORDER BY id LIMIT 1",
+                (user_did,)
+            )
+            
+            result = cursor.fetchone()
+            return dict(result) if result else None
+        except Exception as e:
+            logger.error(f"送信待ちキューの読み込みに失敗しました: {str(e)}")
+            return None
+            
+    def find_outbox_item(self, user_did, kind, key, value):
+        """送信待ちの項目を送信内容の値で検索
+        
+        Args:
+            user_did (str): ユーザーのDID
+            kind (str): 項目の種類
+            key (str): 送信内容（JSON）のキー
+            value (str): 比較する値
+            
+        Returns:
+            int: 見つかった項目のID。見つからない場合はNone
+        """
+        try:
+            cursor = self._cursor()
+            
+            cursor.execute(
+                "SELECT id FROM outbox WHERE user_did = ? AND kind = ? "
+                "AND status IN ('pending', 'sending') AND json_extract(payload, ?) = ? "
+                "ORDER BY id LIMIT 1",
+                (user_did, kind, f"$.{key}", value)
+            )
+            
+            result = cursor.fetchone()
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"送信待ちキューの検索に失敗しました: {str(e)}")
+            return None
+            
+    def update_outbox_item(self, item_id, status, attempts=None, next_attempt_at=None, last_error=None):
+        """送信待ちの項目の状態を更新
+        
+        Args:
+            item_id (int): 項目のID
+            status (str): 新しい状態（'pending'、'sending'、'done'、'failed'）
+            attempts (int, optional): 送信試行回数
+            next_attempt_at (str, optional): 次回の送信試行時刻（ISO形式）
+            last_error (str, optional): 最後に発生したエラー
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            with self._transaction() as cursor:
+                if status == 'done':
+                    # 送信が完了した項目は保持する必要がないため削除
+                    cursor.execute("DELETE FROM outbox WHERE id = ?", (item_id,))
+                else:
+                    cursor.execute(
+                        "UPDATE outbox SET status = ?, attempts = COALESCE(?, attempts), "
+                        "next_attempt_at = COALESCE(?, next_attempt_at), last_error = ?, updated_at = ? "
+                        "WHERE id = ?",
+                        (status, attempts, next_attempt_at, last_error, datetime.now().isoformat(), item_id)
+                    )
+            
+            return True
+        except Exception as e:
+            logger.error(f"送信待ちキューの更新に失敗しました: {str(e)}")
+            return False
+            
+    def count_pending_outbox(self, user_did):
+        """未完了の送信待ち項目の件数を取得
+        
+        Args:
+            user_did (str): ユーザーのDID
+            
+        Returns:
+            int: 件数。取得に失敗した場合は0
+        """
+        try:
+            cursor = self._cursor()
+            
+            cursor.execute(
+                "SELECT COUNT(*) FROM outbox WHERE user_did = ? AND status IN ('pending', 'sending')",
+                (user_did,)
+            )
+            
+            result = cursor.fetchone()
+            return result[0]
+        except Exception as e:
+            logger.error(f"送信待ちキューの件数取得に失敗しました: {str(e)}")
+            return 0
+            
+    def save_startup_history(self, app_version, total_ms, phases, outcome=None):
+        """起動時間を履歴に保存（古いものから削除し、STARTUP_HISTORY_LIMIT件まで残す）
+        
+        Args:
+            app_version (str): アプリケーションのバージョン
+            total_ms (float): 起動にかかった時間（ミリ秒）
+            phases (list): 段階ごとの時間の辞書のリスト
+            outcome (str, optional): 起動の結果
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            with self._transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO startup_history (recorded_at, app_version, outcome, total_ms, phases) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (datetime.now().isoformat(), app_version, outcome, total_ms,
+                     json.dumps(phases, ensure_ascii=False))
+                )
+                cursor.execute(
+                    "DELETE FROM startup_history WHERE id NOT IN "
+                    "(SELECT id FROM startup_history ORDER BY id DESC LIMIT ?)",
+                    (STARTUP_HISTORY_LIMIT,)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"起動時間の履歴の保存に失敗しました: {str(e)}")
+            return False
+            
+    def get_startup_history(self, limit=STARTUP_HISTORY_LIMIT):
+        """起動時間の履歴を取得
+        
+        Args:
+            limit (int, optional): 最大件数
+            
+        Returns:
+            list: 新しい順の履歴（recorded_at、app_version、outcome、total_ms、phasesの辞書）のリスト
+        """
+        try:
+            cursor = self._cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(
+                "SELECT recorded_at, app_version, outcome, total_ms, phases FROM startup_history "
+                "ORDER BY id DESC LIMIT ?",
+                (limit,)
+            )
+            history = []
+            for row in cursor.fetchall():
+                entry = dict(row)
+                entry['phases'] = json.loads(entry['phases']) if entry['phases'] else []
+                history.append(entry)
+            return history
+        except Exception as e:
+            logger.error(f"起動時間の履歴の取得に失敗しました: {str(e)}")
+            return []
+            
+    def save_posts(self, posts, user_did=None, timeline=None):
+        """投稿をキャッシュに保存（引用元の投稿も保存し、全文検索の索引を更新）
+        
+        Args:
+            posts (list): 投稿データ（core.post_model.normalize_postの形式）のリスト
+            user_did (str, optional): タイムラインを表示しているユーザーのDID
+            timeline (str, optional): タイムラインの名前。指定した場合は並び順も保存
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        try:
+            rows = self._new_cache_rows()
+            self._collect_post_rows(rows, posts, user_did, timeline)
+            with self._transaction() as cursor:
+                self._write_cache_rows(cursor, rows)
+            return True
+        except Exception as e:
+            logger.error(f"投稿のキャッシュへの保存に失敗しました: {str(e)}")
+            return False
+            
+    def queue_posts(self, posts, user_did=None, timeline=None):
+        """投稿をキャッシュへの遅延書き込みキューに追加（どのスレッドからでも呼び出せる）
+        
+        Args:
+            posts (list): 投稿データのリスト
+            user_did (str, optional): タイムラインを表示しているユーザーのDID
+            timeline (str, optional): タイムラインの名前
+        """
+        self._queue_write('posts', (list(posts), user_did, timeline), len(posts))
+        
+    def queue_raw_records(self, records):
+        """APIから取得した元のレコードを遅延書き込みキューに追加
+        
+        JSONへの変換と圧縮は書き込み用スレッドで行う。
+        
+        Args:
+            records (list): (投稿のURI, レコード)のリスト。レコードはatprotoのモデル、辞書、JSON文字列のいずれか
+        """
+        self._queue_write('raw', (list(records),), len(records))
+        
+    def queue_relations(self, table, user_did, subjects):
+        """フォロー・ブロック・ミュートの関係を遅延書き込みキューに追加
+        
+        Args:
+            table (str): 'follows'、'blocks'、'mutes'のいずれか
+            user_did (str): ログインユーザーのDID
+            subjects (list): 相手の情報 {'did', 'handle', 'display_name', 'uri'} のリスト
+        """
+        if table not in RELATION_TABLES:
+            raise ValueError(f"不明なテーブルです: {table}")
+        self._queue_write(table, (user_did, list(subjects)), len(subjects))
+        
+    def touch_posts(self, uris):
+        """投稿の最終アクセス日時の更新を遅延書き込みキューに追加
+        
+        Args:
+            uris (list): 参照した投稿のURIのリスト
+        """
+        self._queue_write('touch', (list(uris),), len(uris))
+        
+    def is_idle(self, seconds):
+        """キャッシュへの書き込みが一定時間行われていないかを判定
+        
+        Args:
+            seconds (float): 書き込みがないことを確認する秒数
+            
+        Returns:
+            bool: 遅延書き込みキューが空で、最後の書き込みから指定秒数以上経過している場合はTrue
+        """
+        with self._write_cond:
+            if self._pending_writes:
+                return False
+        return time.monotonic() - self._last_cache_write >= seconds
+        
+    def flush(self, timeout=10):
+        """遅延書き込みキューの内容をすぐに書き込み、完了を待つ
+        
+        Args:
+            timeout (float, optional): 待機する最大秒数
+            
+        Returns:
+            bool: 呼び出し時点のキューがすべて書き込まれた場合はTrue
+        """
+        with self._write_cond:
+            target = self._queued_seq
+            if self._written_seq >= target:
+                return True
+            self._flush_requested = True
+            self._write_cond.notify_all()
+            if not self._write_cond.wait_for(lambda: self._written_seq >= target, timeout):
+                logger.warning("キャッシュの書き込みが時間内に完了しませんでした")
+                return False
+        return True
+        
+    def _queue_write(self, kind, args, count):
+        """遅延書き込みキューに追加し、必要なら書き込み用スレッドを起こす"""
+        if not count:
+            return
+        with self._write_cond:
+            self._pending_writes.append((kind, args))
+            self._pending_records += count
+            self._queued_seq += 1
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+                
+            if self._writer is None or not self._writer.is_alive():
+                self._writer_stop = False
+                self._writer = threading.Thread(target=self._writer_loop, name="DataStoreWriter")
+                self._writer.daemon = True
+                self._writer.start()
+            self._write_cond.notify_all()
+            
+    def _writer_loop(self):
+        """書き込み用スレッドのメインループ"""
+        while True:
+            with self._write_cond:
+                # 件数か時間のしきい値に達するまで溜める
+                while True:
+                    if self._pending_writes and (
+                        self._writer_stop or self._flush_requested
+                        or self._pending_records >= WRITE_BEHIND_MAX_RECORDS
+                    ):
+                        break
+                    if not self._pending_writes:
+                        if self._writer_stop:
+                            return
+                        self._write_cond.wait()
+                        continue
+                    remaining = self._first_pending_at + WRITE_BEHIND_INTERVAL - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._write_cond.wait(remaining)
+                    
+                batches = self._pending_writes
+                last_seq = self._queued_seq
+                self._pending_writes = []
+                self._pending_records = 0
+                self._first_pending_at = None
+                self._flush_requested = False
+                
+            self._write_batches(batches)
+            # 次の書き込みを待つ間、書き込み済みの投稿やモデルを参照し続けないようにする
+            del batches
+            
+            with self._write_cond:
+                self._written_seq = last_seq
+                self._write_cond.notify_all()
+                
+    def _stop_writer(self):
+        """キューを書き込んでから書き込み用スレッドを終了する"""
+        with self._write_cond:
+            writer = self._writer
+            self._writer_stop = True
+            self._write_cond.notify_all()
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=10)
+        with self._write_cond:
+            self._writer = None
+            
+    def _write_batches(self, batches):
+        """溜まったバッチを1つのトランザクションで書き込む
+        
+        Args:
+            batches (list): (種類, 引数)のリスト
+        """
+        try:
+            start = time.perf_counter()
+            rows = self._new_cache_rows()
+            for kind, args in batches:
+                if kind == 'posts':
+                    self._collect_post_rows(rows, *args)
+                elif kind == 'touch':
+                    now = datetime.now().isoformat()
+                    rows['touch'].extend((now, uri) for uri in args[0])
+                elif kind == 'raw':
+                    self._collect_raw_rows(rows, *args)
+                else:
+                    self._collect_relation_rows(rows, kind, *args)
+                    
+            with self._transaction() as cursor:
+                self._write_cache_rows(cursor, rows)
+            self._last_cache_write = time.monotonic()
+            
+            if rows['post_raw'] and self._raw_dict_id is None:
+                self._train_raw_dictionary()
+                
+            logger.debug(
+                f"キャッシュを書き込みました: {len(batches)}バッチ, "
+                f"投稿{len(rows['posts'])}件, {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        except Exception as e:
+            # キャッシュのため、書き込めなかった分は破棄する（次回の取得時に再度保存される）
+            logger.error(f"キャッシュの書き込みに失敗しました: {str(e)}", exc_info=True)
+            
+    @staticmethod
+    def _new_cache_rows():
+        """キャッシュに書き込む行の入れ物を作成"""
+        rows = {
+            'authors': {}, 'post_refs': {}, 'posts': [], 'quotes': [], 'timeline_posts': [], 'touch': [],
+            'post_raw': []
+        }
+        for table in RELATION_TABLES:
+            rows[table] = []
+        return rows
+        
+    @staticmethod
+    def _collect_post_rows(rows, posts, user_did=None, timeline=None):
+        """投稿データから書き込む行を作成
+        
+        Args:
+            rows (dict): 行の入れ物（_new_cache_rowsで作成）
+            posts (list): 投稿データのリスト
+            user_did (str, optional): タイムラインを表示しているユーザーのDID
+            timeline (str, optional): タイムラインの名前
+        """
+        now = datetime.now().isoformat()
+        authors = rows['authors']
+        refs = rows['post_refs']
+        
+        def add_ref(ref):
+            # 同じURIが何度出てきても1行にまとめる（CIDが分かっている方を残す）
+            if ref and ref.get('uri') and (ref['uri'] not in refs or ref.get('cid')):
+                refs[ref['uri']] = (ref['uri'], ref.get('cid'))
+            return ref.get('uri') if ref else None
+            
+        for post in posts:
+            # 取得できなかった投稿（削除済み・ブロック）は保存しない
+            author = post.get('author')
+            if not post.get('uri') or author is None or not author.did:
+                continue
+            authors[author.did] = (author.did, author.handle, author.display_name, now)
+            
+            quote = post.get('quote_of') if post.get('is_quote_post') else None
+            quote_uri = None
+            quote_author = quote.get('author') if quote else None
+            if quote and quote.get('uri') and quote_author is not None and quote_author.did:
+                authors.setdefault(quote_author.did, (quote_author.did, quote_author.handle, quote_author.display_name, now))
+                quote_uri = add_ref(quote)
+                rows['quotes'].append((
+                    quote_uri, quote_author.did, quote['content'],
+                    quote.get('like_count') or 0, quote.get('repost_count') or 0,
+                    quote.get('indexed_at'), now
+                ))
+                
+            rows['posts'].append((
+                add_ref(post), author.did, post['content'],
+                add_ref(post.get('reply_parent')), add_ref(post.get('reply_root')),
+                quote_uri, post.get('likes') or 0, post.get('replies') or 0, post.get('reposts') or 0,
+                post.get('raw_timestamp'), now
+            ))
+            if user_did and timeline:
+                rows['timeline_posts'].append((user_did, timeline, post['uri'], post.get('raw_timestamp'), now))
+                
+    def _collect_raw_rows(self, rows, records):
+        """元のレコードをJSONに変換・圧縮して書き込む行を作成
+        
+        Args:
+            rows (dict): 行の入れ物（_new_cache_rowsで作成）
+            records (list): (投稿のURI, レコード)のリスト
+        """
+        now = datetime.now().isoformat()
+        if self._raw_dict_id is None:
+            # 前回までに作成した辞書があれば使う
+            cursor = self._cursor()
+            cursor.execute("SELECT id, data FROM compression_dicts ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            if row is not None:
+                self._raw_dicts[row[0]] = row[1]
+                self._raw_dict_id = row[0]
+        dict_id = self._raw_dict_id
+        zdict = self._raw_dicts.get(dict_id)
+        for uri, record in records:
+            if not uri or record is None:
+                continue
+            if hasattr(record, 'model_dump_json'):
+                data = record.model_dump_json(exclude_none=True, by_alias=True)
+            elif isinstance(record, (str, bytes)):
+                data = record
+            else:
+                data = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            rows['post_refs'].setdefault(uri, (uri, None))
+            rows['post_raw'].append((uri, dict_id, compress(data, zdict), now))
+            
+    @staticmethod
+    def _collect_relation_rows(rows, table, user_did, subjects):
+        """フォロー・ブロック・ミュートの相手から書き込む行を作成
+        
+        Args:
+            rows (dict): 行の入れ物（_new_cache_rowsで作成）
+            table (str): テーブル名
+            user_did (str): ログインユーザーのDID
+            subjects (list): 相手の情報のリスト
+        """
+        now = datetime.now().isoformat()
+        for subject in subjects:
+            if not subject.get('did'):
+                continue
+            rows['authors'][subject['did']] = (
+                subject['did'], subject.get('handle'), subject.get('display_name') or subject.get('handle'), now
+            )
+            rows[table].append((user_did, subject['did'], subject.get('uri'), now))
+            
+    @staticmethod
+    def _write_cache_rows(cursor, rows):
+        """作成した行をexecutemanyでまとめて書き込む
+        
+        投稿者と投稿のURIは1行ずつだけ保存し、投稿からは整数のIDで参照する。
+        書き込んだ行は最終アクセス日時も更新する。
+        
+        Args:
+            cursor: トランザクション中のカーソル
+            rows (dict): 行の入れ物
+        """
+        cursor.executemany(
+            "INSERT INTO authors (did, handle, display_name, updated_at, last_accessed) VALUES (?, ?, ?, ?, ?4) "
+            "ON CONFLICT(did) DO UPDATE SET handle = excluded.handle, "
+            "display_name = excluded.display_name, updated_at = excluded.updated_at, "
+            "last_accessed = excluded.last_accessed",
+            list(rows['authors'].values())
+        )
+        cursor.executemany(
+            "INSERT INTO post_refs (uri, cid) VALUES (?, ?) "
+            "ON CONFLICT(uri) DO UPDATE SET cid = COALESCE(excluded.cid, post_refs.cid)",
+            list(rows['post_refs'].values())
+        )
+        # 引用元はカウントの一部しか分からないため、未保存の場合のみ追加
+        cursor.executemany(
+            "INSERT INTO posts (id, author_id, text, like_count, repost_count, indexed_at, cached_at, "
+            "last_accessed) VALUES ((SELECT id FROM post_refs WHERE uri = ?1), "
+            "(SELECT id FROM authors WHERE did = ?2), ?3, ?4, ?5, ?6, ?7, ?7) "
+            "ON CONFLICT(id) DO UPDATE SET last_accessed = excluded.last_accessed",
+            rows['quotes']
+        )
+        cursor.executemany(
+            "INSERT INTO posts (id, author_id, text, reply_parent_id, reply_root_id, quote_id, "
+            "like_count, reply_count, repost_count, indexed_at, cached_at, last_accessed) "
+            "VALUES ((SELECT id FROM post_refs WHERE uri = ?1), (SELECT id FROM authors WHERE did = ?2), ?3, "
+            "(SELECT id FROM post_refs WHERE uri = ?4), (SELECT id FROM post_refs WHERE uri = ?5), "
+            "(SELECT id FROM post_refs WHERE uri = ?6), ?7, ?8, ?9, ?10, ?11, ?11) "
+            "ON CONFLICT(id) DO UPDATE SET text = excluded.text, author_id = excluded.author_id, "
+            "reply_parent_id = excluded.reply_parent_id, reply_root_id = excluded.reply_root_id, "
+            "quote_id = excluded.quote_id, like_count = excluded.like_count, "
+            "reply_count = excluded.reply_count, repost_count = excluded.repost_count, "
+            "indexed_at = excluded.indexed_at, cached_at = excluded.cached_at, "
+            "last_accessed = excluded.last_accessed",
+            rows['posts']
+        )
+        cursor.executemany(
+            "INSERT OR REPLACE INTO timeline_posts (user_did, timeline, post_id, indexed_at, last_accessed) "
+            "VALUES (?1, ?2, (SELECT id FROM post_refs WHERE uri = ?3), ?4, ?5)",
+            rows['timeline_posts']
+        )
+        cursor.executemany(
+            "INSERT INTO post_raw (post_id, dict_id, data, fetched_at) "
+            "VALUES ((SELECT id FROM post_refs WHERE uri = ?1), ?2, ?3, ?4) "
+            "ON CONFLICT(post_id) DO UPDATE SET dict_id = excluded.dict_id, data = excluded.data, "
+            "fetched_at = excluded.fetched_at",
+            rows['post_raw']
+        )
+        for table in RELATION_TABLES:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {table} (user_did, subject_did, uri, created_at) VALUES (?, ?, ?, ?)",
+                rows[table]
+            )
+        cursor.executemany(
+            "UPDATE posts SET last_accessed = ?1 WHERE id = (SELECT id FROM post_refs WHERE uri = ?2)",
+            rows['touch']
+        )
+            
+    def _train_raw_dictionary(self):
+        """辞書なしで圧縮した元のレコードが十分に溜まったら辞書を作成し、それらを圧縮し直す
+        
+        既に辞書がある場合はそれを使う（書き込み用スレッドから呼び出す）。件数の確認と
+        辞書の作成は読み込みだけで行い、作成できなかった場合はしばらく再試行しない。
+        """
+        if time.monotonic() < self._raw_dict_retry_at:
+            return
+        try:
+            cursor = self._cursor()
+            cursor.execute("SELECT id, data FROM compression_dicts ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            if row is not None:
+                self._raw_dicts[row[0]] = row[1]
+                self._raw_dict_id = row[0]
+                return
+                
+            cursor.execute("SELECT COUNT(*) FROM post_raw WHERE dict_id IS NULL")
+            if cursor.fetchone()[0] < RAW_DICT_TRAINING_SAMPLES:
+                return
+                
+            cursor.execute(
+                "SELECT data FROM post_raw WHERE dict_id IS NULL ORDER BY post_id DESC LIMIT ?",
+                (RAW_DICT_MAX_SAMPLES,)
+            )
+            zdict = train_dictionary([decompress(data) for data, in cursor.fetchall()])
+            if not zdict:
+                self._raw_dict_retry_at = time.monotonic() + RAW_DICT_RETRY_INTERVAL
+                logger.warning("元のレコードの圧縮用の辞書を作成できませんでした。しばらくしてから再試行します")
+                return
+                
+            with self._transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO compression_dicts (data, created_at) VALUES (?, ?)",
+                    (zdict, datetime.now().isoformat())
+                )
+                dict_id = cursor.lastrowid
+            self._raw_dicts[dict_id] = zdict
+            self._raw_dict_id = dict_id
+            
+            # 辞書なしで圧縮したレコードを少しずつ圧縮し直す
+            recompressed = 0
+            while True:
+                with self._transaction() as cursor:
+                    cursor.execute(
+                        "SELECT post_id, data FROM post_raw WHERE dict_id IS NULL LIMIT ?",
+                        (RAW_DICT_RECOMPRESS_CHUNK,)
+                    )
+                    plain_rows = cursor.fetchall()
+                    cursor.executemany(
+                        "UPDATE post_raw SET dict_id = ?, data = ? WHERE post_id = ?",
+                        [(dict_id, compress(decompress(data), zdict), post_id) for post_id, data in plain_rows]
+                    )
+                recompressed += len(plain_rows)
+                if len(plain_rows) < RAW_DICT_RECOMPRESS_CHUNK:
+                    break
+                    
+            logger.info(
+                f"元のレコードの圧縮用の辞書を作成しました: {len(zdict)}バイト, "
+                f"{recompressed}件を圧縮し直しました"
+            )
+        except Exception as e:
+            self._raw_dict_retry_at = time.monotonic() + RAW_DICT_RETRY_INTERVAL
+            logger.error(f"圧縮用の辞書の作成に失敗しました: {str(e)}", exc_info=True)
+            
+    def _raw_dictionary(self, cursor, dict_id):
+        """圧縮に使用した辞書を取得
+        
+        Args:
+            cursor: データベースカーソル
+            dict_id (int): 辞書のID。Noneの場合は辞書なし
+            
+        Returns:
+            bytes: 辞書。辞書なしの場合はNone
+        """
+        if dict_id is None:
+            return None
+        zdict = self._raw_dicts.get(dict_id)
+        if zdict is None:
+            cursor.execute("SELECT data FROM compression_dicts WHERE id = ?", (dict_id,))
+            zdict = cursor.fetchone()[0]
+            self._raw_dicts[dict_id] = zdict
+        return zdict
+        
+    def load_raw_record(self, uri):
+        """投稿の元のレコードを展開して取得
+        
+        Args:
+            uri (str): 投稿のURI
+            
+        Returns:
+            dict: レコード（APIのJSONをそのまま辞書にしたもの）。保存されていない場合はNone
+        """
+        try:
+            cursor = self._cursor()
+            cursor.execute(
+                "SELECT raw.dict_id, raw.data FROM post_raw raw "
+                "JOIN post_refs r ON r.id = raw.post_id WHERE r.uri = ?",
+                (uri,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return json.loads(decompress(row[1], self._raw_dictionary(cursor, row[0])))
+        except Exception as e:
+            logger.error(f"元のレコードの取得に失敗しました: {str(e)}")
+            return None
+            
+    def iter_raw_records(self, batch_size=500):
+        """保存されているすべての元のレコードを順に展開して返す
+        
+        Args:
+            batch_size (int, optional): 1回に読み込む件数
+            
+        Yields:
+            tuple: (投稿のURI, レコード)
+        """
+        last_id = 0
+        while True:
+            cursor = self._cursor()
+            cursor.execute(
+                "SELECT raw.post_id, r.uri, raw.dict_id, raw.data FROM post_raw raw "
+                "JOIN post_refs r ON r.id = raw.post_id WHERE raw.post_id > ? ORDER BY raw.post_id LIMIT ?",
+                (last_id, batch_size)
+            )
+            batch = cursor.fetchall()
+            if not batch:
+                return
+            for post_id, uri, dict_id, data in batch:
+                last_id = post_id
+                yield uri, json.loads(decompress(data, self._raw_dictionary(cursor, dict_id)))
+                
+    def rebuild_posts_from_raw(self, convert, batch_size=500):
+        """元のレコードから投稿のキャッシュを作り直す（スキーマの変更後など、再取得せずに行う）
+        
+        Args:
+            convert (callable): レコードを投稿データ（normalize_postの形式）に変換する関数。
+                変換できない場合はNoneを返す
+            batch_size (int, optional): 1回に保存する件数
+            
+        Returns:
+            int: 保存した投稿の件数
+        """
+        saved = 0
+        posts = []
+        for uri, record in self.iter_raw_records(batch_size):
+            try:
+                post = convert(record)
+            except Exception as e:
+                logger.warning(f"元のレコードを変換できませんでした: {uri}: {str(e)}")
+                continue
+            if post:
+                posts.append(post)
+            if len(posts) >= batch_size:
+                if self.save_posts(posts):
+                    saved += len(posts)
+                posts = []
+        if posts and self.save_posts(posts):
+            saved += len(posts)
+        logger.info(f"元のレコードから投稿を作り直しました: {saved}件")
+        return saved
+        
+    def search_posts(self, query, limit=50):
+        """キャッシュ済みの投稿を全文検索
+        
+        空白で区切った語をすべて含む投稿を、関連度の高い順に返す。
+        3文字未満の語を含む場合は、部分一致で新しい順に返す。
+        
+        Args:
+            query (str): 検索語
+            limit (int, optional): 最大件数
+            
+        Returns:
+            list: 投稿と投稿者の列を含む辞書のリスト。失敗した場合は空のリスト
+        """
+        terms = query.split()
+        if not terms:
+            return []
+            
+        try:
+            cursor = self._cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            if self._has_fts(cursor) and all(len(term) >= FTS_MIN_TERM_LENGTH for term in terms):
+                # 各語をフレーズとして扱い、FTS5の構文として解釈されないようにする
+                match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+                cursor.execute(
+                    f"SELECT {POST_COLUMNS} FROM posts_fts "
+                    f"JOIN posts p ON p.id = posts_fts.rowid {POST_JOINS} "
+                    "WHERE posts_fts MATCH ? ORDER BY bm25(posts_fts), p.indexed_at DESC LIMIT ?",
+                    (match, limit)
+                )
+            else:
+                conditions = ' AND '.join("p.text LIKE ? ESCAPE '\\'" for _ in terms)
+                patterns = [
+                    '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                    for term in terms
+                ]
+                cursor.execute(
+                    f"SELECT {POST_COLUMNS} FROM posts p {POST_JOINS} "
+                    f"WHERE {conditions} ORDER BY p.indexed_at DESC LIMIT ?",
+                    (*patterns, limit)
+                )
+            
+            results = [dict(row) for row in cursor.fetchall()]
+            
+            # 検索で見つかった投稿はキャッシュから削除されにくくする
+            self.touch_posts([row['uri'] for row in results])
+            return results
+        except Exception as e:
+            logger.error(f"投稿の検索に失敗しました: {str(e)}")
+            return []
+            
+    def load_timeline_posts(self, user_did, timeline='home', limit=CACHED_TIMELINE_LIMIT):
+        """保存済みのタイムラインを読み込む（起動時に、ネットワークからの取得を待たずに表示するため）
+        
+        Args:
+            user_did (str): タイムラインを表示していたユーザーのDID
+            timeline (str, optional): タイムラインの名前
+            limit (int, optional): 最大件数（新しいものから）
+            
+        Returns:
+            list: 投稿と投稿者の列（引用元の本文・投稿者を含む）の辞書のリスト（古い順）。
+                失敗した場合は空のリスト
+        """
+        try:
+            cursor = self._cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(
+                f"SELECT {POST_COLUMNS}, quote.cid AS quote_cid, q.text AS quote_text, "
+                "q.like_count AS quote_like_count, q.repost_count AS quote_repost_count, "
+                "q.indexed_at AS quote_indexed_at, qa.did AS quote_author_did, "
+                "qa.handle AS quote_handle, qa.display_name AS quote_display_name "
+                f"FROM timeline_posts t JOIN posts p ON p.id = t.post_id {POST_JOINS} "
+                "LEFT JOIN posts q ON q.id = p.quote_id LEFT JOIN authors qa ON qa.id = q.author_id "
+                "WHERE t.user_did = ? AND t.timeline = ? ORDER BY t.indexed_at DESC LIMIT ?",
+                (user_did, timeline, limit)
+            )
+            results = [dict(row) for row in cursor.fetchall()]
+            results.reverse()
+            return results
+        except Exception as e:
+            logger.error(f"保存済みのタイムラインの読み込みに失敗しました: {str(e)}")
+            return []
+            
+    def _has_fts(self, cursor):
+        """全文検索の仮想テーブルが作成されているかを判定
+        
+        Args:
+            cursor: データベースカーソル
+            
+        Returns:
+            bool: 作成されている場合はTrue
+        """
+        if self._fts_available is None:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='posts_fts'")
+            self._fts_available = cursor.fetchone() is not None
+        return self._fts_available
+        
+    def evict_cache(self, budgets):
+        """容量の上限を超えたキャッシュのテーブルから、最もアクセスされていない行を削除
+        
+        削除は少しずつ別々のトランザクションで行い、最後に空き領域を段階的に解放する。
+        
+        Args:
+            budgets (dict): テーブル名 -> {'max_rows': 最大行数, 'max_mb': 最大サイズ（MB）}
+            
+        Returns:
+            dict: テーブル名 -> 削除した行数
+        """
+        deleted = {}
+        try:
+            for table in EVICTABLE_TABLES:
+                budget = budgets.get(table)
+                if not budget:
+                    continue
+                excess = self._count_excess_rows(table, budget.get('max_rows'), budget.get('max_mb'))
+                if excess > 0:
+                    deleted[table] = self._delete_lru_rows(table, excess)
+                    
+                # 削除した投稿を参照しているタイムライン・元のレコードの行と、どこからも参照されないURIも削除
+                if table == 'posts' and deleted.get('posts'):
+                    with self._transaction() as cursor:
+                        cursor.execute(
+                            "DELETE FROM timeline_posts WHERE NOT EXISTS "
+                            "(SELECT 1 FROM posts WHERE posts.id = timeline_posts.post_id)"
+                        )
+                        deleted['timeline_posts'] = cursor.rowcount
+                        cursor.execute("DELETE FROM post_raw WHERE post_id NOT IN (SELECT id FROM posts)")
+                        deleted['post_raw'] = cursor.rowcount
+                        cursor.execute(
+                            "DELETE FROM post_refs WHERE id NOT IN ("
+                            "SELECT id FROM posts "
+                            "UNION SELECT reply_parent_id FROM posts WHERE reply_parent_id IS NOT NULL "
+                            "UNION SELECT reply_root_id FROM posts WHERE reply_root_id IS NOT NULL "
+                            "UNION SELECT quote_id FROM posts WHERE quote_id IS NOT NULL)"
+                        )
+                        deleted['post_refs'] = cursor.rowcount
+                        
+            if deleted:
+                freed_pages = self._incremental_vacuum()
+                logger.info(f"キャッシュを整理しました: 削除={deleted}, 解放したページ={freed_pages}")
+        except Exception as e:
+            logger.error(f"キャッシュの整理に失敗しました: {str(e)}", exc_info=True)
+        return deleted
+        
+    def _count_excess_rows(self, table, max_rows=None, max_mb=None):
+        """上限に収めるために削除する行数を求める
+        
+        Args:
+            table (str): テーブル名
+            max_rows (int, optional): 最大行数
+            max_mb (float, optional): 最大サイズ（MB、インデックスを含む）
+            
+        Returns:
+            int: 削除する行数
+        """
+        cursor = self._cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        rows = cursor.fetchone()[0]
+        if not rows:
+            return 0
+            
+        keep = rows
+        if max_rows is not None and rows > max_rows:
+            keep = int(max_rows * EVICTION_TARGET_RATIO)
+            
+        if max_mb is not None:
+            size = self._table_bytes(cursor, table)
+            max_bytes = max_mb * 1024 * 1024
+            if size is not None and size > max_bytes:
+                # 1行あたりの平均サイズから、上限に収まる行数を見積もる
+                keep = min(keep, int(rows * max_bytes * EVICTION_TARGET_RATIO / size))
+                
+        return rows - keep
+        
+    def _table_bytes(self, cursor, table):
+        """テーブルとそのインデックスが使用しているバイト数を取得
+        
+        Args:
+            cursor: データベースカーソル
+            table (str): テーブル名
+            
+        Returns:
+            int: バイト数。dbstatに対応していないSQLiteの場合はNone
+        """
+        if self._dbstat_available is False:
+            return None
+        try:
+            cursor.execute(
+                "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE tbl_name = ?)",
+                (table,)
+            )
+            self._dbstat_available = True
+            return cursor.fetchone()[0]
+        except sqlite3.OperationalError:
+            logger.debug("dbstatを利用できないため、キャッシュのサイズの上限は行数のみで判定します")
+            self._dbstat_available = False
+            return None
+            
+    def _delete_lru_rows(self, table, count):
+        """最もアクセスされていない行から削除
+        
+        投稿者は、キャッシュ済みの投稿やユーザーの関係から参照されていないものだけを削除する。
+        
+        Args:
+            table (str): テーブル名
+            count (int): 削除する行数
+            
+        Returns:
+            int: 実際に削除した行数
+        """
+        condition = ''
+        if table == 'authors':
+            condition = "WHERE " + " AND ".join(
+                f"NOT EXISTS (SELECT 1 FROM {ref} WHERE {ref}.{column} = authors.{key})"
+                for ref, column, key in (('posts', 'author_id', 'id'), ('follows', 'subject_did', 'did'),
+                                         ('blocks', 'subject_did', 'did'), ('mutes', 'subject_did', 'did'))
+            )
+            
+        deleted = 0
+        while deleted < count:
+            with self._transaction() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} {condition} "
+                    "ORDER BY last_accessed LIMIT ?)",
+                    (min(EVICTION_CHUNK_ROWS, count - deleted),)
+                )
+                if cursor.rowcount <= 0:
+                    break
+                deleted += cursor.rowcount
+        return deleted
+        
+    def enable_incremental_vacuum(self):
+        """空き領域を段階的に解放できるよう、auto_vacuumをINCREMENTALに切り替える
+        
+        新しいデータベースは作成時に設定済み。既存のデータベースの切り替えには
+        データベース全体を書き直すVACUUMが必要なため、アイドル時に1回だけ実行する。
+        
+        Returns:
+            bool: 再構成した場合はTrue
+        """
+        conn = self._connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            return False
+            
+        try:
+            logger.info("空き領域を段階的に解放できるよう、データベースを再構成しています...")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            logger.info("データベースを再構成しました")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"データベースの再構成に失敗しました: {str(e)}")
+            return False
+            
+    def _incremental_vacuum(self):
+        """空きページを少しずつファイルから解放
+        
+        Returns:
+            int: 解放したページ数
+        """
+        conn = self._connection()
+        freed = 0
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages <= 0:
+                break
+            # PRAGMAの結果を最後まで読まないと解放が完了しない
+            conn.execute(f"PRAGMA incremental_vacuum({VACUUM_CHUNK_PAGES})").fetchall()
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free_pages:
+                break
+            freed += free_pages - remaining
+        return freed
@@ -26,6 +26,8 @@ AUTH_SESSION_DELETED = "auth.session.deleted" # セッションが削除され
 POST_SUBMIT_START = "post.submit.start"  # 投稿処理開始
 POST_SUBMIT_SUCCESS = "post.submit.success"  # 投稿成功 (引数: result)
 POST_SUBMIT_FAILURE = "post.submit.failure"  # 投稿失敗 (引数: error)
+POST_SUBMIT_QUEUED = "post.submit.queued"  # 送信待ちキューに追加 (引数: pending)
+POST_SUBMIT_RETRY = "post.submit.retry"  # 送信に失敗し再試行待ち (引数: error, attempts)
 
 # いいね関連イベント
 LIKE_START = "post.like.start"  # いいね処理開始 (引数: uri)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+アップロード前の画像処理をワーカープロセスで行うモジュール
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.file_utils import read_binary_file, get_mime_type
+from utils.image_utils import prepare_image, MAX_IMAGE_DIMENSION, MAX_IMAGE_BYTES
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+class ImagePreparer:
+    """画像の縮小・再圧縮をプロセスプールで実行するクラス（シングルトン）
+
+    処理結果は元データのSHA-256をキーにメモリ上へキャッシュし、
+    同じ画像を再度添付した場合は再エンコードを行わない。
+    結果には処理後の画像データのSHA-256を付ける（アップロード済みブロブのキャッシュのキー）。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """シングルトンパターンの実装"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(ImagePreparer, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self, max_workers=None, cache_entries=16, cache_bytes=32 * 1024 * 1024):
+        """初期化
+
+        Args:
+            max_workers (int, optional): ワーカープロセス数。省略時はCPU数（最大4）
+            cache_entries (int, optional): キャッシュする画像の最大件数
+            cache_bytes (int, optional): キャッシュする画像データの合計上限（バイト）
+        """
+        if self._initialized:
+            return
+
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self._cache_lock = threading.Lock()
+        self._initialized = True
+
+    def prepare_files(self, file_paths, max_dimension=MAX_IMAGE_DIMENSION, max_bytes=MAX_IMAGE_BYTES):
+        """複数の画像ファイルを並列に処理する
+
+        Args:
+            file_paths (list): 画像ファイルのパスのリスト
+            max_dimension (int, optional): 長辺の最大ピクセル数
+            max_bytes (int, optional): 1枚あたりの最大バイト数
+
+        Returns:
+            list: (画像データ, MIMEタイプ, 画像データのSHA-256)のタプルのリスト（入力と同じ順序）
+
+        Raises:
+            Exception: ファイルの読み込みに失敗した場合
+        """
+        results = [None] * len(file_paths)
+        pending = []
+        submitted = {}
+
+        for index, file_path in enumerate(file_paths):
+            data = read_binary_file(file_path)
+            if not data:
+                raise Exception(f"ファイルの読み込みに失敗しました: {file_path}")
+
+            key = (hashlib.sha256(data).hexdigest(), max_dimension, max_bytes)
+            cached = self._get_cached(key)
+            if cached:
+                logger.debug(f"画像処理結果をキャッシュから取得しました: {file_path}")
+                results[index] = cached
+                continue
+
+            # 同じ画像が複数添付された場合は1回だけ処理する
+            mime_type = get_mime_type(file_path)
+            if key not in submitted:
+                submitted[key] = self._submit(data, mime_type, max_dimension, max_bytes)
+            future = submitted[key]
+            pending.append((index, key, data, mime_type, future))
+
+        for index, key, data, mime_type, future in pending:
+            prepared = self._resolve(future, data, mime_type, max_dimension, max_bytes)
+            logger.info(f"画像を処理しました: {len(data)} -> {len(prepared[0])} バイト ({prepared[1]})")
+            # ブロブはアップロードした内容で再利用するため、処理後のデータのハッシュを付ける
+            prepared = prepared + (hashlib.sha256(prepared[0]).hexdigest(),)
+            self._put_cached(key, prepared)
+            results[index] = prepared
+
+        return results
+
+    def shutdown(self):
+        """ワーカープロセスを終了する"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _submit(self, data, mime_type, max_dimension, max_bytes):
+        """画像処理をプロセスプールに投入する
+
+        Returns:
+            Future: 処理結果のFuture。プールが使えない場合はNone
+        """
+        try:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                return self._executor.submit(prepare_image, data, mime_type, max_dimension, max_bytes)
+        except Exception as e:
+            logger.warning(f"プロセスプールを利用できないため、スレッド内で画像を処理します: {str(e)}")
+            return None
+
+    def _resolve(self, future, data, mime_type, max_dimension, max_bytes):
+        """Futureの結果を取得する。失敗時は現在のスレッドで処理し直す
+
+        Returns:
+            tuple: (画像データ, MIMEタイプ)
+        """
+        if future is not None:
+            try:
+                return future.result()
+            except BrokenProcessPool as e:
+                logger.warning(f"ワーカープロセスが異常終了しました: {str(e)}")
+                self.shutdown()
+            except Exception as e:
+                logger.warning(f"画像の縮小に失敗しました。元の画像を使用します: {str(e)}")
+                return data, mime_type
+
+        try:
+            return prepare_image(data, mime_type, max_dimension, max_bytes)
+        except Exception as e:
+            logger.warning(f"画像の縮小に失敗しました。元の画像を使用します: {str(e)}")
+            return data, mime_type
+
+    def _get_cached(self, key):
+        """キャッシュから処理結果を取得する"""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+            return cached
+
+    def _put_cached(self, key, prepared):
+        """処理結果をキャッシュに追加し、上限を超えた古いものを破棄する"""
+        size = len(prepared[0])
+        if size > self.cache_bytes:
+            return
+
+        with self._cache_lock:
+            if key in self._cache:
+                return
+            self._cache[key] = prepared
+            self._cache_size += size
+            while len(self._cache) > self.cache_entries or self._cache_size > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted[0])
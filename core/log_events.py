@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+構造化ログ（イベント）モジュール
+
+設定の advanced.log_format を 'json' にすると、ログファイルに1行に1つのJSONオブジェクトを出力し、
+クライアントとタイムラインの処理ごとにイベント（event, endpoint, request_id, duration_ms, count, outcome）を記録する。
+同じリクエストID（タイムラインの取得と、その中で呼び出したAPIなど）で関連するイベントをまとめて検索できる。
+既定の 'text' では従来の形式で出力し、イベントは記録しない。
+"""
+
+import json
+import uuid
+import logging
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+
+# ログの形式
+LOG_FORMAT_TEXT = 'text'
+LOG_FORMAT_JSON = 'json'
+LOG_FORMATS = (LOG_FORMAT_TEXT, LOG_FORMAT_JSON)
+
+# イベントの項目を保持するログレコードの属性名
+EVENT_ATTR = 'ssky_event'
+
+# イベントの結果
+OUTCOME_OK = 'ok'
+OUTCOME_FAILED = 'failed'  # メソッドが失敗を戻り値（False）で返した
+OUTCOME_ERROR = 'error'    # 例外が発生した
+
+# 件数を数える応答の属性（タイムライン・ユーザー一覧など）
+COUNTED_ATTRIBUTES = ('feed', 'follows', 'followers', 'blocks', 'mutes', 'posts', 'notifications')
+
+# イベントを記録するかどうか（setup_loggingでログの形式に合わせて設定する）
+_enabled = False
+
+# 現在のリクエストID（スレッド・コンテキストごと）
+_request_id = contextvars.ContextVar('ssky_request_id', default=None)
+
+def set_enabled(enabled):
+    """イベントを記録するかどうかを設定する
+
+    Args:
+        enabled (bool): 記録する場合はTrue
+    """
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_enabled():
+    """イベントを記録するかどうか
+
+    Returns:
+        bool: 記録する場合はTrue
+    """
+    return _enabled
+
+def new_request_id():
+    """新しいリクエストIDを作成する
+
+    Returns:
+        str: リクエストID（16進数12桁）
+    """
+    return uuid.uuid4().hex[:12]
+
+def current_request_id():
+    """現在のリクエストIDを取得する
+
+    Returns:
+        str: リクエストID。request_scopeの外ではNone
+    """
+    return _request_id.get()
+
+@contextmanager
+def request_scope(request_id=None):
+    """ブロック内で記録するイベントに同じリクエストIDを付ける
+
+    既にリクエストIDがある場合（外側のrequest_scopeの中など）は、そのIDを引き継ぐ。
+
+    Args:
+        request_id (str, optional): リクエストID。省略した場合は新しく作成する
+
+    Yields:
+        str: リクエストID
+    """
+    current = _request_id.get()
+    if current is not None and request_id is None:
+        yield current
+        return
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+def count_items(result):
+    """応答に含まれる項目の数を数える
+
+    Args:
+        result: メソッドの戻り値
+
+    Returns:
+        int: 項目の数。数えられない場合はNone
+    """
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    for name in COUNTED_ATTRIBUTES:
+        items = getattr(result, name, None)
+        if isinstance(items, (list, tuple)):
+            return len(items)
+    return None
+
+def log_event(logger, event, level=logging.INFO, **fields):
+    """イベントを記録する（イベントを記録しない設定の場合は何もしない）
+
+    Args:
+        logger (logging.Logger): 出力するロガー
+        event (str): イベント名（'api_call'、'timeline_fetch'など）
+        level (int, optional): ログレベル
+        **fields: イベントの項目（endpoint, duration_ms, count, outcomeなど。Noneの項目は記録しない）
+    """
+    if not _enabled or not logger.isEnabledFor(level):
+        return
+    record_fields = {'event': event}
+    request_id = _request_id.get()
+    if request_id is not None:
+        record_fields['request_id'] = request_id
+    for key, value in fields.items():
+        if value is not None:
+            record_fields[key] = round(value, 1) if key == 'duration_ms' else value
+    logger.log(level, "%s", EventMessage(record_fields), extra={EVENT_ATTR: record_fields})
+
+def log_call(logger, endpoint, duration_ms, result=None, error=None):
+    """APIの呼び出しをイベントとして記録する
+
+    Args:
+        logger (logging.Logger): 出力するロガー
+        endpoint (str): エンドポイント名
+        duration_ms (float): 所要時間（ミリ秒）
+        result: メソッドの戻り値
+        error (BaseException, optional): 発生した例外
+    """
+    if error is not None:
+        log_event(logger, 'api_call', logging.WARNING, endpoint=endpoint, duration_ms=duration_ms,
+                  outcome=OUTCOME_ERROR, error=type(error).__name__)
+    elif result is False:
+        log_event(logger, 'api_call', logging.WARNING, endpoint=endpoint, duration_ms=duration_ms,
+                  outcome=OUTCOME_FAILED)
+    else:
+        log_event(logger, 'api_call', endpoint=endpoint, duration_ms=duration_ms,
+                  count=count_items(result), outcome=OUTCOME_OK)
+
+class EventMessage:
+    """イベントのメッセージ（テキスト形式の出力先に出力する場合だけ文字列にする）"""
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields):
+        """初期化
+
+        Args:
+            fields (dict): イベントの項目
+        """
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+class JsonFormatter(logging.Formatter):
+    """ログレコードを1行のJSONオブジェクトにするフォーマッタ
+
+    共通の項目（ts, level, logger, thread, message）に、イベントの項目と例外の情報（exc）を加える。
+    """
+
+    def format(self, record):
+        """ログレコードをJSONの文字列にする
+
+        Args:
+            record (logging.LogRecord): ログレコード
+
+        Returns:
+            str: JSONの文字列（改行を含まない）
+        """
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).astimezone().isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, EVENT_ATTR, None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ログファイルの保持期間の管理モジュール
+
+起動のたびに作成されるログファイル（ローテーションしたファイルを含む）のうち、以前の起動のものを
+gzipで圧縮し、保持期間・合計サイズ・ファイル数の上限（設定のadvanced.log_retention）を超えた古いものを削除する。
+現在書き込み中のファイル（今回の起動のファイル）は圧縮・削除しない。
+"""
+
+import os
+import re
+import gzip
+import time
+import shutil
+import logging
+import threading
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 起動してから最初に整理するまでの待ち時間（秒）。起動直後の処理と重ならないようにする
+INITIAL_DELAY = 60
+
+# 整理を行う間隔（秒）。起動したまま日をまたいだ場合のため
+RETENTION_INTERVAL = 24 * 60 * 60
+
+# ログファイル名（ローテーションしたファイルと圧縮したファイルを含む）
+LOG_FILE_PATTERN = re.compile(r'.+\.log(\.\d+)?(\.gz)?$')
+
+# 圧縮したファイルの拡張子
+COMPRESSED_SUFFIX = '.gz'
+
+def list_log_files(log_dir):
+    """ディレクトリ内のログファイルを列挙する
+
+    Args:
+        log_dir (str): ログディレクトリ
+
+    Returns:
+        list: (パス, サイズ, 更新日時)のタプルのリスト（更新日時の古い順）
+    """
+    files = []
+    try:
+        names = os.listdir(log_dir)
+    except FileNotFoundError:
+        return files
+    for name in names:
+        if not LOG_FILE_PATTERN.match(name):
+            continue
+        path = os.path.join(log_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            files.append((path, stat.st_size, stat.st_mtime))
+    files.sort(key=lambda item: (item[2], item[0]))
+    return files
+
+def compress_file(path):
+    """ファイルをgzipで圧縮し、元のファイルを削除する（更新日時は元のファイルのものを引き継ぐ）
+
+    Args:
+        path (str): 圧縮するファイルのパス
+
+    Returns:
+        str: 圧縮したファイルのパス
+    """
+    compressed_path = path + COMPRESSED_SUFFIX
+    temp_path = compressed_path + '.tmp'
+    stat = os.stat(path)
+    try:
+        with open(path, 'rb') as src, gzip.open(temp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.utime(temp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(temp_path, compressed_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.remove(path)
+    return compressed_path
+
+class LogRetention:
+    """以前の起動のログファイルを圧縮し、上限を超えた古いものを削除するクラス
+
+    上限（保持日数・合計サイズ・ファイル数）は実行のたびに取得するため、設定の変更は次回の整理から反映される。
+    """
+
+    def __init__(self, active_file, policy_provider, log_dir=None):
+        """初期化
+
+        Args:
+            active_file (str): 現在書き込み中のログファイルのパス（ローテーションしたファイルも対象外にする）
+            policy_provider (callable): 上限の辞書（max_age_days, max_total_mb, max_files）を返す関数
+            log_dir (str, optional): ログディレクトリ。省略した場合はactive_fileのディレクトリ
+        """
+        self.active_file = os.path.abspath(active_file)
+        self.log_dir = log_dir or os.path.dirname(self.active_file)
+        self.policy_provider = policy_provider
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """整理用のスレッドを開始する"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        # 停止直後に再開した場合に古いスレッドが動き続けないよう、スレッドごとに停止フラグを作る
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="LogRetention")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """整理用のスレッドを停止する"""
+        self._stop_event.set()
+        self._thread = None
+
+    def is_active(self, path):
+        """現在書き込み中のファイル（今回の起動のファイルとローテーションしたファイル）かどうか
+
+        Args:
+            path (str): ファイルのパス
+
+        Returns:
+            bool: 書き込み中の場合はTrue
+        """
+        return os.path.abspath(path).startswith(self.active_file)
+
+    def run_once(self, now=None):
+        """ログファイルを圧縮し、上限を超えた古いファイルを削除する
+
+        Args:
+            now (float, optional): 現在時刻（time.time()の値）
+
+        Returns:
+            dict: {'compressed': 圧縮したファイルの数, 'deleted': 削除したファイルの数,
+                'freed_bytes': 圧縮と削除で減ったサイズ, 'total_bytes': 整理後の合計サイズ}
+        """
+        now = time.time() if now is None else now
+        policy = self.policy_provider() or {}
+        result = {'compressed': 0, 'deleted': 0, 'freed_bytes': 0, 'total_bytes': 0}
+
+        # 以前の起動のファイルを圧縮
+        for path, size, _ in list_log_files(self.log_dir):
+            if path.endswith(COMPRESSED_SUFFIX) or self.is_active(path):
+                continue
+            try:
+                compressed_path = compress_file(path)
+                result['compressed'] += 1
+                result['freed_bytes'] += size - os.path.getsize(compressed_path)
+            except Exception as e:
+                logger.error(f"ログファイルの圧縮に失敗しました: {path}: {str(e)}")
+
+        # 古い順に、保持期間を過ぎたものと、合計サイズ・ファイル数の上限を超えた分を削除
+        files = list_log_files(self.log_dir)
+        max_age_days = policy.get('max_age_days')
+        max_total_bytes = policy['max_total_mb'] * 1024 * 1024 if policy.get('max_total_mb') else None
+        max_files = policy.get('max_files')
+        total_bytes = sum(size for _, size, _ in files)
+        count = len(files)
+        for path, size, mtime in files:
+            if self.is_active(path):
+                continue
+            expired = bool(max_age_days) and now - mtime > max_age_days * 24 * 60 * 60
+            over_size = max_total_bytes is not None and total_bytes > max_total_bytes
+            over_count = bool(max_files) and count > max_files
+            if not (expired or over_size or over_count):
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"ログファイルの削除に失敗しました: {path}: {str(e)}")
+                continue
+            total_bytes -= size
+            count -= 1
+            result['deleted'] += 1
+            result['freed_bytes'] += size
+
+        result['total_bytes'] = total_bytes
+        if result['compressed'] or result['deleted']:
+            logger.info(
+                f"ログファイルを整理しました: 圧縮{result['compressed']}件, 削除{result['deleted']}件, "
+                f"{result['freed_bytes'] / 1024 / 1024:.1f}MB削減（残り{count}件, {total_bytes / 1024 / 1024:.1f}MB）"
+            )
+        return result
+
+    def _run(self, stop_event):
+        """整理用スレッドのメインループ
+
+        Args:
+            stop_event (threading.Event): このスレッドの停止フラグ
+        """
+        wait = INITIAL_DELAY
+        while not stop_event.wait(wait):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"ログファイルの整理中にエラーが発生しました: {str(e)}", exc_info=True)
+            wait = RETENTION_INTERVAL
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+メモリ使用量の監視モジュール（長時間の実行でのリークの調査用）
+
+tracemallocで定期的にスナップショットを取り、開始時点からの増加が大きい箇所（ファイルと行）と、
+登録した計数（PubSubの購読数、生きているダイアログの数など）を記録してログに出力する。
+tracemallocはメモリの確保のたびに記録するため遅くなる。既定では無効で、環境変数で有効にする:
+    SSKY_MEMORY_MONITOR=1      既定の間隔（300秒）で監視する
+    SSKY_MEMORY_MONITOR=60     60秒ごとに監視する
+"""
+
+import gc
+import os
+import time
+import logging
+import threading
+import tracemalloc
+from collections import deque
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 監視を有効にする環境変数（値は間隔の秒数。1などの小さい値は既定の間隔）
+MEMORY_MONITOR_ENV = 'SSKY_MEMORY_MONITOR'
+
+# 既定の監視の間隔（秒）
+DEFAULT_INTERVAL = 300
+
+# 環境変数の値がこれ未満の場合は、有効にする指定とみなして既定の間隔を使う
+MIN_INTERVAL = 10
+
+# 増加の大きい箇所を記録する数
+TOP_SITES = 10
+
+# 記録するスタックの深さ（深いほど確保ごとの負荷が大きい）
+TRACE_FRAMES = 1
+
+# 保持するサンプルの数（既定の間隔で24時間分）
+MAX_SAMPLES = 288
+
+# 集計から除く確保元（監視自体と、モジュールの読み込み）
+IGNORED_FILENAMES = (
+    tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>'
+)
+
+def monitor_interval_from_env():
+    """環境変数から監視の間隔を取得する
+
+    Returns:
+        int: 間隔（秒）。監視が有効でない場合はNone
+    """
+    value = os.environ.get(MEMORY_MONITOR_ENV, '').strip()
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    try:
+        interval = int(value)
+    except ValueError:
+        return DEFAULT_INTERVAL
+    return interval if interval >= MIN_INTERVAL else DEFAULT_INTERVAL
+
+def count_pubsub_listeners(pub):
+    """PubSubのトピックごとの購読数を数える
+
+    Args:
+        pub: pubsub.pub
+
+    Returns:
+        dict: トピック名 -> 購読数（購読のあるトピックのみ）
+    """
+    counts = {}
+    stack = [pub.getDefaultTopicMgr().getRootAllTopics()]
+    while stack:
+        topic = stack.pop()
+        count = topic.getNumListeners()
+        if count:
+            counts[topic.getName()] = count
+        stack.extend(topic.getSubtopics())
+    return counts
+
+def count_instances(classes):
+    """生きているインスタンスの数を数える（ガベージコレクタが追跡しているオブジェクトのみ）
+
+    Args:
+        classes (dict): 名前 -> クラス（またはクラスのタプル）
+
+    Returns:
+        dict: 名前 -> インスタンスの数
+    """
+    counts = dict.fromkeys(classes, 0)
+    for obj in gc.get_objects():
+        for name, cls in classes.items():
+            if isinstance(obj, cls):
+                counts[name] += 1
+    return counts
+
+def detect_growth(values, warmup=1, tolerance=0):
+    """サンプルの系列が増え続けているかを判定する
+
+    ウォームアップ後のサンプルに最小二乗法で直線を当てはめ、その期間の増加量が許容量を超えた場合に
+    増え続けているとみなす（一時的な増減では判定しない）。
+
+    Args:
+        values (list): サンプルの値（メモリ使用量など）
+        warmup (int, optional): 判定から除く最初のサンプルの数（キャッシュが満ちるまでなど）
+        tolerance (float, optional): 許容する増加量
+
+    Returns:
+        tuple: (増え続けている場合はTrue, 当てはめた直線による期間中の増加量)
+    """
+    values = list(values)[warmup:]
+    if len(values) < 3:
+        return False, 0.0
+    count = len(values)
+    mean_x = (count - 1) / 2
+    mean_y = sum(values) / count
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    denominator = sum((x - mean_x) ** 2 for x in range(count))
+    growth = numerator / denominator * (count - 1)
+    return growth > tolerance, growth
+
+class MemoryMonitor:
+    """メモリ使用量を定期的に記録するクラス"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, top=TOP_SITES, frames=TRACE_FRAMES, max_samples=MAX_SAMPLES,
+                 ignored=()):
+        """初期化
+
+        Args:
+            interval (int, optional): 記録する間隔（秒）
+            top (int, optional): 増加の大きい箇所を記録する数
+            frames (int, optional): tracemallocで記録するスタックの深さ
+            max_samples (int, optional): 保持するサンプルの数
+            ignored (tuple, optional): 集計から除く確保元のファイル名（fnmatchのパターン）
+        """
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.ignored = IGNORED_FILENAMES + tuple(ignored)
+        self._counters = {}
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._baseline = None
+        self._started_at = None
+        self._started_tracing = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        """記録中かどうか"""
+        return self._baseline is not None
+
+    @property
+    def samples(self):
+        """記録したサンプルのリスト（古い順）"""
+        with self._lock:
+            return list(self._samples)
+
+    def add_counter(self, name, func):
+        """サンプルごとに記録する計数を登録する
+
+        Args:
+            name (str): 計数の名前
+            func (callable): 数（または名前 -> 数の辞書）を返す関数
+        """
+        self._counters[name] = func
+
+    def start(self, thread=True):
+        """記録を開始する（開始時点のスナップショットを基準にする）
+
+        Args:
+            thread (bool, optional): 一定間隔で記録するスレッドを開始する場合はTrue
+                （Falseの場合はsampleを呼び出したときだけ記録する）
+        """
+        if self.is_running:
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._started_at = time.monotonic()
+        self._baseline = self._take_snapshot()
+        logger.info(f"メモリの監視を開始しました（間隔: {self.interval}秒）")
+
+        if thread:
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="MemoryMonitor")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """記録を停止する（このクラスで開始したtracemallocも停止する）"""
+        self._stop_event.set()
+        self._thread = None
+        self._baseline = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def sample(self):
+        """現在のメモリ使用量と計数を記録する
+
+        Returns:
+            dict: {'elapsed_s', 'traced_bytes'（除外した確保元を除く使用量）, 'peak_bytes'（プロセス全体の最大）,
+                'growth_bytes', 'counters', 'top_growth'}。記録中でない場合はNone
+        """
+        baseline = self._baseline
+        if baseline is None:
+            return None
+
+        snapshot = self._take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.compare_to(baseline, 'lineno')
+        top_growth = [
+            {
+                'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+            }
+            for stat in stats[:self.top] if stat.size_diff > 0
+        ]
+
+        counters = {}
+        for name, func in self._counters.items():
+            try:
+                counters[name] = func()
+            except Exception as e:
+                logger.error(f"メモリの監視の計数（{name}）の取得中にエラーが発生しました: {str(e)}")
+
+        record = {
+            'elapsed_s': round(time.monotonic() - self._started_at, 1),
+            'traced_bytes': sum(stat.size for stat in stats),
+            'peak_bytes': peak,
+            'growth_bytes': sum(stat.size_diff for stat in stats),
+            'counters': counters,
+            'top_growth': top_growth,
+        }
+        with self._lock:
+            self._samples.append(record)
+        return record
+
+    def report(self, record=None):
+        """サンプルを文字列にする
+
+        Args:
+            record (dict, optional): サンプル。省略した場合は最後のサンプル
+
+        Returns:
+            str: 報告（サンプルがない場合は空文字列）
+        """
+        if record is None:
+            samples = self.samples
+            if not samples:
+                return ""
+            record = samples[-1]
+
+        lines = [
+            f"メモリ: {record['traced_bytes'] / 1024 / 1024:.1f}MB（開始時から{record['growth_bytes'] / 1024:+.0f}KB, "
+            f"最大{record['peak_bytes'] / 1024 / 1024:.1f}MB, 経過{record['elapsed_s']:.0f}秒）"
+        ]
+        for name, value in record['counters'].items():
+            if isinstance(value, dict):
+                total = sum(value.values())
+                details = ", ".join(f"{key}={count}" for key, count in sorted(value.items()))
+                lines.append(f"  {name}: {total}（{details}）")
+            else:
+                lines.append(f"  {name}: {value}")
+        if record['top_growth']:
+            lines.append("  開始時からの増加の大きい箇所:")
+            for stat in record['top_growth']:
+                lines.append(f"    {stat['size_diff'] / 1024:+10.1f}KB {stat['count_diff']:+8}個  {stat['site']}")
+        return "\n".join(lines)
+
+    def _take_snapshot(self):
+        """監視自体・モジュールの読み込み・除外を指定した確保元を除いたスナップショットを取る"""
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in self.ignored]
+        )
+
+    def _run(self, stop_event):
+        """記録用スレッドのメインループ
+
+        Args:
+            stop_event (threading.Event): このスレッドの停止フラグ
+        """
+        while not stop_event.wait(self.interval):
+            try:
+                record = self.sample()
+                if record is not None:
+                    logger.info(self.report(record))
+            except Exception as e:
+                logger.error(f"メモリの監視中にエラーが発生しました: {str(e)}", exc_info=True)
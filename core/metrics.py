@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+API呼び出しの計測モジュール（呼び出し回数・エラー回数・レイテンシのヒストグラム）
+"""
+
+import time
+import bisect
+import logging
+import threading
+import functools
+from core.log_events import is_enabled as events_enabled, request_scope, log_call
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# レイテンシのヒストグラムのバケットの上限（ミリ秒）。最後のバケットはこれを超えたもの
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 750, 1000, 1500, 2500, 5000, 10000, 30000)
+
+# 表示するパーセンタイル
+PERCENTILES = (50, 95, 99)
+
+class LatencyHistogram:
+    """固定のバケットで数えるレイテンシのヒストグラム（1つのエンドポイント分）
+
+    記録はバケットの添字を求めてカウンタを増やすだけで、個々の値は保持しない。
+    パーセンタイルはバケット内で線形補間した近似値になる。
+    """
+
+    __slots__ = ('buckets', 'count', 'errors', 'total_ms', 'max_ms', '_lock')
+
+    def __init__(self):
+        """初期化"""
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms, error=False):
+        """1回の呼び出しを記録する
+
+        Args:
+            duration_ms (float): 所要時間（ミリ秒）
+            error (bool, optional): 例外が発生した場合はTrue
+        """
+        index = bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total_ms += duration_ms
+            if duration_ms > self.max_ms:
+                self.max_ms = duration_ms
+            if error:
+                self.errors += 1
+
+    def clear(self):
+        """すべての記録を消去する"""
+        with self._lock:
+            self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            self.count = 0
+            self.errors = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+
+    def percentile(self, p):
+        """パーセンタイルの近似値を求める
+
+        Args:
+            p (float): パーセンタイル（0〜100）
+
+        Returns:
+            float: 所要時間（ミリ秒）。記録がない場合はNone
+        """
+        with self._lock:
+            buckets = list(self.buckets)
+            count = self.count
+            max_ms = self.max_ms
+        if not count:
+            return None
+
+        rank = count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0
+                upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else max_ms
+                # 実際の最大値を超えないようにする
+                upper = min(upper, max_ms)
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return max_ms
+
+    def snapshot(self):
+        """現在の値を取得する
+
+        Returns:
+            dict: 'count'、'errors'、'avg_ms'、'max_ms'、'p50'などのパーセンタイル、'buckets'
+        """
+        with self._lock:
+            result = {
+                'count': self.count,
+                'errors': self.errors,
+                'avg_ms': self.total_ms / self.count if self.count else None,
+                'max_ms': self.max_ms if self.count else None,
+                'buckets': list(self.buckets),
+            }
+        for p in PERCENTILES:
+            result[f'p{p}'] = self.percentile(p)
+        return result
+
+class ClientMetrics:
+    """エンドポイント（BlueskyClientのメソッド）ごとの計測値を保持するクラス（シングルトン）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """シングルトンパターンの実装"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(ClientMetrics, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        """初期化（一度だけ実行）"""
+        if self._initialized:
+            return
+
+        self._histograms = {}
+        self._histograms_lock = threading.Lock()
+        self.started_at = time.time()
+        self._initialized = True
+
+    def histogram(self, endpoint):
+        """エンドポイントのヒストグラムを取得する（なければ作成する）
+
+        Args:
+            endpoint (str): エンドポイント名
+
+        Returns:
+            LatencyHistogram: ヒストグラム
+        """
+        histogram = self._histograms.get(endpoint)
+        if histogram is None:
+            with self._histograms_lock:
+                histogram = self._histograms.setdefault(endpoint, LatencyHistogram())
+        return histogram
+
+    def record(self, endpoint, duration_ms, error=False):
+        """1回の呼び出しを記録する
+
+        Args:
+            endpoint (str): エンドポイント名
+            duration_ms (float): 所要時間（ミリ秒）
+            error (bool, optional): 例外が発生した場合はTrue
+        """
+        self.histogram(endpoint).record(duration_ms, error)
+
+    def snapshot(self):
+        """すべてのエンドポイントの計測値を取得する
+
+        Returns:
+            list: {'endpoint', 'count', 'errors', 'avg_ms', 'max_ms', 'p50', 'p95', 'p99', 'buckets'}の
+                辞書のリスト（呼び出し回数の多い順。呼び出されていないエンドポイントも含む）
+        """
+        with self._histograms_lock:
+            items = list(self._histograms.items())
+        rows = [dict(endpoint=endpoint, **histogram.snapshot()) for endpoint, histogram in items]
+        rows.sort(key=lambda row: (-row['count'], row['endpoint']))
+        return rows
+
+    def get(self, endpoint):
+        """1つのエンドポイントの計測値を取得する
+
+        Args:
+            endpoint (str): エンドポイント名
+
+        Returns:
+            dict: 計測値（snapshotの要素と同じ形式）。記録がない場合はNone
+        """
+        histogram = self._histograms.get(endpoint)
+        if histogram is None or not histogram.count:
+            return None
+        return dict(endpoint=endpoint, **histogram.snapshot())
+
+    def reset(self):
+        """すべての計測値を消去する（計測中のメソッドが参照するヒストグラムはそのまま使う）"""
+        with self._histograms_lock:
+            for histogram in self._histograms.values():
+                histogram.clear()
+            self.started_at = time.time()
+
+def instrument_methods(prefix=None, exclude=(), metrics=None):
+    """クラスの公開メソッド（_で始まらないメソッド）の呼び出しを計測するクラスデコレータ
+
+    呼び出し回数と所要時間をメソッドごとに記録し、例外が発生した場合はエラーとして数える
+    （メソッドの中で例外を処理して戻り値で失敗を返す場合は、エラーとして数えない）。
+    構造化ログが有効な場合は、呼び出しごとにイベント（api_call）も記録する（core.log_eventsを参照）。
+
+    Args:
+        prefix (str, optional): エンドポイント名の接頭辞。省略した場合はクラス名
+        exclude (tuple, optional): 計測しないメソッド名
+        metrics (ClientMetrics, optional): 記録先。省略した場合はClientMetrics()
+
+    Returns:
+        callable: クラスデコレータ
+    """
+    def decorator(cls):
+        target = metrics if metrics is not None else ClientMetrics()
+        name_prefix = prefix if prefix is not None else cls.__name__
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(attr) or isinstance(attr, (staticmethod, classmethod)):
+                continue
+            setattr(cls, name, _timed(attr, f"{name_prefix}.{name}", target))
+        return cls
+    return decorator
+
+def _timed(func, endpoint, metrics):
+    """関数の呼び出しを計測するラッパーを作成する
+
+    Args:
+        func (callable): 計測する関数
+        endpoint (str): エンドポイント名
+        metrics (ClientMetrics): 記録先
+
+    Returns:
+        callable: ラッパー
+    """
+    # ヒストグラムは先に作成し、呼び出しごとの辞書の検索を省く
+    histogram = metrics.histogram(endpoint)
+    event_logger = logging.getLogger(func.__module__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if events_enabled():
+            return _call_logged(func, args, kwargs, endpoint, histogram, event_logger)
+        start = time.perf_counter()
+        error = False
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            histogram.record((time.perf_counter() - start) * 1000, error)
+    return wrapper
+
+def _call_logged(func, args, kwargs, endpoint, histogram, event_logger):
+    """関数を呼び出して計測し、イベントを記録する（構造化ログが有効な場合）
+
+    呼び出しの中で記録するイベント（呼び出したメソッドの中の別のメソッドの呼び出しなど）には同じリクエストIDを付ける。
+
+    Args:
+        func (callable): 計測する関数
+        args (tuple): 位置引数
+        kwargs (dict): キーワード引数
+        endpoint (str): エンドポイント名
+        histogram (LatencyHistogram): 記録先
+        event_logger (logging.Logger): イベントを出力するロガー
+
+    Returns:
+        関数の戻り値
+    """
+    with request_scope():
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            duration_ms = (time.perf_counter() - start) * 1000
+            histogram.record(duration_ms, True)
+            log_call(event_logger, endpoint, duration_ms, error=e)
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        histogram.record(duration_ms, False)
+        log_call(event_logger, endpoint, duration_ms, result=result)
+        return result
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+送信待ちキュー（アウトボックス）モジュール
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 再試行の待ち時間（秒）。失敗するたびに倍になり、上限で頭打ちになる
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 300
+
+# 送信待ちの項目がない場合やログインしていない場合の確認間隔（秒）
+IDLE_WAIT = 30
+
+# 項目の種類ごとのコレクション名
+COLLECTIONS = {
+    'post': 'app.bsky.feed.post',
+    'like': 'app.bsky.feed.like',
+}
+
+# 再利用したブロブがサーバー側で見つからない（無効になった）ことを示すエラー名とメッセージ
+STALE_BLOB_ERRORS = ('BlobNotFound', 'InvalidBlob')
+STALE_BLOB_MESSAGE = 'Could not find blob'
+
+# TID（タイムスタンプ識別子）で使用するbase32の文字
+_TID_ALPHABET = '234567abcdefghijklmnopqrstuvwxyz'
+_tid_lock = threading.Lock()
+_last_tid_timestamp = 0
+
+def generate_tid():
+    """レコードキーに使用するTIDを生成する
+
+    マイクロ秒単位のタイムスタンプとランダムなクロックIDから13文字のTIDを作る。
+    同一プロセス内では単調増加する。
+
+    Returns:
+        str: TID
+    """
+    global _last_tid_timestamp
+    with _tid_lock:
+        timestamp = max(int(time.time() * 1000000), _last_tid_timestamp + 1)
+        _last_tid_timestamp = timestamp
+
+    value = (timestamp << 10) | random.getrandbits(10)
+    chars = []
+    for _ in range(13):
+        chars.append(_TID_ALPHABET[value & 0x1f])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+def current_time_iso():
+    """レコードのcreatedAtに使用する現在時刻を取得する
+
+    Returns:
+        str: UTCのISO 8601形式の文字列（ミリ秒まで）
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec='milliseconds') + 'Z'
+
+def is_retryable_error(error):
+    """再試行すべきエラーかどうかを判定する
+
+    ネットワークエラー、タイムアウト、サーバーエラー、認証エラー（再ログイン後に送れる）、
+    未ログインは再試行する。リクエスト内容に起因するエラーは再試行しない。
+
+    Args:
+        error (Exception): 発生したエラー
+
+    Returns:
+        bool: 再試行すべき場合はTrue
+    """
+    # 下位レイヤーの接続エラー
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+
+    try:
+        from atproto_client.exceptions import (
+            NetworkError, RequestException, UnauthorizedError, LoginRequiredError
+        )
+        from core.client import AuthenticationError
+    except ImportError:
+        return False
+
+    return isinstance(error, (NetworkError, RequestException, UnauthorizedError,
+                              LoginRequiredError, AuthenticationError))
+
+def is_stale_blob_error(error):
+    """再利用したブロブがサーバー側で見つからない（無効になった）ことによるエラーかどうかを判定する
+
+    Args:
+        error (Exception): 発生したエラー
+
+    Returns:
+        bool: ブロブをアップロードし直すべき場合はTrue
+    """
+    content = getattr(getattr(error, 'response', None), 'content', None)
+    if getattr(content, 'error', None) in STALE_BLOB_ERRORS:
+        return True
+    return STALE_BLOB_MESSAGE in (getattr(content, 'message', None) or '')
+
+class Outbox:
+    """送信待ちキューを管理し、バックグラウンドで順番に送信するクラス
+
+    投稿・返信・いいねはまずSQLiteのoutboxテーブルに保存され、ドレインスレッドが
+    古いものから順に送信する。各項目には作成時にレコードキー（TID）を割り当てるため、
+    送信結果が不明なまま再送しても重複しない。
+    """
+
+    def __init__(self, client, data_store=None, listener=None):
+        """初期化
+
+        Args:
+            client (BlueskyClient): Blueskyクライアント
+            data_store (DataStore, optional): データストア。省略時はクライアントのものを使用
+            listener (callable, optional): 送信結果の通知先。
+                listener(item, result=None, error=None, retrying=False) の形式で呼び出される
+        """
+        self.client = client
+        self.data_store = data_store or client.data_store
+        self.listener = listener
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """ドレインスレッドを開始する"""
+        if self._thread and self._thread.is_alive():
+            self.wake()
+            return
+
+        # 停止直後に再開した場合に古いスレッドが動き続けないよう、スレッドごとに停止フラグを作る
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="OutboxDrainer")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info("送信待ちキューの処理を開始しました")
+
+    def stop(self):
+        """ドレインスレッドを停止する（送信中の項目は次回起動時に再送される）"""
+        self._stop_event.set()
+        self._wake_event.set()
+        self._thread = None
+
+    def wake(self):
+        """ドレインスレッドを起こして、すぐに送信を試みる"""
+        self._wake_event.set()
+
+    def enqueue_post(self, text, images=None, reply_to=None):
+        """投稿（返信）を送信待ちキューに追加する
+
+        Args:
+            text (str): 投稿内容
+            images (list, optional): 添付画像のファイルパスのリスト
+            reply_to (dict, optional): 返信先情報 {'uri', 'cid', 'reply_parent', 'reply_root'}
+
+        Returns:
+            int: 追加した項目のID
+
+        Raises:
+            Exception: ログインしていない場合、または保存に失敗した場合
+        """
+        payload = {
+            'text': text,
+            'images': list(images or []),
+            'created_at': current_time_iso(),
+        }
+        if reply_to:
+            payload['reply_to'] = {
+                key: reply_to.get(key) for key in ('uri', 'cid', 'reply_parent', 'reply_root')
+                if reply_to.get(key)
+            }
+        return self._enqueue('post', payload)
+
+    def enqueue_like(self, uri, cid):
+        """いいねを送信待ちキューに追加する
+
+        同じ投稿へのいいねが既に送信待ちの場合は、その項目のIDを返す。
+
+        Args:
+            uri (str): 投稿のURI
+            cid (str): 投稿のCID
+
+        Returns:
+            int: 追加した（または既存の）項目のID
+
+        Raises:
+            Exception: ログインしていない場合、または保存に失敗した場合
+        """
+        existing = self.data_store.find_outbox_item(self._user_did(), 'like', 'uri', uri)
+        if existing:
+            logger.debug(f"同じ投稿へのいいねが送信待ちです: {uri}")
+            self.wake()
+            return existing
+
+        payload = {'uri': uri, 'cid': cid, 'created_at': current_time_iso()}
+        return self._enqueue('like', payload)
+
+    def pending_count(self):
+        """未送信の項目数を取得する
+
+        Returns:
+            int: 未送信の項目数
+        """
+        user_did = self.client.user_did
+        return self.data_store.count_pending_outbox(user_did) if user_did else 0
+
+    def _user_did(self):
+        """送信するユーザーのDIDを取得する"""
+        user_did = self.client.user_did
+        if not user_did:
+            raise Exception("送信にはログインが必要です")
+        return user_did
+
+    def _enqueue(self, kind, payload):
+        """項目を保存してドレインスレッドを起こす"""
+        item_id = self.data_store.enqueue_outbox(
+            self._user_did(), kind, json.dumps(payload, ensure_ascii=False), generate_tid()
+        )
+        if item_id is None:
+            raise Exception("送信待ちキューへの保存に失敗しました")
+
+        logger.info(f"送信待ちキューに追加しました: id={item_id}, kind={kind}")
+        self.wake()
+        return item_id
+
+    def _run(self, stop_event):
+        """ドレインスレッドのメインループ
+
+        Args:
+            stop_event (threading.Event): このスレッドの停止フラグ
+        """
+        while not stop_event.is_set():
+            try:
+                wait = self.drain_once()
+            except Exception as e:
+                logger.error(f"送信待ちキューの処理中にエラーが発生しました: {str(e)}", exc_info=True)
+                wait = IDLE_WAIT
+
+            if wait > 0:
+                self._wake_event.wait(wait)
+            self._wake_event.clear()
+
+    def drain_once(self):
+        """先頭の項目を1件送信する
+
+        Returns:
+            float: 次の送信を試みるまでの待ち時間（秒）
+        """
+        if not self.client.is_logged_in or not self.client.user_did:
+            return IDLE_WAIT
+
+        item = self.data_store.get_next_outbox_item(self.client.user_did)
+        if not item:
+            return IDLE_WAIT
+
+        # 再試行待ちの場合は予定時刻まで待つ（順序を守るため後続の項目も待たせる）
+        if item['next_attempt_at']:
+            remaining = (datetime.fromisoformat(item['next_attempt_at']) - datetime.now()).total_seconds()
+            if remaining > 0:
+                return remaining
+
+        attempts = item['attempts'] + 1
+        self.data_store.update_outbox_item(item['id'], 'sending', attempts=attempts, last_error=item['last_error'])
+        item['payload'] = json.loads(item['payload'])
+        item['attempts'] = attempts
+
+        try:
+            result = self._send(item)
+        except Exception as e:
+            if is_retryable_error(e):
+                delay = min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+                delay += random.uniform(0, delay / 4)
+                next_attempt_at = (datetime.now() + timedelta(seconds=delay)).isoformat()
+                self.data_store.update_outbox_item(
+                    item['id'], 'pending', next_attempt_at=next_attempt_at, last_error=str(e)
+                )
+                logger.warning(f"送信に失敗しました。{delay:.0f}秒後に再試行します（{attempts}回目）: {str(e)}")
+                self._notify(item, error=e, retrying=True)
+                return delay
+
+            self.data_store.update_outbox_item(item['id'], 'failed', last_error=str(e))
+            logger.error(f"送信に失敗しました（再試行しません）: id={item['id']}, {str(e)}")
+            self._notify(item, error=e)
+            return 0
+
+        self.data_store.update_outbox_item(item['id'], 'done')
+        logger.info(f"送信待ちの項目を送信しました: id={item['id']}, kind={item['kind']}")
+        self._notify(item, result=result)
+        return 0
+
+    def _send(self, item):
+        """項目を送信する
+
+        2回目以降の送信では、前回の送信が実際には成功していた可能性があるため、
+        同じレコードキーのレコードが既に存在するかを先に確認する。
+
+        Args:
+            item (dict): 送信する項目
+
+        Returns:
+            object: 作成結果（uri、cidを持つ）
+        """
+        kind = item['kind']
+        payload = item['payload']
+
+        if item['attempts'] > 1:
+            existing = self.client.get_own_record(COLLECTIONS[kind], item['rkey'])
+            if existing:
+                logger.info(f"前回の送信で作成済みでした: {existing.uri}")
+                return existing
+
+        if kind == 'like':
+            return self.client.create_like(payload['uri'], payload['cid'], item['rkey'], payload['created_at'])
+
+        if kind == 'post':
+            return self._send_post(item['rkey'], payload)
+
+        raise ValueError(f"不明な送信待ち項目の種類です: {kind}")
+
+    def _send_post(self, rkey, payload):
+        """投稿（画像・返信を含む）を送信する"""
+        images = payload.get('images')
+        if not images:
+            return self.client.create_post(
+                payload['text'], rkey, payload['created_at'], reply_to=payload.get('reply_to')
+            )
+
+        # 画像を縮小・再圧縮（ワーカープロセスで並列処理）
+        from core.image_preparer import ImagePreparer
+        prepared_images = ImagePreparer().prepare_files(images)
+
+        # 画像をアップロード（同じ画像はアップロード済みのブロブを再利用）
+        digests = [digest for _, _, digest in prepared_images]
+        blobs, reused = self.client.upload_images(prepared_images)
+
+        try:
+            result = self.client.create_post(
+                payload['text'], rkey, payload['created_at'], images=blobs, reply_to=payload.get('reply_to')
+            )
+        except Exception as e:
+            # それ以外のエラーは通常の再試行の判定に任せる
+            if not reused or not is_stale_blob_error(e):
+                raise
+            # 再利用したブロブがサーバー側で削除されていたため、アップロードし直す
+            logger.warning(f"再利用したブロブが見つからないため、再アップロードします: {str(e)}")
+            self.client.forget_blobs(digests)
+            blobs, _ = self.client.upload_images(prepared_images, use_cache=False)
+            result = self.client.create_post(
+                payload['text'], rkey, payload['created_at'], images=blobs, reply_to=payload.get('reply_to')
+            )
+
+        # 投稿から参照されたブロブは長期間再利用できる
+        self.client.mark_blobs_referenced(digests)
+        return result
+
+    def _notify(self, item, result=None, error=None, retrying=False):
+        """送信結果を通知する"""
+        if not self.listener:
+            return
+        try:
+            self.listener(item, result=result, error=error, retrying=retrying)
+        except Exception as e:
+            logger.error(f"送信結果の通知中にエラーが発生しました: {str(e)}", exc_info=True)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+投稿データ変換モジュール（APIのPostViewを画面表示用の辞書に変換）
+"""
+
+import logging
+import threading
+import weakref
+from utils.time_format import format_relative_time
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 埋め込み・レコードの種類（py_typeで判定するため、atprotoのモデルをインポートせずに済む）
+EMBED_RECORD_VIEW = 'app.bsky.embed.record#view'
+EMBED_RECORD_WITH_MEDIA_VIEW = 'app.bsky.embed.recordWithMedia#view'
+EMBED_VIEW_RECORD = 'app.bsky.embed.record#viewRecord'
+EMBED_VIEW_NOT_FOUND = 'app.bsky.embed.record#viewNotFound'
+EMBED_VIEW_BLOCKED = 'app.bsky.embed.record#viewBlocked'
+
+# 使用中の投稿者・投稿の参照（DID・URIごとに1つのインスタンスを共有する。どこからも参照されなくなると自動で消える）
+_authors = weakref.WeakValueDictionary()
+_refs = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+class Author:
+    """投稿者（DIDごとに1つのインスタンスを全投稿で共有する）"""
+
+    __slots__ = ('did', 'handle', 'display_name', 'username', 'handle_text', '__weakref__')
+
+    def __init__(self, did, handle, display_name=None):
+        """初期化
+
+        Args:
+            did (str): 投稿者のDID
+            handle (str): ハンドル（@なし）
+            display_name (str, optional): 表示名
+        """
+        self.did = did
+        self.handle = None
+        self.update(handle, display_name)
+
+    def update(self, handle, display_name=None):
+        """ハンドル・表示名を更新する
+
+        Args:
+            handle (str): ハンドル（@なし）
+            display_name (str, optional): 表示名
+        """
+        handle = handle or ''
+        if handle != self.handle:
+            self.handle = handle
+            self.handle_text = f"@{handle}"  # 表示用（@付き）
+        self.display_name = display_name or None
+        self.username = self.display_name or handle
+
+# 投稿者が分からない投稿・引用元の代わりに使う投稿者（DIDがないためキャッシュには保存しない）
+UNKNOWN_AUTHOR = Author(None, 'unknown', '不明')
+BLOCKED_AUTHOR = Author(None, 'blocked', 'ブロック')
+
+def intern_author(did, handle, display_name=None):
+    """投稿者をDIDごとに1つのインスタンスにまとめる
+
+    既に使用中の投稿者はハンドル・表示名を更新して返す。
+
+    Args:
+        did (str): 投稿者のDID
+        handle (str): ハンドル（@なし）
+        display_name (str, optional): 表示名
+
+    Returns:
+        Author: 投稿者
+    """
+    if not did:
+        return Author(did, handle, display_name)
+
+    with _intern_lock:
+        author = _authors.get(did)
+        if author is None:
+            author = Author(did, handle, display_name)
+            _authors[did] = author
+        elif author.handle != (handle or '') or author.display_name != (display_name or None):
+            author.update(handle, display_name)
+        return author
+
+class PostRef(dict):
+    """投稿の参照（{'uri', 'cid'}の辞書。返信先・引用元として複数の投稿から共有する）"""
+
+    __slots__ = ('__weakref__',)
+
+def intern_ref(uri, cid=None):
+    """投稿の参照をURIごとに1つのインスタンスにまとめる
+
+    Args:
+        uri (str): 投稿のURI
+        cid (str, optional): 投稿のCID
+
+    Returns:
+        PostRef: 投稿の参照。URIがない場合はNone
+    """
+    if not uri:
+        return None
+
+    with _intern_lock:
+        ref = _refs.get(uri)
+        # CIDが異なる場合は、既に参照している投稿に影響しないよう別のインスタンスにする
+        if ref is None or (cid and ref['cid'] != cid):
+            ref = PostRef(uri=uri, cid=cid)
+            _refs[uri] = ref
+        return ref
+
+def normalize_post(post_view, my_handle=None):
+    """PostViewを画面表示用の投稿データに変換する
+
+    Args:
+        post_view: APIから取得したPostView（app.bsky.feed.defs#postView）
+        my_handle (str, optional): ログインユーザーのハンドル（自分の投稿の判定に使用）
+
+    Returns:
+        dict: 投稿データ。投稿者の表示名・ハンドル・DIDは'author'（Author）から読む
+    """
+    view_author = post_view.author
+    author = intern_author(getattr(view_author, 'did', None), view_author.handle, view_author.display_name)
+    record = post_view.record
+
+    # 投稿者の情報は共有のAuthorにだけ持たせ、投稿ごとに複製しない
+    post_data = {
+        'author': author,  # 投稿者（DIDごとに共有）
+        'content': getattr(record, 'text', ''),
+        'time': format_relative_time(post_view.indexed_at),  # 表示用の文字列
+        'raw_timestamp': post_view.indexed_at,  # ソート用のオリジナルタイムスタンプ
+        'likes': getattr(post_view, 'like_count', 0),
+        'replies': getattr(post_view, 'reply_count', 0),
+        'reposts': getattr(post_view, 'repost_count', 0),
+        'uri': getattr(post_view, 'uri', None),  # 投稿のURI（削除に必要）
+        'cid': getattr(post_view, 'cid', None),  # 投稿のCID（削除に必要）
+        'is_own_post': author.handle == my_handle,  # 自分の投稿かどうか
+        # スレッド情報
+        'reply_parent': None,
+        'reply_root': None,
+        # facets情報（URLなどの特殊要素の情報）
+        'facets': getattr(record, 'facets', None),
+        # 引用ポスト情報
+        'quote_of': None,
+        'is_quote_post': False
+    }
+
+    # embedフィールドの確認（引用ポストかどうか）
+    quote_of = _extract_quote(getattr(post_view, 'embed', None), post_data['uri'])
+    if quote_of:
+        post_data['is_quote_post'] = True
+        post_data['quote_of'] = quote_of
+
+    # スレッド情報を取得（返信の場合）
+    reply = getattr(record, 'reply', None)
+    if reply:
+        post_data['reply_parent'] = _strong_ref(getattr(reply, 'parent', None))
+        post_data['reply_root'] = _strong_ref(getattr(reply, 'root', None))
+
+    return post_data
+
+def placeholder_post(uri, content):
+    """取得できない投稿（削除済み・ブロック）の代わりに表示する投稿データを作成する
+
+    Args:
+        uri (str): 投稿のURI
+        content (str): 表示する説明文
+
+    Returns:
+        dict: 投稿データ
+    """
+    return {
+        'author': UNKNOWN_AUTHOR,
+        'content': content,
+        'time': '',
+        'raw_timestamp': '',
+        'likes': 0,
+        'replies': 0,
+        'reposts': 0,
+        'uri': uri,
+        'cid': None,
+        'is_own_post': False,
+        'reply_parent': None,
+        'reply_root': None,
+        'facets': None,
+        'quote_of': None,
+        'is_quote_post': False
+    }
+
+def post_from_cache(row, my_did=None):
+    """ローカルキャッシュの行（DataStore.search_postsの結果など）を投稿データに変換する
+    
+    Args:
+        row (dict): 投稿と投稿者の列を含む辞書
+        my_did (str, optional): ログインユーザーのDID（自分の投稿の判定に使用）
+        
+    Returns:
+        dict: 投稿データ
+    """
+    post_data = placeholder_post(row['uri'], row.get('text') or '')
+    if row.get('handle'):
+        post_data['author'] = intern_author(row.get('author_did'), row['handle'], row.get('display_name'))
+    post_data.update({
+        'time': format_relative_time(row['indexed_at']) if row.get('indexed_at') else '',
+        'raw_timestamp': row.get('indexed_at') or '',
+        'likes': row.get('like_count') or 0,
+        'replies': row.get('reply_count') or 0,
+        'reposts': row.get('repost_count') or 0,
+        'cid': row.get('cid'),
+        'is_own_post': bool(my_did) and row.get('author_did') == my_did,
+    })
+    post_data['reply_parent'] = intern_ref(row.get('reply_parent_uri'), row.get('reply_parent_cid'))
+    post_data['reply_root'] = intern_ref(row.get('reply_root_uri'), row.get('reply_root_cid'))
+
+    # 引用元の本文・投稿者を含む行（DataStore.load_timeline_postsの結果）の場合は引用元も復元する
+    if row.get('quote_uri') and row.get('quote_handle'):
+        quoted_author = intern_author(row.get('quote_author_did'), row['quote_handle'], row.get('quote_display_name'))
+        post_data['is_quote_post'] = True
+        post_data['quote_of'] = {
+            'author': quoted_author,
+            'content': row.get('quote_text') or '',
+            'uri': row['quote_uri'],
+            'cid': row.get('quote_cid'),
+            'indexed_at': row.get('quote_indexed_at'),
+            'like_count': row.get('quote_like_count') or 0,
+            'repost_count': row.get('quote_repost_count') or 0
+        }
+    return post_data
+
+def post_from_raw(record, my_handle=None):
+    """保存した元のレコード（タイムラインのFeedViewPostのJSON）から投稿データを作成する
+
+    キャッシュのスキーマを変更した後に、再取得せずに作り直すときに使う
+    （DataStore.rebuild_posts_from_rawに渡す）。
+
+    Args:
+        record (dict): DataStore.load_raw_recordなどで取得したレコード
+        my_handle (str, optional): ログインユーザーのハンドル（自分の投稿の判定に使用）
+
+    Returns:
+        dict: 投稿データ
+    """
+    from atproto_client import models
+    feed_item = models.get_or_create(record, models.AppBskyFeedDefs.FeedViewPost, strict=False)
+    return normalize_post(feed_item.post, my_handle)
+
+def format_post_content(post):
+    """一覧表示用の本文を作成する（引用ポストの場合は引用元も含める）
+
+    Args:
+        post (dict): 投稿データ
+
+    Returns:
+        str: 表示用の本文
+    """
+    if post.get('is_quote_post', False) and post.get('quote_of'):
+        quote_info = post['quote_of']
+        return f"{post['content']}\n\n【引用】{quote_info['author'].handle_text} - {quote_info['content']}"
+    return post['content']
+
+def _extract_quote(embed, uri=None):
+    """埋め込みから引用元情報を取り出す
+
+    Args:
+        embed: 投稿の埋め込み（embed view）
+        uri (str, optional): 引用している投稿のURI（ログ用）
+
+    Returns:
+        dict: 引用元情報。引用ポストでない場合はNone
+    """
+    embed_type = getattr(embed, 'py_type', None)
+
+    if embed_type == EMBED_RECORD_VIEW:
+        # 引用ポストの場合
+        logger.debug("引用ポストを検出: %s", uri)
+        quoted_record = getattr(embed, 'record', None)
+    elif embed_type == EMBED_RECORD_WITH_MEDIA_VIEW:
+        # 引用ポスト + メディアの場合
+        logger.debug("引用ポスト + メディアを検出: %s", uri)
+        quoted_record = getattr(getattr(embed, 'record', None), 'record', None)
+    else:
+        return None
+
+    record_type = getattr(quoted_record, 'py_type', None)
+
+    # ViewRecordの場合（通常のケース）
+    if record_type == EMBED_VIEW_RECORD:
+        quoted_author = intern_author(
+            getattr(quoted_record.author, 'did', None),
+            quoted_record.author.handle,
+            quoted_record.author.display_name
+        )
+        quoted_text = getattr(quoted_record.value, 'text', '[引用元テキストなし]')
+        return {
+            'author': quoted_author,
+            'content': quoted_text,
+            'uri': getattr(quoted_record, 'uri', None),
+            'cid': getattr(quoted_record, 'cid', None),
+            'indexed_at': getattr(quoted_record, 'indexed_at', None),
+            'like_count': getattr(quoted_record, 'like_count', 0),
+            'repost_count': getattr(quoted_record, 'repost_count', 0)
+        }
+
+    # 引用元が見つからない場合（メディア付きの引用では従来どおり扱わない）
+    if embed_type == EMBED_RECORD_VIEW and record_type == EMBED_VIEW_NOT_FOUND:
+        return {
+            'author': UNKNOWN_AUTHOR,
+            'content': '[引用元投稿が見つかりません]',
+            'uri': None,
+            'cid': None
+        }
+
+    # 引用元がブロックされている場合
+    if embed_type == EMBED_RECORD_VIEW and record_type == EMBED_VIEW_BLOCKED:
+        return {
+            'author': BLOCKED_AUTHOR,
+            'content': '[引用元投稿はブロックされています]',
+            'uri': None,
+            'cid': None
+        }
+
+    return None
+
+def _strong_ref(ref):
+    """StrongRefを共有の投稿の参照に変換する
+
+    Args:
+        ref: com.atproto.repo.strongRef
+
+    Returns:
+        PostRef: {'uri': uri, 'cid': cid}。情報が不足している場合はNone
+    """
+    uri = getattr(ref, 'uri', None)
+    cid = getattr(ref, 'cid', None)
+    if uri and cid:
+        return intern_ref(uri, cid)
+    return None
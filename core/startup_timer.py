@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+起動時間の計測モジュール
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# このモジュールを読み込んだ時刻（SSky.pyで最初にインポートするため、ほぼプロセスの開始時刻）
+MODULE_LOADED_AT = time.monotonic()
+
+class StartupTimer:
+    """起動処理の各段階の時間を計測するクラス（シングルトン）
+
+    時刻はtime.monotonicで記録し、このモジュールを読み込んだ時点（プロセスの開始直後）からの経過時間で表す。
+    finishを呼ぶまでに記録した段階を、1行の要約としてログに出力し、DataStoreに履歴として保存する。
+    finishの後（ログアウト後の再ログインなど）は記録しない。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """シングルトンパターンの実装"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(StartupTimer, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        """初期化（一度だけ実行）"""
+        if self._initialized:
+            return
+
+        self._phases_lock = threading.Lock()
+        self.reset(MODULE_LOADED_AT)
+        self._initialized = True
+
+    def reset(self, started_at=None):
+        """計測をやり直す（テストなど）
+
+        Args:
+            started_at (float, optional): 計測の開始時刻（time.monotonic）。省略した場合は現在
+        """
+        with self._phases_lock:
+            self.started_at = started_at if started_at is not None else time.monotonic()
+            # {'name': 段階名, 'start_ms': 開始時点, 'duration_ms': 所要時間（時点の場合はNone）, 'thread': スレッド名}のリスト
+            self.phases = []
+            self.finished = False
+            self.total_ms = None
+
+    @contextmanager
+    def phase(self, name):
+        """段階の時間を計測する
+
+        Args:
+            name (str): 段階名（同じ名前が複数回記録された場合は「#2」などを付ける）
+        """
+        if self.finished:
+            yield
+            return
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.monotonic())
+
+    def mark(self, name):
+        """時点（ウィンドウの表示など）を記録する
+
+        Args:
+            name (str): 時点の名前
+        """
+        if not self.finished:
+            self._record(name, time.monotonic())
+
+    def _record(self, name, start, end=None):
+        """段階を記録する（endを省略した場合は時点として記録し、所要時間はNoneにする）"""
+        with self._phases_lock:
+            if self.finished:
+                return
+            count = sum(1 for phase in self.phases if phase['name'] == name or phase['name'].startswith(name + '#'))
+            self.phases.append({
+                'name': f"{name}#{count + 1}" if count else name,
+                'start_ms': round((start - self.started_at) * 1000, 1),
+                'duration_ms': round((end - start) * 1000, 1) if end is not None else None,
+                'thread': threading.current_thread().name,
+            })
+
+    def elapsed_ms(self):
+        """計測開始からの経過時間を取得する
+
+        Returns:
+            float: 経過時間（ミリ秒）
+        """
+        return (time.monotonic() - self.started_at) * 1000
+
+    def summary(self):
+        """記録した段階の1行の要約を作成する
+
+        Returns:
+            str: 要約（開始順。所要時間と、計測開始からの開始時点を含む）
+        """
+        total = self.total_ms if self.total_ms is not None else self.elapsed_ms()
+        with self._phases_lock:
+            phases = sorted(self.phases, key=lambda phase: phase['start_ms'])
+        parts = [
+            f"{phase['name']}={phase['duration_ms']:.0f}ms@{phase['start_ms']:.0f}"
+            if phase['duration_ms'] is not None else f"{phase['name']}@{phase['start_ms']:.0f}"
+            for phase in phases
+        ]
+        return f"起動時間: 合計{total:.0f}ms ({', '.join(parts)})"
+
+    def finish(self, data_store=None, app_version=None, outcome=None):
+        """計測を終了し、要約をログに出力して履歴に保存する（2回目以降の呼び出しは何もしない）
+
+        Args:
+            data_store (DataStore, optional): 履歴を保存するデータストア
+            app_version (str, optional): アプリケーションのバージョン
+            outcome (str, optional): 起動の結果（'session'、'no_session'など）
+
+        Returns:
+            float: 起動にかかった時間（ミリ秒）。既に終了していた場合はNone
+        """
+        with self._phases_lock:
+            if self.finished:
+                return None
+            self.finished = True
+            self.total_ms = self.elapsed_ms()
+
+        logger.info(f"{self.summary()} [{outcome or 'unknown'}]")
+
+        if data_store is not None:
+            data_store.save_startup_history(app_version, self.total_ms, list(self.phases), outcome)
+        return self.total_ms
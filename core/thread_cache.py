@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+スレッド（会話）キャッシュモジュール
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from core.post_model import normalize_post, placeholder_post
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 初回表示時に取得する返信の深さ
+INITIAL_DEPTH = 3
+
+# 深い枝を展開するときに取得する返信の深さ
+BRANCH_DEPTH = 3
+
+# 前回の取得からこの秒数以内に開き直した場合は再取得しない
+REFRESH_INTERVAL = 30
+
+# スレッドの種類（py_typeで判定）
+THREAD_VIEW_POST = 'app.bsky.feed.defs#threadViewPost'
+NOT_FOUND_POST = 'app.bsky.feed.defs#notFoundPost'
+BLOCKED_POST = 'app.bsky.feed.defs#blockedPost'
+
+class Thread:
+    """1つのスレッド（ルート投稿とその返信のツリー）"""
+
+    def __init__(self, root_uri):
+        """初期化
+
+        Args:
+            root_uri (str): ルート投稿のURI
+        """
+        self.root_uri = root_uri
+        # URI -> {'post': 投稿データ, 'parent': 親のURI, 'children': 子のURIのリスト, 'loaded': 子を取得済みか}
+        self.nodes = {}
+        # 個別に展開した枝の起点のURI（再表示時にこれらも更新する）
+        self.branch_roots = set()
+        self.fetched_at = 0
+        self.lock = threading.RLock()
+
+    def get_node(self, uri):
+        """ノードを取得する
+
+        Args:
+            uri (str): 投稿のURI
+
+        Returns:
+            dict: ノード。存在しない場合はNone
+        """
+        return self.nodes.get(uri)
+
+    def needs_expand(self, uri):
+        """子の返信を追加で取得する必要があるかを判定する
+
+        Args:
+            uri (str): 投稿のURI
+
+        Returns:
+            bool: 返信があるのに未取得の場合はTrue
+        """
+        node = self.nodes.get(uri)
+        return bool(node and not node['loaded'] and node['post'].get('replies'))
+
+class ThreadCache:
+    """ルート投稿のURIをキーにスレッドを保持するキャッシュ（シングルトン）
+
+    再表示時はキャッシュ済みのツリーに新しい返信だけを追加し、
+    深い枝は展開されたときに初めて取得する。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """シングルトンパターンの実装"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(ThreadCache, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self, max_threads=50):
+        """初期化
+
+        Args:
+            max_threads (int, optional): 保持するスレッドの最大数
+        """
+        if self._initialized:
+            return
+
+        self.max_threads = max_threads
+        self._threads = OrderedDict()
+        self._threads_lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def root_uri_of(post):
+        """投稿データからスレッドのルート投稿のURIを求める
+
+        Args:
+            post (dict): 投稿データ
+
+        Returns:
+            str: ルート投稿のURI
+        """
+        if post.get('reply_root'):
+            return post['reply_root']['uri']
+        return post['uri']
+
+    def get(self, root_uri):
+        """キャッシュ済みのスレッドを取得する
+
+        Args:
+            root_uri (str): ルート投稿のURI
+
+        Returns:
+            Thread: スレッド。キャッシュにない場合はNone
+        """
+        with self._threads_lock:
+            thread = self._threads.get(root_uri)
+            if thread is not None:
+                self._threads.move_to_end(root_uri)
+            return thread
+
+    def clear(self):
+        """キャッシュを空にする（ログアウト時など）"""
+        with self._threads_lock:
+            self._threads.clear()
+
+    def load(self, client, root_uri, force=False):
+        """スレッドを取得し、キャッシュ済みの場合は差分をマージする
+
+        Args:
+            client (BlueskyClient): Blueskyクライアント
+            root_uri (str): ルート投稿のURI
+            force (bool, optional): 前回の取得から間がなくても再取得する
+
+        Returns:
+            tuple: (スレッド, 新しく追加されたノードのURIのリスト)
+        """
+        thread = self.get(root_uri)
+        if thread is None:
+            thread = Thread(root_uri)
+            with self._threads_lock:
+                self._threads[root_uri] = thread
+                while len(self._threads) > self.max_threads:
+                    self._threads.popitem(last=False)
+        elif not force and time.time() - thread.fetched_at < REFRESH_INTERVAL:
+            logger.debug(f"キャッシュ済みのスレッドを使用します: {root_uri}")
+            return thread, []
+
+        my_handle = self._my_handle(client)
+        added = []
+        view = client.get_post_thread(root_uri, depth=INITIAL_DEPTH)
+        with thread.lock:
+            self._merge(thread, view, None, my_handle, added)
+
+        # 個別に展開した枝は、初回の深さより下にあるため枝ごとに更新する
+        for branch_uri in list(thread.branch_roots):
+            node = thread.get_node(branch_uri)
+            if node is None:
+                thread.branch_roots.discard(branch_uri)
+                continue
+            view = client.get_post_thread(branch_uri, depth=BRANCH_DEPTH)
+            with thread.lock:
+                self._merge(thread, view, node['parent'], my_handle, added)
+
+        thread.fetched_at = time.time()
+        self._save(client, thread)
+        logger.info(f"スレッドを更新しました: {root_uri} (全{len(thread.nodes)}件, 新規{len(added)}件)")
+        return thread, added
+
+    def expand(self, client, thread, uri):
+        """深い枝の返信を取得してスレッドにマージする
+
+        Args:
+            client (BlueskyClient): Blueskyクライアント
+            thread (Thread): スレッド
+            uri (str): 展開する投稿のURI
+
+        Returns:
+            list: 新しく追加されたノードのURIのリスト
+        """
+        node = thread.get_node(uri)
+        if node is None:
+            return []
+
+        added = []
+        view = client.get_post_thread(uri, depth=BRANCH_DEPTH)
+        with thread.lock:
+            self._merge(thread, view, node['parent'], self._my_handle(client), added)
+            thread.branch_roots.add(uri)
+        self._save(client, thread)
+        return added
+
+    def _merge(self, thread, view, parent_uri, my_handle, added):
+        """APIのスレッドをツリーにマージする
+
+        既存のノードは投稿データ（いいね数など）を更新し、子の並びは保持したまま
+        新しい返信だけを追加する。返信が含まれていない（取得した深さの末端）ノードの
+        子は変更しない。
+
+        Args:
+            thread (Thread): マージ先のスレッド
+            view: ThreadViewPost、NotFoundPost、BlockedPostのいずれか
+            parent_uri (str): 親投稿のURI
+            my_handle (str): ログインユーザーのハンドル
+            added (list): 新しく追加したノードのURIを追記するリスト
+
+        Returns:
+            str: マージしたノードのURI
+        """
+        view_type = getattr(view, 'py_type', None)
+
+        if view_type == THREAD_VIEW_POST:
+            post = normalize_post(view.post, my_handle)
+        elif view_type == BLOCKED_POST:
+            post = placeholder_post(view.uri, '[ブロックされている投稿です]')
+        else:
+            post = placeholder_post(getattr(view, 'uri', None), '[投稿が見つかりません]')
+
+        uri = post['uri']
+        node = thread.nodes.get(uri)
+        if node is None:
+            node = {'post': post, 'parent': parent_uri, 'children': [], 'loaded': False}
+            thread.nodes[uri] = node
+            added.append(uri)
+        else:
+            node['post'] = post
+            if node['parent'] is None:
+                node['parent'] = parent_uri
+
+        replies = getattr(view, 'replies', None)
+        if view_type == THREAD_VIEW_POST and replies is not None:
+            for reply in replies:
+                child_uri = self._merge(thread, reply, uri, my_handle, added)
+                if child_uri and child_uri not in node['children']:
+                    node['children'].append(child_uri)
+            node['children'].sort(key=lambda child: thread.nodes[child]['post']['raw_timestamp'])
+            node['loaded'] = True
+
+        return uri
+
+    @staticmethod
+    def _save(client, thread):
+        """スレッドの投稿をローカルキャッシュに保存する（全文検索の対象になる）"""
+        with thread.lock:
+            posts = [node['post'] for node in thread.nodes.values()]
+        client.data_store.queue_posts(posts)
+
+    @staticmethod
+    def _my_handle(client):
+        """ログインユーザーのハンドルを取得する"""
+        profile = getattr(client, 'profile', None)
+        return getattr(profile, 'handle', None)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+タイムラインの投稿リストの操作（マージ・並べ替え・件数の制限・相対時間の更新）
+
+画面を操作しないため、wxがない環境（ベンチマークなど）からも使える。
+"""
+
+import time
+import logging
+from utils.time_format import format_relative_time
+from core.post_model import normalize_post
+from core.startup_timer import StartupTimer
+from core.log_events import log_event, request_scope, OUTCOME_OK, OUTCOME_ERROR
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# タイムラインに保持する最大投稿数
+MAX_TIMELINE_POSTS = 1000
+
+def fetch_timeline_posts(client, limit, timeline='home'):
+    """タイムラインを取得して投稿データに変換し、キャッシュへの書き込みキューに追加する
+
+    画面は操作しないため、ワーカースレッドやwxがない環境（ソークテストなど）から呼び出せる。
+
+    Args:
+        client (BlueskyClient): Blueskyクライアント
+        limit (int): 取得する投稿数
+        timeline (str, optional): キャッシュに保存するタイムラインの名前
+
+    Returns:
+        dict: URI -> 投稿データ
+    """
+    # タイムラインの取得（APIの呼び出しのイベントにも同じリクエストIDを付ける）
+    logger.info("タイムラインを取得しています... (最大%d件)", limit)
+    with request_scope():
+        start = time.perf_counter()
+        try:
+            with StartupTimer().phase('timeline_fetch'):
+                timeline_data = client.get_timeline(limit=limit)
+
+            new_posts_dict = {}  # 一時的な辞書（URIをキー）
+
+            # 取得した投稿を処理
+            for post in timeline_data.feed:
+                # 投稿データを適切な形式に変換
+                post_data = normalize_post(post.post, client.profile.handle)
+
+                uri = post_data['uri']
+                if uri:
+                    new_posts_dict[uri] = post_data
+
+            # 取得した投稿をキャッシュに保存（全文検索の対象になる。書き込みはバックグラウンドでまとめて行う）
+            client.data_store.queue_posts(list(new_posts_dict.values()), client.user_did, timeline)
+            # 正規化していない項目（埋め込み・言語・ラベルなど）も後で使えるよう、元のレコードを圧縮して保存
+            client.data_store.queue_raw_records([(post.post.uri, post) for post in timeline_data.feed])
+        except Exception as e:
+            log_event(logger, 'timeline_fetch', logging.WARNING, endpoint=timeline,
+                      duration_ms=(time.perf_counter() - start) * 1000, outcome=OUTCOME_ERROR, error=type(e).__name__)
+            raise
+        log_event(logger, 'timeline_fetch', endpoint=timeline, duration_ms=(time.perf_counter() - start) * 1000,
+                  count=len(new_posts_dict), outcome=OUTCOME_OK)
+    return new_posts_dict
+
+def merge_timeline_posts(posts, new_posts_dict, max_posts=MAX_TIMELINE_POSTS):
+    """取得した投稿を表示中の投稿にマージする（既存の投稿は保持し、変更があったものだけ置き換える）
+
+    Args:
+        posts (list): 表示中の投稿データのリスト（変更しない）
+        new_posts_dict (dict): URI -> 取得した投稿データ
+        max_posts (int, optional): 保持する最大投稿数。Noneの場合は制限しない
+
+    Returns:
+        tuple: (マージした投稿データのリスト（古い順）, 新規の件数, 更新した件数)
+    """
+    # URIからリストのインデックスへのマッピング
+    uri_to_index = {}
+    for i, post in enumerate(posts):
+        uri = post.get('uri')
+        if uri:
+            uri_to_index[uri] = i
+
+    merged = list(posts)
+    added_count = 0
+    updated_count = 0
+    for uri, new_post in new_posts_dict.items():
+        index = uri_to_index.get(uri)
+        if index is None:
+            merged.append(new_post)
+            added_count += 1
+            continue
+
+        # 実際に変更があるか確認（キャッシュから表示した投稿は常に置き換える）
+        old_post = merged[index]
+        if (old_post.get('from_cache') or
+            old_post['likes'] != new_post['likes'] or
+            old_post['reposts'] != new_post['reposts'] or
+            old_post['replies'] != new_post['replies']):
+            merged[index] = new_post
+            updated_count += 1
+
+    # 投稿を日時でソート（古い順）
+    merged.sort(key=lambda post: post['raw_timestamp'])
+
+    if max_posts is not None:
+        merged = trim_timeline_posts(merged, max_posts)
+    return merged, added_count, updated_count
+
+def trim_timeline_posts(posts, max_posts=MAX_TIMELINE_POSTS):
+    """投稿数を制限する（新しい投稿を優先して保持し、古い投稿を削除する）
+
+    Args:
+        posts (list): 投稿データのリスト（古い順）
+        max_posts (int, optional): 保持する最大投稿数
+
+    Returns:
+        list: 制限した投稿データのリスト（制限を超えていない場合は同じリスト）
+    """
+    if len(posts) <= max_posts:
+        return posts
+    trimmed = posts[len(posts) - max_posts:]
+    logger.debug("古い投稿を削除しました。残り%d件", len(trimmed))
+    return trimmed
+
+def refresh_relative_times(posts):
+    """投稿の相対時間の表示を再計算する
+
+    Args:
+        posts (list): 投稿データのリスト（'time'を更新する）
+
+    Returns:
+        list: 表示が変わった投稿のインデックスのリスト
+    """
+    changed = []
+    for i, post in enumerate(posts):
+        new_time = format_relative_time(post['raw_timestamp'])
+        if new_time != post['time']:
+            post['time'] = new_time
+            changed.append(i)
+    return changed
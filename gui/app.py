@@ -10,6 +10,7 @@ import wx
 import logging
 from gui.main_frame import MainFrame
 from config.app_config import AppConfig
+from core.startup_timer import StartupTimer
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -20,11 +21,12 @@ class SSkyApp(wx.App):
     def __init__(self):
         """初期化"""
         # 設定の読み込み
-        self.config = AppConfig()
-        
-        # 設定マネージャーの初期化（シングルトン）
-        from config.settings_manager import SettingsManager
-        self.settings_manager = SettingsManager()
+        with StartupTimer().phase('settings'):
+            self.config = AppConfig()
+            
+            # 設定マネージャーの初期化（シングルトン）
+            from config.settings_manager import SettingsManager
+            self.settings_manager = SettingsManager()
         
         super(SSkyApp, self).__init__()
         
@@ -35,15 +37,18 @@ class SSkyApp(wx.App):
         height = self.config.get('window_size.height', 600)
         
         # メインフレームの作成
-        self.frame = MainFrame(
-            None, 
-            title=self.config.get('app_name', 'SSky'),
-            size=(width, height)
-        )
-        
-        # フレームの表示
-        self.frame.Show()
-        self.SetTopWindow(self.frame)
+        startup_timer = StartupTimer()
+        with startup_timer.phase('main_frame'):
+            self.frame = MainFrame(
+                None, 
+                title=self.config.get('app_name', 'SSky'),
+                size=(width, height)
+            )
+            
+            # フレームの表示
+            self.frame.Show()
+            self.SetTopWindow(self.frame)
+        startup_timer.mark('frame_shown')
         
         logger.info("アプリケーションを初期化しました")
         
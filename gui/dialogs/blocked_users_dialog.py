@@ -81,6 +81,9 @@ class BlockedUsersDialog(UserListDialog):
                 self.list_ctrl.SetItem(index, 1, f"@{handle}")
                 self.list_ctrl.SetItem(index, 2, description)
                 
+            # ローカルキャッシュに保存
+            self.cache_relations('blocks', result.blocks, 'blocking')
+            
             # もっと読み込むボタンの状態を更新
             if self.cursor:
                 self.load_more_btn.SetLabel("もっと読み込む")
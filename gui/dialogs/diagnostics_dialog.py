@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+診断情報ダイアログ（API呼び出しの回数・エラー回数・レイテンシ）
+"""
+
+import wx
+import time
+import logging
+
+from core.metrics import ClientMetrics
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 一覧の列（見出し, 幅, 計測値のキー）
+COLUMNS = (
+    ("エンドポイント", 220, 'endpoint'),
+    ("呼び出し", 70, 'count'),
+    ("エラー", 60, 'errors'),
+    ("平均", 70, 'avg_ms'),
+    ("p50", 70, 'p50'),
+    ("p95", 70, 'p95'),
+    ("p99", 70, 'p99'),
+    ("最大", 70, 'max_ms'),
+)
+
+def format_ms(value):
+    """所要時間を表示用の文字列にする
+
+    Args:
+        value (float): 所要時間（ミリ秒）。記録がない場合はNone
+
+    Returns:
+        str: 表示用の文字列
+    """
+    if value is None:
+        return "-"
+    if value >= 1000:
+        return f"{value / 1000:.2f}s"
+    return f"{value:.0f}ms"
+
+class DiagnosticsDialog(wx.Dialog):
+    """診断情報ダイアログ"""
+
+    def __init__(self, parent, metrics=None):
+        """初期化
+
+        Args:
+            parent: 親ウィンドウ
+            metrics (ClientMetrics, optional): 表示する計測値。省略した場合はClientMetrics()
+        """
+        super(DiagnosticsDialog, self).__init__(
+            parent,
+            title="診断情報",
+            size=(760, 460),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
+        )
+
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+
+        # UIの初期化
+        self.init_ui()
+
+        # キーイベントのバインド
+        self.Bind(wx.EVT_CHAR_HOOK, self.on_key_down)
+
+        # 中央に配置
+        self.Centre()
+
+        self.refresh()
+
+    def init_ui(self):
+        """UIの初期化"""
+        panel = wx.Panel(self)
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+
+        # 計測期間などの表示
+        self.status_label = wx.StaticText(panel, label="")
+        main_sizer.Add(self.status_label, 0, wx.EXPAND | wx.ALL, 5)
+
+        # 計測値の一覧
+        self.list_ctrl = wx.ListCtrl(panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        for index, (label, width, _) in enumerate(COLUMNS):
+            align = wx.LIST_FORMAT_LEFT if index == 0 else wx.LIST_FORMAT_RIGHT
+            self.list_ctrl.InsertColumn(index, label, align, width=width)
+        main_sizer.Add(self.list_ctrl, 1, wx.EXPAND | wx.ALL, 10)
+
+        # 操作ボタン
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+
+        refresh_btn = wx.Button(panel, label="更新(&R)")
+        refresh_btn.Bind(wx.EVT_BUTTON, lambda event: self.refresh())
+        button_sizer.Add(refresh_btn, 0, wx.ALL, 5)
+
+        reset_btn = wx.Button(panel, label="リセット(&C)")
+        reset_btn.Bind(wx.EVT_BUTTON, self.on_reset)
+        button_sizer.Add(reset_btn, 0, wx.ALL, 5)
+
+        close_btn = wx.Button(panel, wx.ID_CLOSE, "閉じる")
+        close_btn.Bind(wx.EVT_BUTTON, lambda event: self.EndModal(wx.ID_CLOSE))
+        button_sizer.Add(close_btn, 0, wx.ALL, 5)
+
+        main_sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
+        panel.SetSizer(main_sizer)
+
+    def refresh(self):
+        """計測値を読み込み直して一覧を更新する"""
+        rows = [row for row in self.metrics.snapshot() if row['count']]
+
+        self.list_ctrl.DeleteAllItems()
+        for row in rows:
+            index = self.list_ctrl.InsertItem(self.list_ctrl.GetItemCount(), row['endpoint'])
+            for column, (_, _, key) in enumerate(COLUMNS[1:], start=1):
+                value = row[key]
+                self.list_ctrl.SetItem(index, column, str(value) if key in ('count', 'errors') else format_ms(value))
+            if row['errors']:
+                self.list_ctrl.SetItemTextColour(index, wx.RED)
+
+        elapsed_minutes = (time.time() - self.metrics.started_at) / 60
+        total = sum(row['count'] for row in rows)
+        errors = sum(row['errors'] for row in rows)
+        self.status_label.SetLabel(
+            f"計測期間: {elapsed_minutes:.0f}分  呼び出し: {total}回  エラー: {errors}回"
+            "（パーセンタイルは固定のバケットからの近似値です）"
+        )
+
+    def on_reset(self, event):
+        """計測値を消去する
+
+        Args:
+            event: ボタンイベント
+        """
+        if wx.MessageBox("計測値を消去しますか？", "確認", wx.YES_NO | wx.ICON_QUESTION, self) != wx.YES:
+            return
+        self.metrics.reset()
+        logger.info("API呼び出しの計測値を消去しました")
+        self.refresh()
+
+    def on_key_down(self, event):
+        """キー入力時の処理
+
+        Args:
+            event: キーイベント
+        """
+        # Escキーが押されたらダイアログを閉じる
+        if event.GetKeyCode() == wx.WXK_ESCAPE:
+            self.EndModal(wx.ID_CLOSE)
+        else:
+            event.Skip()
@@ -86,6 +86,9 @@ class FollowingDialog(UserListDialog):
                 
             # この行は不要なので削除
             
+            # ローカルキャッシュに保存
+            self.cache_relations('follows', result.follows, 'following')
+            
             # もっと読み込むボタンの状態を更新
             if self.cursor:
                 self.load_more_btn.SetLabel("もっと読み込む")
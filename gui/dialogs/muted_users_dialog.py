@@ -84,6 +84,9 @@ class MutedUsersDialog(UserListDialog):
                 self.list_ctrl.SetItem(index, 1, f"@{handle}")
                 self.list_ctrl.SetItem(index, 2, description)
 
+            # ローカルキャッシュに保存
+            self.cache_relations('mutes', result.mutes)
+
             # もっと読み込むボタンの状態を更新
             if self.cursor:
                 self.load_more_btn.SetLabel("もっと読み込む")
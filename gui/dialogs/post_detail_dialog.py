@@ -27,7 +27,7 @@ class PostDetailDialog(wx.Dialog):
         """
         super(PostDetailDialog, self).__init__(
             parent, 
-            title=f"{post_data['username']}の投稿",
+            title=f"{post_data['author'].username}の投稿",
             size=(500, 300),
             style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
         )
@@ -134,7 +134,7 @@ class PostDetailDialog(wx.Dialog):
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         
         # 投稿内容（リードオンリーエディット）- 全ての情報を含む
-        content_text = f"{self.post_data['username']} {self.post_data['handle']}\n"
+        content_text = f"{self.post_data['author'].username} {self.post_data['author'].handle_text}\n"
         content_text += f"{format_timestamp_to_jst(self.post_data['raw_timestamp'])}\n\n"
         content_text += f"{self.post_data['content']}\n"
         
@@ -142,7 +142,7 @@ class PostDetailDialog(wx.Dialog):
         if self.post_data.get('is_quote_post', False) and self.post_data.get('quote_of'):
             quote_info = self.post_data['quote_of']
             content_text += f"\n【引用元】\n"
-            content_text += f"{quote_info['username']} {quote_info['handle']}\n"
+            content_text += f"{quote_info['author'].username} {quote_info['author'].handle_text}\n"
             content_text += f"{quote_info['content']}\n"
             if 'like_count' in quote_info and 'repost_count' in quote_info:
                 content_text += f"いいね: {quote_info['like_count']}  リポスト: {quote_info['repost_count']}\n"
@@ -194,6 +194,11 @@ class PostDetailDialog(wx.Dialog):
         quote_btn.Bind(wx.EVT_BUTTON, self.on_quote)
         button_sizer.Add(quote_btn, 0, wx.ALL, 5)
         
+        # スレッド表示ボタン
+        thread_btn = wx.Button(panel, label="スレッド", size=(80, -1))
+        thread_btn.Bind(wx.EVT_BUTTON, self.on_show_thread)
+        button_sizer.Add(thread_btn, 0, wx.ALL, 5)
+        
         # 閉じるボタン
         close_btn = wx.Button(panel, wx.ID_CLOSE, "閉じる")
         close_btn.Bind(wx.EVT_BUTTON, self.on_close)
@@ -255,6 +260,19 @@ class PostDetailDialog(wx.Dialog):
             if hasattr(frame, 'on_repost'):
                 frame.on_repost(event)
         
+    def on_show_thread(self, event):
+        """スレッド表示ボタンクリック時の処理
+        
+        Args:
+            event: ボタンイベント
+        """
+        # 親フレームのon_show_threadメソッドを呼び出す
+        parent = self.parent_ref()
+        if parent and not parent.IsBeingDeleted():
+            frame = wx.GetTopLevelParent(parent)
+            if hasattr(frame, 'on_show_thread'):
+                frame.on_show_thread(event)
+        
     def on_close(self, event):
         """閉じるボタンクリック時の処理
         
@@ -24,7 +24,7 @@ class QuoteDialog(wx.Dialog):
         """
         super(QuoteDialog, self).__init__(
             parent, 
-            title=f"{post_data['username']}の投稿を引用", 
+            title=f"{post_data['author'].username}の投稿を引用", 
             size=(500, 350),
             style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
         )
@@ -48,7 +48,7 @@ class QuoteDialog(wx.Dialog):
         main_sizer.Add(quote_from_label, 0, wx.ALL | wx.EXPAND, 5)
         
         # 引用元の投稿内容（リードオンリー）
-        quote_content = f"{self.post_data['username']} {self.post_data['handle']} - {self.post_data['time']}\n{self.post_data['content']}"
+        quote_content = f"{self.post_data['author'].username} {self.post_data['author'].handle_text} - {self.post_data['time']}\n{self.post_data['content']}"
         quote_from_ctrl = wx.TextCtrl(
             panel, 
             value=quote_content,
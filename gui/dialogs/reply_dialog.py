@@ -24,7 +24,7 @@ class ReplyDialog(wx.Dialog):
         """
         super(ReplyDialog, self).__init__(
             parent, 
-            title=f"{post_data['username']}への返信", 
+            title=f"{post_data['author'].username}への返信", 
             size=(500, 300),
             style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
         )
@@ -65,7 +65,7 @@ class ReplyDialog(wx.Dialog):
         main_sizer.Add(content_label, 0, wx.ALL | wx.EXPAND, 5)
         
         # デフォルトでメンションを入れる
-        default_text = f"@{self.post_data['author_handle']} "
+        default_text = f"@{self.post_data['author'].handle} "
         
         self.content_ctrl = wx.TextCtrl(panel, style=wx.TE_MULTILINE)
         self.content_ctrl.SetValue(default_text)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+保存済みの投稿の検索ダイアログ
+"""
+
+import wx
+import time
+import logging
+from core.post_model import post_from_cache, format_post_content
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+class SearchDialog(wx.Dialog):
+    """保存済みの投稿の検索ダイアログ
+
+    タイムラインやスレッドで表示した投稿をローカルのキャッシュから検索する。
+    通信は行わない。
+    """
+
+    def __init__(self, parent, client):
+        """初期化
+
+        Args:
+            parent: 親ウィンドウ
+            client: Blueskyクライアント
+        """
+        super(SearchDialog, self).__init__(
+            parent,
+            title="保存済みの投稿を検索",
+            size=(700, 500),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
+        )
+
+        self.client = client
+        self.results = []
+
+        # UIの初期化
+        self.init_ui()
+
+        # キーイベントのバインド
+        self.Bind(wx.EVT_CHAR_HOOK, self.on_key_down)
+
+        # 中央に配置
+        self.Centre()
+
+        self.query_ctrl.SetFocus()
+
+    def init_ui(self):
+        """UIの初期化"""
+        panel = wx.Panel(self)
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+
+        # 検索語の入力欄
+        query_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        query_label = wx.StaticText(panel, label="検索語(&S):")
+        query_sizer.Add(query_label, 0, wx.ALIGN_CENTER_VERTICAL | wx.ALL, 5)
+
+        self.query_ctrl = wx.TextCtrl(panel, style=wx.TE_PROCESS_ENTER)
+        self.query_ctrl.SetName("検索語")
+        self.query_ctrl.Bind(wx.EVT_TEXT_ENTER, self.on_search)
+        query_sizer.Add(self.query_ctrl, 1, wx.EXPAND | wx.ALL, 5)
+
+        search_btn = wx.Button(panel, label="検索")
+        search_btn.Bind(wx.EVT_BUTTON, self.on_search)
+        query_sizer.Add(search_btn, 0, wx.ALL, 5)
+
+        main_sizer.Add(query_sizer, 0, wx.EXPAND | wx.ALL, 5)
+
+        # ステータスラベル
+        self.status_label = wx.StaticText(panel, label="検索語を入力してEnterキーを押してください")
+        main_sizer.Add(self.status_label, 0, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
+
+        # 検索結果
+        self.list_ctrl = wx.ListCtrl(panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.list_ctrl.SetName("検索結果")
+        self.list_ctrl.InsertColumn(0, "ユーザー", width=150)
+        self.list_ctrl.InsertColumn(1, "内容", width=400)
+        self.list_ctrl.InsertColumn(2, "日時", width=100)
+        self.list_ctrl.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_item_activated)
+        main_sizer.Add(self.list_ctrl, 1, wx.EXPAND | wx.ALL, 10)
+
+        # 操作ボタン
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+
+        # スレッド表示ボタン
+        thread_btn = wx.Button(panel, label="スレッドを表示(&H)")
+        thread_btn.Bind(wx.EVT_BUTTON, self.on_show_thread)
+        button_sizer.Add(thread_btn, 0, wx.ALL, 5)
+
+        # 閉じるボタン
+        close_btn = wx.Button(panel, wx.ID_CLOSE, "閉じる")
+        close_btn.Bind(wx.EVT_BUTTON, self.on_close)
+        button_sizer.Add(close_btn, 0, wx.ALL, 5)
+
+        main_sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
+
+        panel.SetSizer(main_sizer)
+
+    def on_key_down(self, event):
+        """キー入力時の処理
+
+        Args:
+            event: キーイベント
+        """
+        key_code = event.GetKeyCode()
+
+        # Escキーが押されたらダイアログを閉じる
+        if key_code == wx.WXK_ESCAPE:
+            self.EndModal(wx.ID_CLOSE)
+        else:
+            event.Skip()
+
+    def on_search(self, event):
+        """検索の実行
+
+        Args:
+            event: イベント
+        """
+        query = self.query_ctrl.GetValue().strip()
+        if not query:
+            return
+
+        # 直前に取得した投稿も検索できるよう、遅延書き込み中のキャッシュを反映
+        self.client.data_store.flush()
+
+        start = time.perf_counter()
+        rows = self.client.data_store.search_posts(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"保存済みの投稿を検索しました: {len(rows)}件, {elapsed_ms:.1f}ms")
+
+        self.results = [post_from_cache(row, self.client.user_did) for row in rows]
+
+        self.list_ctrl.DeleteAllItems()
+        for i, post in enumerate(self.results):
+            index = self.list_ctrl.InsertItem(i, post['author'].username)
+            self.list_ctrl.SetItem(index, 1, format_post_content(post).replace('\n', ' '))
+            self.list_ctrl.SetItem(index, 2, post['time'])
+
+        if self.results:
+            self.status_label.SetLabel(f"{len(self.results)}件見つかりました（{elapsed_ms:.0f}ミリ秒）")
+            self.list_ctrl.Select(0)
+            self.list_ctrl.Focus(0)
+            self.list_ctrl.SetFocus()
+        else:
+            self.status_label.SetLabel("見つかりませんでした")
+
+    def get_selected_post(self):
+        """選択中の検索結果を取得
+
+        Returns:
+            dict: 投稿データ。選択されていない場合はNone
+        """
+        index = self.list_ctrl.GetFirstSelected()
+        if index == -1 or index >= len(self.results):
+            return None
+        return self.results[index]
+
+    def on_item_activated(self, event):
+        """検索結果のダブルクリック・Enterキーの処理
+
+        Args:
+            event: リストイベント
+        """
+        self.on_show_thread(event)
+
+    def on_show_thread(self, event):
+        """選択中の投稿のスレッドを表示
+
+        Args:
+            event: イベント
+        """
+        post = self.get_selected_post()
+        if not post:
+            return
+
+        if not self.client.is_logged_in:
+            wx.MessageBox("スレッドを表示するにはログインしてください", "エラー", wx.OK | wx.ICON_ERROR)
+            return
+
+        from gui.dialogs.thread_dialog import ThreadDialog
+        dlg = ThreadDialog(self, self.client, post)
+        dlg.ShowModal()
+        dlg.Destroy()
+
+    def on_close(self, event):
+        """閉じるボタンクリック時の処理
+
+        Args:
+            event: ボタンイベント
+        """
+        self.EndModal(wx.ID_CLOSE)
@@ -8,6 +8,7 @@ SSky - Blueskyクライアント
 
 import wx
 import logging
+from core.log_events import LOG_FORMAT_TEXT, LOG_FORMAT_JSON
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -46,7 +47,8 @@ class SettingsDialog(wx.Dialog):
                 'show_completion_dialog': self.settings_manager.get('post.show_completion_dialog', True)
             },
             'advanced': {
-                'enable_debug_log': self.settings_manager.get('advanced.enable_debug_log', False)
+                'enable_debug_log': self.settings_manager.get('advanced.enable_debug_log', False),
+                'log_format': self.settings_manager.get('advanced.log_format', LOG_FORMAT_TEXT)
             }
         }
         
@@ -182,15 +184,26 @@ class SettingsDialog(wx.Dialog):
         description.SetMinSize((-1, 60))
         sizer.Add(description, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10)
         
+        # ログの形式の設定
+        self.json_log_cb = wx.CheckBox(
+            self.settings_panel,
+            label="ログをJSON形式で出力する（再起動後に反映）"
+        )
+        sizer.Add(self.json_log_cb, 0, wx.ALL, 10)
+        
         self.settings_panel.SetSizer(sizer)
         
         # 設定値の読み込み（キャッシュから）
         self.enable_debug_log_cb.SetValue(
             self.settings_cache['advanced']['enable_debug_log']
         )
+        self.json_log_cb.SetValue(
+            self.settings_cache['advanced']['log_format'] == LOG_FORMAT_JSON
+        )
         
         # イベントハンドラをバインド
         self.enable_debug_log_cb.Bind(wx.EVT_CHECKBOX, self.on_debug_log_changed)
+        self.json_log_cb.Bind(wx.EVT_CHECKBOX, self.on_log_format_changed)
         
         self.settings_panel.Layout()
     
@@ -210,6 +223,22 @@ class SettingsDialog(wx.Dialog):
         self.settings_cache['advanced']['enable_debug_log'] = enabled
         logger.debug(f"デバッグログの有効/無効を変更しました: {enabled}")
     
+    def on_log_format_changed(self, event):
+        """ログの形式が変更されたときの処理
+        
+        Args:
+            event: チェックボックスイベント
+        """
+        # ダイアログが破棄中の場合は何もしない
+        if self.is_being_destroyed:
+            return
+            
+        log_format = LOG_FORMAT_JSON if self.json_log_cb.GetValue() else LOG_FORMAT_TEXT
+        
+        # キャッシュに値を保存
+        self.settings_cache['advanced']['log_format'] = log_format
+        logger.debug(f"ログの形式を変更しました: {log_format}")
+    
     def show_timeline_settings(self):
         """投稿一覧の設定項目を表示"""
         # 現在の設定パネルの子ウィジェットをクリア
@@ -443,11 +472,12 @@ class SettingsDialog(wx.Dialog):
             fetch_interval = self.settings_cache['timeline']['fetch_interval']
             show_completion_dialog = self.settings_cache['post']['show_completion_dialog']
             enable_debug_log = self.settings_cache['advanced']['enable_debug_log']
+            log_format = self.settings_cache['advanced']['log_format']
             
             # 設定値の詳細をログに出力
             logger.debug(f"保存する設定値: timeline.fetch_count={fetch_count}, timeline.auto_fetch={auto_fetch}, "
                          f"timeline.fetch_interval={fetch_interval}, post.show_completion_dialog={show_completion_dialog}, "
-                         f"advanced.enable_debug_log={enable_debug_log}")
+                         f"advanced.enable_debug_log={enable_debug_log}, advanced.log_format={log_format}")
             
             # バリデーション
             if fetch_count < 1 or fetch_count > 100:
@@ -471,6 +501,7 @@ class SettingsDialog(wx.Dialog):
             self.settings_manager.set('timeline.fetch_interval', fetch_interval)
             self.settings_manager.set('post.show_completion_dialog', show_completion_dialog)
             self.settings_manager.set('advanced.enable_debug_log', enable_debug_log)
+            self.settings_manager.set('advanced.log_format', log_format)
             
             # 設定ファイルに保存
             logger.debug(f"設定の保存を試みます: {self.settings_manager.settings_file}")
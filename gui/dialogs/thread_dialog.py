@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+スレッド表示ダイアログ
+"""
+
+import wx
+import logging
+from core.thread_cache import ThreadCache
+from core.post_model import format_post_content
+from utils.async_utils import run_async
+from utils.time_format import format_timestamp_to_jst
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 未取得の返信がある枝に表示する仮の項目
+LOADING_LABEL = "返信を読み込み中..."
+
+class ThreadDialog(wx.Dialog):
+    """スレッド表示ダイアログ
+
+    ルート投稿から返信をツリーで表示する。キャッシュ済みのスレッドはすぐに表示し、
+    新しい返信をバックグラウンドで取得して追加する。
+    """
+
+    def __init__(self, parent, client, post_data):
+        """初期化
+
+        Args:
+            parent: 親ウィンドウ
+            client: Blueskyクライアント
+            post_data (dict): 起点となる投稿データ
+        """
+        super(ThreadDialog, self).__init__(
+            parent,
+            title=f"{post_data['author'].username}の投稿のスレッド",
+            size=(700, 550),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
+        )
+
+        self.client = client
+        self.post_data = post_data
+        self.cache = ThreadCache()
+        self.root_uri = ThreadCache.root_uri_of(post_data)
+        self.thread = None
+        self.items = {}  # URI -> TreeItemId
+        self.expanding = set()  # 展開処理中のURI
+        self.closed = False
+
+        # UIの初期化
+        self.init_ui()
+
+        # キーイベントのバインド
+        self.Bind(wx.EVT_CHAR_HOOK, self.on_key_down)
+
+        # 中央に配置
+        self.Centre()
+
+        # キャッシュ済みのスレッドがあれば先に表示してから差分を取得
+        cached = self.cache.get(self.root_uri)
+        if cached is not None:
+            self.thread = cached
+            self.populate()
+        self.load_thread()
+
+    def init_ui(self):
+        """UIの初期化"""
+        panel = wx.Panel(self)
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+
+        # ステータスラベル
+        self.status_label = wx.StaticText(panel, label="読み込み中...")
+        main_sizer.Add(self.status_label, 0, wx.EXPAND | wx.ALL, 5)
+
+        # スレッドのツリー
+        self.tree = wx.TreeCtrl(
+            panel,
+            style=wx.TR_DEFAULT_STYLE | wx.TR_HIDE_ROOT | wx.TR_LINES_AT_ROOT | wx.BORDER_THEME
+        )
+        self.tree.SetName("スレッド")
+        self.tree_root = self.tree.AddRoot("スレッド")
+        self.tree.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.on_item_expanding)
+        self.tree.Bind(wx.EVT_TREE_SEL_CHANGED, self.on_selection_changed)
+        main_sizer.Add(self.tree, 2, wx.EXPAND | wx.ALL, 10)
+
+        # 選択中の投稿の詳細
+        self.detail = wx.TextCtrl(
+            panel,
+            style=wx.TE_MULTILINE | wx.TE_READONLY | wx.BORDER_SIMPLE
+        )
+        self.detail.SetName("投稿の詳細")
+        self.detail.SetBackgroundColour(wx.SystemSettings.GetColour(wx.SYS_COLOUR_BTNFACE))
+        main_sizer.Add(self.detail, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
+
+        # 操作ボタン
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+
+        # 更新ボタン
+        self.refresh_btn = wx.Button(panel, label="更新(&U)")
+        self.refresh_btn.Bind(wx.EVT_BUTTON, self.on_refresh)
+        button_sizer.Add(self.refresh_btn, 0, wx.ALL, 5)
+
+        # 閉じるボタン
+        close_btn = wx.Button(panel, wx.ID_CLOSE, "閉じる")
+        close_btn.Bind(wx.EVT_BUTTON, self.on_close)
+        button_sizer.Add(close_btn, 0, wx.ALL, 5)
+
+        main_sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
+
+        panel.SetSizer(main_sizer)
+
+    def on_key_down(self, event):
+        """キー入力時の処理
+
+        Args:
+            event: キーイベント
+        """
+        key_code = event.GetKeyCode()
+
+        # Escキーが押されたらダイアログを閉じる
+        if key_code == wx.WXK_ESCAPE:
+            self.EndModal(wx.ID_CLOSE)
+        # F5キーで更新
+        elif key_code == wx.WXK_F5:
+            self.load_thread(force=True)
+        else:
+            event.Skip()
+
+    def load_thread(self, force=False):
+        """スレッドをバックグラウンドで取得（キャッシュ済みなら差分のみ追加）
+
+        Args:
+            force (bool, optional): 前回の取得から間がなくても再取得する
+        """
+        self.status_label.SetLabel("スレッドを取得しています...")
+        self.refresh_btn.Enable(False)
+        run_async(
+            self.cache.load, self._on_thread_loaded, self._on_load_error,
+            self.client, self.root_uri, force
+        )
+
+    def _on_thread_loaded(self, result):
+        """スレッド取得完了時の処理（UIスレッド）
+
+        Args:
+            result (tuple): (スレッド, 新しく追加されたノードのURIのリスト)
+        """
+        if self.closed:
+            return
+
+        thread, added = result
+        self.refresh_btn.Enable(True)
+
+        if self.thread is None:
+            # 初回表示
+            self.thread = thread
+            self.populate()
+        else:
+            # 新しい返信だけを追加し、既存の項目は表示を更新
+            self.add_nodes(added)
+            self.update_labels()
+
+        if added and len(added) != len(self.thread.nodes):
+            self.status_label.SetLabel(f"{len(self.thread.nodes)}件の投稿（新しい返信: {len(added)}件）")
+        else:
+            self.status_label.SetLabel(f"{len(self.thread.nodes)}件の投稿")
+
+    def _on_load_error(self, error):
+        """スレッド取得失敗時の処理（UIスレッド）
+
+        Args:
+            error: エラー情報
+        """
+        if self.closed:
+            return
+        self.refresh_btn.Enable(True)
+        self.status_label.SetLabel(f"スレッドの取得に失敗しました: {str(error)}")
+
+    def populate(self):
+        """スレッド全体をツリーに表示"""
+        self.tree.DeleteChildren(self.tree_root)
+        self.items = {}
+
+        with self.thread.lock:
+            root_node = self.thread.get_node(self.root_uri)
+            if root_node is None:
+                return
+            self._append_item(self.tree_root, self.root_uri)
+
+        self.tree.ExpandAll()
+
+        # 起点の投稿を選択
+        item = self.items.get(self.post_data.get('uri')) or self.items.get(self.root_uri)
+        if item:
+            self.tree.SelectItem(item)
+            self.tree.EnsureVisible(item)
+        self.status_label.SetLabel(f"{len(self.thread.nodes)}件の投稿")
+
+    def add_nodes(self, uris):
+        """新しく追加されたノードをツリーに追加
+
+        Args:
+            uris (list): 追加されたノードのURIのリスト（親が先に並ぶ）
+        """
+        with self.thread.lock:
+            for uri in uris:
+                if uri in self.items:
+                    continue
+                node = self.thread.get_node(uri)
+                parent_item = self.items.get(node['parent']) if node else None
+                if parent_item is None:
+                    continue
+                self._remove_loading_item(parent_item)
+                self._append_item(parent_item, uri)
+
+    def update_labels(self):
+        """既存の項目の表示（いいね数など）を更新"""
+        with self.thread.lock:
+            for uri, item in self.items.items():
+                node = self.thread.get_node(uri)
+                if node:
+                    self.tree.SetItemText(item, self._format_label(node['post']))
+
+    def _append_item(self, parent_item, uri):
+        """ノードとその取得済みの子をツリーに追加
+
+        Args:
+            parent_item: 親の項目
+            uri (str): 追加するノードのURI
+        """
+        node = self.thread.get_node(uri)
+        item = self.tree.AppendItem(parent_item, self._format_label(node['post']))
+        self.tree.SetItemData(item, uri)
+        self.items[uri] = item
+
+        for child_uri in node['children']:
+            if child_uri not in self.items:
+                self._append_item(item, child_uri)
+
+        # 未取得の返信がある場合は、展開できるよう仮の項目を置く
+        if self.thread.needs_expand(uri):
+            self.tree.AppendItem(item, LOADING_LABEL)
+
+    def _remove_loading_item(self, item):
+        """仮の項目を削除
+
+        Args:
+            item: 親の項目
+        """
+        child, cookie = self.tree.GetFirstChild(item)
+        while child.IsOk():
+            next_child, cookie = self.tree.GetNextChild(item, cookie)
+            if self.tree.GetItemData(child) is None:
+                self.tree.Delete(child)
+            child = next_child
+
+    @staticmethod
+    def _format_label(post):
+        """ツリーに表示する文字列を作成
+
+        Args:
+            post (dict): 投稿データ
+
+        Returns:
+            str: 表示用の文字列
+        """
+        content = format_post_content(post).replace('\n', ' ')
+        label = f"{post['author'].username}: {content}"
+        if post.get('time'):
+            label += f" ({post['time']})"
+        return label
+
+    def on_item_expanding(self, event):
+        """項目展開時の処理（未取得の深い枝を取得）
+
+        Args:
+            event: ツリーイベント
+        """
+        item = event.GetItem()
+        uri = self.tree.GetItemData(item)
+        if self.thread is None or not uri or uri in self.expanding or not self.thread.needs_expand(uri):
+            event.Skip()
+            return
+
+        self.expanding.add(uri)
+        self.status_label.SetLabel("返信を取得しています...")
+        run_async(
+            self.cache.expand,
+            lambda added: self._on_branch_loaded(uri, added),
+            lambda error: self._on_branch_error(uri, error),
+            self.client, self.thread, uri
+        )
+        event.Skip()
+
+    def _on_branch_loaded(self, uri, added):
+        """枝の取得完了時の処理（UIスレッド）
+
+        Args:
+            uri (str): 展開した投稿のURI
+            added (list): 新しく追加されたノードのURIのリスト
+        """
+        self.expanding.discard(uri)
+        if self.closed:
+            return
+
+        item = self.items.get(uri)
+        if item is None:
+            return
+        self._remove_loading_item(item)
+        self.add_nodes(added)
+        self.tree.Expand(item)
+        self.status_label.SetLabel(f"{len(self.thread.nodes)}件の投稿")
+
+    def _on_branch_error(self, uri, error):
+        """枝の取得失敗時の処理（UIスレッド）
+
+        Args:
+            uri (str): 展開した投稿のURI
+            error: エラー情報
+        """
+        self.expanding.discard(uri)
+        if self.closed:
+            return
+        self.status_label.SetLabel(f"返信の取得に失敗しました: {str(error)}")
+
+    def on_selection_changed(self, event):
+        """選択変更時の処理（詳細欄を更新）
+
+        Args:
+            event: ツリーイベント
+        """
+        uri = self.tree.GetItemData(event.GetItem()) if event.GetItem().IsOk() else None
+        node = self.thread.get_node(uri) if self.thread and uri else None
+        if node is None:
+            self.detail.SetValue("")
+            return
+
+        post = node['post']
+        detail_text = f"{post['author'].username} {post['author'].handle_text}\n"
+        if post.get('raw_timestamp'):
+            detail_text += f"{format_timestamp_to_jst(post['raw_timestamp'])}\n"
+        detail_text += f"\n{format_post_content(post)}\n"
+        detail_text += f"\nいいね: {post['likes']}  返信: {post['replies']}  リポスト: {post['reposts']}"
+        self.detail.SetValue(detail_text)
+
+    def on_refresh(self, event):
+        """更新ボタンクリック時の処理
+
+        Args:
+            event: ボタンイベント
+        """
+        self.load_thread(force=True)
+
+    def on_close(self, event):
+        """閉じるボタンクリック時の処理
+
+        Args:
+            event: ボタンイベント
+        """
+        self.EndModal(wx.ID_CLOSE)
+
+    def Destroy(self):
+        """ダイアログ破棄時の処理"""
+        # 取得中の結果が届いても画面を触らないようにする
+        self.closed = True
+        self.Unbind(wx.EVT_CHAR_HOOK)
+        logger.debug("ThreadDialogのリソースを解放しました")
+        return super(ThreadDialog, self).Destroy()
@@ -328,6 +328,28 @@ class UserListDialog(wx.Dialog):
             status_text = message
             
         self.status_label.SetLabel(status_text)
+        
+    def cache_relations(self, table, users, uri_attr=None):
+        """取得したユーザーとの関係をローカルキャッシュに保存（書き込みはバックグラウンドで行う）
+        
+        Args:
+            table (str): 'follows'、'blocks'、'mutes'のいずれか
+            users (list): APIから取得したProfileViewのリスト
+            uri_attr (str, optional): 関係のレコードのURIを持つviewerの属性名
+        """
+        try:
+            subjects = [
+                {
+                    'did': user.did,
+                    'handle': user.handle,
+                    'display_name': user.display_name,
+                    'uri': getattr(getattr(user, 'viewer', None), uri_attr, None) if uri_attr else None
+                }
+                for user in users
+            ]
+            self.client.data_store.queue_relations(table, self.client.user_did, subjects)
+        except Exception as e:
+            logger.error(f"ユーザーの関係のキャッシュに失敗しました: {str(e)}")
 
 
 class UserListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
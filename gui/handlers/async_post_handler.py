@@ -11,115 +11,124 @@ import wx
 from pubsub import pub
 import logging
 from core import events
-from utils.file_utils import read_binary_file, get_mime_type
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
 class AsyncPostHandler:
-    """非同期投稿処理クラス"""
+    """非同期投稿処理クラス
+    
+    投稿・返信・いいねは送信待ちキュー（Outbox）に保存してから
+    バックグラウンドで送信するため、呼び出し元はすぐに戻る。
+    """
+    
+    # 送信待ちキュー（クライアントごとに1つ）
+    _outbox = None
     
     @staticmethod
-    def submit_post(client, text, images=None):
-        """投稿を非同期で送信
+    def get_outbox(client):
+        """送信待ちキューを取得（必要なら作成）
         
         Args:
             client: Blueskyクライアント
-            text: 投稿内容
-            images: 添付画像のリスト（オプション）
+            
+        Returns:
+            Outbox: 送信待ちキュー
         """
-        # イベント発行（投稿開始）
-        wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_START)
+        outbox = AsyncPostHandler._outbox
+        if outbox is None or outbox.client is not client:
+            if outbox is not None:
+                outbox.stop()
+            from core.outbox import Outbox
+            outbox = Outbox(client, listener=AsyncPostHandler._on_outbox_result)
+            AsyncPostHandler._outbox = outbox
+        return outbox
+    
+    @staticmethod
+    def start_outbox(client):
+        """送信待ちキューの送信を開始（ログイン後に呼び出す）
         
-        # 投稿処理スレッドを開始
-        thread = threading.Thread(
-            target=AsyncPostHandler._post_thread,
-            args=(client, text, images)
-        )
-        thread.daemon = True
-        thread.start()
+        Args:
+            client: Blueskyクライアント
+        """
+        AsyncPostHandler.get_outbox(client).start()
+    
+    @staticmethod
+    def stop_outbox():
+        """送信待ちキューの送信を停止（未送信の項目は次回ログイン時に送信）"""
+        if AsyncPostHandler._outbox is not None:
+            AsyncPostHandler._outbox.stop()
     
     @staticmethod
-    def _post_thread(client, text, images):
-        """投稿処理スレッド
+    def submit_post(client, text, images=None, reply_to=None):
+        """投稿を送信待ちキューに追加して非同期で送信
         
         Args:
             client: Blueskyクライアント
             text: 投稿内容
             images: 添付画像のリスト（オプション）
-        """
-        try:
-            # 画像付き投稿
-            if images:
-                # 画像をアップロード
-                uploaded_blobs = []
-                for file_path in images:
-                    # ファイルデータを読み込み
-                    file_data = read_binary_file(file_path)
-                    if not file_data:
-                        raise Exception(f"ファイルの読み込みに失敗しました: {file_path}")
-                        
-                    # ファイルの種類を判定
-                    mime_type = get_mime_type(file_path)
-                    
-                    # ファイルをアップロード
-                    blob = client.upload_blob(file_data, mime_type)
-                    uploaded_blobs.append(blob)
-                
-                # 画像付きで投稿
-                result = client.send_post(text=text, images=uploaded_blobs)
-            else:
-                # テキストのみ投稿
-                result = client.send_post(text=text)
-            
-            # 投稿成功イベントを発行（UIスレッドで実行）
-            wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_SUCCESS, result=result)
+            reply_to: 返信先情報（オプション）
             
-        except Exception as e:
-            logger.error(f"投稿処理中にエラーが発生しました: {str(e)}", exc_info=True)
-            # 投稿失敗イベントを発行（UIスレッドで実行）
-            wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_FAILURE, error=e)
+        Raises:
+            Exception: 送信待ちキューへの保存に失敗した場合
+        """
+        # イベント発行（投稿開始）
+        wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_START)
+        
+        outbox = AsyncPostHandler.get_outbox(client)
+        outbox.enqueue_post(text, images, reply_to)
+        outbox.start()
+        
+        # イベント発行（送信待ちに追加）
+        wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_QUEUED, pending=outbox.pending_count())
     
     @staticmethod
     def like_post(client, uri, cid):
-        """投稿にいいねを非同期で付ける
+        """いいねを送信待ちキューに追加して非同期で送信
         
         Args:
             client: Blueskyクライアント
             uri: 投稿のURI
             cid: 投稿のCID
+            
+        Raises:
+            Exception: 送信待ちキューへの保存に失敗した場合
         """
         # イベント発行（いいね開始）
         wx.CallAfter(pub.sendMessage, events.LIKE_START, uri=uri)
         
-        # いいね処理スレッドを開始
-        thread = threading.Thread(
-            target=AsyncPostHandler._like_thread,
-            args=(client, uri, cid)
-        )
-        thread.daemon = True
-        thread.start()
+        outbox = AsyncPostHandler.get_outbox(client)
+        outbox.enqueue_like(uri, cid)
+        outbox.start()
     
     @staticmethod
-    def _like_thread(client, uri, cid):
-        """いいね処理スレッド
+    def _on_outbox_result(item, result=None, error=None, retrying=False):
+        """送信待ちキューの送信結果をイベントとして発行（ドレインスレッドから呼ばれる）
         
         Args:
-            client: Blueskyクライアント
-            uri: 投稿のURI
-            cid: 投稿のCID
+            item: 送信した項目
+            result: 送信結果
+            error: エラー情報
+            retrying: 再試行予定の場合はTrue
         """
-        try:
-            # いいねを付ける
-            result = client.like(uri, cid)
-            
-            # いいね成功イベントを発行（UIスレッドで実行）
-            wx.CallAfter(pub.sendMessage, events.LIKE_SUCCESS, result=result, uri=uri)
-            
-        except Exception as e:
-            logger.error(f"いいね処理中にエラーが発生しました: {str(e)}", exc_info=True)
-            # いいね失敗イベントを発行（UIスレッドで実行）
-            wx.CallAfter(pub.sendMessage, events.LIKE_FAILURE, error=e, uri=uri)
+        if item['kind'] == 'like':
+            uri = item['payload']['uri']
+            if retrying:
+                return
+            if error is None:
+                wx.CallAfter(pub.sendMessage, events.LIKE_SUCCESS, result=result, uri=uri)
+            else:
+                wx.CallAfter(pub.sendMessage, events.LIKE_FAILURE, error=error, uri=uri)
+            return
+        
+        if retrying:
+            wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_RETRY, error=error, attempts=item['attempts'])
+        elif error is None:
+            # 投稿成功イベントを発行（UIスレッドで実行）
+            wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_SUCCESS, result=result)
+        else:
+            # 投稿失敗イベントを発行（UIスレッドで実行）
+            wx.CallAfter(pub.sendMessage, events.POST_SUBMIT_FAILURE, error=error)
     
     @staticmethod
     def repost(client, repost_of):
@@ -8,13 +8,14 @@ SSky - Blueskyクライアント
 
 import wx # LoginDialog のために残す
 import logging
+import threading
 from pubsub import pub # PyPubSub をインポート
-from atproto_client import Session, SessionEvent # SDK の型をインポート
 
-from gui.dialogs.login_dialog import LoginDialog # show_login_dialog のために残す
 from core.auth.auth_manager import AuthManager
+from core.auth.session_persistence import SessionPersistence
 from core.client import BlueskyClient
 from core import events # 定義したイベント名をインポート
+from utils.async_utils import run_async
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -27,6 +28,10 @@ class AuthService: # クラス名を変更
         self.client = client
         self.auth_manager = auth_manager
 
+        # セッション情報の保存はSessionPersistenceに一本化（重複を除き、バックグラウンドでまとめて保存する）
+        self.session_persistence = SessionPersistence(auth_manager)
+        self.session_persistence.add_listener(self._on_session_saved)
+
         # SDK のセッション変更イベントを購読
         # 注意: self.client が atproto_client.Client インスタンスであることを確認
         if hasattr(self.client, 'on_session_change') and callable(self.client.on_session_change):
@@ -36,8 +41,22 @@ class AuthService: # クラス名を変更
              logger.warning("AuthService: client does not support on_session_change. Session saving might not work automatically.")
 
 
-    def _handle_session_change(self, event: SessionEvent, session: Session):
+    def _send_message(self, topic, **kwargs):
+        """イベントを発行する（ワーカースレッドから呼び出された場合はメインスレッドで発行する）
+
+        Args:
+            topic (str): イベント名
+            **kwargs: イベントの引数
+        """
+        if threading.current_thread() is threading.main_thread():
+            pub.sendMessage(topic, **kwargs)
+        else:
+            wx.CallAfter(pub.sendMessage, topic, **kwargs)
+
+    def _handle_session_change(self, event, session):
         """SDKからのセッション変更イベントを処理"""
+        # atprotoは起動時に読み込まないため、使うときにインポート
+        from atproto_client.client.session import SessionEvent
         logger.info(f"Session change event received: {event}")
         if event in (SessionEvent.CREATE, SessionEvent.REFRESH):
             try:
@@ -45,12 +64,9 @@ class AuthService: # クラス名を変更
                 if hasattr(self.client, 'export_session_string') and callable(self.client.export_session_string):
                     session_string = self.client.export_session_string()
                     if session_string and session and session.did:
-                        logger.debug(f"Saving session for DID: {session.did}")
-                        # AuthManager を介して保存
-                        saved = self.auth_manager.save_session(session.did, session_string)
-                        if saved:
-                            # セッション保存成功イベントを発行
-                            pub.sendMessage(events.AUTH_SESSION_SAVED, did=session.did)
+                        logger.debug(f"Requesting session save for DID: {session.did}")
+                        # 保存サービスに渡す（保存が完了すると _on_session_saved でイベントを発行）
+                        self.session_persistence.submit(session.did, session_string)
                     else:
                         logger.warning("Could not export session string or DID is missing. Session not saved.")
                 else:
@@ -60,9 +76,15 @@ class AuthService: # クラス名を変更
         # elif event == SessionEvent.IMPORT: # 必要ならインポートイベントも処理
         #     pass
 
+    def _on_session_saved(self, did):
+        """セッション情報の保存完了時の処理（保存サービスの書き込み用スレッドから呼び出される）"""
+        # セッション保存成功イベントを発行
+        self._send_message(events.AUTH_SESSION_SAVED, did=did)
+
     def show_login_dialog(self, parent_window):
         """ログインダイアログを表示し、入力があればログイン処理を試行"""
         # LoginDialog は wx.Dialog を継承しているので parent が必要
+        from gui.dialogs.login_dialog import LoginDialog
         dlg = LoginDialog(parent_window)
         try:
             if dlg.ShowModal() == wx.ID_OK:
@@ -81,7 +103,7 @@ class AuthService: # クラス名を変更
     def perform_login(self, username, password):
         """ユーザー名とパスワードでログインを実行"""
         logger.debug("Attempting login...")
-        pub.sendMessage(events.AUTH_LOGIN_ATTEMPT) # ログイン試行イベント
+        self._send_message(events.AUTH_LOGIN_ATTEMPT) # ログイン試行イベント
         try:
             # login メソッドが client に存在するか確認
             if hasattr(self.client, 'login') and callable(self.client.login):
@@ -92,17 +114,17 @@ class AuthService: # クラス名を変更
                 wx.MessageBox(f"{profile.handle}としてログインしました", "ログイン成功", wx.OK | wx.ICON_INFORMATION)
                 
                 # ログイン成功イベントを発行 (プロファイル情報を渡す)
-                pub.sendMessage(events.AUTH_LOGIN_SUCCESS, profile=profile)
+                self._send_message(events.AUTH_LOGIN_SUCCESS, profile=profile)
                 return True
             else:
                  logger.error("AuthService: client does not support login method.")
-                 pub.sendMessage(events.AUTH_LOGIN_FAILURE, error=NotImplementedError("Login method not available"))
+                 self._send_message(events.AUTH_LOGIN_FAILURE, error=NotImplementedError("Login method not available"))
                  return False
 
         except Exception as e:
             logger.error(f"Login failed: {e}", exc_info=True)
             # ログイン失敗イベントを発行 (エラー情報を渡す)
-            pub.sendMessage(events.AUTH_LOGIN_FAILURE, error=e)
+            self._send_message(events.AUTH_LOGIN_FAILURE, error=e)
             return False
 
     def perform_logout(self):
@@ -124,32 +146,33 @@ class AuthService: # クラス名を変更
                 if hasattr(self.client, 'profile'): # プロファイル情報もクリア
                     self.client.profile = None
 
-                # セッション情報を永続化ストアから削除
+                # セッション情報を永続化ストアから削除（保存待ちの分が後から書き込まれないよう先に破棄）
+                self.session_persistence.discard(user_did)
                 deleted = self.auth_manager.delete_session(user_did)
                 if deleted:
                     logger.info(f"Session deleted for DID: {user_did}")
-                    pub.sendMessage(events.AUTH_SESSION_DELETED, did=user_did)
+                    self._send_message(events.AUTH_SESSION_DELETED, did=user_did)
                 else:
                     logger.warning(f"Session for DID {user_did} not found or failed to delete.")
 
                 # ログアウト成功イベントを発行
-                pub.sendMessage(events.AUTH_LOGOUT_SUCCESS)
+                self._send_message(events.AUTH_LOGOUT_SUCCESS)
                 return True
             except Exception as e:
                  logger.error(f"Error during logout: {e}", exc_info=True)
                  # 必要であればログアウト失敗イベントを発行
-                 # pub.sendMessage(events.AUTH_LOGOUT_FAILURE, error=e)
+                 # self._send_message(events.AUTH_LOGOUT_FAILURE, error=e)
                  return False
         else:
             logger.warning("Logout requested but not logged in or profile info unavailable.")
             # ログアウト状態であることを示すイベントを発行しても良い
-            pub.sendMessage(events.AUTH_LOGOUT_SUCCESS) # すでにログアウトしている場合も成功として扱う
+            self._send_message(events.AUTH_LOGOUT_SUCCESS) # すでにログアウトしている場合も成功として扱う
             return False
 
     def login_with_session(self, session_string, user_did):
         """保存されたセッション文字列を使用してログインを試行"""
         logger.debug(f"Attempting login with session for DID: {user_did}")
-        pub.sendMessage(events.AUTH_SESSION_LOAD_ATTEMPT, did=user_did)
+        self._send_message(events.AUTH_SESSION_LOAD_ATTEMPT, did=user_did)
         try:
             # login メソッドが session_string を受け付けるか確認
             if hasattr(self.client, 'login') and callable(self.client.login):
@@ -160,28 +183,40 @@ class AuthService: # クラス名を変更
 
                  logger.info(f"Login with session successful for handle: {profile.handle}")
                  # セッションログイン成功イベントを発行
-                 pub.sendMessage(events.AUTH_SESSION_LOAD_SUCCESS, profile=profile)
+                 self._send_message(events.AUTH_SESSION_LOAD_SUCCESS, profile=profile)
                  return True
             else:
                  logger.error("AuthService: client does not support login with session method.")
-                 pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=NotImplementedError("Login with session method not available"), needs_relogin=True)
+                 self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=NotImplementedError("Login with session method not available"), needs_relogin=True)
                  return False
 
         except Exception as e:
             logger.error(f"Login with session failed for DID {user_did}: {e}", exc_info=True)
             # セッションが無効だった可能性が高い
-            pub.sendMessage(events.AUTH_SESSION_INVALID, error=e, did=user_did)
+            self._send_message(events.AUTH_SESSION_INVALID, error=e, did=user_did)
 
             # 無効なセッション情報を削除
+            self.session_persistence.discard(user_did)
             deleted = self.auth_manager.delete_session(user_did)
             if deleted:
                 logger.info(f"Invalid session deleted for DID: {user_did}")
-                pub.sendMessage(events.AUTH_SESSION_DELETED, did=user_did)
+                self._send_message(events.AUTH_SESSION_DELETED, did=user_did)
 
             # セッションログイン失敗イベントを発行
-            pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=e, needs_relogin=True)
+            self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=e, needs_relogin=True)
             return False
 
+    def load_and_login_async(self):
+        """保存されたセッションの読み込み（復号化）とログインをバックグラウンドで実行
+
+        結果のイベントはメインスレッドで発行するため、その間も画面の表示や
+        保存済みのタイムラインの読み込みを並行して行える。
+
+        Returns:
+            threading.Thread: 起動したスレッド
+        """
+        return run_async(self.load_and_login)
+
     def load_and_login(self):
         """保存されたセッションを読み込み、ログインを試行"""
         logger.debug("Attempting to load session from store...")
@@ -200,11 +235,11 @@ class AuthService: # クラス名を変更
                          logger.debug("Session data decoded from bytes.")
                      except Exception as decode_error:
                          logger.error(f"Failed to decode session data: {decode_error}")
-                         pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=decode_error, needs_relogin=True)
+                         self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=decode_error, needs_relogin=True)
                          return False
                 else:
                     logger.error(f"Loaded session data is not a string or bytes: type={type(session_data)}")
-                    pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=TypeError("Invalid session data type"), needs_relogin=True)
+                    self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=TypeError("Invalid session data type"), needs_relogin=True)
                     return False
 
 
@@ -213,10 +248,10 @@ class AuthService: # クラス名を変更
             else:
                 logger.info("No session found in store.")
                 # セッションが見つからなかった場合のイベント
-                pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=None, needs_relogin=False)
+                self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=None, needs_relogin=False)
                 return False
 
         except Exception as e:
             logger.error(f"Failed to load and login with session: {e}", exc_info=True)
-            pub.sendMessage(events.AUTH_SESSION_LOAD_FAILURE, error=e, needs_relogin=True)
+            self._send_message(events.AUTH_SESSION_LOAD_FAILURE, error=e, needs_relogin=True)
             return False
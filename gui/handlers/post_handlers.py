@@ -10,7 +10,6 @@ import os
 import wx
 import logging
 from pubsub import pub
-from gui.dialogs.post_dialog import PostDialog
 from utils.file_utils import read_binary_file, get_mime_type
 from core import events
 
@@ -43,6 +42,14 @@ class PostHandlers:
             from config.settings_manager import SettingsManager
             self.settings_manager = SettingsManager()
         
+        # 送信待ちキューの結果はいつ届くか分からない（前回起動時の未送信分も含む）ため、常時購読する
+        pub.subscribe(self._on_post_submit_queued, events.POST_SUBMIT_QUEUED)
+        pub.subscribe(self._on_post_submit_retry, events.POST_SUBMIT_RETRY)
+        pub.subscribe(self._on_post_submit_success, events.POST_SUBMIT_SUCCESS)
+        pub.subscribe(self._on_post_submit_failure, events.POST_SUBMIT_FAILURE)
+        pub.subscribe(self._on_like_success, events.LIKE_SUCCESS)
+        pub.subscribe(self._on_like_failure, events.LIKE_FAILURE)
+        
     def on_new_post(self, event):
         """新規投稿ダイアログを表示
         
@@ -54,6 +61,7 @@ class PostHandlers:
             return
             
         # 投稿ダイアログの作成
+        from gui.dialogs.post_dialog import PostDialog
         dlg = PostDialog(self.parent)
         
         # ダイアログ表示
@@ -65,11 +73,7 @@ class PostHandlers:
                     if hasattr(self.parent, 'statusbar'):
                         self.parent.statusbar.SetStatusText("投稿中...")
                     
-                    # PubSubイベントの購読
-                    pub.subscribe(self._on_post_submit_success, events.POST_SUBMIT_SUCCESS)
-                    pub.subscribe(self._on_post_submit_failure, events.POST_SUBMIT_FAILURE)
-                    
-                    # 非同期投稿処理を開始
+                    # 送信待ちキューに追加（送信はバックグラウンドで行う）
                     from gui.handlers.async_post_handler import AsyncPostHandler
                     AsyncPostHandler.submit_post(self.client, post_content, attachment_files)
                     
@@ -83,16 +87,32 @@ class PostHandlers:
         
         dlg.Destroy()
         
+    def _on_post_submit_queued(self, pending):
+        """送信待ちキュー追加イベントハンドラ
+        
+        Args:
+            pending: 未送信の件数
+        """
+        if hasattr(self.parent, 'statusbar'):
+            self.parent.statusbar.SetStatusText(f"送信しています...（未送信: {pending}件）")
+    
+    def _on_post_submit_retry(self, error, attempts):
+        """送信再試行待ちイベントハンドラ
+        
+        Args:
+            error: エラー情報
+            attempts: これまでの送信試行回数
+        """
+        logger.warning(f"送信に失敗しました。再試行します（{attempts}回目）: {str(error)}")
+        if hasattr(self.parent, 'statusbar'):
+            self.parent.statusbar.SetStatusText(f"送信に失敗しました。接続が回復したら再送します（{attempts}回目）")
+    
     def _on_post_submit_success(self, result):
         """投稿成功イベントハンドラ
         
         Args:
             result: 投稿結果
         """
-        # イベント購読を解除
-        pub.unsubscribe(self._on_post_submit_success, events.POST_SUBMIT_SUCCESS)
-        pub.unsubscribe(self._on_post_submit_failure, events.POST_SUBMIT_FAILURE)
-        
         # 投稿成功
         self.show_completion_dialog("投稿が完了しました", "投稿完了")
         
@@ -111,10 +131,6 @@ class PostHandlers:
         Args:
             error: エラー情報
         """
-        # イベント購読を解除
-        pub.unsubscribe(self._on_post_submit_success, events.POST_SUBMIT_SUCCESS)
-        pub.unsubscribe(self._on_post_submit_failure, events.POST_SUBMIT_FAILURE)
-        
         # エラーメッセージを表示
         logger.error(f"投稿に失敗しました: {str(error)}")
         wx.MessageBox(f"投稿に失敗しました: {str(error)}", "エラー", wx.OK | wx.ICON_ERROR)
@@ -153,14 +169,12 @@ class PostHandlers:
             if hasattr(self.parent, 'statusbar'):
                 self.parent.statusbar.SetStatusText("いいねしています...")
                 
-            # PubSubイベントの購読
-            pub.subscribe(self._on_like_success, events.LIKE_SUCCESS)
-            pub.subscribe(self._on_like_failure, events.LIKE_FAILURE)
-            
-            # 非同期いいね処理を開始
+            # 送信待ちキューに追加（送信はバックグラウンドで行う）
             from gui.handlers.async_post_handler import AsyncPostHandler
             AsyncPostHandler.like_post(self.client, selected['uri'], selected['cid'])
             
+            # キューへの追加が済めば次のいいねを受け付けられる（同じ投稿への重複はキュー側で除外）
+            PostHandlers._liking_post = False
             return True
             
         except Exception as e:
@@ -179,10 +193,6 @@ class PostHandlers:
             result: いいね結果
             uri: 投稿のURI
         """
-        # イベント購読を解除
-        pub.unsubscribe(self._on_like_success, events.LIKE_SUCCESS)
-        pub.unsubscribe(self._on_like_failure, events.LIKE_FAILURE)
-        
         # いいね成功
         wx.MessageBox("投稿にいいねしました", "いいね", wx.OK | wx.ICON_INFORMATION)
         if hasattr(self.parent, 'statusbar'):
@@ -203,10 +213,6 @@ class PostHandlers:
             error: エラー情報
             uri: 投稿のURI
         """
-        # イベント購読を解除
-        pub.unsubscribe(self._on_like_success, events.LIKE_SUCCESS)
-        pub.unsubscribe(self._on_like_failure, events.LIKE_FAILURE)
-        
         # エラーメッセージを表示
         logger.error(f"いいね処理に失敗しました: {str(error)}")
         wx.MessageBox(f"いいね処理に失敗しました: {str(error)}", "エラー", wx.OK | wx.ICON_ERROR)
@@ -258,16 +264,9 @@ class PostHandlers:
                     if hasattr(self.parent, 'statusbar'):
                         self.parent.statusbar.SetStatusText("返信を送信しています...")
                     
-                    # 返信を送信
-                    self.client.reply_to_post(reply_text, reply_to)
-                    
-                    # 返信成功
-                    self.show_completion_dialog("返信が完了しました", "返信完了")
-                    
-                    # タイムラインを2秒後に更新
-                    if hasattr(self.parent, 'timeline'):
-                        from utils.async_utils import run_delayed
-                        run_delayed(self.parent.timeline.fetch_timeline, 2, self.client)
+                    # 送信待ちキューに追加（送信結果は投稿と同じイベントで通知される）
+                    from gui.handlers.async_post_handler import AsyncPostHandler
+                    AsyncPostHandler.submit_post(self.client, reply_text, reply_to=reply_to)
                     
                     dlg.Destroy()
                     return True
@@ -393,7 +392,7 @@ class PostHandlers:
         # リポスト確認ダイアログ
         dlg = wx.MessageDialog(
             self.parent,
-            f"{selected['username']}の投稿をリポストしますか？",
+            f"{selected['author'].username}の投稿をリポストしますか？",
             "リポストの確認",
             wx.YES_NO | wx.ICON_QUESTION
         )
@@ -532,10 +531,11 @@ class PostHandlers:
         try:
             # ステータスバーの更新
             if hasattr(self.parent, 'statusbar'):
-                self.parent.statusbar.SetStatusText(f"{selected['username']}のプロフィールを取得しています...")
+                self.parent.statusbar.SetStatusText(f"{selected['author'].username}のプロフィールを取得しています...")
                 
             # 投稿者のハンドルを取得
-            author_handle = selected.get('author_handle')
+            # 投稿者が分からない投稿（削除済み・ブロック）はDIDがない
+            author_handle = selected['author'].handle if selected['author'].did else None
             if not author_handle:
                 wx.MessageBox("投稿者のハンドルが取得できません", "エラー", wx.OK | wx.ICON_ERROR)
                 return False
@@ -545,7 +545,7 @@ class PostHandlers:
             
             # ステータスバーの更新
             if hasattr(self.parent, 'statusbar'):
-                self.parent.statusbar.SetStatusText(f"{selected['username']}のプロフィールを表示します")
+                self.parent.statusbar.SetStatusText(f"{selected['author'].username}のプロフィールを表示します")
                 
             # プロフィールダイアログを表示
             from gui.dialogs.profile_dialog import ProfileDialog
@@ -562,6 +562,54 @@ class PostHandlers:
                 self.parent.statusbar.SetStatusText("プロフィール表示に失敗しました")
             return False
     
+    def on_show_thread(self, event):
+        """スレッド表示アクション
+        
+        Args:
+            event: メニューイベント
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        if not self.client or not self.client.is_logged_in:
+            wx.MessageBox("スレッドを表示するにはログインしてください", "エラー", wx.OK | wx.ICON_ERROR)
+            return False
+            
+        # タイムラインから選択された投稿を取得
+        selected = None
+        if hasattr(self.parent, 'timeline') and hasattr(self.parent.timeline, 'get_selected_post'):
+            selected = self.parent.timeline.get_selected_post()
+            
+        if not selected or not selected.get('uri'):
+            wx.MessageBox("投稿を選択してください", "エラー", wx.OK | wx.ICON_ERROR)
+            return False
+            
+        # スレッドダイアログを表示（取得はダイアログ内で非同期に行う）
+        from gui.dialogs.thread_dialog import ThreadDialog
+        dlg = ThreadDialog(self.parent, self.client, selected)
+        dlg.ShowModal()
+        dlg.Destroy()
+        return True
+    
+    def on_search(self, event):
+        """保存済みの投稿の検索アクション
+        
+        Args:
+            event: メニューイベント
+            
+        Returns:
+            bool: 成功した場合はTrue
+        """
+        if not self.client:
+            return False
+            
+        # 検索はローカルのキャッシュに対して行うため、ログインしていなくても利用できる
+        from gui.dialogs.search_dialog import SearchDialog
+        dlg = SearchDialog(self.parent, self.client)
+        dlg.ShowModal()
+        dlg.Destroy()
+        return True
+    
     def on_delete(self, event):
         """投稿削除アクション
         
@@ -15,7 +15,9 @@ from gui.handlers.post_handlers import PostHandlers
 from core.client import BlueskyClient
 from core.auth.auth_manager import AuthManager
 from core import events # イベント名をインポート
-from atproto_client.models.app.bsky.actor.defs import ProfileViewDetailed # 型ヒント用
+from core.startup_timer import StartupTimer
+from core.post_model import post_from_cache
+from utils.async_utils import run_async
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -54,6 +56,35 @@ class MainFrame(wx.Frame):
         # タイムラインビューを設定マネージャーのオブザーバーとして登録
         # （TimelineViewのコンストラクタで自動的に登録されるため不要）
 
+        # キャッシュの容量管理（アイドル時に上限を超えた分を削除）
+        from core.cache_eviction import CacheEvictor
+        self.cache_evictor = CacheEvictor(
+            self.client.data_store,
+            lambda: self.settings_manager.get('advanced.cache_budgets', {})
+        )
+        self.cache_evictor.start()
+        
+        # ログファイルの整理（以前の起動のログを圧縮し、上限を超えた古いものを削除）
+        from config.logging_config import current_log_file
+        from core.log_retention import LogRetention
+        self.log_retention = None
+        log_file = current_log_file()
+        if log_file:
+            self.log_retention = LogRetention(
+                log_file,
+                lambda: self.settings_manager.get('advanced.log_retention', {})
+            )
+            self.log_retention.start()
+        
+        # アクセストークンの事前更新（ログイン中のみ動かす）
+        from core.auth.token_refresher import TokenRefresher
+        self.token_refresher = TokenRefresher(self.client, on_auth_failure=self._on_token_refresh_failure)
+        
+        # メモリの監視（環境変数SSKY_MEMORY_MONITORで有効にした場合のみ）
+        from core.memory_monitor import monitor_interval_from_env
+        self.memory_monitor = None
+        memory_monitor_interval = monitor_interval_from_env()
+        
         # 認証サービス
         self.auth_service = AuthService(self.client, self.auth_manager)
         # ポストハンドラ (AuthService から client を取得するように変更も検討可能)
@@ -65,11 +96,17 @@ class MainFrame(wx.Frame):
         # PubSubイベントの購読設定
         self._subscribe_auth_events()
 
+        # メモリの監視はタイムラインビューの作成後に開始する（投稿数を記録するため）
+        if memory_monitor_interval:
+            self._start_memory_monitor(memory_monitor_interval)
+
         # 中央に配置
         self.Centre()
 
         # 保存されたセッションを読み込んでログイン試行 (UI更新はイベント経由)
-        self.auth_service.load_and_login()
+        # ウィンドウを先に表示するため、イベントループの開始後に行う
+        self._restoring_session = False
+        wx.CallAfter(self._start_session_restore)
 
         # 設定に基づいて自動取得を設定
         self.apply_timeline_settings()
@@ -121,10 +158,14 @@ class MainFrame(wx.Frame):
         delete_item = post_menu.Append(wx.ID_ANY, "投稿を削除(&D)\tDel", "投稿を削除する")
         post_menu.AppendSeparator()  # 区切り線
         profile_item = post_menu.Append(wx.ID_ANY, "投稿者のプロフィールを表示(&P)\tCtrl+P", "投稿者のプロフィールを表示")
+        thread_item = post_menu.Append(wx.ID_ANY, "スレッドを表示(&H)\tCtrl+T", "投稿を含む会話をツリーで表示")
+        post_menu.AppendSeparator()  # 区切り線
+        search_item = post_menu.Append(wx.ID_ANY, "保存済みの投稿を検索(&F)\tCtrl+F", "表示したことのある投稿をオフラインで検索")
         
         # 設定メニュー
         settings_menu = wx.Menu()
         settings_item = settings_menu.Append(wx.ID_ANY, "設定(&S)", "アプリケーション設定")
+        diagnostics_item = settings_menu.Append(wx.ID_ANY, "診断情報(&D)", "API呼び出しの回数と応答時間を表示")
         
         # ユーザー操作メニュー
         user_menu = wx.Menu()
@@ -156,12 +197,34 @@ class MainFrame(wx.Frame):
         self.Bind(wx.EVT_MENU, self.on_open_url, open_url_item)
         self.Bind(wx.EVT_MENU, self.post_handlers.on_delete, delete_item)
         self.Bind(wx.EVT_MENU, self.post_handlers.on_profile, profile_item)
+        self.Bind(wx.EVT_MENU, self.post_handlers.on_show_thread, thread_item)
+        self.Bind(wx.EVT_MENU, self.post_handlers.on_search, search_item)
         self.Bind(wx.EVT_MENU, self.on_settings, settings_item)
+        self.Bind(wx.EVT_MENU, self.on_diagnostics, diagnostics_item)
         self.Bind(wx.EVT_MENU, self.on_following_list, following_item)
         self.Bind(wx.EVT_MENU, self.on_followers_list, followers_item)
         self.Bind(wx.EVT_MENU, self.on_muted_users_list, muted_users_item)
         self.Bind(wx.EVT_MENU, self.on_blocked_users_list, blocked_users_item)
 
+    def _start_memory_monitor(self, interval):
+        """メモリの監視を開始する
+        
+        Args:
+            interval (int): 記録する間隔（秒）
+        """
+        from core.memory_monitor import MemoryMonitor, count_pubsub_listeners, count_instances
+        
+        self.memory_monitor = MemoryMonitor(interval)
+        self.memory_monitor.add_counter('pubsub_listeners', lambda: count_pubsub_listeners(pub))
+        # 閉じた後も参照が残っているダイアログやハンドラは、ここで数が増え続ける
+        self.memory_monitor.add_counter('live_objects', lambda: count_instances({
+            'dialogs': wx.Dialog,
+            'post_handlers': PostHandlers,
+            'clients': BlueskyClient,
+        }))
+        self.memory_monitor.add_counter('timeline_posts', lambda: len(self.timeline.posts))
+        self.memory_monitor.start()
+        
     # --- PubSub Event Handlers ---
 
     def _subscribe_auth_events(self):
@@ -178,9 +241,13 @@ class MainFrame(wx.Frame):
         # pub.subscribe(self._on_session_deleted, events.AUTH_SESSION_DELETED)
         logger.debug("Subscribed to authentication events.")
 
-    def _on_login_success(self, profile: ProfileViewDetailed):
+    def _on_login_success(self, profile):
         """ログイン成功イベントハンドラ"""
         logger.info(f"Login successful event received for: {profile.handle}")
+        self.token_refresher.start()
+        # 送信待ちキュー（前回起動時の未送信分を含む）の送信を開始
+        from gui.handlers.async_post_handler import AsyncPostHandler
+        AsyncPostHandler.start_outbox(self.client)
         self.SetTitle(f"SSky - [{profile.handle}]")
         self.statusbar.SetStatusText(f"{profile.handle}としてログインしました")
         self.update_login_status(True)
@@ -194,24 +261,88 @@ class MainFrame(wx.Frame):
             self.timeline.fetch_timeline(self.client) # client を渡す
             self.statusbar.SetStatusText(f"{profile.handle}としてログインしました")
 
-    def _on_session_load_success(self, profile: ProfileViewDetailed):
+    def _on_session_load_success(self, profile):
         """セッションからのログイン成功イベントハンドラ"""
         logger.info(f"Session load successful event received for: {profile.handle}")
+        self.token_refresher.start()
+        # 送信待ちキュー（前回起動時の未送信分を含む）の送信を開始
+        from gui.handlers.async_post_handler import AsyncPostHandler
+        AsyncPostHandler.start_outbox(self.client)
         self.SetTitle(f"SSky - [{profile.handle}]")
         self.statusbar.SetStatusText(f"{profile.handle}としてログインしました")
         self.update_login_status(True)
         # タイムラインビューも更新
         if hasattr(self.timeline, 'update_login_status'):
             self.timeline.update_login_status(True)
-        # タイムラインを取得
+        # タイムラインをバックグラウンドで取得し、届いたら表示中（保存済み）の投稿にマージ
+        self._restoring_session = False
         self.statusbar.SetStatusText("タイムラインを更新しています...")
-        if hasattr(self.timeline, 'fetch_timeline'):
-            self.timeline.fetch_timeline(self.client)
-            self.statusbar.SetStatusText(f"{profile.handle}としてログインしました")
+
+        def _on_timeline_fetched():
+            if self:
+                self.statusbar.SetStatusText(f"{profile.handle}としてログインしました")
+                self._finish_startup('session')
+
+        self.timeline.fetch_timeline_async(self.client, _on_timeline_fetched)
+
+    def _start_session_restore(self):
+        """起動時のセッションの復元と、保存済みのタイムラインの表示を並行して開始する
+
+        セッションの復号化とログイン（ネットワーク通信）の完了を待たずに、前回保存したタイムラインを表示する。
+        ログインに成功すると、ネットワークから取得したタイムラインを表示中の投稿にマージする。
+        """
+        self._restoring_session = True
+        self.statusbar.SetStatusText("セッションを確認しています...")
+        self.auth_service.load_and_login_async()
+        run_async(self._load_cached_timeline, self._on_cached_timeline_loaded)
+
+    def _load_cached_timeline(self):
+        """前回ログインしていたユーザーの保存済みのタイムラインを読み込む（ワーカースレッドで実行）
+
+        Returns:
+            list: 投稿データのリスト（古い順）
+        """
+        user_did, _ = self.auth_manager.data_store.get_latest_session()
+        if not user_did:
+            return []
+        with StartupTimer().phase('cached_timeline'):
+            rows = self.client.data_store.load_timeline_posts(user_did, 'home', self.timeline.fetch_count)
+            return [post_from_cache(row, user_did) for row in rows]
+
+    def _on_cached_timeline_loaded(self, posts):
+        """保存済みのタイムラインを表示する
+
+        Args:
+            posts (list): 投稿データのリスト
+        """
+        # セッションが無効だった場合（未ログイン状態に戻った後）は表示しない
+        if not self or not (self._restoring_session or self.client.is_logged_in):
+            return
+        if self.timeline.show_cached_posts(posts):
+            StartupTimer().mark('cached_timeline_shown')
+            if self._restoring_session:
+                self.statusbar.SetStatusText("保存済みのタイムラインを表示しています。セッションを確認しています...")
+
+    def _finish_startup(self, outcome):
+        """起動時間の計測を終了し、要約をログに出力して履歴に保存する（起動時の1回のみ）
+
+        Args:
+            outcome (str): 起動の結果
+        """
+        app = wx.GetApp()
+        app_version = app.config.get('version') if hasattr(app, 'config') else None
+        StartupTimer().finish(self.client.data_store, app_version, outcome)
 
     def _on_logout_success(self):
         """ログアウト成功イベントハンドラ"""
         logger.info("Logout successful event received.")
+        self.token_refresher.stop()
+        # 送信待ちキューの送信を停止（未送信分は次回ログイン時に送信）
+        from gui.handlers.async_post_handler import AsyncPostHandler
+        AsyncPostHandler.stop_outbox()
+        # 別アカウントのスレッドを表示しないようキャッシュを破棄
+        from core.thread_cache import ThreadCache
+        ThreadCache().clear()
         self.SetTitle("SSky")
         self.statusbar.SetStatusText("ログアウトしました")
         self.update_login_status(False)
@@ -243,6 +374,8 @@ class MainFrame(wx.Frame):
     def _on_session_load_failure(self, error: Exception | None, needs_relogin: bool):
         """セッション読み込み失敗イベントハンドラ"""
         logger.warning(f"Session load failure event received: error={error}, needs_relogin={needs_relogin}")
+        self._restoring_session = False
+        self._finish_startup('session_failed' if needs_relogin else 'no_session')
         if needs_relogin:
             self.statusbar.SetStatusText("セッションが無効か、読み込みに失敗しました。再ログインが必要です。")
         else:
@@ -257,9 +390,15 @@ class MainFrame(wx.Frame):
         if error:
              wx.MessageBox(f"セッションの読み込みに失敗しました: {error}", "セッションエラー", wx.OK | wx.ICON_WARNING, parent=self)
 
+    def _on_token_refresh_failure(self, error, did):
+        """アクセストークンの更新で再ログインが必要になった場合の処理（監視用スレッドから呼び出される）"""
+        # 他の認証エラーと同じく、セッション無効イベントで再ログインを求める
+        wx.CallAfter(pub.sendMessage, events.AUTH_SESSION_INVALID, error=error, did=did)
+
     def _on_session_invalid(self, error: Exception, did: str):
         """セッション無効イベントハンドラ"""
         logger.error(f"Session invalid event received for DID {did}: {error}")
+        self.token_refresher.stop()
         self.statusbar.SetStatusText("セッションが無効になりました。再ログインしてください。")
         self.update_login_status(False)
         # タイムラインビューも更新
@@ -308,6 +447,37 @@ class MainFrame(wx.Frame):
         # セッション保存は AuthService の _handle_session_change で自動的に行われるため、
         # ここでの明示的な保存は不要（重複や競合の可能性がある）
         logger.debug("MainFrame OnClose called.")
+        
+        # 送信待ちキューの送信を停止（未送信分は次回起動時に送信）
+        from gui.handlers.async_post_handler import AsyncPostHandler
+        AsyncPostHandler.stop_outbox()
+        
+        # 画像処理用のワーカープロセスを終了
+        from core.image_preparer import ImagePreparer
+        ImagePreparer().shutdown()
+        
+        # キャッシュとログファイルの整理、アクセストークンの事前更新を停止
+        self.cache_evictor.stop()
+        if self.log_retention:
+            self.log_retention.stop()
+        self.token_refresher.stop()
+        
+        # メモリの監視を停止（最後の状態をログに残す）
+        if self.memory_monitor:
+            self.memory_monitor.sample()
+            logger.info(self.memory_monitor.report())
+            self.memory_monitor.stop()
+        
+        # 保存待ちのセッション情報を書き込む
+        from core.auth.session_persistence import SessionPersistence
+        SessionPersistence().flush()
+        
+        # 遅延書き込み中のキャッシュを書き込んでから、データベース接続を閉じる
+        # （WALの内容もデータベースファイルに反映される）
+        if self.client:
+            self.client.data_store.close()
+        self.auth_manager.data_store.close()
+        
         # イベントを処理（ウィンドウを閉じる）
         event.Skip() # これによりデフォルトのクローズ処理が実行される
         
@@ -331,6 +501,18 @@ class MainFrame(wx.Frame):
         
         dialog.Destroy()
         
+    def on_diagnostics(self, event):
+        """診断情報ダイアログを表示
+        
+        Args:
+            event: メニューイベント
+        """
+        from gui.dialogs.diagnostics_dialog import DiagnosticsDialog
+        
+        dialog = DiagnosticsDialog(self)
+        dialog.ShowModal()
+        dialog.Destroy()
+        
     # イベントハンドラのプロキシメソッド
     def on_like(self, event):
         """いいねアクション（プロキシ）
@@ -372,6 +554,14 @@ class MainFrame(wx.Frame):
         """
         self.post_handlers.on_profile(event)
         
+    def on_show_thread(self, event):
+        """スレッド表示アクション（プロキシ）
+        
+        Args:
+            event: メニューイベント
+        """
+        self.post_handlers.on_show_thread(event)
+        
     def on_delete(self, event):
         """投稿削除アクション（プロキシ）
         
@@ -426,10 +616,21 @@ class MainFrame(wx.Frame):
             if self.client and hasattr(self.client, 'profile') and self.client.profile:
                 self.auth_service.perform_logout()
             
+            # 送信待ちキューを止めてから、開いている接続を閉じる（Windowsではファイルがロックされるため）
+            from gui.handlers.async_post_handler import AsyncPostHandler
+            AsyncPostHandler.stop_outbox()
+            self.auth_manager.data_store.close()
+            if self.client:
+                self.client.data_store.close()
+            
             # データベースファイルを削除
             try:
                 if os.path.exists(db_path):
                     os.remove(db_path)
+                    # WALモードの補助ファイルも削除
+                    for suffix in ('-wal', '-shm'):
+                        if os.path.exists(db_path + suffix):
+                            os.remove(db_path + suffix)
                     logger.info(f"データベースファイルを削除しました: {db_path}")
                     
                     # 成功メッセージを表示
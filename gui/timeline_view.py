@@ -10,8 +10,10 @@ import wx
 import wx.lib.mixins.listctrl as listmix
 import logging
 import time
-from utils.time_format import format_relative_time
-from gui.dialogs.post_detail_dialog import PostDetailDialog
+from core.post_model import format_post_content
+from core.timeline_model import fetch_timeline_posts, merge_timeline_posts, refresh_relative_times
+from core.log_events import log_event, OUTCOME_OK
+from utils.async_utils import run_async
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -105,7 +107,7 @@ class TimelineView(wx.Panel):
         Args:
             event: タイマーイベント
         """
-        logger.debug(f"自動取得タイマー発火: {time.strftime('%H:%M:%S')}")
+        logger.debug("自動取得タイマー発火")
         self.fetch_timeline()
     
     def on_time_update_timer(self, event):
@@ -114,7 +116,7 @@ class TimelineView(wx.Panel):
         Args:
             event: タイマーイベント
         """
-        logger.debug(f"時間表示更新タイマー発火: {time.strftime('%H:%M:%S')}")
+        logger.debug("時間表示更新タイマー発火")
         self.update_post_times()
     
     def update_post_times(self):
@@ -122,19 +124,12 @@ class TimelineView(wx.Panel):
         if not self.list_ctrl.posts:
             return
             
-        # 投稿の時間表示を更新
-        updated = False
-        for i, post in enumerate(self.list_ctrl.posts):
-            # raw_timestampから相対時間を再計算
-            new_time = format_relative_time(post['raw_timestamp'])
-            
-            # 表示が変わった場合のみ更新
-            if new_time != post['time']:
-                post['time'] = new_time
-                self.list_ctrl.SetItem(i, 2, new_time)
-                updated = True
+        # raw_timestampから相対時間を再計算し、表示が変わった投稿だけ更新
+        changed = refresh_relative_times(self.list_ctrl.posts)
+        for i in changed:
+            self.list_ctrl.SetItem(i, 2, self.list_ctrl.posts[i]['time'])
                 
-        if updated:
+        if changed:
             logger.debug("投稿の時間表示を更新しました")
         
     def on_fetch_button(self, event):
@@ -205,10 +200,78 @@ class TimelineView(wx.Panel):
             client (BlueskyClient, optional): Blueskyクライアント
             selected_uri (str, optional): 選択する投稿のURI
         """
-        # 現在選択されている投稿のURIを記憶（引数で指定されていない場合）
-        if selected_uri is None:
-            selected_uri = self.list_ctrl.get_selected_post_uri()
+        client = self._resolve_client(client)
+        if client is None:
+            return
+            
+        try:
+            new_posts_dict = self._fetch_posts(client)
+            self._merge_posts(new_posts_dict, selected_uri)
+        except Exception as e:
+            self._handle_fetch_error(e)
+            
+    def fetch_timeline_async(self, client=None, on_done=None):
+        """タイムラインをバックグラウンドで取得し、届いた時点で表示中の投稿にマージする
+        
+        取得中も画面を操作できる（起動時に保存済みのタイムラインを表示したまま取得する場合など）。
+        
+        Args:
+            client (BlueskyClient, optional): Blueskyクライアント
+            on_done (callable, optional): 取得が終わったとき（失敗した場合も）に呼び出す関数
+        """
+        client = self._resolve_client(client)
+        if client is None:
+            if on_done:
+                on_done()
+            return
+            
+        def _on_success(new_posts_dict):
+            # 取得中にウィンドウが閉じられた場合やログアウトした場合は何もしない
+            if self and client.is_logged_in:
+                # 選択位置は、取得中にユーザーが移動した場合も考えてマージの直前に取得する
+                self._merge_posts(new_posts_dict)
+            if on_done:
+                on_done()
+                
+        def _on_error(error):
+            if self:
+                self._handle_fetch_error(error)
+            if on_done:
+                on_done()
+                
+        run_async(self._fetch_posts, _on_success, _on_error, client)
+        
+    def show_cached_posts(self, posts):
+        """保存済みのタイムラインを表示する（起動時、セッションの確認やネットワークからの取得を待たずに表示する）
+        
+        既にネットワークから取得した投稿を表示している場合は何もしない。
+        
+        Args:
+            posts (list): 投稿データのリスト（core.post_model.post_from_cacheの形式）
+            
+        Returns:
+            bool: 表示した場合はTrue
+        """
+        if not self or not posts or self.list_ctrl.posts:
+            return False
+            
+        # ネットワークから取得した投稿が届いたら、カウントに変更がなくても置き換える（facetsなどを含むため）
+        for post in posts:
+            post['from_cache'] = True
+        self._merge_posts({post['uri']: post for post in posts if post.get('uri')})
+        self.title_label.SetLabel("ホームタイムライン（保存済み）")
+        logger.info("保存済みのタイムラインを表示しました: %d件", len(posts))
+        return True
+        
+    def _resolve_client(self, client):
+        """タイムラインの取得に使うクライアントを取得する
+        
+        Args:
+            client (BlueskyClient, optional): Blueskyクライアント。省略した場合は親フレームから取得
             
+        Returns:
+            BlueskyClient: ログイン済みのクライアント。ログインしていない場合はNone
+        """
         # クライアントが渡されなかった場合は親フレームから取得
         if not client:
             frame = wx.GetTopLevelParent(self)
@@ -219,257 +282,92 @@ class TimelineView(wx.Panel):
         if not client or not client.is_logged_in:
             logger.warning("タイムラインの取得に失敗しました: クライアントが設定されていません")
             self.show_not_logged_in_message()
-            return
-            
-        try:
-            # タイムラインの取得
-            logger.info(f"タイムラインを取得しています... (最大{self.fetch_count}件)")
-            timeline_data = client.get_timeline(limit=self.fetch_count)
-            
-            # 新しく取得した投稿のURIセットを作成（高速検索用）
-            new_post_uris = set()
-            new_posts_dict = {}  # 一時的な辞書（URIをキー）
-            
-            # 取得した投稿を処理
-            for post in timeline_data.feed:
-                # 投稿データを適切な形式に変換
-                post_data = {
-                    'username': post.post.author.display_name or post.post.author.handle,
-                    'handle': f"@{post.post.author.handle}",
-                    'author_handle': post.post.author.handle,  # 投稿者のハンドル（@なし）
-                    'content': post.post.record.text,
-                    'time': format_relative_time(post.post.indexed_at),  # 表示用の文字列
-                    'raw_timestamp': post.post.indexed_at,  # ソート用のオリジナルタイムスタンプ
-                    'likes': getattr(post.post, 'like_count', 0),
-                    'replies': getattr(post.post, 'reply_count', 0),
-                    'reposts': getattr(post.post, 'repost_count', 0),
-                    'uri': getattr(post.post, 'uri', None),  # 投稿のURI（削除に必要）
-                    'cid': getattr(post.post, 'cid', None),  # 投稿のCID（削除に必要）
-                    'is_own_post': post.post.author.handle == client.profile.handle,  # 自分の投稿かどうか
-                    # スレッド情報を追加
-                    'reply_parent': None,
-                    'reply_root': None,
-                    # facets情報を追加（URLなどの特殊要素の情報）
-                    'facets': getattr(post.post.record, 'facets', None),
-                    # 引用ポスト情報を初期化
-                    'quote_of': None,
-                    'is_quote_post': False
-                }
-                
-                # embedフィールドの確認（引用ポストかどうか）
-                from atproto import models
-                if hasattr(post.post, 'embed'):
-                    embed = post.post.embed
-                    
-                    # 引用ポストの場合
-                    if isinstance(embed, models.AppBskyEmbedRecord.View):
-                        logger.debug(f"引用ポストを検出: {post.post.uri}")
-                        
-                        # 引用元レコードの情報を取得
-                        if hasattr(embed, 'record'):
-                            quoted_record = embed.record
-                            
-                            # ViewRecordの場合（通常のケース）
-                            if isinstance(quoted_record, models.AppBskyEmbedRecord.ViewRecord):
-                                quoted_author = quoted_record.author
-                                quoted_text = getattr(quoted_record.value, 'text', '[引用元テキストなし]')
-                                
-                                # 引用元情報を設定
-                                post_data['is_quote_post'] = True
-                                post_data['quote_of'] = {
-                                    'username': quoted_author.display_name or quoted_author.handle,
-                                    'handle': f"@{quoted_author.handle}",
-                                    'content': quoted_text,
-                                    'uri': getattr(quoted_record, 'uri', None),
-                                    'cid': getattr(quoted_record, 'cid', None),
-                                    'like_count': getattr(quoted_record, 'like_count', 0),
-                                    'repost_count': getattr(quoted_record, 'repost_count', 0)
-                                }
-                                logger.debug(f"引用元情報: {quoted_author.handle} - {quoted_text[:30]}...")
-                            
-                            # 引用元が見つからない場合
-                            elif isinstance(quoted_record, models.AppBskyEmbedRecord.ViewNotFound):
-                                post_data['is_quote_post'] = True
-                                post_data['quote_of'] = {
-                                    'username': '不明',
-                                    'handle': '@unknown',
-                                    'content': '[引用元投稿が見つかりません]',
-                                    'uri': None,
-                                    'cid': None
-                                }
-                                logger.debug("引用元投稿が見つかりません")
-                            
-                            # 引用元がブロックされている場合
-                            elif isinstance(quoted_record, models.AppBskyEmbedRecord.ViewBlocked):
-                                post_data['is_quote_post'] = True
-                                post_data['quote_of'] = {
-                                    'username': 'ブロック',
-                                    'handle': '@blocked',
-                                    'content': '[引用元投稿はブロックされています]',
-                                    'uri': None,
-                                    'cid': None
-                                }
-                                logger.debug("引用元投稿はブロックされています")
-                    
-                    # 引用ポスト + メディアの場合
-                    elif isinstance(embed, models.AppBskyEmbedRecordWithMedia.View):
-                        logger.debug(f"引用ポスト + メディアを検出: {post.post.uri}")
-                        
-                        # 引用元レコードの情報を取得
-                        if hasattr(embed, 'record') and hasattr(embed.record, 'record'):
-                            quoted_record = embed.record.record
-                            
-                            # ViewRecordの場合（通常のケース）
-                            if isinstance(quoted_record, models.AppBskyEmbedRecord.ViewRecord):
-                                quoted_author = quoted_record.author
-                                quoted_text = getattr(quoted_record.value, 'text', '[引用元テキストなし]')
-                                
-                                # 引用元情報を設定
-                                post_data['is_quote_post'] = True
-                                post_data['quote_of'] = {
-                                    'username': quoted_author.display_name or quoted_author.handle,
-                                    'handle': f"@{quoted_author.handle}",
-                                    'content': quoted_text,
-                                    'uri': getattr(quoted_record, 'uri', None),
-                                    'cid': getattr(quoted_record, 'cid', None),
-                                    'like_count': getattr(quoted_record, 'like_count', 0),
-                                    'repost_count': getattr(quoted_record, 'repost_count', 0)
-                                }
-                                logger.debug(f"引用元情報 (メディア付き): {quoted_author.handle} - {quoted_text[:30]}...")
-                
-                # スレッド情報を取得（返信の場合）
-                if hasattr(post.post.record, 'reply') and post.post.record.reply:
-                    logger.debug(f"返信投稿を検出: {post.post.uri}")
-                    
-                    # 親投稿の情報
-                    if hasattr(post.post.record.reply, 'parent'):
-                        parent_uri = getattr(post.post.record.reply.parent, 'uri', None)
-                        parent_cid = getattr(post.post.record.reply.parent, 'cid', None)
-                        
-                        if parent_uri and parent_cid:
-                            post_data['reply_parent'] = {
-                                'uri': parent_uri,
-                                'cid': parent_cid
-                            }
-                            logger.debug(f"親投稿情報: {parent_uri}")
-                    
-                    # ルート投稿の情報
-                    if hasattr(post.post.record.reply, 'root'):
-                        root_uri = getattr(post.post.record.reply.root, 'uri', None)
-                        root_cid = getattr(post.post.record.reply.root, 'cid', None)
-                        
-                        if root_uri and root_cid:
-                            post_data['reply_root'] = {
-                                'uri': root_uri,
-                                'cid': root_cid
-                            }
-                            logger.debug(f"ルート投稿情報: {root_uri}")
-                
-                uri = post_data['uri']
-                if uri:
-                    new_post_uris.add(uri)
-                    new_posts_dict[uri] = post_data
-            
-            # 既存の投稿URIセットとマッピングを作成
-            existing_post_uris = set()
-            uri_to_index = {}  # URIからリストのインデックスへのマッピング
-            
-            for i, post in enumerate(self.list_ctrl.posts):
-                if 'uri' in post and post['uri']:
-                    uri = post['uri']
-                    existing_post_uris.add(uri)
-                    uri_to_index[uri] = i
-            
-            # 1. 新しく追加された投稿を特定
-            added_uris = new_post_uris - existing_post_uris
-            
-            # 2. 更新された投稿を特定（両方のセットに存在するURI）
-            updated_uris = new_post_uris.intersection(existing_post_uris)
-            updated_count = 0
-            
-            # テンポラリの投稿リストを作成（既存の投稿をコピー）
-            temp_posts = self.list_ctrl.posts.copy()
-            
-            # 既存の投稿を更新（インデックスマッピングを使用して高速化）
-            for uri in updated_uris:
-                if uri in uri_to_index:
-                    index = uri_to_index[uri]
-                    # 実際に変更があるかチェック（いいね数、リポスト数、返信数）
-                    old_post = temp_posts[index]
-                    new_post = new_posts_dict[uri]
-                    
-                    if (old_post['likes'] != new_post['likes'] or 
-                        old_post['reposts'] != new_post['reposts'] or 
-                        old_post['replies'] != new_post['replies']):
-                        # 投稿を更新
-                        temp_posts[index] = new_post
-                        updated_count += 1
-            
-            # 新しい投稿を追加
-            for uri in added_uris:
-                temp_posts.append(new_posts_dict[uri])
-            
-            # 投稿を日時でソート（古い順）
-            temp_posts.sort(key=lambda x: x['raw_timestamp'])
-            
-            # 投稿数を制限（オプション）
-            max_posts = 1000  # 保持する最大投稿数
-            if len(temp_posts) > max_posts:
-                # 新しい投稿を優先して保持（古い投稿を削除）
-                temp_posts = temp_posts[len(temp_posts) - max_posts:]
-                logger.debug(f"古い投稿を削除しました。残り{len(temp_posts)}件")
-            
-            # リストビューをクリア
-            self.list_ctrl.DeleteAllItems()
-            
-            # 投稿データを更新
-            self.list_ctrl.posts = temp_posts
-            self.list_ctrl.post_count = len(temp_posts)
-            
-            # リストビューに投稿を追加
-            for i, post in enumerate(temp_posts):
-                index = self.list_ctrl.InsertItem(i, post['username'])
-                
-                # 引用ポストの場合は引用元情報も表示
-                if post.get('is_quote_post', False) and post.get('quote_of'):
-                    quote_info = post['quote_of']
-                    display_content = f"{post['content']}\n\n【引用】{quote_info['handle']} - {quote_info['content']}"
-                else:
-                    display_content = post['content']
-                
-                self.list_ctrl.SetItem(index, 1, display_content)
-                self.list_ctrl.SetItem(index, 2, post['time'])
-                self.list_ctrl.SetItemData(index, i)
-            
-            # 以前選択していた投稿と同じURIを持つ投稿を選択
-            if selected_uri:
-                self.list_ctrl.select_post_by_uri(selected_uri)
+            return None
+        return client
+        
+    def _fetch_posts(self, client):
+        """タイムラインを取得して投稿データに変換し、キャッシュへの書き込みキューに追加する
+        
+        画面は操作しないため、ワーカースレッドから呼び出せる。
+        
+        Args:
+            client (BlueskyClient): Blueskyクライアント
             
-            logger.info(f"タイムラインを更新しました: 新規={len(added_uris)}件, 更新={updated_count}件, 合計={len(temp_posts)}件")
+        Returns:
+            dict: URI -> 投稿データ
+        """
+        return fetch_timeline_posts(client, self.fetch_count)
+        
+    def _merge_posts(self, new_posts_dict, selected_uri=None):
+        """取得した投稿を表示中の投稿にマージして表示する（既存の投稿は保持し、変更があったものだけ更新）
+        
+        Args:
+            new_posts_dict (dict): URI -> 投稿データ
+            selected_uri (str, optional): 選択する投稿のURI。省略した場合は現在選択している投稿
+        """
+        start = time.perf_counter()
+        
+        # 現在選択されている投稿のURIを記憶（引数で指定されていない場合）
+        if selected_uri is None:
+            selected_uri = self.list_ctrl.get_selected_post_uri()
             
-            # 再描画を強制
-            wx.CallAfter(self.list_ctrl.Refresh)
+        # 既存の投稿とマージして並べ替え、件数を制限
+        temp_posts, added_count, updated_count = merge_timeline_posts(self.list_ctrl.posts, new_posts_dict)
+        
+        # リストビューをクリア
+        self.list_ctrl.DeleteAllItems()
+        self.title_label.SetLabel("ホームタイムライン")
+        
+        # 投稿データを更新
+        self.list_ctrl.posts = temp_posts
+        self.list_ctrl.post_count = len(temp_posts)
+        
+        # リストビューに投稿を追加
+        for i, post in enumerate(temp_posts):
+            index = self.list_ctrl.InsertItem(i, post['author'].username)
             
-        except Exception as e:
-            # 認証エラーの場合は特別な処理
-            from core.client import AuthenticationError
-            if isinstance(e, AuthenticationError):
-                logger.error(f"認証エラー: {str(e)}")
-                wx.MessageBox(
-                    "セッションが無効になりました。再ログインが必要です。",
-                    "認証エラー",
-                    wx.OK | wx.ICON_ERROR
-                )
-                # 認証エラーが発生した場合、UIを未ログイン状態に更新する
-                # 再ログインはユーザーがメニューから行う
-                self.show_not_logged_in_message()
-                # 必要であれば、PubSubでイベントを発行してMainFrameに通知することも可能
-                # from pubsub import pub
-                # from core import events
-                # pub.sendMessage(events.AUTH_SESSION_INVALID, error=e, did=getattr(client, 'user_did', None))
-            else:
-                logger.error(f"タイムラインの取得に失敗しました: {str(e)}", exc_info=True)
-    
+            # 引用ポストの場合は引用元情報も表示
+            self.list_ctrl.SetItem(index, 1, format_post_content(post))
+            self.list_ctrl.SetItem(index, 2, post['time'])
+            self.list_ctrl.SetItemData(index, i)
+        
+        # 以前選択していた投稿と同じURIを持つ投稿を選択
+        if selected_uri:
+            self.list_ctrl.select_post_by_uri(selected_uri)
+        
+        logger.info("タイムラインを更新しました: 新規=%d件, 更新=%d件, 合計=%d件", added_count, updated_count, len(temp_posts))
+        log_event(logger, 'timeline_merge', endpoint='home', duration_ms=(time.perf_counter() - start) * 1000,
+                  count=len(new_posts_dict), added=added_count, updated=updated_count, total=len(temp_posts),
+                  outcome=OUTCOME_OK)
+        
+        # 再描画を強制
+        wx.CallAfter(self.list_ctrl.Refresh)
+        
+    def _handle_fetch_error(self, e):
+        """タイムラインの取得に失敗した場合の処理
+        
+        Args:
+            e (Exception): 発生したエラー
+        """
+        # 認証エラーの場合は特別な処理
+        from core.client import AuthenticationError
+        if isinstance(e, AuthenticationError):
+            logger.error(f"認証エラー: {str(e)}")
+            wx.MessageBox(
+                "セッションが無効になりました。再ログインが必要です。",
+                "認証エラー",
+                wx.OK | wx.ICON_ERROR
+            )
+            # 認証エラーが発生した場合、UIを未ログイン状態に更新する
+            # 再ログインはユーザーがメニューから行う
+            self.show_not_logged_in_message()
+            # 必要であれば、PubSubでイベントを発行してMainFrameに通知することも可能
+            # from pubsub import pub
+            # from core import events
+            # pub.sendMessage(events.AUTH_SESSION_INVALID, error=e, did=getattr(client, 'user_did', None))
+        else:
+            logger.error(f"タイムラインの取得に失敗しました: {str(e)}", exc_info=True)
+
     def on_open_url(self, event):
         """URLを開くアクション
         
@@ -584,19 +482,13 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         # 投稿データをリストに追加
         for i, post in enumerate(self.posts):
             # ユーザー名のみを表示
-            user_text = post['username']
+            user_text = post['author'].username
             
             # リストに追加
             index = self.InsertItem(i, user_text)
             
             # 引用ポストの場合は引用元情報も表示
-            if post.get('is_quote_post', False) and post.get('quote_of'):
-                quote_info = post['quote_of']
-                display_content = f"{post['content']}\n\n【引用】{quote_info['handle']} - {quote_info['content']}"
-            else:
-                display_content = post['content']
-                
-            self.SetItem(index, 1, display_content)
+            self.SetItem(index, 1, format_post_content(post))
             self.SetItem(index, 2, post['time'])
             
             # データを関連付け
@@ -645,6 +537,7 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         post = self.posts[index]
         
         # 投稿の詳細表示（例：ダイアログ表示）
+        from gui.dialogs.post_detail_dialog import PostDetailDialog
         dlg = PostDetailDialog(self, post)
         dlg.ShowModal()
         dlg.Destroy()
@@ -700,6 +593,9 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
             elif key_code == ord('E'):  # Ctrl+E
                 self.on_open_url(event)
                 return
+            elif key_code == ord('T'):  # Ctrl+T
+                self.on_show_thread(event)
+                return
         
         # Delキーで投稿削除
         if key_code == wx.WXK_DELETE:
@@ -754,6 +650,7 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         quote_item = menu.Append(wx.ID_ANY, "引用(&Q)\tCtrl+Q")
         profile_item = menu.Append(wx.ID_ANY, "投稿者のプロフィールを表示(&P)\tCtrl+P")
         open_url_item = menu.Append(wx.ID_ANY, "URLを開く(&E)\tCtrl+E")
+        thread_item = menu.Append(wx.ID_ANY, "スレッドを表示(&H)\tCtrl+T")
         menu.AppendSeparator()  # 区切り線
         delete_item = menu.Append(wx.ID_ANY, "投稿を削除(&D)\tDel")
         
@@ -768,6 +665,7 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         self.Bind(wx.EVT_MENU, self.on_repost, repost_item)
         self.Bind(wx.EVT_MENU, self.on_profile, profile_item)
         self.Bind(wx.EVT_MENU, self.on_open_url, open_url_item)
+        self.Bind(wx.EVT_MENU, self.on_show_thread, thread_item)
         self.Bind(wx.EVT_MENU, self.on_delete, delete_item)
         
         # 自分の投稿はリポストできない
@@ -826,6 +724,18 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
             if hasattr(frame, 'on_repost'):
                 frame.on_repost(event)
         
+    def on_show_thread(self, event):
+        """スレッド表示アクション
+        
+        Args:
+            event: メニューイベント
+        """
+        if self.selected_index != -1:
+            # 親フレームのon_show_threadメソッドを呼び出す
+            frame = wx.GetTopLevelParent(self)
+            if hasattr(frame, 'on_show_thread'):
+                frame.on_show_thread(event)
+                
     def on_profile(self, event):
         """プロフィール表示アクション
         
@@ -839,7 +749,7 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
                 frame.on_profile(event)
             else:
                 post = self.posts[self.selected_index]
-                wx.MessageBox(f"プロフィールを表示します: {post['username']}", "プロフィール", wx.OK | wx.ICON_INFORMATION)
+                wx.MessageBox(f"プロフィールを表示します: {post['author'].username}", "プロフィール", wx.OK | wx.ICON_INFORMATION)
     
     def on_delete(self, event):
         """削除アクション
@@ -926,16 +836,16 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
             # 引用ポストの場合は引用元情報も表示
             if post_data.get('is_quote_post', False) and post_data.get('quote_of'):
                 quote_info = post_data['quote_of']
-                display_content = f"{post_data['content']}\n\n【引用】{quote_info['handle']} - {quote_info['content']}"
+                display_content = f"{post_data['content']}\n\n【引用】{quote_info['author'].handle_text} - {quote_info['content']}"
             else:
                 display_content = post_data['content']
             
             # リストビューの表示を更新
-            self.SetItem(index, 0, post_data['username'])
+            self.SetItem(index, 0, post_data['author'].username)
             self.SetItem(index, 1, display_content)
             self.SetItem(index, 2, post_data['time'])
             
-            logger.debug(f"投稿を更新しました: index={index}, uri={post_data.get('uri')}")
+            logger.debug("投稿を更新しました: index=%d, uri=%s", index, post_data.get('uri'))
             return True
         return False
     
@@ -960,20 +870,14 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
         
         # リストビューに追加
         for i, post in enumerate(new_posts, start=current_count):
-            index = self.InsertItem(i, post['username'])
+            index = self.InsertItem(i, post['author'].username)
             
             # 引用ポストの場合は引用元情報も表示
-            if post.get('is_quote_post', False) and post.get('quote_of'):
-                quote_info = post['quote_of']
-                display_content = f"{post['content']}\n\n【引用】{quote_info['handle']} - {quote_info['content']}"
-            else:
-                display_content = post['content']
-                
-            self.SetItem(index, 1, display_content)
+            self.SetItem(index, 1, format_post_content(post))
             self.SetItem(index, 2, post['time'])
             self.SetItemData(index, i)
         
-        logger.debug(f"新しい投稿を追加しました: {len(new_posts)}件")
+        logger.debug("新しい投稿を追加しました: %d件", len(new_posts))
         return len(new_posts)
     
     def select_post_by_uri(self, uri):
@@ -992,6 +896,6 @@ class TimelineListCtrl(wx.ListCtrl, listmix.ListCtrlAutoWidthMixin):
             self.selected_index = index
             # 選択した項目が表示されるようにスクロール
             self.EnsureVisible(index)
-            logger.debug(f"投稿を選択しました: index={index}, uri={uri}")
+            logger.debug("投稿を選択しました: index=%d, uri=%s", index, uri)
             return True
         return False
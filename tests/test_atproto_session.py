@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+atprotoのクライアントの非公開の機能を使う部分のテスト
+
+atprotoを更新して非公開の属性が変わった場合に気付けるよう、固定したバージョンと実際のクライアントを確認する。
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import re
+import sys
+import time
+import json
+import base64
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auth import atproto_session
+from core.auth.atproto_session import SUPPORTED_ATPROTO_VERSION, PRIVATE_ATTRIBUTES
+
+try:
+    from atproto_client import Client
+    HAS_ATPROTO = True
+except ImportError:
+    HAS_ATPROTO = False
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestAtprotoSession(unittest.TestCase):
+    """atprotoのクライアントの非公開の機能のテストクラス"""
+
+    def test_version_pinned(self):
+        """requirements.txtのatprotoのバージョンが動作を確認したバージョンと一致することのテスト"""
+        with open(os.path.join(ROOT_DIR, 'requirements.txt'), encoding='utf-8') as f:
+            match = re.search(r'^atproto==(\S+)$', f.read(), re.MULTILINE)
+        self.assertIsNotNone(match, "requirements.txtでatprotoのバージョンを固定してください")
+        self.assertEqual(match.group(1), SUPPORTED_ATPROTO_VERSION)
+
+    def test_fallback_without_private_api(self):
+        """非公開の属性がないクライアントでは何もしないことのテスト"""
+        client = MagicMock(spec=['login', 'me'])
+        self.assertFalse(atproto_session.supports_private_api(client))
+        self.assertIsNone(atproto_session.import_session(client, 'session', 'did:plc:alice', 'alice.test'))
+        client.login.assert_not_called()
+        should_refresh = MagicMock(return_value=True)
+        self.assertFalse(atproto_session.refresh_session(client, should_refresh))
+        should_refresh.assert_not_called()
+        self.assertIsNone(atproto_session.current_session(client))
+
+    @unittest.skipUnless(HAS_ATPROTO, "atprotoがインストールされていません")
+    def test_private_api_available(self):
+        """固定したバージョンのクライアントが非公開の属性を持っていることのテスト"""
+        self.assertEqual(atproto_session.installed_atproto_version(), SUPPORTED_ATPROTO_VERSION)
+        client = Client()
+        for name in PRIVATE_ATTRIBUTES:
+            self.assertTrue(hasattr(client, name), name)
+        self.assertTrue(atproto_session.supports_private_api(client))
+
+    @unittest.skipUnless(HAS_ATPROTO, "atprotoがインストールされていません")
+    def test_import_session_offline(self):
+        """通信せずにセッションを読み込み、プロフィールのモデルを設定することのテスト"""
+        from atproto_client import models
+        from atproto_client.client.session import Session
+
+        exp = int(time.time()) + 3600
+        payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode()).rstrip(b'=').decode()
+        jwt = f"eyJhbGciOiJFUzI1NksifQ.{payload}.signature"
+        session_string = Session(
+            handle='alice.test', did='did:plc:alice', access_jwt=jwt, refresh_jwt=jwt,
+            pds_endpoint='https://pds.example'
+        ).encode()
+
+        client = Client()
+        with patch.object(client, '_request') as request:  # 通信しないことを確認する
+            profile = atproto_session.import_session(client, session_string, 'did:plc:alice', 'alice.test')
+            request.assert_not_called()
+
+        self.assertIsInstance(profile, models.AppBskyActorDefs.ProfileViewDetailed)
+        self.assertIs(client.me, profile)
+        self.assertEqual((profile.did, profile.handle), ('did:plc:alice', 'alice.test'))
+        self.assertEqual(client.export_session_string(), session_string)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,8 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import shutil
+import tempfile
 
 # プロジェクトのルートディレクトリをパスに追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -28,12 +30,21 @@ class TestAuthManager(unittest.TestCase):
         # DataStoreのモックを作成
         self.mock_data_store = MagicMock(spec=DataStore)
         
-        # AuthManagerのシングルトンインスタンスを取得
-        self.auth_manager = AuthManager()
+        # AuthManagerのシングルトンインスタンスを取得（作業ツリーにデータベースを作らないよう、一時ディレクトリを使う）
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_data_store = DataStore(db_path=os.path.join(self.temp_dir, 'test_data.db'))
+        with patch('core.auth.auth_manager.DataStore', return_value=self.temp_data_store):
+            self.auth_manager = AuthManager()
         # モックのDataStoreを注入
         self.auth_manager.data_store = self.mock_data_store
     
-    @patch('core.auth.auth_manager.encrypt_data')
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        AuthManager._instance = None
+        self.temp_data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @patch('core.auth.session_persistence.encrypt_data')
     def test_save_session(self, mock_encrypt):
         """save_sessionのテスト"""
         # モックの戻り値を設定
@@ -52,7 +63,7 @@ class TestAuthManager(unittest.TestCase):
         # 結果の確認
         self.assertTrue(result)
     
-    @patch('core.auth.auth_manager.encrypt_data')
+    @patch('core.auth.session_persistence.encrypt_data')
     def test_save_session_encryption_failure(self, mock_encrypt):
         """暗号化失敗時のsave_sessionのテスト"""
         # モックの戻り値を設定
@@ -70,7 +81,7 @@ class TestAuthManager(unittest.TestCase):
         # 結果の確認
         self.assertFalse(result)
     
-    @patch('core.auth.auth_manager.decrypt_data')
+    @patch('core.auth.session_persistence.decrypt_data')
     def test_load_session(self, mock_decrypt):
         """load_sessionのテスト"""
         # モックの戻り値を設定
@@ -88,7 +99,7 @@ class TestAuthManager(unittest.TestCase):
         self.assertEqual(session_data, 'session_data')
         self.assertEqual(user_did, 'did:plc:test_user')
     
-    @patch('core.auth.auth_manager.decrypt_data')
+    @patch('core.auth.session_persistence.decrypt_data')
     def test_load_session_no_data(self, mock_decrypt):
         """セッションデータがない場合のload_sessionのテスト"""
         # モックの戻り値を設定
@@ -105,7 +116,7 @@ class TestAuthManager(unittest.TestCase):
         self.assertIsNone(session_data)
         self.assertIsNone(user_did)
     
-    @patch('core.auth.auth_manager.decrypt_data')
+    @patch('core.auth.session_persistence.decrypt_data')
     def test_load_session_decryption_failure(self, mock_decrypt):
         """復号化失敗時のload_sessionのテスト"""
         # モックの戻り値を設定
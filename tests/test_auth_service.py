@@ -40,6 +40,8 @@ class TestAuthService(unittest.TestCase):
                 client=self.mock_client,
                 auth_manager=self.mock_auth_manager
             )
+        # セッション情報の保存サービスのモック
+        self.auth_service.session_persistence = MagicMock()
     
     def test_handle_session_change_create(self):
         """セッション作成イベント処理のテスト"""
@@ -47,16 +49,15 @@ class TestAuthService(unittest.TestCase):
         mock_session = MagicMock(spec=Session)
         mock_session.did = "test_did"
         self.mock_client.export_session_string.return_value = "test_session_string"
-        self.mock_auth_manager.save_session.return_value = True
         
         # テスト実行
         with patch('gui.handlers.auth_service.pub', self.mock_pub):
             self.auth_service._handle_session_change(SessionEvent.CREATE, mock_session)
         
-        # 検証
+        # 検証（保存は保存サービスに要求し、その場では保存しない）
         self.mock_client.export_session_string.assert_called_once()
-        self.mock_auth_manager.save_session.assert_called_once_with("test_did", "test_session_string")
-        self.mock_pub.sendMessage.assert_called_once_with(events.AUTH_SESSION_SAVED, did="test_did")
+        self.auth_service.session_persistence.submit.assert_called_once_with("test_did", "test_session_string")
+        self.mock_auth_manager.save_session.assert_not_called()
     
     def test_handle_session_change_refresh(self):
         """セッション更新イベント処理のテスト"""
@@ -64,7 +65,6 @@ class TestAuthService(unittest.TestCase):
         mock_session = MagicMock(spec=Session)
         mock_session.did = "test_did"
         self.mock_client.export_session_string.return_value = "test_session_string"
-        self.mock_auth_manager.save_session.return_value = True
         
         # テスト実行
         with patch('gui.handlers.auth_service.pub', self.mock_pub):
@@ -72,7 +72,13 @@ class TestAuthService(unittest.TestCase):
         
         # 検証
         self.mock_client.export_session_string.assert_called_once()
-        self.mock_auth_manager.save_session.assert_called_once_with("test_did", "test_session_string")
+        self.auth_service.session_persistence.submit.assert_called_once_with("test_did", "test_session_string")
+    
+    def test_on_session_saved(self):
+        """セッション情報の保存完了時にイベントを発行するテスト"""
+        with patch('gui.handlers.auth_service.pub', self.mock_pub):
+            self.auth_service._on_session_saved("test_did")
+        
         self.mock_pub.sendMessage.assert_called_once_with(events.AUTH_SESSION_SAVED, did="test_did")
     
     def test_handle_session_change_import(self):
@@ -86,7 +92,7 @@ class TestAuthService(unittest.TestCase):
         
         # 検証（何も呼ばれないはず）
         self.mock_client.export_session_string.assert_not_called()
-        self.mock_auth_manager.save_session.assert_not_called()
+        self.auth_service.session_persistence.submit.assert_not_called()
         self.mock_pub.sendMessage.assert_not_called()
     
     def test_login_with_session_success(self):
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+HTTPの記録（カセット）のテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cassette import Cassette, CassetteMissError, REDACTED, REPLAY_TOKEN_EXP, decode_response_body
+from core.auth.session_token import decode_jwt_payload
+from benchmarks.fake_xrpc import FakeXrpcServer, _make_jwt
+from core.data_store import DataStore
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import atproto_client  # noqa: F401
+    HAS_ATPROTO = True
+except ImportError:
+    HAS_ATPROTO = False
+
+JSON_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+
+def json_body(value):
+    """JSONの本文を作成"""
+    return json.dumps(value).encode('utf-8')
+
+class TestCassette(unittest.TestCase):
+    """カセットのテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'cassette.json')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_redaction(self):
+        """認証情報がカセットに残らないことのテスト"""
+        access_jwt = _make_jwt({'scope': 'com.atproto.access', 'sub': 'did:plc:me', 'exp': 1})
+        cassette = Cassette(self.path)
+        cassette.record(
+            'POST', 'https://bsky.social/xrpc/com.atproto.server.createSession',
+            dict(JSON_HEADERS, Authorization='Bearer secret'), json_body({'identifier': 'me', 'password': 'hunter2'}),
+            200, dict(JSON_HEADERS, **{'Content-Encoding': 'gzip', 'Set-Cookie': 'a=b'}),
+            json_body({'did': 'did:plc:me', 'accessJwt': access_jwt, 'refreshJwt': 'not-a-jwt', 'email': 'me@example.com'}),
+            12.5
+        )
+        self.assertTrue(cassette.save())
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        for secret in ('hunter2', 'secret', access_jwt, 'not-a-jwt', 'me@example.com', 'a=b'):
+            self.assertNotIn(secret, text)
+
+        interaction = Cassette.load(self.path).interactions[0]
+        self.assertEqual(interaction['request']['headers']['authorization'], REDACTED)
+        self.assertEqual(interaction['request']['body']['json']['password'], REDACTED)
+        self.assertNotIn('content-encoding', interaction['response']['headers'])
+        session = json.loads(decode_response_body(interaction))
+        self.assertEqual(session['email'], REDACTED)
+        # 代わりのJWTは有効期限が遠い将来で、元のクレームを残す
+        payload = decode_jwt_payload(session['accessJwt'])
+        self.assertEqual((payload['sub'], payload['exp']), ('did:plc:me', REPLAY_TOKEN_EXP))
+        self.assertEqual(decode_jwt_payload(session['refreshJwt']), {'exp': REPLAY_TOKEN_EXP})
+
+    def test_replay_order_and_matching(self):
+        """同じリクエストには記録した順に応答し、ホスト名とクエリの順序によらず照合することのテスト"""
+        cassette = Cassette(self.path)
+        for page in (1, 2):
+            cassette.record(
+                'GET', 'https://pds.example/xrpc/app.bsky.feed.getTimeline?limit=2&algorithm=x', {}, b'',
+                200, JSON_HEADERS, json_body({'page': page}), 30.0
+            )
+        cassette.record(
+            'POST', 'https://pds.example/xrpc/com.atproto.repo.uploadBlob', {'Content-Type': 'image/png'},
+            b'\x89PNG' * 100, 200, JSON_HEADERS, json_body({'blob': {}}), 5.0
+        )
+        cassette.save()
+        replay = Cassette.load(self.path, repeat=False)
+
+        url = 'http://127.0.0.1:1234/xrpc/app.bsky.feed.getTimeline?algorithm=x&limit=2'
+        pages = [json.loads(decode_response_body(replay.find('get', url)))['page'] for _ in range(2)]
+        self.assertEqual(pages, [1, 2])
+        with self.assertRaises(CassetteMissError):
+            replay.find('GET', url)
+        with self.assertRaises(CassetteMissError):
+            replay.find('GET', 'http://127.0.0.1:1234/xrpc/app.bsky.feed.getTimeline?limit=3&algorithm=x')
+
+        # 巻き戻すと最初から応答し、repeat=Trueなら最後の応答を繰り返す
+        replay.rewind()
+        replay.repeat = True
+        pages = [json.loads(decode_response_body(replay.find('GET', url)))['page'] for _ in range(3)]
+        self.assertEqual(pages, [1, 2, 2])
+
+        # 画像の本文はハッシュだけを保存し、本文も照合する場合はハッシュで照合する
+        self.assertNotIn('base64', replay.interactions[2]['request']['body'])
+        strict = Cassette.load(self.path, match_body=True)
+        blob_url = 'https://bsky.social/xrpc/com.atproto.repo.uploadBlob'
+        self.assertEqual(strict.find('POST', blob_url, b'\x89PNG' * 100)['elapsed_ms'], 5.0)
+        with self.assertRaises(CassetteMissError):
+            strict.find('POST', blob_url, b'other')
+
+    def test_binary_response(self):
+        """JSON以外の応答が元のバイト列に戻ることのテスト"""
+        cassette = Cassette(self.path)
+        data = bytes(range(256))
+        cassette.record('GET', 'https://cdn.example/img', {}, b'', 200, {'Content-Type': 'image/jpeg'}, data, 1.0)
+        cassette.save()
+        self.assertEqual(decode_response_body(Cassette.load(self.path).find('GET', 'https://cdn.example/img')), data)
+
+@unittest.skipUnless(HAS_HTTPX, "httpxがインストールされていません")
+class TestCassetteTransport(unittest.TestCase):
+    """カセットの記録・再生のトランスポートのテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'cassette.json')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_record_and_replay(self):
+        """検証用サーバーとの通信を記録し、サーバーを止めて再生できることのテスト"""
+        from core.cassette_transport import RecordingTransport, ReplayTransport
+
+        with FakeXrpcServer(timeline_size=30) as server:
+            url = server.url
+            recorder = RecordingTransport(Cassette(self.path))
+            with httpx.Client(transport=recorder, base_url=url) as client:
+                session = client.post('/xrpc/com.atproto.server.createSession', json={
+                    'identifier': server.handle, 'password': server.password,
+                }).json()
+                headers = {'Authorization': f"Bearer {session['accessJwt']}"}
+                recorded = client.get('/xrpc/app.bsky.feed.getTimeline', params={'limit': 10}, headers=headers).json()
+                missing = client.get('/xrpc/com.atproto.repo.getRecord', params={'repo': 'x', 'collection': 'y', 'rkey': 'z'})
+
+        # 閉じたときに保存される
+        cassette = Cassette.load(self.path)
+        self.assertEqual(len(cassette), 3)
+        with httpx.Client(transport=ReplayTransport(cassette), base_url=url) as client:
+            replayed = client.post('/xrpc/com.atproto.server.createSession', json={'identifier': 'x', 'password': 'y'})
+            self.assertEqual(replayed.json()['did'], session['did'])
+            timeline = client.get('/xrpc/app.bsky.feed.getTimeline', params={'limit': 10})
+            self.assertEqual(timeline.json(), recorded)
+            error = client.get('/xrpc/com.atproto.repo.getRecord', params={'repo': 'x', 'collection': 'y', 'rkey': 'z'})
+            self.assertEqual((error.status_code, error.json()), (missing.status_code, missing.json()))
+
+    @unittest.skipUnless(HAS_ATPROTO, "atprotoがインストールされていません")
+    def test_bluesky_client_replay(self):
+        """BlueskyClientの通信を記録し、同じ結果を再生できることのテスト"""
+        from unittest.mock import patch
+        from core.client import BlueskyClient
+        from core.cassette_transport import RecordingTransport, ReplayTransport
+
+        def session(client, password):
+            with patch('core.client.SessionPersistence'):
+                client.login('user1.bsky.social', password)
+            return [item.post.uri for item in client.get_timeline(limit=20).feed]
+
+        data_store = DataStore(os.path.join(self.temp_dir, 'test_data.db'))
+        try:
+            with FakeXrpcServer(timeline_size=40) as server:
+                cassette = Cassette(self.path)
+                client = BlueskyClient(base_url=server.url, data_store=data_store,
+                                       transport=RecordingTransport(cassette, autosave=False))
+                recorded = session(client, server.password)
+            cassette.save()
+
+            client = BlueskyClient(base_url='http://127.0.0.1:9', data_store=data_store,
+                                   transport=ReplayTransport(Cassette.load(self.path)))
+            self.assertEqual(session(client, 'anything'), recorded)
+        finally:
+            data_store.close()
+
+if __name__ == '__main__':
+    unittest.main()
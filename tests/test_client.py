@@ -10,27 +10,51 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import time
+import json
+import base64
+import shutil
+import tempfile
 
 # プロジェクトのルートディレクトリをパスに追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.client import BlueskyClient
+from core.data_store import DataStore
 from atproto.exceptions import AtProtocolError
 
+def make_jwt(exp):
+    """テスト用のJWTを作成（署名は検証しないためダミー）"""
+    payload = base64.urlsafe_b64encode(json.dumps({'sub': 'test_did', 'exp': exp}).encode()).rstrip(b'=').decode()
+    return f"header.{payload}.signature"
+
 class TestBlueskyClient(unittest.TestCase):
     """BlueskyClientのテストクラス"""
     
     def setUp(self):
         """テスト前の準備"""
-        self.client = BlueskyClient()
+        # 作業ツリーにデータベースを作らないよう、一時ディレクトリのデータストアを使う
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_store = DataStore(db_path=os.path.join(self.temp_dir, 'test_data.db'))
+        # ログイン時のセッション情報の保存（既定のデータベースへの書き込み）は行わない
+        persistence_patcher = patch('core.client.SessionPersistence')
+        persistence_patcher.start()
+        self.addCleanup(persistence_patcher.stop)
+        
+        self.client = BlueskyClient(data_store=self.data_store)
         # ログイン状態をモック
         self.client.is_logged_in = True
         self.client.client = MagicMock()
         self.client.profile = MagicMock()
         
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
     def test_init(self):
         """初期化のテスト"""
-        client = BlueskyClient()
+        client = BlueskyClient(data_store=self.data_store)
         self.assertFalse(client.is_logged_in)
         self.assertIsNone(client.profile)
         
@@ -43,7 +67,7 @@ class TestBlueskyClient(unittest.TestCase):
         mock_atproto.return_value = mock_client
         
         # テスト実行
-        client = BlueskyClient()
+        client = BlueskyClient(data_store=self.data_store)
         result = client.login("test_user", "test_password")
         
         # 検証
@@ -60,7 +84,7 @@ class TestBlueskyClient(unittest.TestCase):
         mock_atproto.return_value = mock_client
         
         # テスト実行
-        client = BlueskyClient()
+        client = BlueskyClient(data_store=self.data_store)
         with self.assertRaises(AtProtocolError):
             client.login("test_user", "test_password")
         
@@ -270,5 +294,63 @@ class TestBlueskyClient(unittest.TestCase):
         self.assertFalse(self.client.is_logged_in)
         self.assertIsNone(self.client.profile)
 
+    def test_login_with_session_valid_token(self):
+        """アクセストークンが有効な場合に通信せずにセッションを再利用するテスト"""
+        now = time.time()
+        session_string = ':::'.join(
+            ['test_handle', 'test_did', make_jwt(now + 3600), make_jwt(now + 86400), 'https://pds.example']
+        )
+        self.client.is_logged_in = False
+        self.client.client = MagicMock()
+        
+        with patch.object(self.client, '_load_profile_async') as mock_load_profile:
+            result = self.client.login_with_session(session_string)
+        
+        self.client.client.login.assert_not_called()
+        self.client.client._import_session_string.assert_called_once_with(session_string)
+        mock_load_profile.assert_called_once()
+        self.assertTrue(self.client.is_logged_in)
+        self.assertEqual(result.handle, "test_handle")
+        self.assertEqual(self.client.user_did, "test_did")
+        
+    def test_login_with_session_expired_token(self):
+        """リフレッシュトークンも期限切れの場合に通信せずに失敗するテスト"""
+        now = time.time()
+        session_string = ':::'.join(['test_handle', 'test_did', make_jwt(now - 10), make_jwt(now - 10)])
+        self.client.is_logged_in = False
+        self.client.client = MagicMock()
+        
+        with self.assertRaises(Exception):
+            self.client.login_with_session(session_string)
+        
+        self.client.client.login.assert_not_called()
+        self.assertFalse(self.client.is_logged_in)
+
+    def test_refresh_session_once(self):
+        """同時に更新を要求しても、更新は1回だけ行われるテスト"""
+        import threading
+        session = MagicMock(access_jwt=make_jwt(time.time() + 60))
+        atproto_client = MagicMock(_session=session, _refresh_lock=threading.Lock())
+        
+        def refresh():
+            time.sleep(0.05)
+            session.access_jwt = make_jwt(time.time() + 7200)
+        atproto_client._refresh_and_set_session.side_effect = refresh
+        self.client.client = atproto_client
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.client.refresh_session(ahead=1200)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        atproto_client._refresh_and_set_session.assert_called_once()
+        self.assertEqual(sorted(results), [False, False, True])
+        self.assertGreater(self.client.access_token_expires_at(), time.time() + 3600)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+圧縮ユーティリティのテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.compression import compress, decompress, train_dictionary, DICTIONARY_SIZE
+
+def make_record(i):
+    """テスト用のタイムラインのレコード（JSON）を作成"""
+    return json.dumps({
+        'post': {
+            '$type': 'app.bsky.feed.defs#postView',
+            'uri': f'at://did:plc:user{i % 5}/app.bsky.feed.post/{i:013d}',
+            'cid': f'bafyreicid{i:040d}',
+            'author': {
+                'did': f'did:plc:user{i % 5}',
+                'handle': f'user{i % 5}.bsky.social',
+                'avatar': f'https://cdn.bsky.app/img/avatar/plain/did:plc:user{i % 5}/avatar@jpeg',
+                'labels': []
+            },
+            'record': {'$type': 'app.bsky.feed.post', 'text': f'投稿{i}', 'langs': ['ja']},
+            'indexedAt': f'2024-01-01T00:00:{i % 60:02d}.000Z',
+            'likeCount': i, 'replyCount': 0, 'repostCount': 0
+        }
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class TestCompression(unittest.TestCase):
+    """圧縮ユーティリティのテストクラス"""
+    
+    def test_round_trip(self):
+        """辞書の有無にかかわらず元のデータに戻ることのテスト"""
+        data = make_record(1)
+        self.assertEqual(decompress(compress(data)), data)
+        
+        zdict = train_dictionary([make_record(i) for i in range(50)])
+        self.assertEqual(decompress(compress(data, zdict), zdict), data)
+    
+    def test_dictionary_improves_small_records(self):
+        """学習した辞書で小さなレコードの圧縮率が上がることのテスト"""
+        zdict = train_dictionary([make_record(i) for i in range(50)])
+        self.assertGreater(len(zdict), 0)
+        self.assertLessEqual(len(zdict), DICTIONARY_SIZE)
+        
+        records = [make_record(i) for i in range(100, 120)]
+        plain = sum(len(compress(data)) for data in records)
+        with_dict = sum(len(compress(data, zdict)) for data in records)
+        self.assertLess(with_dict, plain * 0.7)
+    
+    def test_dictionary_size_limit(self):
+        """辞書が指定したサイズを超えないことのテスト"""
+        zdict = train_dictionary([make_record(i) for i in range(50)], size=64)
+        self.assertLessEqual(len(zdict), 64)
+        self.assertEqual(train_dictionary([]), b'')
+
+if __name__ == '__main__':
+    unittest.main()
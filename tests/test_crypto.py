@@ -19,7 +19,7 @@ from utils.crypto import encrypt_data, decrypt_data
 class TestCrypto(unittest.TestCase):
     """暗号化ユーティリティのテストクラス"""
     
-    @patch('utils.crypto.win32crypt.CryptProtectData')
+    @patch('win32crypt.CryptProtectData')
     def test_encrypt_data_string(self, mock_protect):
         """文字列データの暗号化テスト"""
         # モックの戻り値を設定
@@ -36,7 +36,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertEqual(result, b'encrypted_data')
     
-    @patch('utils.crypto.win32crypt.CryptProtectData')
+    @patch('win32crypt.CryptProtectData')
     def test_encrypt_data_bytes(self, mock_protect):
         """バイト列データの暗号化テスト"""
         # モックの戻り値を設定
@@ -53,7 +53,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertEqual(result, b'encrypted_data')
     
-    @patch('utils.crypto.win32crypt.CryptProtectData')
+    @patch('win32crypt.CryptProtectData')
     def test_encrypt_data_unsupported_type(self, mock_protect):
         """サポートされていない型の暗号化テスト"""
         # テスト実行
@@ -66,7 +66,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertIsNone(result)
         
-    @patch('utils.crypto.win32crypt.CryptUnprotectData')
+    @patch('win32crypt.CryptUnprotectData')
     def test_decrypt_data_utf8(self, mock_unprotect):
         """UTF-8でデコード可能なデータの復号化テスト"""
         # モックの戻り値を設定
@@ -81,7 +81,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertEqual(result, 'test_data')
     
-    @patch('utils.crypto.win32crypt.CryptUnprotectData')
+    @patch('win32crypt.CryptUnprotectData')
     def test_decrypt_data_latin1(self, mock_unprotect):
         """UTF-8でデコードできないがLatin-1でデコード可能なデータの復号化テスト"""
         # UTF-8でデコードできないバイト列を作成
@@ -99,7 +99,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertEqual(result, invalid_utf8.decode('latin-1'))
     
-    @patch('utils.crypto.win32crypt.CryptUnprotectData')
+    @patch('win32crypt.CryptUnprotectData')
     def test_decrypt_data_error(self, mock_unprotect):
         """復号化エラーのテスト"""
         # モックが例外を発生させる
@@ -111,7 +111,7 @@ class TestCrypto(unittest.TestCase):
         # 結果の確認
         self.assertIsNone(result)
         
-    @patch('utils.crypto.win32crypt.CryptProtectData')
+    @patch('win32crypt.CryptProtectData')
     def test_encrypt_data_error(self, mock_protect):
         """暗号化エラーのテスト"""
         # モックが例外を発生させる
@@ -10,13 +10,19 @@ import unittest
 import os
 import sys
 import tempfile
+import gc
+import json
 import sqlite3
+import weakref
+import threading
 from datetime import datetime
+from unittest.mock import patch
 
 # プロジェクトのルートディレクトリをパスに追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.data_store import DataStore
+from core.post_model import Author
 
 class TestDataStore(unittest.TestCase):
     """データストアのテストクラス"""
@@ -34,6 +40,7 @@ class TestDataStore(unittest.TestCase):
         """テスト後のクリーンアップ"""
         # データベース接続を確実に閉じる
         try:
+            self.data_store.close()
             del self.data_store
         except:
             pass
@@ -133,6 +140,468 @@ class TestDataStore(unittest.TestCase):
         
         loaded_session2 = self.data_store.load_session(user_did2)
         self.assertEqual(loaded_session2, encrypted_session2)
+    
+    def test_blob_cache(self):
+        """ブロブキャッシュの保存・延長・削除のテスト"""
+        user_did = 'did:plc:test_user'
+        
+        # 保存と読み込み
+        self.assertTrue(self.data_store.save_blob_cache(user_did, 'abc', 'bafkrei', 'image/jpeg', 1234, 60))
+        self.assertEqual(
+            self.data_store.load_blob_cache(user_did, 'abc'),
+            {'cid': 'bafkrei', 'mime_type': 'image/jpeg', 'size': 1234}
+        )
+        
+        # 他のユーザーからは参照できない
+        self.assertIsNone(self.data_store.load_blob_cache('did:plc:other', 'abc'))
+        
+        # 期限切れは返さない
+        self.data_store.extend_blob_cache(user_did, ['abc'], -1)
+        self.assertIsNone(self.data_store.load_blob_cache(user_did, 'abc'))
+        
+        # 期限を延長すると再び参照できる
+        self.data_store.extend_blob_cache(user_did, ['abc'], 60)
+        self.assertIsNotNone(self.data_store.load_blob_cache(user_did, 'abc'))
+        
+        # 削除
+        self.assertTrue(self.data_store.delete_blob_cache(user_did, ['abc']))
+        self.assertIsNone(self.data_store.load_blob_cache(user_did, 'abc'))
+    
+    def test_connection_reused_per_thread(self):
+        """接続がスレッドごとに使い回され、WALモードで開かれることのテスト"""
+        conn = self.data_store._connection()
+        self.assertIs(self.data_store._connection(), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        
+        # 別スレッドでは別の接続を使用する
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.data_store._connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+        
+        # 終了したスレッドの接続は、次に接続を作成するときに閉じられる
+        thread = threading.Thread(target=self.data_store._connection)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(self.data_store._connections), 2)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            other[0].execute("SELECT 1")
+        
+        # close()の後は新しい接続が作成される
+        self.data_store.close()
+        self.assertIsNot(self.data_store._connection(), conn)
+        self.assertEqual(self.data_store.load_session('did:plc:test_user'), None)
+    
+    def test_transaction_rollback(self):
+        """トランザクション内で例外が発生した場合にロールバックされることのテスト"""
+        with self.assertRaises(RuntimeError):
+            with self.data_store._transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO users (did, created_at, updated_at) VALUES (?, ?, ?)",
+                    ('did:plc:rollback', None, None)
+                )
+                raise RuntimeError("rollback")
+        
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT COUNT(*) FROM users WHERE did = ?", ('did:plc:rollback',))
+        self.assertEqual(cursor.fetchone()[0], 0)
+    
+    def test_read_during_write_transaction(self):
+        """書き込みトランザクション中も他のスレッドから読み込めることのテスト"""
+        self.data_store.save_session('did:plc:test_user', b'old')
+        
+        loaded = []
+        with self.data_store._transaction() as cursor:
+            cursor.execute("UPDATE sessions SET encrypted_session = ?", (b'new',))
+            
+            # コミット前の内容は見えず、待たされることもない
+            thread = threading.Thread(
+                target=lambda: loaded.append(self.data_store.load_session('did:plc:test_user'))
+            )
+            thread.start()
+            thread.join(timeout=2)
+        
+        self.assertEqual(loaded, [b'old'])
+        self.assertEqual(self.data_store.load_session('did:plc:test_user'), b'new')
+    
+    def test_schema_version_and_indexes(self):
+        """最新バージョンまでマイグレーションされ、キャッシュのクエリがインデックスを使うことのテスト"""
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT version FROM db_version ORDER BY id DESC LIMIT 1")
+        self.assertEqual(cursor.fetchone()[0], DataStore._MIGRATIONS[-1][0])
+        
+        queries = {
+            'idx_timeline_posts_timeline': (
+                "SELECT post_id FROM timeline_posts WHERE user_did = 'a' AND timeline = 'home' "
+                "ORDER BY indexed_at DESC LIMIT 50"
+            ),
+            'idx_posts_author': "SELECT id FROM posts WHERE author_id = 1 ORDER BY indexed_at DESC",
+            'idx_follows_subject': "SELECT user_did FROM follows WHERE subject_did = 'a'",
+            'idx_blocks_subject': "SELECT user_did FROM blocks WHERE subject_did = 'a'",
+            'idx_mutes_subject': "SELECT user_did FROM mutes WHERE subject_did = 'a'",
+        }
+        for index, query in queries.items():
+            cursor.execute("EXPLAIN QUERY PLAN " + query)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan)
+    
+    def test_schema_verified_once(self):
+        """同じデータベースのスキーマ確認は1回だけ行われることのテスト"""
+        with patch.object(DataStore, '_get_current_version') as get_version:
+            DataStore(self.db_path)
+            get_version.assert_not_called()
+            
+            # ファイルが削除された場合は作り直す
+            self.data_store.close()
+            os.remove(self.db_path)
+            get_version.return_value = DataStore._MIGRATIONS[-1][0]
+            DataStore(self.db_path)
+            get_version.assert_called_once()
+    
+    def test_migrate_from_older_version(self):
+        """古いバージョンのデータベースが残りのマイグレーションだけで更新されることのテスト"""
+        self.data_store.save_session('did:plc:test_user', b'encrypted_session')
+        self.data_store.close()
+        
+        # バージョン3の状態に戻す
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE posts")
+        conn.execute("DELETE FROM db_version WHERE version > 3")
+        conn.commit()
+        conn.close()
+        DataStore._verified_paths.clear()
+        
+        data_store = DataStore(self.db_path)
+        cursor = data_store._cursor()
+        cursor.execute("SELECT version FROM db_version ORDER BY version")
+        self.assertEqual([row[0] for row in cursor.fetchall()], [version for version, _ in DataStore._MIGRATIONS])
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='posts'")
+        self.assertIsNotNone(cursor.fetchone())
+        self.assertEqual(data_store.load_session('did:plc:test_user'), b'encrypted_session')
+        data_store.close()
+    
+    def _make_post(self, uri, content, indexed_at, quote_of=None):
+        """テスト用の投稿データを作成"""
+        return {
+            'uri': uri, 'cid': f"cid-{uri}", 'author': Author('did:plc:alice', 'alice.test', 'Alice'),
+            'content': content, 'raw_timestamp': indexed_at,
+            'likes': 1, 'replies': 0, 'reposts': 0, 'reply_parent': None, 'reply_root': None,
+            'is_quote_post': quote_of is not None, 'quote_of': quote_of
+        }
+    
+    def test_search_posts(self):
+        """キャッシュした投稿の全文検索のテスト"""
+        quote = {
+            'uri': 'at://quoted', 'cid': 'cid-quoted', 'author': Author('did:plc:bob', 'bob.test', 'Bob'),
+            'content': '引用元の投稿です', 'indexed_at': '2024-01-01T00:00:00Z'
+        }
+        posts = [
+            self._make_post('at://1', '今朝見た桜がきれいでした', '2024-01-01T01:00:00Z'),
+            self._make_post('at://2', 'Python and SQLite full text search', '2024-01-01T02:00:00Z'),
+            self._make_post('at://3', '桜の写真を引用します', '2024-01-01T03:00:00Z', quote_of=quote),
+        ]
+        self.assertTrue(self.data_store.save_posts(posts, 'did:plc:alice', 'home'))
+        
+        # 日本語の部分文字列（trigram）
+        results = self.data_store.search_posts('桜がきれい')
+        self.assertEqual([row['uri'] for row in results], ['at://1'])
+        self.assertEqual(results[0]['handle'], 'alice.test')
+        
+        # 複数の語はすべてを含むもの、英字は大文字小文字を区別しない
+        self.assertEqual([row['uri'] for row in self.data_store.search_posts('sqlite TEXT')], ['at://2'])
+        
+        # 引用元の投稿も検索できる
+        results = self.data_store.search_posts('引用元の')
+        self.assertEqual([row['uri'] for row in results], ['at://quoted'])
+        self.assertEqual(results[0]['display_name'], 'Bob')
+        
+        # 3文字未満の語は部分一致（新しい順）
+        self.assertEqual([row['uri'] for row in self.data_store.search_posts('桜')], ['at://3', 'at://1'])
+        
+        # 本文が更新された場合は索引も更新される
+        posts[0]['content'] = '夕方の空'
+        self.data_store.save_posts(posts[:1])
+        self.assertEqual(self.data_store.search_posts('桜がきれい'), [])
+        self.assertEqual([row['uri'] for row in self.data_store.search_posts('夕方の空')], ['at://1'])
+        
+        # 本文が同じ場合は索引を更新しない（トリガーによる変更が数えられない）
+        conn = self.data_store._connection()
+        before = conn.total_changes
+        conn.execute("UPDATE posts SET text = text")
+        self.assertEqual(conn.total_changes - before, 4)
+        
+        # FTS5の構文として解釈されない
+        self.assertEqual(self.data_store.search_posts('"OR" NEAR('), [])
+    
+    def test_authors_and_refs_stored_once(self):
+        """投稿者と返信先・引用元のURIが1行だけ保存され、IDで参照されることのテスト"""
+        quote = {
+            'uri': 'at://quoted', 'cid': 'cid-quoted', 'author': Author('did:plc:alice', 'alice.test', 'Alice'),
+            'content': '引用元', 'indexed_at': '2024-01-01T00:00:00Z'
+        }
+        posts = [self._make_post('at://root', 'ルート', '2024-01-01T00:00:00Z')]
+        for i in range(3):
+            post = self._make_post(f'at://reply{i}', f'返信{i}', f'2024-01-01T00:0{i + 1}:00Z', quote_of=quote)
+            post['reply_parent'] = post['reply_root'] = {'uri': 'at://root', 'cid': 'cid-at://root'}
+            posts.append(post)
+        self.assertTrue(self.data_store.save_posts(posts, 'did:plc:alice', 'home'))
+        
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT COUNT(*) FROM authors")
+        self.assertEqual(cursor.fetchone()[0], 1)
+        cursor.execute("SELECT COUNT(*) FROM post_refs")
+        self.assertEqual(cursor.fetchone()[0], 5)
+        cursor.execute("SELECT COUNT(DISTINCT reply_root_id), COUNT(DISTINCT quote_id) FROM posts")
+        self.assertEqual(cursor.fetchone(), (1, 1))
+        
+        # 返信先のCIDも復元できる
+        results = self.data_store.search_posts('返信1')
+        self.assertEqual(results[0]['reply_parent_uri'], 'at://root')
+        self.assertEqual(results[0]['reply_root_cid'], 'cid-at://root')
+        self.assertEqual(results[0]['quote_uri'], 'at://quoted')
+        
+        # 表示名の変更は1行の更新だけで全投稿に反映される
+        posts[0]['author'].update('alice.test', 'Alice 2')
+        self.data_store.save_posts(posts[:1])
+        self.assertEqual({row['display_name'] for row in self.data_store.search_posts('返信')}, {'Alice 2'})
+    
+    def test_load_timeline_posts(self):
+        """保存済みのタイムラインを引用元も含めて読み込めることのテスト"""
+        from core.post_model import post_from_cache
+        quote = {
+            'uri': 'at://quoted', 'cid': 'cid-quoted', 'author': Author('did:plc:bob', 'bob.test', 'Bob'),
+            'content': '引用元の投稿です', 'indexed_at': '2024-01-01T00:00:00Z'
+        }
+        posts = [
+            self._make_post(f'at://{i}', f'投稿{i}', f'2024-01-01T0{i}:00:00Z', quote_of=quote if i == 2 else None)
+            for i in range(1, 4)
+        ]
+        self.data_store.save_posts(posts, 'did:plc:alice', 'home')
+        self.data_store.save_posts([self._make_post('at://other', '別のユーザー', '2024-01-01T05:00:00Z')],
+                                   'did:plc:carol', 'home')
+        
+        # 新しいものからlimit件を古い順に返す
+        rows = self.data_store.load_timeline_posts('did:plc:alice', 'home', limit=2)
+        self.assertEqual([row['uri'] for row in rows], ['at://2', 'at://3'])
+        
+        post = post_from_cache(rows[0], 'did:plc:alice')
+        self.assertTrue(post['is_own_post'])
+        self.assertTrue(post['is_quote_post'])
+        self.assertEqual(post['quote_of']['author'].handle_text, '@bob.test')
+        self.assertEqual(post['quote_of']['content'], '引用元の投稿です')
+        self.assertFalse(post_from_cache(rows[1])['is_quote_post'])
+        
+        self.assertEqual(self.data_store.load_timeline_posts('did:plc:nobody'), [])
+    
+    def test_raw_records(self):
+        """元のレコードが圧縮して保存され、要求されたときに展開されることのテスト"""
+        def make_record(i):
+            return {
+                'post': {
+                    'uri': f'at://{i}', 'cid': f'cid-at://{i}', 'indexedAt': '2024-01-01T00:00:00Z',
+                    'author': {'did': 'did:plc:alice', 'handle': 'alice.test', 'labels': []},
+                    'record': {'$type': 'app.bsky.feed.post', 'text': f'投稿{i}', 'langs': ['ja']},
+                }
+            }
+        
+        with patch('core.data_store.RAW_DICT_TRAINING_SAMPLES', 10), \
+                patch('core.data_store.RAW_DICT_RECOMPRESS_CHUNK', 5):
+            self.data_store.queue_posts([self._make_post('at://0', '投稿0', '2024-01-01T00:00:00Z')])
+            self.data_store.queue_raw_records([('at://0', make_record(0))])
+            self.data_store.flush()
+            self.assertEqual(self.data_store.load_raw_record('at://0'), make_record(0))
+            self.assertIsNone(self.data_store.load_raw_record('at://missing'))
+            
+            # 十分に溜まったら辞書を作成し、それまでのレコードも辞書で圧縮し直す
+            self.data_store.queue_raw_records([(f'at://{i}', json.dumps(make_record(i))) for i in range(1, 12)])
+            self.data_store.flush()
+        
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT COUNT(*) FROM compression_dicts")
+        self.assertEqual(cursor.fetchone()[0], 1)
+        cursor.execute("SELECT COUNT(*) FROM post_raw WHERE dict_id IS NULL")
+        self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(self.data_store.load_raw_record('at://0'), make_record(0))
+        
+        # 元のレコードから投稿を作り直せる
+        records = dict(self.data_store.iter_raw_records(batch_size=5))
+        self.assertEqual(len(records), 12)
+        convert = lambda record: self._make_post(
+            record['post']['uri'], record['post']['record']['text'], record['post']['indexedAt']
+        )
+        self.assertEqual(self.data_store.rebuild_posts_from_raw(convert, batch_size=5), 12)
+        self.assertEqual([row['uri'] for row in self.data_store.search_posts('投稿11')], ['at://11'])
+    
+    def test_raw_dictionary_training_backoff(self):
+        """辞書を作成できなかった場合は、しばらく再試行しないことのテスト"""
+        with patch('core.data_store.RAW_DICT_TRAINING_SAMPLES', 2), \
+                patch('core.data_store.train_dictionary', return_value=b'') as train:
+            self.data_store.queue_raw_records([('at://1', '{"a":1}'), ('at://2', '{"a":2}')])
+            self.data_store.flush()
+            self.data_store.queue_raw_records([('at://3', '{"a":3}')])
+            self.data_store.flush()
+        
+        train.assert_called_once()
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT COUNT(*) FROM compression_dicts")
+        self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(self.data_store.load_raw_record('at://3'), {'a': 3})
+    
+    def test_write_behind_flush(self):
+        """遅延書き込みキューがflushとcloseで書き込まれることのテスト"""
+        posts = [self._make_post(f'at://{i}', f'投稿{i}番目', f'2024-01-01T00:00:{i:02d}Z') for i in range(3)]
+        
+        # 別スレッドから追加
+        thread = threading.Thread(target=self.data_store.queue_posts, args=(posts, 'did:plc:alice', 'home'))
+        thread.start()
+        thread.join()
+        self.data_store.queue_relations('follows', 'did:plc:alice', [
+            {'did': 'did:plc:bob', 'handle': 'bob.test', 'display_name': None, 'uri': 'at://follow'}
+        ])
+        
+        self.assertTrue(self.data_store.flush())
+        cursor = self.data_store._cursor()
+        cursor.execute("SELECT COUNT(*) FROM timeline_posts WHERE user_did = 'did:plc:alice' AND timeline = 'home'")
+        self.assertEqual(cursor.fetchone()[0], 3)
+        cursor.execute("SELECT a.handle, a.display_name FROM follows f JOIN authors a ON a.did = f.subject_did")
+        self.assertEqual(cursor.fetchone(), ('bob.test', 'bob.test'))
+        
+        # closeでも書き込まれる
+        self.data_store.queue_posts([self._make_post('at://last', '最後の投稿', '2024-01-02T00:00:00Z')])
+        self.data_store.close()
+        self.assertEqual([row['uri'] for row in self.data_store.search_posts('最後の投稿')], ['at://last'])
+    
+    def test_write_behind_releases_written_records(self):
+        """書き込み済みのレコードを書き込み用スレッドが参照し続けないことのテスト"""
+        class Record:
+            def model_dump_json(self, **kwargs):
+                return json.dumps({'text': 'record'})
+        
+        record = Record()
+        ref = weakref.ref(record)
+        self.data_store.queue_raw_records([('at://record', record)])
+        self.assertTrue(self.data_store.flush())
+        del record
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(self.data_store.load_raw_record('at://record'), {'text': 'record'})
+    
+    def test_write_behind_thresholds(self):
+        """件数のしきい値に達したら、flushしなくても書き込まれることのテスト"""
+        with patch('core.data_store.WRITE_BEHIND_MAX_RECORDS', 2), \
+                patch('core.data_store.WRITE_BEHIND_INTERVAL', 60):
+            with patch.object(self.data_store, '_write_batches', wraps=self.data_store._write_batches) as write:
+                self.data_store.queue_posts([self._make_post('at://1', 'one', '2024-01-01T00:00:01Z')])
+                self.data_store.queue_posts([self._make_post('at://2', 'two', '2024-01-01T00:00:02Z')])
+                
+                # 2件がまとめて1回で書き込まれる
+                with self.data_store._write_cond:
+                    self.assertTrue(self.data_store._write_cond.wait_for(
+                        lambda: self.data_store._written_seq >= 2, timeout=5
+                    ))
+                write.assert_called_once()
+                self.assertEqual(len(write.call_args[0][0]), 2)
+    
+    def test_evict_cache(self):
+        """上限を超えたキャッシュが最もアクセスされていない順に削除されることのテスト"""
+        cursor = self.data_store._cursor()
+        cursor.execute("PRAGMA auto_vacuum")
+        self.assertEqual(cursor.fetchone()[0], 2)  # INCREMENTAL
+        
+        posts = [self._make_post(f'at://{i}', f'投稿番号{i:02d}' * 50, f'2024-01-01T00:00:{i:02d}Z') for i in range(20)]
+        self.data_store.save_posts(posts, 'did:plc:alice', 'home')
+        self.data_store.queue_relations('mutes', 'did:plc:alice', [
+            {'did': 'did:plc:muted', 'handle': 'muted.test', 'display_name': 'Muted'}
+        ])
+        self.data_store.flush()
+        
+        # 古い投稿でも最近参照したものは残る
+        cursor.execute(
+            "UPDATE posts SET last_accessed = '2000-01-01' "
+            "WHERE id != (SELECT id FROM post_refs WHERE uri = 'at://0')"
+        )
+        cursor.execute(
+            "UPDATE posts SET last_accessed = '2001-01-01' "
+            "WHERE id IN (SELECT id FROM post_refs WHERE uri IN ('at://18', 'at://19'))"
+        )
+        
+        deleted = self.data_store.evict_cache({'posts': {'max_rows': 10}, 'authors': {'max_rows': 1}})
+        
+        self.assertEqual(deleted['posts'], 11)  # 上限の90%まで削除
+        cursor.execute("SELECT r.uri FROM posts p JOIN post_refs r ON r.id = p.id ORDER BY p.id")
+        remaining = [row[0] for row in cursor.fetchall()]
+        self.assertEqual(len(remaining), 9)
+        self.assertIn('at://0', remaining)
+        self.assertIn('at://19', remaining)
+        self.assertNotIn('at://1', remaining)
+        
+        # タイムライン・URI・全文検索の索引からも消える
+        cursor.execute("SELECT COUNT(*) FROM timeline_posts")
+        self.assertEqual(cursor.fetchone()[0], 9)
+        cursor.execute("SELECT COUNT(*) FROM post_refs")
+        self.assertEqual(cursor.fetchone()[0], 9)
+        self.assertEqual(self.data_store.search_posts('投稿番号01'), [])
+        
+        # 参照されている投稿者は削除されない
+        self.assertEqual(deleted.get('authors', 0), 0)
+        cursor.execute("SELECT COUNT(*) FROM authors")
+        self.assertEqual(cursor.fetchone()[0], 2)
+        
+        # サイズの上限
+        deleted = self.data_store.evict_cache({'posts': {'max_mb': 0.0001}})
+        self.assertGreater(deleted['posts'], 0)
+        
+        # 上限内の場合は何もしない
+        self.assertEqual(self.data_store.evict_cache({'posts': {'max_rows': 100, 'max_mb': 64}}), {})
+    
+    def test_cache_evictor_waits_for_idle(self):
+        """キャッシュへの書き込み直後は整理を延期することのテスト"""
+        from core.cache_eviction import CacheEvictor, IDLE_SECONDS
+        
+        budgets = {'posts': {'max_rows': 1}}
+        evictor = CacheEvictor(self.data_store, lambda: budgets)
+        self.data_store.queue_posts([self._make_post(f'at://{i}', 'text', '2024-01-01T00:00:00Z') for i in range(3)])
+        self.data_store.flush()
+        self.assertIsNone(evictor.run_once())
+        
+        self.data_store._last_cache_write -= IDLE_SECONDS
+        self.assertEqual(evictor.run_once(), {'posts': 3, 'timeline_posts': 0, 'post_raw': 0, 'post_refs': 3})
+    
+    def test_incremental_vacuum_deferred_to_evictor(self):
+        """既存のデータベースは起動時にVACUUMせず、アイドル時の整理で切り替えることのテスト"""
+        from core.cache_eviction import CacheEvictor
+        
+        # auto_vacuumを設定していない既存のデータベース
+        self.data_store.close()
+        os.remove(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+        DataStore._verified_paths.clear()
+        
+        statements = []
+        connect = sqlite3.connect
+        
+        def traced_connect(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+        
+        with patch('core.data_store.sqlite3.connect', side_effect=traced_connect):
+            self.data_store = DataStore(self.db_path)
+        self.assertNotIn('VACUUM', statements)
+        cursor = self.data_store._cursor()
+        cursor.execute("PRAGMA auto_vacuum")
+        self.assertEqual(cursor.fetchone()[0], 0)
+        
+        evictor = CacheEvictor(self.data_store, lambda: {})
+        self.assertEqual(evictor.run_once(), {})
+        cursor.execute("PRAGMA auto_vacuum")
+        self.assertEqual(cursor.fetchone()[0], 2)
+        self.assertFalse(self.data_store.enable_incremental_vacuum())
 
 if __name__ == '__main__':
     unittest.main()
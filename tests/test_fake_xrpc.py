@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+検証用XRPCサーバーのテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_xrpc import FakeXrpcServer
+from core.data_store import DataStore
+
+try:
+    import atproto_client  # noqa: F401
+    HAS_ATPROTO = True
+except ImportError:
+    HAS_ATPROTO = False
+
+class TestFakeXrpcServer(unittest.TestCase):
+    """検証用XRPCサーバーのテストクラス（HTTPで直接呼び出す）"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.server = FakeXrpcServer(timeline_size=120, follow_count=5).start()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.server.stop()
+
+    def call(self, nsid, params='', body=None, token=None, raw=None):
+        """XRPCを呼び出す
+
+        Returns:
+            tuple: (ステータスコード, 応答のJSON, ヘッダー)
+        """
+        data = raw if raw is not None else (json.dumps(body).encode('utf-8') if body is not None else None)
+        url = f"{self.server.url}/xrpc/{nsid}" + (f"?{params}" if params else '')
+        request = urllib.request.Request(url, data=data, method='POST' if data is not None else 'GET')
+        if token:
+            request.add_header('Authorization', f"Bearer {token}")
+        if data is not None:
+            request.add_header('Content-Type', 'application/json' if raw is None else 'image/png')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read()), e.headers
+
+    def login(self):
+        """ログインしてセッションを取得"""
+        status, session, _ = self.call('com.atproto.server.createSession', body={
+            'identifier': self.server.handle, 'password': self.server.password,
+        })
+        self.assertEqual(status, 200)
+        return session
+
+    def test_session_and_refresh(self):
+        """ログイン・認証・トークンの更新のテスト"""
+        status, body, _ = self.call('com.atproto.server.createSession', body={
+            'identifier': self.server.handle, 'password': 'wrong',
+        })
+        self.assertEqual(status, 401)
+
+        session = self.login()
+        self.assertEqual(session['did'], self.server.did)
+        status, _, _ = self.call('com.atproto.server.getSession', token=session['accessJwt'])
+        self.assertEqual(status, 200)
+        status, body, _ = self.call('app.bsky.feed.getTimeline', token='invalid')
+        self.assertEqual((status, body['error']), (401, 'InvalidToken'))
+
+        # リフレッシュトークンは1回だけ使える
+        status, refreshed, _ = self.call('com.atproto.server.refreshSession', raw=b'', token=session['refreshJwt'])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(refreshed['accessJwt'], session['accessJwt'])
+        status, _, _ = self.call('com.atproto.server.refreshSession', raw=b'', token=session['refreshJwt'])
+        self.assertEqual(status, 401)
+
+    def test_expired_token(self):
+        """期限切れのアクセストークンがExpiredTokenになることのテスト"""
+        self.server.access_token_ttl = -1
+        session = self.login()
+        status, body, _ = self.call('app.bsky.feed.getTimeline', token=session['accessJwt'])
+        self.assertEqual((status, body['error']), (400, 'ExpiredToken'))
+
+    def test_timeline_pagination(self):
+        """タイムラインがカーソルでページ分割されることのテスト"""
+        token = self.login()['accessJwt']
+        uris = []
+        cursor = ''
+        while True:
+            status, body, _ = self.call('app.bsky.feed.getTimeline', f"limit=50&cursor={cursor}", token=token)
+            self.assertEqual(status, 200)
+            uris.extend(item['post']['uri'] for item in body['feed'])
+            cursor = body.get('cursor')
+            if not cursor:
+                break
+        self.assertEqual(len(uris), 120)
+        self.assertEqual(len(set(uris)), 120)
+
+    def test_records(self):
+        """レコードの作成・取得・一覧・削除のテスト"""
+        session = self.login()
+        token = session['accessJwt']
+        status, created, _ = self.call('com.atproto.repo.createRecord', body={
+            'repo': session['did'], 'collection': 'app.bsky.feed.post', 'rkey': 'testkey',
+            'record': {'$type': 'app.bsky.feed.post', 'text': "テスト", 'createdAt': '2026-01-01T00:00:00Z'},
+        }, token=token)
+        self.assertEqual(status, 200)
+        self.assertTrue(created['cid'].startswith('bafyrei'))
+
+        # 作成した投稿はタイムラインの先頭に入る
+        _, timeline, _ = self.call('app.bsky.feed.getTimeline', 'limit=1', token=token)
+        self.assertEqual(timeline['feed'][0]['post']['uri'], created['uri'])
+
+        params = f"repo={session['did']}&collection=app.bsky.feed.post&rkey=testkey"
+        status, record, _ = self.call('com.atproto.repo.getRecord', params)
+        self.assertEqual((status, record['value']['text']), (200, "テスト"))
+        _, listed, _ = self.call('com.atproto.repo.listRecords', f"repo={session['did']}&collection=app.bsky.feed.post")
+        self.assertEqual([r['uri'] for r in listed['records']], [created['uri']])
+
+        status, _, _ = self.call('com.atproto.repo.deleteRecord', body={
+            'repo': session['did'], 'collection': 'app.bsky.feed.post', 'rkey': 'testkey',
+        }, token=token)
+        self.assertEqual(status, 200)
+        status, body, _ = self.call('com.atproto.repo.getRecord', params)
+        self.assertEqual((status, body['error']), (400, 'RecordNotFound'))
+
+    def test_graph_and_blob(self):
+        """フォロー・ミュートの状態とブロブのアップロードのテスト"""
+        token = self.login()['accessJwt']
+        _, follows, _ = self.call('app.bsky.graph.getFollows', f"actor={self.server.handle}", token=token)
+        self.assertEqual(len(follows['follows']), 5)
+        self.assertIn('following', follows['follows'][0]['viewer'])
+
+        target = follows['follows'][0]['handle']
+        status, _, _ = self.call('app.bsky.graph.muteActor', body={'actor': target}, token=token)
+        self.assertEqual(status, 200)
+        _, profile, _ = self.call('app.bsky.actor.getProfile', f"actor={target}", token=token)
+        self.assertTrue(profile['viewer']['muted'])
+        _, mutes, _ = self.call('app.bsky.graph.getMutes', token=token)
+        self.assertEqual([m['handle'] for m in mutes['mutes']], [target])
+
+        status, blob, _ = self.call('com.atproto.repo.uploadBlob', raw=b'\x89PNG' + b'0' * 100, token=token)
+        self.assertEqual(status, 200)
+        self.assertEqual((blob['blob']['size'], blob['blob']['mimeType']), (104, 'image/png'))
+        self.assertTrue(blob['blob']['ref']['$link'].startswith('bafkrei'))
+
+    def test_errors_and_rate_limit(self):
+        """エラーの注入とレート制限のヘッダーのテスト"""
+        self.server.endpoint_overrides['app.bsky.actor.getProfile'] = {'error_rate': 1.0}
+        token = self.login()['accessJwt']
+        status, body, _ = self.call('app.bsky.actor.getProfile', f"actor={self.server.handle}", token=token)
+        self.assertEqual((status, body['error']), (500, 'InternalServerError'))
+        status, _, _ = self.call('app.bsky.feed.getTimeline', token=token)
+        self.assertEqual(status, 200)
+
+        self.server.rate_limit = 2
+        self.server._rate_count = 0
+        status, _, headers = self.call('app.bsky.feed.getTimeline', token=token)
+        self.assertEqual((status, headers['RateLimit-Remaining']), (200, '1'))
+        self.call('app.bsky.feed.getTimeline', token=token)
+        status, body, headers = self.call('app.bsky.feed.getTimeline', token=token)
+        self.assertEqual((status, body['error'], headers['RateLimit-Remaining']), (429, 'RateLimitExceeded', '0'))
+
+        self.assertEqual(self.server.request_counts['app.bsky.feed.getTimeline'], 4)
+        self.assertEqual(self.server.status_counts[429], 1)
+
+@unittest.skipUnless(HAS_ATPROTO, "atprotoがインストールされていません")
+class TestBlueskyClientWithFakeServer(unittest.TestCase):
+    """BlueskyClientをHTTP経由で検証用サーバーに接続するテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_store = DataStore(os.path.join(self.temp_dir, 'test_data.db'))
+        self.server = FakeXrpcServer(timeline_size=60).start()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.server.stop()
+        self.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_login_timeline_and_post(self):
+        """ログイン・タイムラインの取得・投稿がHTTP経由で動作することのテスト"""
+        from unittest.mock import patch
+        from core.client import BlueskyClient
+
+        client = BlueskyClient(base_url=self.server.url, data_store=self.data_store)
+        with patch('core.client.SessionPersistence'):
+            client.login(self.server.handle, self.server.password)
+        self.assertEqual(client.user_did, self.server.did)
+
+        timeline = client.get_timeline(limit=20)
+        self.assertEqual(len(timeline.feed), 20)
+
+        client.send_post("検証用サーバーへの投稿")
+        self.assertEqual(self.server.request_counts['com.atproto.repo.createRecord'], 1)
+        self.assertEqual(client.get_timeline(limit=1).feed[0].post.record.text, "検証用サーバーへの投稿")
+
+if __name__ == '__main__':
+    unittest.main()
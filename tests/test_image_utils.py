@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+画像処理ユーティリティのテスト
+"""
+
+import unittest
+from unittest.mock import patch
+import io
+import os
+import sys
+import tempfile
+import shutil
+import hashlib
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.image_utils import prepare_image
+from core.image_preparer import ImagePreparer
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+class TestPrepareImage(unittest.TestCase):
+    """prepare_imageのテストクラス"""
+    
+    @unittest.skipUnless(HAS_PIL, "Pillowがインストールされていません")
+    def test_downscale_large_image(self):
+        """長辺が上限を超える画像の縮小テスト"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (4000, 3000), (200, 100, 50)).save(buffer, format='PNG')
+        
+        data, mime_type = prepare_image(buffer.getvalue(), 'image/png', max_dimension=1000)
+        
+        self.assertEqual(mime_type, 'image/jpeg')
+        with Image.open(io.BytesIO(data)) as result:
+            self.assertEqual(max(result.size), 1000)
+            self.assertNotIn('exif', result.info)
+    
+    @unittest.skipUnless(HAS_PIL, "Pillowがインストールされていません")
+    def test_recompress_to_max_bytes(self):
+        """上限バイト数に収まるまで再圧縮されることのテスト"""
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (800, 800), os.urandom(800 * 800 * 3)).save(buffer, format='PNG')
+        
+        data, _ = prepare_image(buffer.getvalue(), 'image/png', max_bytes=100000)
+        
+        self.assertLessEqual(len(data), 100000)
+    
+    @unittest.skipUnless(HAS_PIL, "Pillowがインストールされていません")
+    def test_small_png_stays_png(self):
+        """縮小の必要がなく上限に収まる不透明なPNGはPNGのまま返すことのテスト"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 100), (255, 255, 255)).save(buffer, format='PNG')
+        
+        data, mime_type = prepare_image(buffer.getvalue(), 'image/png')
+        
+        self.assertEqual(mime_type, 'image/png')
+        with Image.open(io.BytesIO(data)) as result:
+            self.assertEqual(result.format, 'PNG')
+            self.assertEqual(result.size, (200, 100))
+    
+    @unittest.skipIf(HAS_PIL, "Pillowがインストールされています")
+    def test_without_pillow(self):
+        """Pillowがない場合は元のデータを返すことのテスト"""
+        data, mime_type = prepare_image(b'raw image', 'image/jpeg')
+        
+        self.assertEqual(data, b'raw image')
+        self.assertEqual(mime_type, 'image/jpeg')
+
+class TestImagePreparer(unittest.TestCase):
+    """ImagePreparerのテストクラス"""
+    
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.temp_dir, 'test.jpg')
+        with open(self.image_path, 'wb') as f:
+            f.write(b'image data')
+        
+        # シングルトンをリセット
+        ImagePreparer._instance = None
+        self.preparer = ImagePreparer()
+    
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.preparer.shutdown()
+        ImagePreparer._instance = None
+        shutil.rmtree(self.temp_dir)
+    
+    @patch('core.image_preparer.prepare_image')
+    @patch.object(ImagePreparer, '_submit', return_value=None)
+    def test_cache_by_content_hash(self, mock_submit, mock_prepare):
+        """同じ内容の画像は再処理されないことのテスト"""
+        mock_prepare.return_value = (b'small', 'image/jpeg')
+        
+        first = self.preparer.prepare_files([self.image_path])
+        second = self.preparer.prepare_files([self.image_path])
+        
+        mock_prepare.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(first[0][0], b'small')
+        # ブロブキャッシュのキーはアップロードする（処理後の）データのハッシュ
+        self.assertEqual(first[0][2], hashlib.sha256(b'small').hexdigest())
+    
+    def test_read_failure(self):
+        """存在しないファイルで例外が発生することのテスト"""
+        with self.assertRaises(Exception):
+            self.preparer.prepare_files([os.path.join(self.temp_dir, 'missing.jpg')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+遅延インポートと起動時間のベンチマークのテスト
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.lazy_import import lazy_import
+from benchmarks.startup_importtime import parse_importtime, summarize, find_forbidden
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 | _io
+import time:        50 |         50 |   encodings.aliases
+import time:       200 |        250 | encodings
+import time:      1000 |       1000 |     atproto_client.models.base
+import time:       500 |       1500 |   atproto_client.models
+import time:       300 |       1800 | atproto_client
+"""
+
+class TestLazyImport(unittest.TestCase):
+    """遅延インポートのテストクラス"""
+    
+    def test_loads_on_first_use(self):
+        """最初に属性にアクセスしたときに読み込まれることのテスト"""
+        sys.modules.pop('colorsys', None)
+        colorsys = lazy_import('colorsys')
+        self.assertNotIn('colorsys', sys.modules)
+        
+        self.assertEqual(colorsys.rgb_to_hsv(0, 0, 0), (0.0, 0.0, 0.0))
+        self.assertIn('colorsys', sys.modules)
+    
+    def test_attribute_proxy_is_callable_and_patchable(self):
+        """属性の代理を呼び出せ、mock.patchで置き換えられることのテスト"""
+        ordered_dict = lazy_import('collections', 'OrderedDict')
+        self.assertEqual(list(ordered_dict(a=1)), ['a'])
+        
+        decimal = lazy_import('decimal')
+        with patch.object(decimal, 'Decimal', return_value='patched'):
+            self.assertEqual(decimal.Decimal('1'), 'patched')
+        self.assertEqual(str(decimal.Decimal('1.5')), '1.5')
+    
+    def test_parse_importtime(self):
+        """-X importtimeの出力の解析と集計のテスト"""
+        entries = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual([entry['depth'] for entry in entries], [0, 1, 0, 2, 1, 0])
+        
+        summary = summarize(entries, top=2)
+        self.assertEqual(summary['total_ms'], 2.15)
+        self.assertEqual(summary['top_cumulative'][0], ('atproto_client', 1.8))
+        self.assertEqual(summary['top_packages'][0], ('atproto_client', 1.8))
+        self.assertEqual(find_forbidden(summary['modules']), ['atproto_client'])
+
+if __name__ == '__main__':
+    unittest.main()
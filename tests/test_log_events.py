@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+構造化ログ（イベント）とログの集計のテスト
+"""
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import log_events
+from core.log_events import JsonFormatter, log_event, request_scope, current_request_id, count_items
+from core.metrics import ClientMetrics, instrument_methods
+from config.logging_config import setup_logging, stop_logging
+from benchmarks.log_analyzer import list_log_files, load_entries, summarize_requests, find_error_bursts, main
+
+class ListHandler(logging.Handler):
+    """記録したレコードを保持するハンドラ"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+class TestLogEvents(unittest.TestCase):
+    """イベントの記録のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.handler = ListHandler()
+        self.logger = logging.getLogger('ssky.test.events')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        log_events.set_enabled(True)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        log_events.set_enabled(False)
+        self.logger.removeHandler(self.handler)
+        self.logger.propagate = True
+
+    def test_json_formatter(self):
+        """イベントの項目と例外の情報を含む1行のJSONになることのテスト"""
+        with request_scope('req-1') as request_id:
+            log_event(self.logger, 'timeline_fetch', endpoint='home', duration_ms=12.345, count=3,
+                      outcome='ok', error=None)
+        self.assertEqual(request_id, 'req-1')
+        try:
+            raise ValueError("失敗")
+        except ValueError:
+            self.logger.error("例外: %s", "テスト", exc_info=True)
+
+        formatter = JsonFormatter()
+        event, error = [json.loads(formatter.format(record)) for record in self.handler.records]
+        self.assertEqual(
+            {key: event[key] for key in ('event', 'endpoint', 'request_id', 'duration_ms', 'count', 'outcome')},
+            {'event': 'timeline_fetch', 'endpoint': 'home', 'request_id': 'req-1', 'duration_ms': 12.3,
+             'count': 3, 'outcome': 'ok'}
+        )
+        # Noneの項目は記録しない
+        self.assertNotIn('error', event)
+        self.assertEqual(event['level'], 'INFO')
+        self.assertIsNotNone(datetime.fromisoformat(event['ts']).tzinfo)
+        self.assertEqual(error['message'], "例外: テスト")
+        self.assertIn("ValueError: 失敗", error['exc'])
+        self.assertNotIn('\n', formatter.format(self.handler.records[1]))
+
+    def test_disabled(self):
+        """イベントを記録しない設定の場合は何も出力しないことのテスト"""
+        log_events.set_enabled(False)
+        log_event(self.logger, 'timeline_fetch', outcome='ok')
+        self.assertEqual(self.handler.records, [])
+
+    def test_request_scope_nesting(self):
+        """内側のスコープは外側のリクエストIDを引き継ぐことのテスト"""
+        self.assertIsNone(current_request_id())
+        with request_scope() as outer:
+            with request_scope() as inner:
+                self.assertEqual(inner, outer)
+            with request_scope('explicit') as explicit:
+                self.assertEqual(current_request_id(), 'explicit')
+            self.assertEqual(current_request_id(), outer)
+        self.assertNotEqual(explicit, outer)
+        self.assertIsNone(current_request_id())
+
+    def test_count_items(self):
+        """応答に含まれる項目の数を数えるテスト"""
+        class Response:
+            feed = [1, 2, 3]
+
+        self.assertEqual(count_items(Response()), 3)
+        self.assertEqual(count_items([1, 2]), 2)
+        self.assertIsNone(count_items(True))
+        self.assertIsNone(count_items(None))
+
+    def test_instrumented_methods_log_calls(self):
+        """計測するメソッドの呼び出しがイベントとして記録され、入れ子の呼び出しに同じリクエストIDが付くことのテスト"""
+        class Feed:
+            feed = ['a', 'b']
+
+        @instrument_methods(prefix='Fake', metrics=ClientMetrics())
+        class FakeClient:
+            def timeline(self):
+                self.like()
+                return Feed()
+
+            def like(self):
+                return False
+
+            def fail(self):
+                raise RuntimeError("失敗")
+
+        # イベントは呼び出したメソッドのモジュールのロガーに出力する
+        module_logger = logging.getLogger(__name__)
+        with patch.object(module_logger, 'handlers', [self.handler]), \
+                patch.object(module_logger, 'propagate', False), patch.object(module_logger, 'level', logging.DEBUG):
+            client = FakeClient()
+            client.timeline()
+            with self.assertRaises(RuntimeError):
+                client.fail()
+
+        events = [record.ssky_event for record in self.handler.records]
+        self.assertEqual([(event['endpoint'], event['outcome']) for event in events],
+                         [('Fake.like', 'failed'), ('Fake.timeline', 'ok'), ('Fake.fail', 'error')])
+        self.assertEqual(events[1]['count'], 2)
+        self.assertEqual(events[2]['error'], 'RuntimeError')
+        self.assertEqual(events[0]['request_id'], events[1]['request_id'])
+        self.assertNotEqual(events[1]['request_id'], events[2]['request_id'])
+        self.assertEqual(self.handler.records[0].levelno, logging.WARNING)
+
+class TestJsonLogFile(unittest.TestCase):
+    """JSON形式のログファイルと集計のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        root = logging.getLogger()
+        self.saved_handlers = root.handlers[:]
+        self.saved_level = root.level
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        stop_logging()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_entries(self, name, entries):
+        with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def test_json_log_file(self):
+        """JSON形式の設定でイベントと例外がログファイルに1行ずつ出力されることのテスト"""
+        def settings(key, default=None):
+            return {'advanced.enable_debug_log': False, 'advanced.log_format': 'json'}.get(key, default)
+
+        with patch('config.settings_manager.SettingsManager') as settings_manager:
+            settings_manager.return_value.get.side_effect = settings
+            setup_logging(app_name='test', log_dir=self.temp_dir)
+        self.assertTrue(log_events.is_enabled())
+        logger = logging.getLogger('ssky.test.json')
+        with request_scope('req-2'):
+            log_event(logger, 'api_call', endpoint='BlueskyClient.get_timeline', duration_ms=1500.0, count=50,
+                      outcome='ok')
+        try:
+            raise KeyError('x')
+        except KeyError:
+            logger.exception("取得に失敗しました")
+        stop_logging()
+        self.assertFalse(log_events.is_enabled())
+
+        files = list_log_files(self.temp_dir)
+        entries, skipped = load_entries(files)
+        self.assertEqual(skipped, 0)
+        event = [entry for entry in entries if entry.get('event') == 'api_call'][0]
+        self.assertEqual((event['request_id'], event['count']), ('req-2', 50))
+        error = [entry for entry in entries if entry['level'] == 'ERROR'][0]
+        self.assertEqual(error['message'], "取得に失敗しました")
+        self.assertIn("KeyError", error['exc'])
+        requests = summarize_requests(entries, slow_ms=1000)
+        self.assertEqual(requests['slow_total'], 1)
+
+    def test_analyzer(self):
+        """遅いリクエストとエラーの集中を集計するテスト"""
+        start = datetime(2026, 1, 1, 12, 0, 0).astimezone()
+
+        def entry(seconds, **fields):
+            return dict({'ts': (start + timedelta(seconds=seconds)).isoformat(timespec='milliseconds'),
+                         'level': 'INFO', 'logger': 'core.client', 'message': ''}, **fields)
+
+        calls = [entry(i, event='api_call', endpoint='BlueskyClient.get_timeline', duration_ms=100.0 + i,
+                       outcome='ok', request_id=f"r{i}") for i in range(20)]
+        calls.append(entry(25, event='api_call', endpoint='BlueskyClient.get_timeline', duration_ms=4000.0,
+                           outcome='ok', request_id='slow'))
+        # 10秒間に6件のエラー（集中）と、離れた1件のエラー
+        errors = [entry(100 + i * 2, level='WARNING', event='api_call', endpoint='BlueskyClient.like_post',
+                        duration_ms=50.0, outcome='error', error='NetworkError') for i in range(6)]
+        errors.append(entry(1000, level='ERROR', message="保存に失敗しました"))
+        self._write_entries('ssky_20260101_120000.log.1', calls)
+        self._write_entries('ssky_20260101_120000.log', errors)
+        with open(os.path.join(self.temp_dir, 'ssky_old.log'), 'w', encoding='utf-8') as f:
+            f.write("2026-01-01 00:00:00 - root - INFO - 従来の形式\n")
+        with open(os.path.join(self.temp_dir, 'notes.txt'), 'w', encoding='utf-8') as f:
+            f.write("{}\n")
+
+        files = list_log_files(self.temp_dir)
+        self.assertEqual(len(files), 3)
+        entries, skipped = load_entries(files)
+        self.assertEqual((len(entries), skipped), (28, 1))
+
+        requests = summarize_requests(entries, slow_ms=1000, top=5)
+        timeline = requests['endpoints'][0]
+        self.assertEqual((timeline['endpoint'], timeline['count'], timeline['max_ms']),
+                         ('BlueskyClient.get_timeline', 21, 4000.0))
+        self.assertEqual(timeline['p50_ms'], 110.0)
+        self.assertEqual([entry['request_id'] for entry in requests['slow']], ['slow'])
+        like = [row for row in requests['endpoints'] if row['endpoint'] == 'BlueskyClient.like_post'][0]
+        self.assertEqual(like['errors'], 6)
+
+        bursts = find_error_bursts(entries, window_s=5, min_errors=5)
+        self.assertEqual(len(bursts), 1)
+        self.assertEqual(bursts[0]['count'], 6)
+        self.assertEqual(bursts[0]['endpoints'], {'BlueskyClient.like_post': 6})
+        self.assertEqual(bursts[0]['messages'], ['NetworkError'])
+        self.assertEqual(len(find_error_bursts(entries, window_s=5, min_errors=1)), 2)
+
+        with patch('sys.stdout'):
+            self.assertEqual(main([self.temp_dir, '--json']), 0)
+            self.assertEqual(main([os.path.join(self.temp_dir, 'missing')]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
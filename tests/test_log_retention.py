@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ログファイルの保持期間の管理のテスト
+"""
+
+import unittest
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.log_retention import LogRetention, list_log_files
+from config.settings_manager import SettingsManager, DEFAULT_LOG_RETENTION
+from benchmarks.log_analyzer import load_entries
+
+DAY = 24 * 60 * 60
+
+class TestLogRetention(unittest.TestCase):
+    """ログファイルの保持期間の管理のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.now = time.time()
+        self.active = self._write('ssky_20260301_090000.log', 'current\n', age_days=0)
+        self._write('ssky_20260301_090000.log.1', 'current rotated\n', age_days=0)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content, age_days):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        mtime = self.now - age_days * DAY
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def _names(self):
+        return sorted(os.path.basename(path) for path, _, _ in list_log_files(self.temp_dir))
+
+    def test_compresses_previous_sessions(self):
+        """以前の起動のファイルを圧縮し、書き込み中のファイルは残すことのテスト"""
+        line = json.dumps({'ts': '2026-02-01T10:00:00.000+09:00', 'level': 'INFO', 'message': 'x'}) + "\n"
+        old = self._write('ssky_20260201_100000.log', line * 1000, age_days=2)
+        self._write('ssky_20260201_100000.log.1', 'rotated\n' * 1000, age_days=3)
+        self._write('notes.txt', 'not a log', age_days=100)
+
+        retention = LogRetention(self.active, lambda: {})
+        result = retention.run_once(now=self.now)
+
+        self.assertEqual(result['compressed'], 2)
+        self.assertEqual(result['deleted'], 0)
+        self.assertGreater(result['freed_bytes'], 0)
+        self.assertEqual(self._names(), [
+            'ssky_20260201_100000.log.1.gz', 'ssky_20260201_100000.log.gz',
+            'ssky_20260301_090000.log', 'ssky_20260301_090000.log.1',
+        ])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'notes.txt')))
+        with gzip.open(old + '.gz', 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), line * 1000)
+        # 更新日時は元のファイルのものを引き継ぐ
+        self.assertAlmostEqual(os.path.getmtime(old + '.gz'), self.now - 2 * DAY, delta=1)
+        # 圧縮したファイルも集計できる
+        entries, _ = load_entries([old + '.gz'])
+        self.assertEqual(len(entries), 1000)
+
+        # 2回目は何もしない
+        self.assertEqual(retention.run_once(now=self.now)['compressed'], 0)
+
+    def test_prunes_by_age_count_and_size(self):
+        """保持期間・ファイル数・合計サイズの上限を超えた古いファイルを削除することのテスト"""
+        for day in range(1, 11):
+            self._write(f'ssky_202602{day:02d}_100000.log.gz', 'x' * 1024, age_days=40 - day)
+
+        # 保持期間（35日）を過ぎた4件を削除
+        retention = LogRetention(self.active, lambda: {'max_age_days': 35})
+        self.assertEqual(retention.run_once(now=self.now)['deleted'], 4)
+        self.assertEqual(len(self._names()), 8)
+
+        # ファイル数の上限（書き込み中のファイルを含めて5件）
+        retention.policy_provider = lambda: {'max_files': 5}
+        self.assertEqual(retention.run_once(now=self.now)['deleted'], 3)
+        self.assertEqual(self._names()[0], 'ssky_20260208_100000.log.gz')
+
+        # 合計サイズの上限（古い順に削除し、書き込み中のファイルは削除しない）
+        retention.policy_provider = lambda: {'max_total_mb': 1024 / 1024 / 1024}
+        result = retention.run_once(now=self.now)
+        self.assertEqual(result['deleted'], 3)
+        self.assertEqual(self._names(), ['ssky_20260301_090000.log', 'ssky_20260301_090000.log.1'])
+
+    def test_missing_directory(self):
+        """ログディレクトリがない場合は何もしないことのテスト"""
+        retention = LogRetention(os.path.join(self.temp_dir, 'missing', 'ssky.log'), lambda: DEFAULT_LOG_RETENTION)
+        self.assertEqual(retention.run_once()['deleted'], 0)
+
+    def test_validation(self):
+        """保持の上限の設定の判定のテスト"""
+        self.assertTrue(SettingsManager._is_valid_log_retention(DEFAULT_LOG_RETENTION))
+        self.assertTrue(SettingsManager._is_valid_log_retention({'max_files': None}))
+        for invalid in (None, [], {'max_files': 0}, {'max_age_days': True}, {'max_total_mb': '10'}):
+            self.assertFalse(SettingsManager._is_valid_log_retention(invalid), invalid)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+ロギング設定のテスト
+"""
+
+import unittest
+import os
+import sys
+import glob
+import shutil
+import logging
+import tempfile
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from unittest.mock import patch
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.logging_config import setup_logging, stop_logging
+
+class CountingArg:
+    """文字列に変換された回数を数える引数"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "counted"
+
+class TestLoggingConfig(unittest.TestCase):
+    """ロギング設定のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        root = logging.getLogger()
+        self.saved_handlers = root.handlers[:]
+        self.saved_level = root.level
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        stop_logging()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _setup(self, enable_debug_log, log_dir=None):
+        with patch('config.settings_manager.SettingsManager') as settings_manager:
+            settings_manager.return_value.get.return_value = enable_debug_log
+            return setup_logging(app_name='test', log_dir=log_dir or self.temp_dir)
+
+    def _read_log(self, log_dir=None):
+        paths = glob.glob(os.path.join(log_dir or self.temp_dir, 'test_*.log'))
+        self.assertEqual(len(paths), 1)
+        with open(paths[0], 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_writes_on_background_thread(self):
+        """ルートロガーにはキューに追加するハンドラだけを設定し、書き込みは別のスレッドで行うことのテスト"""
+        root = self._setup(enable_debug_log=True)
+        self.assertEqual(len(root.handlers), 1)
+        self.assertIsInstance(root.handlers[0], QueueHandler)
+
+        written_by = []
+        original_emit = RotatingFileHandler.emit
+
+        def emit(handler, record):
+            written_by.append(threading.current_thread())
+            original_emit(handler, record)
+
+        with patch.object(RotatingFileHandler, 'emit', emit):
+            logging.getLogger('ssky.test').debug("デバッグ: %s", 1)
+            logging.getLogger('ssky.test').error("エラー: %s", 'テスト')
+            stop_logging()
+
+        self.assertNotIn(threading.current_thread(), written_by)
+        self.assertGreaterEqual(len(written_by), 2)
+        # 停止後はキューに追加するハンドラを外す
+        self.assertEqual(logging.getLogger().handlers, [])
+        log = self._read_log()
+        self.assertIn("デバッグ: 1", log)
+        self.assertIn("ssky.test - ERROR - エラー: テスト", log)
+
+    def test_debug_disabled_skips_formatting(self):
+        """デバッグログが無効な場合は、デバッグのメッセージを組み立てないことのテスト"""
+        self._setup(enable_debug_log=False)
+        # 設定後に作成したロガーもルートロガーのレベルを引き継ぐ
+        logger = logging.getLogger('ssky.test.created_later')
+        arg = CountingArg()
+        logger.debug("内容: %s", arg)
+        logger.info("情報: %s", arg)
+        stop_logging()
+
+        self.assertEqual(arg.count, 1)
+        log = self._read_log()
+        self.assertIn("情報: counted", log)
+        self.assertNotIn("内容:", log)
+        # サードパーティライブラリのレベルは上書きしない
+        self.assertEqual(logging.getLogger('httpx').level, logging.WARNING)
+
+    def test_setup_twice_replaces_listener(self):
+        """再設定すると以前の書き込み用のスレッドを停止して置き換えることのテスト"""
+        first_dir = os.path.join(self.temp_dir, 'first')
+        second_dir = os.path.join(self.temp_dir, 'second')
+        self._setup(enable_debug_log=False, log_dir=first_dir)
+        logging.getLogger('ssky.test').info("1回目")
+        root = self._setup(enable_debug_log=False, log_dir=second_dir)
+        self.assertEqual(len(root.handlers), 1)
+        logging.getLogger('ssky.test').info("2回目")
+        stop_logging()
+        stop_logging()
+
+        # 以前の設定のキューに残っていたログは、置き換える前に書き込まれる
+        self.assertIn("1回目", self._read_log(first_dir))
+        self.assertNotIn("2回目", self._read_log(first_dir))
+        self.assertIn("2回目", self._read_log(second_dir))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+メモリ使用量の監視のテスト
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.memory_monitor import (
+    MemoryMonitor, detect_growth, count_instances, monitor_interval_from_env, MEMORY_MONITOR_ENV, DEFAULT_INTERVAL
+)
+from core.data_store import DataStore
+from benchmarks.memory_soak import SoakSession, SyntheticClient, run_soak, parse_mix
+
+class Retained:
+    """テスト用に保持するオブジェクト"""
+
+    def __init__(self, index):
+        self.payload = [index] * 100
+
+class TestMemoryMonitor(unittest.TestCase):
+    """メモリ使用量の監視のテストクラス"""
+
+    def test_detect_growth(self):
+        """増え続ける系列だけを検出することのテスト"""
+        noisy = [1000, 1400, 900, 1300, 1000, 1200, 1100, 1300, 900, 1200]
+        growing, growth = detect_growth(noisy, warmup=2, tolerance=500)
+        self.assertFalse(growing)
+        self.assertLess(abs(growth), 500)
+
+        leaking = [1000 + 200 * i + (50 if i % 2 else -50) for i in range(10)]
+        growing, growth = detect_growth(leaking, warmup=2, tolerance=500)
+        self.assertTrue(growing)
+        self.assertAlmostEqual(growth, 1400, delta=150)
+
+        # ウォームアップ中の増加は判定しない
+        self.assertFalse(detect_growth([0, 5000, 5000, 5000, 5000], warmup=1, tolerance=100)[0])
+        self.assertEqual(detect_growth([1, 2], warmup=0), (False, 0.0))
+
+    def test_sample_reports_growth_sites_and_counters(self):
+        """増加した箇所と計数が記録されることのテスト"""
+        retained = []
+        monitor = MemoryMonitor(top=5)
+        monitor.add_counter('retained', lambda: len(retained))
+        monitor.add_counter('broken', lambda: 1 / 0)
+        monitor.add_counter('instances', lambda: count_instances({'retained': Retained}))
+        was_tracing = tracemalloc.is_tracing()
+        monitor.start(thread=False)
+        try:
+            retained.extend(Retained(i) for i in range(2000))
+            record = monitor.sample()
+        finally:
+            monitor.stop()
+
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+        self.assertFalse(monitor.is_running)
+        self.assertIsNone(monitor.sample())
+        self.assertGreater(record['growth_bytes'], 2000 * 800)
+        self.assertTrue(any(__file__ in stat['site'] for stat in record['top_growth']))
+        # 取得に失敗した計数は記録しない
+        self.assertEqual(record['counters'], {'retained': 2000, 'instances': {'retained': 2000}})
+        self.assertEqual(monitor.samples, [record])
+        report = monitor.report()
+        self.assertIn('retained: 2000', report)
+        self.assertIn(os.path.basename(__file__), report)
+
+    def test_interval_from_env(self):
+        """環境変数から監視の間隔を取得するテスト"""
+        for value, expected in (('', None), ('0', None), ('off', None), ('1', DEFAULT_INTERVAL),
+                                ('yes', DEFAULT_INTERVAL), ('60', 60)):
+            with patch.dict(os.environ, {MEMORY_MONITOR_ENV: value}):
+                self.assertEqual(monitor_interval_from_env(), expected, value)
+
+class TestMemorySoak(unittest.TestCase):
+    """ソークテストの判定のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_store = DataStore(os.path.join(self.temp_dir, 'test_data.db'))
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_steady_session_passes(self):
+        """表示する投稿数が一定のセッションは増え続けていると判定されないことのテスト"""
+        session = SoakSession(SyntheticClient(self.data_store, pool_size=300), seed=1)
+        result = run_soak(session, 60, 10, parse_mix('refresh=2,like=1,thread=1'), warmup=2, tolerance=256 * 1024)
+
+        self.assertEqual(sum(result['operations'].values()), 60)
+        self.assertEqual(len(result['samples']), 6)
+        self.assertEqual(result['samples'][-1]['counters']['timeline_posts'], 300)
+        self.assertEqual(len({sample['counters']['client_referrers'] for sample in result['samples'][2:]}), 1)
+        self.assertFalse(result['growing'], result['report'])
+
+    def test_like_through_outbox(self):
+        """いいねは送信待ちキューを通して送信され、結果の通知でいいね数が更新されることのテスト"""
+        session = SoakSession(SyntheticClient(self.data_store, pool_size=300), seed=1)
+        session.refresh()
+        session.like()
+
+        uri = session.selected['uri']
+        post = next(post for post in session.posts if post['uri'] == uri)
+        self.assertEqual(post['likes'], session.selected['likes'] + 1)
+        self.assertEqual(self.data_store.count_pending_outbox(session.client.user_did), 0)
+
+    def test_leaking_session_fails(self):
+        """更新のたびに参照が残るセッションは増え続けていると判定されることのテスト"""
+        leaked = []
+
+        class LeakingSession(SoakSession):
+            def refresh(self):
+                super().refresh()
+                leaked.append([Retained(i) for i in range(20)])
+
+        session = LeakingSession(SyntheticClient(self.data_store, pool_size=300), seed=1)
+        result = run_soak(session, 60, 10, parse_mix('refresh'), warmup=2, tolerance=256 * 1024)
+
+        self.assertTrue(result['growing'])
+        self.assertTrue(any(__file__ in stat['site'] for stat in result['top_growth']))
+        with self.assertRaises(ValueError):
+            parse_mix('refresh=1,scroll=1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+API呼び出しの計測のテスト
+"""
+
+import unittest
+import os
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.metrics import LatencyHistogram, ClientMetrics, LATENCY_BUCKETS_MS, instrument_methods
+
+class TestLatencyHistogram(unittest.TestCase):
+    """レイテンシのヒストグラムのテストクラス"""
+
+    def test_empty(self):
+        """記録がない場合のテスト"""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 0)
+        self.assertIsNone(snapshot['p99'])
+        self.assertIsNone(snapshot['avg_ms'])
+
+    def test_percentiles(self):
+        """パーセンタイルがバケットの範囲内の近似値になることのテスト"""
+        histogram = LatencyHistogram()
+        # 90回は20ms、9回は400ms、1回は3000ms
+        for _ in range(90):
+            histogram.record(20)
+        for _ in range(9):
+            histogram.record(400)
+        histogram.record(3000, error=True)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertEqual(snapshot['errors'], 1)
+        self.assertEqual(snapshot['max_ms'], 3000)
+        self.assertAlmostEqual(snapshot['avg_ms'], (90 * 20 + 9 * 400 + 3000) / 100)
+        self.assertEqual(sum(snapshot['buckets']), 100)
+        self.assertTrue(10 < snapshot['p50'] <= 25)
+        self.assertTrue(250 < snapshot['p95'] <= 500)
+        self.assertTrue(250 < snapshot['p99'] <= 500)
+        self.assertEqual(histogram.percentile(100), 3000)
+
+    def test_overflow_bucket(self):
+        """最大のバケットを超えた値は実際の最大値を上限にすることのテスト"""
+        histogram = LatencyHistogram()
+        histogram.record(LATENCY_BUCKETS_MS[-1] * 2)
+        self.assertEqual(histogram.buckets[-1], 1)
+        self.assertLessEqual(histogram.percentile(99), LATENCY_BUCKETS_MS[-1] * 2)
+
+class TestInstrumentMethods(unittest.TestCase):
+    """メソッドの計測のテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.metrics = ClientMetrics()
+        self.metrics.reset()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.metrics.reset()
+
+    def test_counts_calls_and_errors(self):
+        """公開メソッドの呼び出しと例外が記録されることのテスト"""
+        @instrument_methods(prefix='Dummy', exclude=('skipped',))
+        class Dummy:
+            def fetch(self, value):
+                return value * 2
+
+            def fail(self):
+                raise ValueError("失敗")
+
+            def skipped(self):
+                return True
+
+            def _private(self):
+                return True
+
+        dummy = Dummy()
+        self.assertEqual(dummy.fetch(2), 4)
+        self.assertEqual(dummy.fetch(3), 6)
+        with self.assertRaises(ValueError):
+            dummy.fail()
+        dummy.skipped()
+        dummy._private()
+
+        self.assertEqual(Dummy.fetch.__name__, 'fetch')
+        fetch = self.metrics.get('Dummy.fetch')
+        self.assertEqual(fetch['count'], 2)
+        self.assertEqual(fetch['errors'], 0)
+        fail = self.metrics.get('Dummy.fail')
+        self.assertEqual(fail['count'], 1)
+        self.assertEqual(fail['errors'], 1)
+        self.assertIsNone(self.metrics.get('Dummy.skipped'))
+        self.assertIsNone(self.metrics.get('Dummy._private'))
+
+        # 呼び出し回数の多い順に並ぶ
+        endpoints = [row['endpoint'] for row in self.metrics.snapshot()]
+        self.assertEqual(endpoints[:2], ['Dummy.fetch', 'Dummy.fail'])
+
+        # リセットした後も同じメソッドの呼び出しが記録される
+        self.metrics.reset()
+        self.assertIsNone(self.metrics.get('Dummy.fetch'))
+        dummy.fetch(1)
+        self.assertEqual(self.metrics.get('Dummy.fetch')['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
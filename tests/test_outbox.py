@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+送信待ちキューのテスト
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_store import DataStore
+from core.outbox import Outbox, generate_tid
+
+class TestOutbox(unittest.TestCase):
+    """Outboxのテストクラス"""
+    
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_store = DataStore(os.path.join(self.temp_dir, 'test_data.db'))
+        
+        self.client = MagicMock()
+        self.client.is_logged_in = True
+        self.client.user_did = 'did:plc:test_user'
+        self.client.get_own_record.return_value = None
+        
+        self.listener = MagicMock()
+        self.outbox = Outbox(self.client, self.data_store, self.listener)
+    
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.outbox.stop()
+        self.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_generate_tid(self):
+        """TIDが13文字で単調増加することのテスト"""
+        tids = [generate_tid() for _ in range(100)]
+        
+        self.assertTrue(all(len(tid) == 13 for tid in tids))
+        self.assertEqual(tids, sorted(tids))
+        self.assertEqual(len(set(tids)), 100)
+    
+    def test_drain_in_order(self):
+        """キューに追加した順に送信されることのテスト"""
+        self.outbox.enqueue_post("first")
+        self.outbox.enqueue_like('at://post', 'cid')
+        
+        self.outbox.drain_once()
+        self.outbox.drain_once()
+        
+        self.client.create_post.assert_called_once()
+        self.assertEqual(self.client.create_post.call_args[0][0], "first")
+        self.client.create_like.assert_called_once()
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(self.listener.call_count, 2)
+    
+    def test_duplicate_like(self):
+        """同じ投稿へのいいねが重複して追加されないことのテスト"""
+        first = self.outbox.enqueue_like('at://post', 'cid')
+        second = self.outbox.enqueue_like('at://post', 'cid')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.outbox.pending_count(), 1)
+    
+    def test_retry_is_idempotent(self):
+        """再送時に作成済みのレコードがあれば再作成しないことのテスト"""
+        self.client.create_post.side_effect = ConnectionError("offline")
+        self.outbox.enqueue_post("hello")
+        
+        # 1回目は接続エラーで再試行待ちになる
+        wait = self.outbox.drain_once()
+        self.assertGreater(wait, 0)
+        self.assertEqual(self.outbox.pending_count(), 1)
+        self.assertTrue(self.listener.call_args[1]['retrying'])
+        
+        # 前回の送信が実は成功していた場合
+        existing = MagicMock(uri='at://did:plc:test_user/app.bsky.feed.post/x')
+        self.client.get_own_record.return_value = existing
+        item = self.data_store.get_next_outbox_item(self.client.user_did)
+        self.data_store.update_outbox_item(item['id'], 'pending', next_attempt_at='2000-01-01T00:00:00')
+        
+        self.outbox.drain_once()
+        
+        self.assertEqual(self.client.create_post.call_count, 1)
+        self.client.get_own_record.assert_called_once_with('app.bsky.feed.post', item['rkey'])
+        self.assertIs(self.listener.call_args[1]['result'], existing)
+        self.assertEqual(self.outbox.pending_count(), 0)
+    
+    def test_permanent_failure(self):
+        """再試行できないエラーでは失敗として扱われることのテスト"""
+        self.client.create_post.side_effect = ValueError("invalid")
+        self.outbox.enqueue_post("hello", reply_to={'uri': 'at://parent', 'cid': 'cid', 'facets': object()})
+        
+        self.outbox.drain_once()
+        
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertIsInstance(self.listener.call_args[1]['error'], ValueError)
+        self.assertFalse(self.listener.call_args[1]['retrying'])
+        
+        # 返信先は送信に必要な項目だけが保存される
+        self.assertEqual(self.client.create_post.call_args[1]['reply_to'], {'uri': 'at://parent', 'cid': 'cid'})
+    
+    @patch('core.image_preparer.ImagePreparer')
+    def test_stale_blob_reupload(self, preparer):
+        """再利用したブロブが見つからない場合だけアップロードし直すことのテスト"""
+        preparer.return_value.prepare_files.return_value = [(b'image', 'image/jpeg', 'digest')]
+        self.client.upload_images.return_value = (['blob'], True)
+        
+        # 接続エラーはアップロードし直さず、通常どおり再試行待ちになる
+        self.client.create_post.side_effect = ConnectionError("offline")
+        self.outbox.enqueue_post("hello", images=['image.jpg'])
+        self.outbox.drain_once()
+        self.client.forget_blobs.assert_not_called()
+        self.assertTrue(self.listener.call_args[1]['retrying'])
+        
+        # ブロブが見つからない場合はキャッシュを破棄してアップロードし直す
+        stale = Exception("BadRequest")
+        stale.response = MagicMock(content=MagicMock(error='InvalidRequest', message='Could not find blob: bafy'))
+        self.client.create_post.side_effect = [stale, MagicMock(uri='at://created')]
+        item = self.data_store.get_next_outbox_item(self.client.user_did)
+        self.data_store.update_outbox_item(item['id'], 'pending', next_attempt_at='2000-01-01T00:00:00')
+        self.outbox.drain_once()
+        
+        self.client.forget_blobs.assert_called_once_with(['digest'])
+        self.assertEqual(self.client.upload_images.call_args[1], {'use_cache': False})
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.client.mark_blobs_referenced.assert_called_once_with(['digest'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+セッション情報の保存サービスのテスト
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import shutil
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auth.auth_manager import AuthManager
+from core.auth.session_persistence import SessionPersistence, CryptoBackend, DpapiBackend
+from core.data_store import DataStore
+
+class ReversingCryptoBackend(CryptoBackend):
+    """テスト用の暗号化方式（バイト列を反転するだけ）"""
+
+    def encrypt(self, data):
+        return data.encode('utf-8')[::-1]
+
+    def decrypt(self, encrypted_data):
+        return encrypted_data[::-1].decode('utf-8')
+
+class TestSessionPersistence(unittest.TestCase):
+    """SessionPersistenceのテストクラス"""
+    
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        AuthManager._instance = None
+        with patch('core.auth.auth_manager.DataStore',
+                   return_value=DataStore(os.path.join(self.temp_dir, 'test_data.db'))):
+            self.auth_manager = AuthManager()
+        self.auth_manager.set_crypto_backend(ReversingCryptoBackend())
+        
+        SessionPersistence._instance = None
+        self.persistence = SessionPersistence(self.auth_manager, debounce=0.05)
+        self.saved = []
+        self.persistence.add_listener(self.saved.append)
+    
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.persistence.flush()
+        SessionPersistence._instance = None
+        AuthManager._instance = None
+        self.auth_manager.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_debounce_and_dedupe(self):
+        """連続した要求は最後の1つだけ保存され、同じセッションは保存し直さないことのテスト"""
+        with patch.object(self.auth_manager.data_store, 'save_session',
+                          wraps=self.auth_manager.data_store.save_session) as mock_save:
+            for i in range(5):
+                self.assertTrue(self.persistence.submit('did:plc:alice', f'session-{i}'))
+            self.assertFalse(self.persistence.submit('did:plc:alice', 'session-4'))
+            self.assertTrue(self.persistence.flush())
+            self.assertEqual(mock_save.call_count, 1)
+            
+            # 保存済みと同じセッションは無視する
+            self.assertFalse(self.persistence.submit('did:plc:alice', 'session-4'))
+            self.assertTrue(self.persistence.flush())
+            self.assertEqual(mock_save.call_count, 1)
+        
+        # 差し替えた暗号化方式で保存・復号化される
+        self.assertEqual(self.auth_manager.load_session(), ('session-4', 'did:plc:alice'))
+        self.assertEqual(self.auth_manager.data_store.load_session('did:plc:alice'), b'4-noisses')
+        self.assertEqual(self.saved, ['did:plc:alice'])
+    
+    def test_discard(self):
+        """破棄した保存待ちのセッションが書き込まれないことのテスト"""
+        self.persistence.submit('did:plc:alice', 'session-1')
+        self.persistence.discard('did:plc:alice')
+        self.assertTrue(self.persistence.flush())
+        self.assertEqual(self.auth_manager.load_session(), (None, None))
+        self.assertEqual(self.saved, [])
+        
+        # 破棄した後は同じセッションでも保存できる
+        self.assertTrue(self.persistence.submit('did:plc:alice', 'session-1'))
+        self.assertTrue(self.persistence.flush())
+        self.assertEqual(self.saved, ['did:plc:alice'])
+
+    def test_crypto_backend(self):
+        """暗号化方式は抽象クラスで、既定はDPAPIであることのテスト"""
+        with self.assertRaises(TypeError):
+            CryptoBackend()
+
+        AuthManager._instance = None
+        with patch('core.auth.auth_manager.DataStore'):
+            self.assertIsInstance(AuthManager().crypto_backend, DpapiBackend)
+        with patch('core.auth.session_persistence.encrypt_data', return_value=b'encrypted') as mock_encrypt:
+            self.assertEqual(DpapiBackend().encrypt('session'), b'encrypted')
+            mock_encrypt.assert_called_once_with('session')
+
+if __name__ == '__main__':
+    unittest.main()
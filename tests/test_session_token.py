@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+セッショントークンの検証のテスト
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import base64
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auth.session_token import (
+    SESSION_VALID, SESSION_NEEDS_REFRESH, SESSION_EXPIRED,
+    parse_session_string, encode_session, check_session, token_expires_at
+)
+
+def make_jwt(exp):
+    """テスト用のJWTを作成（署名は検証しないためダミー）"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+    return f"{encode({'alg': 'ES256K'})}.{encode({'sub': 'did:plc:alice', 'exp': exp})}.signature"
+
+class TestSessionToken(unittest.TestCase):
+    """セッショントークンの検証のテストクラス"""
+
+    def make_session_string(self, access_exp, refresh_exp, pds=True):
+        """テスト用のセッション文字列を作成"""
+        fields = ['alice.test', 'did:plc:alice', make_jwt(access_exp), make_jwt(refresh_exp)]
+        if pds:
+            fields.append('https://pds.example')
+        return ':::'.join(fields)
+
+    def test_parse_and_encode(self):
+        """セッション文字列の解析と復元のテスト"""
+        now = time.time()
+        session_string = self.make_session_string(now + 3600, now + 86400)
+        session = parse_session_string(session_string)
+        self.assertEqual(session['did'], 'did:plc:alice')
+        self.assertEqual(session['pds_endpoint'], 'https://pds.example')
+        self.assertEqual(encode_session(session), session_string)
+
+        # バイト列・古い形式（PDSなし）も解析できる
+        old_string = self.make_session_string(now + 3600, now + 86400, pds=False)
+        session = parse_session_string(old_string.encode('utf-8'))
+        self.assertIsNone(session['pds_endpoint'])
+        self.assertEqual(encode_session(session), old_string)
+
+        self.assertIsNone(parse_session_string('test_session_string'))
+        self.assertIsNone(parse_session_string(None))
+        self.assertIsNone(token_expires_at('not-a-jwt'))
+
+    def test_check_session(self):
+        """有効期限による状態の判定のテスト"""
+        now = 1_700_000_000
+        check = lambda access, refresh: check_session(parse_session_string(self.make_session_string(access, refresh)), now)
+
+        self.assertEqual(check(now + 3600, now + 86400), SESSION_VALID)
+        # 期限まで15分を切ったアクセストークンは更新が必要
+        self.assertEqual(check(now + 600, now + 86400), SESSION_NEEDS_REFRESH)
+        self.assertEqual(check(now - 10, now + 86400), SESSION_NEEDS_REFRESH)
+        self.assertEqual(check(now - 10, now - 10), SESSION_EXPIRED)
+
+        # 有効期限が読み取れない場合は判定しない
+        session = parse_session_string(self.make_session_string(now + 3600, now + 86400))
+        session['access_jwt'] = 'opaque-token'
+        self.assertIsNone(check_session(session, now))
+
+if __name__ == '__main__':
+    unittest.main()
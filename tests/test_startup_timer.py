@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+起動時間の計測のテスト
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import shutil
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.startup_timer import StartupTimer
+from core.data_store import DataStore
+
+class TestStartupTimer(unittest.TestCase):
+    """起動時間の計測のテストクラス"""
+    
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_store = DataStore(os.path.join(self.temp_dir, 'test_data.db'))
+        self.timer = StartupTimer()
+        self.timer.reset()
+    
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.timer.reset()
+        self.data_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_phases_and_summary(self):
+        """段階が記録され、要約と履歴に保存されることのテスト"""
+        with self.timer.phase('settings'):
+            pass
+        with self.timer.phase('data_store_init'):
+            pass
+        with self.timer.phase('data_store_init'):
+            pass
+        self.timer.mark('frame_shown')
+        
+        names = [phase['name'] for phase in self.timer.phases]
+        self.assertEqual(names, ['settings', 'data_store_init', 'data_store_init#2', 'frame_shown'])
+        self.assertIn('settings=', self.timer.summary())
+        self.assertIn('frame_shown@', self.timer.summary())
+        
+        with self.assertLogs('core.startup_timer', level='INFO') as logs:
+            total = self.timer.finish(self.data_store, '1.0.0', 'session')
+        self.assertEqual(len(logs.output), 1)
+        self.assertGreater(total, 0)
+        
+        # 終了後は記録せず、2回目のfinishは何もしない
+        with self.timer.phase('timeline_fetch'):
+            pass
+        self.assertIsNone(self.timer.finish(self.data_store, '1.0.0', 'session'))
+        
+        history = self.data_store.get_startup_history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0]['app_version'], '1.0.0')
+        self.assertEqual(history[0]['outcome'], 'session')
+        self.assertEqual([phase['name'] for phase in history[0]['phases']], names)
+    
+    def test_history_is_rolling(self):
+        """履歴が上限の件数まで新しい順に残ることのテスト"""
+        with patch('core.data_store.STARTUP_HISTORY_LIMIT', 3):
+            for i in range(5):
+                self.data_store.save_startup_history('1.0.0', float(i), [], 'session')
+        
+        self.assertEqual([entry['total_ms'] for entry in self.data_store.get_startup_history()], [4.0, 3.0, 2.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+スレッドキャッシュのテスト
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+from types import SimpleNamespace
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.post_model import normalize_post
+from core.thread_cache import ThreadCache, THREAD_VIEW_POST, NOT_FOUND_POST
+
+def make_post(uri, text, indexed_at, reply_count=0, handle='alice.bsky.social'):
+    """テスト用のPostViewを作成"""
+    return SimpleNamespace(
+        uri=uri,
+        cid=f"cid-{uri}",
+        author=SimpleNamespace(handle=handle, display_name=None),
+        record=SimpleNamespace(text=text, facets=None, reply=None),
+        indexed_at=indexed_at,
+        like_count=0,
+        reply_count=reply_count,
+        repost_count=0,
+        embed=None
+    )
+
+def make_view(post, replies=None):
+    """テスト用のThreadViewPostを作成"""
+    return SimpleNamespace(py_type=THREAD_VIEW_POST, post=post, replies=replies)
+
+class TestThreadCache(unittest.TestCase):
+    """ThreadCacheのテストクラス"""
+    
+    def setUp(self):
+        """テスト前の準備"""
+        self.cache = ThreadCache()
+        self.cache.clear()
+        
+        self.client = MagicMock()
+        self.client.profile = SimpleNamespace(handle='alice.bsky.social')
+        
+        self.root = make_post('at://root', 'root', '2024-01-01T00:00:00Z', reply_count=2)
+        self.reply1 = make_post('at://r1', 'reply1', '2024-01-01T00:01:00Z', reply_count=1)
+        self.deep = make_post('at://deep', 'deep', '2024-01-01T00:03:00Z')
+    
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.cache.clear()
+    
+    def test_load_builds_tree(self):
+        """取得したスレッドがツリーになることのテスト"""
+        # reply1の子は取得した深さの末端（repliesがNone）
+        self.client.get_post_thread.return_value = make_view(self.root, [
+            make_view(self.reply1, None),
+            SimpleNamespace(py_type=NOT_FOUND_POST, uri='at://deleted', not_found=True),
+        ])
+        
+        thread, added = self.cache.load(self.client, 'at://root')
+        
+        self.assertEqual(added, ['at://root', 'at://r1', 'at://deleted'])
+        self.assertEqual(thread.get_node('at://r1')['parent'], 'at://root')
+        self.assertEqual(thread.get_node('at://deleted')['post']['content'], '[投稿が見つかりません]')
+        self.assertTrue(thread.get_node('at://root')['post']['is_own_post'])
+        self.assertTrue(thread.needs_expand('at://r1'))
+        self.assertFalse(thread.needs_expand('at://root'))
+        
+        # 取得した投稿は検索用にキャッシュへ保存される
+        saved = self.client.data_store.queue_posts.call_args[0][0]
+        self.assertEqual(len(saved), 3)
+    
+    def test_reload_adds_only_new_replies(self):
+        """再取得時は新しい返信だけが追加されることのテスト"""
+        self.client.get_post_thread.return_value = make_view(self.root, [make_view(self.reply1, [])])
+        self.cache.load(self.client, 'at://root')
+        
+        # 間を置かずに開き直した場合は再取得しない
+        thread, added = self.cache.load(self.client, 'at://root')
+        self.assertEqual(added, [])
+        self.assertEqual(self.client.get_post_thread.call_count, 1)
+        
+        reply2 = make_post('at://r2', 'reply2', '2024-01-01T00:02:00Z')
+        self.client.get_post_thread.return_value = make_view(self.root, [
+            make_view(reply2, []), make_view(self.reply1, [])
+        ])
+        thread, added = self.cache.load(self.client, 'at://root', force=True)
+        
+        self.assertEqual(added, ['at://r2'])
+        self.assertEqual(thread.get_node('at://root')['children'], ['at://r1', 'at://r2'])
+    
+    def test_expand_branch(self):
+        """深い枝の展開と、展開済みの枝の再取得のテスト"""
+        self.client.get_post_thread.return_value = make_view(self.root, [make_view(self.reply1, None)])
+        thread, _ = self.cache.load(self.client, 'at://root')
+        
+        self.client.get_post_thread.return_value = make_view(self.reply1, [make_view(self.deep, [])])
+        added = self.cache.expand(self.client, thread, 'at://r1')
+        
+        self.assertEqual(added, ['at://deep'])
+        self.assertEqual(thread.get_node('at://deep')['parent'], 'at://r1')
+        self.assertFalse(thread.needs_expand('at://r1'))
+        self.client.get_post_thread.assert_called_with('at://r1', depth=3)
+        
+        # 再取得時は展開済みの枝も取得し直す（末端の子は保持される）
+        self.client.get_post_thread.side_effect = [
+            make_view(self.root, [make_view(self.reply1, None)]),
+            make_view(self.reply1, [make_view(self.deep, [])]),
+        ]
+        thread, added = self.cache.load(self.client, 'at://root', force=True)
+        
+        self.assertEqual(added, [])
+        self.assertEqual(thread.get_node('at://r1')['children'], ['at://deep'])
+    
+    def test_lru_eviction(self):
+        """上限を超えたスレッドが古い順に破棄されることのテスト"""
+        self.client.get_post_thread.side_effect = lambda uri, depth: make_view(
+            make_post(uri, uri, '2024-01-01T00:00:00Z'), []
+        )
+        with patch.object(self.cache, 'max_threads', 2):
+            self.cache.load(self.client, 'at://a')
+            self.cache.load(self.client, 'at://b')
+            self.cache.get('at://a')
+            self.cache.load(self.client, 'at://c')
+        
+        self.assertIsNotNone(self.cache.get('at://a'))
+        self.assertIsNone(self.cache.get('at://b'))
+        self.assertIsNotNone(self.cache.get('at://c'))
+    
+    def test_normalize_reply_post(self):
+        """返信のPostViewの変換とルートURIの判定のテスト"""
+        post = make_post('at://r1', 'reply1', '2024-01-01T00:01:00Z', handle='bob.bsky.social')
+        post.record.reply = SimpleNamespace(
+            parent=SimpleNamespace(uri='at://root', cid='cid-root'),
+            root=SimpleNamespace(uri='at://root', cid='cid-root')
+        )
+        
+        post_data = normalize_post(post, 'alice.bsky.social')
+        
+        self.assertFalse(post_data['is_own_post'])
+        self.assertEqual(post_data['reply_root'], {'uri': 'at://root', 'cid': 'cid-root'})
+        self.assertEqual(ThreadCache.root_uri_of(post_data), 'at://root')
+    
+    def test_normalize_shares_authors_and_refs(self):
+        """同じ投稿者・返信先は投稿間で1つのインスタンスを共有することのテスト"""
+        posts = []
+        for i, display_name in enumerate(('Bob', 'Bob', 'Bobby')):
+            post = make_post(f'at://r{i}', 'reply', '2024-01-01T00:01:00Z', handle='bob.bsky.social')
+            post.author = SimpleNamespace(did='did:plc:bob', handle='bob.bsky.social', display_name=display_name)
+            post.record.reply = SimpleNamespace(
+                parent=SimpleNamespace(uri='at://root', cid='cid-root'),
+                root=SimpleNamespace(uri='at://root', cid='cid-root')
+            )
+            posts.append(normalize_post(post))
+        
+        self.assertIs(posts[0]['author'], posts[1]['author'])
+        self.assertNotIn('handle', posts[0])
+        self.assertIs(posts[0]['reply_parent'], posts[1]['reply_root'])
+        
+        # 表示名の変更は共有の投稿者に反映される
+        self.assertIs(posts[2]['author'], posts[0]['author'])
+        self.assertEqual(posts[0]['author'].username, 'Bobby')
+
+if __name__ == '__main__':
+    unittest.main()
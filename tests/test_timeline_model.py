@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+タイムラインの投稿リストの操作のテスト
+"""
+
+import unittest
+import os
+import sys
+from datetime import datetime, timezone, timedelta
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.post_model import normalize_post
+from core.timeline_model import merge_timeline_posts, trim_timeline_posts, refresh_relative_times
+from benchmarks.synthetic_feed import generate_feed, to_model
+
+def make_post(uri, timestamp, likes=0, **kwargs):
+    """テスト用の投稿データを作成"""
+    post = {'uri': uri, 'raw_timestamp': timestamp, 'time': '', 'likes': likes, 'reposts': 0, 'replies': 0}
+    post.update(kwargs)
+    return post
+
+class TestTimelineModel(unittest.TestCase):
+    """タイムラインの投稿リストの操作のテストクラス"""
+
+    def test_merge_adds_updates_and_sorts(self):
+        """新しい投稿の追加、変更のあった投稿の置き換え、古い順の並べ替えのテスト"""
+        displayed = [
+            make_post('at://a', '2026-01-01T00:00:00Z'),
+            make_post('at://b', '2026-01-02T00:00:00Z', likes=1),
+            make_post('at://c', '2026-01-03T00:00:00Z', from_cache=True),
+        ]
+        fetched = {
+            'at://d': make_post('at://d', '2026-01-01T12:00:00Z'),
+            'at://b': make_post('at://b', '2026-01-02T00:00:00Z', likes=2),
+            'at://a': make_post('at://a', '2026-01-01T00:00:00Z'),
+            'at://c': make_post('at://c', '2026-01-03T00:00:00Z'),
+        }
+
+        merged, added, updated = merge_timeline_posts(displayed, fetched)
+
+        self.assertEqual([post['uri'] for post in merged], ['at://a', 'at://d', 'at://b', 'at://c'])
+        self.assertEqual(added, 1)
+        # いいね数が変わった投稿と、キャッシュから表示した投稿だけを置き換える
+        self.assertEqual(updated, 2)
+        self.assertIs(merged[0], displayed[0])
+        self.assertEqual(merged[2]['likes'], 2)
+        self.assertNotIn('from_cache', merged[3])
+        # 元のリストは変更しない
+        self.assertEqual(len(displayed), 3)
+
+    def test_trim_keeps_newest(self):
+        """件数の制限で新しい投稿が残ることのテスト"""
+        posts = [make_post(f'at://{i}', f'2026-01-01T00:00:{i:02d}Z') for i in range(10)]
+        self.assertIs(trim_timeline_posts(posts, 20), posts)
+        self.assertEqual([post['uri'] for post in trim_timeline_posts(posts, 3)], ['at://7', 'at://8', 'at://9'])
+
+        merged, _, _ = merge_timeline_posts(posts[:5], {post['uri']: post for post in posts[5:]}, max_posts=4)
+        self.assertEqual([post['uri'] for post in merged], ['at://6', 'at://7', 'at://8', 'at://9'])
+
+    def test_refresh_relative_times(self):
+        """表示が変わった投稿だけが返されることのテスト"""
+        now = datetime.now(timezone.utc)
+        posts = [
+            make_post('at://a', (now - timedelta(hours=3)).isoformat(), time='3時間前'),
+            make_post('at://b', (now - timedelta(days=2)).isoformat(), time='1日前'),
+        ]
+
+        self.assertEqual(refresh_relative_times(posts), [1])
+        self.assertEqual(posts[1]['time'], '2日前')
+        self.assertEqual(refresh_relative_times(posts), [])
+
+    def test_synthetic_feed(self):
+        """合成のタイムラインが正規化でき、引用・返信・facetsを含むことのテスト"""
+        now = datetime.now(timezone.utc)
+        feed = generate_feed(300, seed=1, now=now)
+        # 同じシードと時刻なら同じ内容になる
+        self.assertEqual(feed, generate_feed(300, seed=1, now=now))
+        self.assertGreaterEqual(feed[0]['post']['indexedAt'], feed[-1]['post']['indexedAt'])
+
+        posts = [normalize_post(to_model(item).post, 'user1.bsky.social') for item in feed]
+
+        self.assertEqual(len({post['uri'] for post in posts}), 300)
+        self.assertTrue(any(post['is_quote_post'] and post['quote_of']['author'].did for post in posts))
+        self.assertTrue(any(post['reply_parent'] for post in posts))
+        self.assertTrue(any(post['facets'] for post in posts))
+        self.assertTrue(any('reason' in item for item in feed))
+
+        merged, added, _ = merge_timeline_posts([], {post['uri']: post for post in posts}, max_posts=None)
+        self.assertEqual(added, 300)
+        self.assertEqual(merged[-1]['uri'], posts[0]['uri'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+アクセストークンの事前更新のテスト
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import threading
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.auth import token_refresher
+from core.auth.token_refresher import TokenRefresher, REFRESH_AHEAD, MAX_WAIT, MIN_WAIT
+
+class TestTokenRefresher(unittest.TestCase):
+    """TokenRefresherのテストクラス"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.client = MagicMock()
+        self.refresher = TokenRefresher(self.client)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.refresher.stop()
+
+    def test_next_wait(self):
+        """有効期限から次に確認するまでの時間を計算するテスト"""
+        now = time.time()
+        self.client.access_token_expires_at.return_value = now + REFRESH_AHEAD + 120
+        self.assertAlmostEqual(self.refresher.next_wait(), 120, delta=2)
+
+        # 期限が遠い場合も最長の待ち時間ごとに確認する
+        self.client.access_token_expires_at.return_value = now + 24 * 3600
+        self.assertEqual(self.refresher.next_wait(), MAX_WAIT)
+
+        # 更新の時期を過ぎている場合はすぐに更新する
+        self.client.access_token_expires_at.return_value = now
+        self.assertEqual(self.refresher.next_wait(), MIN_WAIT)
+
+        # ログインしていない場合
+        self.client.access_token_expires_at.return_value = None
+        self.assertEqual(self.refresher.next_wait(), MAX_WAIT)
+
+    def test_background_refresh(self):
+        """監視用スレッドが期限前に更新し、失敗した場合はエラーを処理して再試行するテスト"""
+        self.client.access_token_expires_at.return_value = time.time()
+        calls = []
+
+        def refresh_session(ahead):
+            calls.append(ahead)
+            if len(calls) == 1:
+                raise Exception("refresh failed")
+            return len(calls) == 2
+        self.client.refresh_session.side_effect = refresh_session
+        self.client.handle_api_error.return_value = False
+        listener = MagicMock()
+        self.refresher.on_auth_failure = listener
+
+        with patch.object(token_refresher, 'MIN_WAIT', 0.01), patch.object(token_refresher, 'RETRY_DELAY', 0.01):
+            self.refresher.start()
+            deadline = time.time() + 5
+            while self.client.refresh_session.call_count < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            self.refresher.stop()
+
+        self.client.refresh_session.assert_called_with(REFRESH_AHEAD)
+        self.client.handle_api_error.assert_called_once()
+        self.assertGreaterEqual(self.client.refresh_session.call_count, 3)
+        listener.assert_not_called()
+
+    def test_auth_failure_notified(self):
+        """再ログインが必要な場合は通知して、監視を終えるテスト"""
+        self.client.access_token_expires_at.return_value = time.time()
+        self.client.user_did = 'did:plc:alice'
+        error = Exception("ExpiredToken")
+        self.client.refresh_session.side_effect = error
+        self.client.handle_api_error.return_value = True
+        notified = threading.Event()
+        listener = MagicMock(side_effect=lambda *args: notified.set())
+        self.refresher.on_auth_failure = listener
+
+        with patch.object(token_refresher, 'MIN_WAIT', 0.01), patch.object(token_refresher, 'RETRY_DELAY', 0.01):
+            self.refresher.start()
+            self.assertTrue(notified.wait(5))
+            self.refresher._thread.join(5)
+            self.assertFalse(self.refresher._thread.is_alive())
+
+        listener.assert_called_once_with(error, 'did:plc:alice')
+        self.client.refresh_session.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
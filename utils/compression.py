@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+圧縮ユーティリティ（学習した辞書を使うzlib圧縮）
+"""
+
+import re
+import zlib
+import logging
+from collections import Counter
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# 辞書の最大サイズ（zlibが参照できるウィンドウの大きさ）
+DICTIONARY_SIZE = 32 * 1024
+
+# 圧縮レベル
+COMPRESSION_LEVEL = 6
+
+# 辞書に入れる断片の長さの範囲
+MIN_FRAGMENT_LENGTH = 4
+MAX_FRAGMENT_LENGTH = 256
+
+# JSONの文字列（キーや値）と、それに続く区切り文字を1つの断片として扱う
+_FRAGMENT_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"[:,\]}]*')
+
+def compress(data, zdict=None):
+    """データを圧縮する
+
+    Args:
+        data (bytes): 圧縮するデータ
+        zdict (bytes, optional): 辞書（train_dictionaryで作成したもの）
+
+    Returns:
+        bytes: 圧縮したデータ
+    """
+    if zdict:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    return compressor.compress(data) + compressor.flush()
+
+def decompress(data, zdict=None):
+    """圧縮したデータを展開する
+
+    Args:
+        data (bytes): 圧縮したデータ
+        zdict (bytes, optional): 圧縮に使用した辞書
+
+    Returns:
+        bytes: 展開したデータ
+    """
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+def train_dictionary(samples, size=DICTIONARY_SIZE):
+    """サンプルから圧縮用の辞書を作成する
+
+    複数のサンプルに共通して現れるJSONのキーや値（$type、DID、URLの前半など）を集め、
+    削減できるバイト数が多いものほど辞書の末尾（zlibが最も近くから参照できる位置）に置く。
+
+    Args:
+        samples (list): サンプルのデータ（bytes）のリスト
+        size (int, optional): 辞書の最大サイズ
+
+    Returns:
+        bytes: 辞書。共通する断片がない場合は空のバイト列
+    """
+    # 断片ごとに、いくつのサンプルに現れたかを数える
+    counts = Counter()
+    for sample in samples:
+        fragments = {
+            fragment for fragment in _FRAGMENT_PATTERN.findall(sample)
+            if MIN_FRAGMENT_LENGTH <= len(fragment) <= MAX_FRAGMENT_LENGTH
+        }
+        counts.update(fragments)
+
+    # 2つ以上のサンプルに現れた断片を、削減できるバイト数の多い順に選ぶ
+    candidates = sorted(
+        (fragment for fragment, count in counts.items() if count >= 2),
+        key=lambda fragment: (counts[fragment] * len(fragment), fragment),
+        reverse=True
+    )
+    selected = []
+    total = 0
+    for fragment in candidates:
+        if total + len(fragment) > size:
+            continue
+        selected.append(fragment)
+        total += len(fragment)
+
+    logger.debug(f"圧縮用の辞書を作成しました: {len(selected)}個の断片, {total}バイト")
+    return b''.join(reversed(selected))
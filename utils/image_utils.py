@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+画像の縮小・再圧縮ユーティリティ
+"""
+
+import io
+import logging
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+# Blueskyの画像ブロブの上限サイズ（バイト）
+MAX_IMAGE_BYTES = 1000000
+
+# アップロード前に縮小する長辺の最大ピクセル数
+MAX_IMAGE_DIMENSION = 2000
+
+# JPEG再圧縮時に試す品質の段階
+JPEG_QUALITY_STEPS = (90, 85, 80, 75, 70, 60, 50, 40)
+
+# 品質を下げても収まらない場合に長辺を縮める比率
+DOWNSCALE_STEP = 0.8
+
+
+def prepare_image(data, mime_type, max_dimension=MAX_IMAGE_DIMENSION, max_bytes=MAX_IMAGE_BYTES):
+    """アップロード用に画像を縮小・再圧縮する
+
+    EXIFの向きを反映した上でメタデータを取り除き、長辺がmax_dimensionを
+    超える場合は縮小する。透過を含む画像と、縮小の必要がないPNGは、PNGのまま
+    max_bytesに収まればPNGで返す（文字のスクリーンショットなどを劣化させない）。
+    サイズがmax_bytesを超える場合はJPEGの品質を段階的に下げ、それでも
+    収まらなければさらに縮小する。
+    ワーカープロセスから呼び出されるため、モジュールのトップレベルに定義する。
+
+    Args:
+        data (bytes): 元の画像データ
+        mime_type (str): 元の画像のMIMEタイプ
+        max_dimension (int, optional): 長辺の最大ピクセル数
+        max_bytes (int, optional): 出力データの最大バイト数
+
+    Returns:
+        tuple: (画像データ, MIMEタイプ)。Pillowが利用できない場合や
+            アニメーションGIFの場合は元のデータをそのまま返す
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.warning("Pillowがインストールされていないため、画像を縮小せずにアップロードします")
+        return data, mime_type
+
+    with Image.open(io.BytesIO(data)) as image:
+        # アニメーションGIFは再エンコードすると動きが失われるため、そのまま送る
+        if getattr(image, 'is_animated', False):
+            return data, mime_type
+
+        is_png = image.format == 'PNG'
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+        dimension = min(max(image.size), max_dimension)
+        while True:
+            resized = _resize_to(image, dimension)
+
+            # 透過を含む画像と、縮小の必要がないPNGは、PNGのまま収まるならPNGを優先する
+            if has_alpha or (is_png and resized is image):
+                encoded = _encode(resized, 'PNG')
+                if len(encoded) <= max_bytes:
+                    return encoded, 'image/png'
+
+            rgb = resized.convert('RGB') if resized.mode != 'RGB' else resized
+            for quality in JPEG_QUALITY_STEPS:
+                encoded = _encode(rgb, 'JPEG', quality=quality, optimize=True)
+                if len(encoded) <= max_bytes:
+                    return encoded, 'image/jpeg'
+
+            next_dimension = int(dimension * DOWNSCALE_STEP)
+            if next_dimension < 1 or next_dimension == dimension:
+                # これ以上縮小できない場合は最後の結果を返す
+                return encoded, 'image/jpeg'
+            dimension = next_dimension
+
+
+def _resize_to(image, dimension):
+    """長辺がdimension以下になるよう縮小したコピーを返す
+
+    Args:
+        image (PIL.Image.Image): 元の画像
+        dimension (int): 長辺の最大ピクセル数
+
+    Returns:
+        PIL.Image.Image: 縮小後の画像
+    """
+    from PIL import Image
+
+    if max(image.size) <= dimension:
+        return image
+    resized = image.copy()
+    resized.thumbnail((dimension, dimension), Image.LANCZOS)
+    return resized
+
+
+def _encode(image, image_format, **options):
+    """画像をメタデータなしでエンコードする
+
+    Args:
+        image (PIL.Image.Image): エンコードする画像
+        image_format (str): 出力フォーマット（'JPEG'、'PNG'）
+        **options: Pillowのsaveに渡す追加オプション
+
+    Returns:
+        bytes: エンコード後のデータ
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SSky - Blueskyクライアント
+遅延インポートユーティリティ（起動時間の短縮用）
+"""
+
+import logging
+import importlib
+import threading
+
+# ロガーの設定
+logger = logging.getLogger(__name__)
+
+class LazyImport:
+    """最初に属性にアクセスしたとき（または呼び出したとき）にモジュールを読み込む代理オブジェクト
+
+    モジュールレベルの名前として置いておけるため、unittest.mock.patchの対象にもできる。
+    """
+
+    def __init__(self, module_name, attribute=None):
+        """初期化
+
+        Args:
+            module_name (str): モジュール名
+            attribute (str, optional): モジュールの属性名。指定した場合はその属性の代理になる
+        """
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """モジュールを読み込んで代理の対象を返す"""
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._module_name)
+                    logger.debug(f"モジュールを読み込みました: {self._module_name}")
+                    self._target = getattr(module, self._attribute) if self._attribute else module
+                target = self._target
+        return target
+
+    def __getattr__(self, name):
+        """属性へのアクセス時にモジュールを読み込む"""
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        """呼び出し時にモジュールを読み込む（クラスの代理として使う場合）"""
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module_name}.{self._attribute}" if self._attribute else self._module_name
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<LazyImport {name} ({state})>"
+
+def lazy_import(module_name, attribute=None):
+    """モジュール（またはその属性）を遅延インポートする
+
+    Args:
+        module_name (str): モジュール名
+        attribute (str, optional): モジュールの属性名
+
+    Returns:
+        LazyImport: 最初に使うときに読み込む代理オブジェクト
+    """
+    return LazyImport(module_name, attribute)